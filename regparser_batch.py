@@ -0,0 +1,353 @@
+"""Unattended processing of many evidence collections, one output folder per case.
+
+A batch is a list of cases (a JSON or CSV case list, or ZIPs dropped into a
+watched folder). Every case runs the full triage pipeline on the shared
+JobManager, so CPU-bound steps of different cases share the cores. Each
+case is split into an io job that extracts its ZIP and a case job that
+returns the case's pipeline as child jobs. The runner feeds cases to the
+manager itself: extractions run one at a time and at most
+``parallel_cases`` cases are in flight, so the next case is unpacked while
+the current one parses and the disk never fills with evidence that is
+still waiting. Earlier cases keep priority over later ones. A status
+summary (``batch_summary.json`` and ``.csv``) is rewritten in the output
+root whenever a case finishes.
+
+Case list entries use the job file keys (``zip`` or ``reg_folder``,
+``case_name``, ``examiner``, ``output_folder``, ``tasks``, ``report``, ...);
+missing keys come from the batch defaults. JSON is either a list of
+entries or ``{"defaults": {...}, "cases": [...]}``.
+"""
+import os
+import re
+import csv
+import json
+import time
+import shutil
+import threading
+
+import regparser_core as core
+from regparser_jobs import Job, DONE, FAILED, CANCELLED
+from regparser_manifest import open_manifest, load_manifest, latest_entries, summarize_artifacts, utc_now
+from regparser_pipeline import build_triage_pipeline, normalize_job
+
+
+BATCH_SUMMARY_NAME = "batch_summary"
+EXTRACT_DIR = "_extracted"
+DEFAULT_PARALLEL_CASES = 2
+# Added per case to the priority of its jobs so earlier cases run first; above every pipeline priority
+CASE_PRIORITY_STRIDE = 10
+POLL_INTERVAL = 1.0
+WATCH_INTERVAL = 5.0
+# A dropped ZIP is taken once its size and mtime have not changed for this long (still being copied)
+WATCH_SETTLE = 10.0
+# Per-case keys that must never be inherited from the batch defaults
+CASE_KEYS = ['zip', 'extract_to', 'reg_folder', 'jump_folder', 'prefetch_folder', 'output_folder']
+SUMMARY_COLUMNS = ['case', 'source', 'output_folder', 'status', 'started', 'finished', 'extract_seconds',
+                   'total_seconds', 'failed_steps', 'artifacts']
+
+
+def load_case_list(path):
+    """(defaults, case entries) of a JSON or CSV case list"""
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return {}, [{key: value for key, value in row.items() if key and value} for row in csv.DictReader(f)]
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return {}, data
+    return data.get('defaults', {}), data.get('cases', [])
+
+
+def safe_folder_name(name):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('._') or "case"
+
+
+def case_name_of(spec):
+    source = spec.get('zip') or spec.get('reg_folder') or ''
+    stem = os.path.basename(os.path.normpath(source))
+    return spec.get('case_name') or (os.path.splitext(stem)[0] if spec.get('zip') else stem) or "case"
+
+
+def job_tree(job):
+    """job and every descendant it spawned"""
+    jobs = [job]
+    for child in job.children:
+        jobs.extend(job_tree(child))
+    return jobs
+
+
+def claim(job, case_name, offset):
+    """Prefix job with its case and lift it by offset, including any jobs it spawns later"""
+    job.name = f"{case_name}: {job.name}"
+    job.priority += offset
+    func = job.func
+
+    def run(cancel):
+        children = func(cancel)
+        for child in children or []:
+            claim(child, case_name, offset)
+        return children
+    job.func = run
+    return job
+
+
+class BatchCase:
+    def __init__(self, seq, name, job):
+        self.seq = seq
+        self.name = name
+        self.job = job
+        self.source = job.get('zip') or job.get('reg_folder') or ''
+        self.extract_job = None
+        self.case_job = None
+        self.queued = utc_now()
+        self.started = None
+        self.extract_seconds = None
+        self.reported = False
+
+    def jobs(self):
+        if self.case_job is None:
+            return []
+        jobs = [self.extract_job] if self.extract_job else []
+        return jobs + job_tree(self.case_job)
+
+    @property
+    def submitted(self):
+        return self.case_job is not None
+
+    @property
+    def finished(self):
+        return self.case_job is not None and self.case_job.finished
+
+    @property
+    def extracting(self):
+        return self.extract_job is not None and not self.extract_job.finished
+
+    def status(self):
+        if not self.submitted:
+            return 'queued'
+        states = [job.state for job in self.jobs()]
+        if FAILED in states:
+            return 'failed'
+        if CANCELLED in states:
+            return 'cancelled'
+        return 'done' if all(state == DONE for state in states) else 'running'
+
+    def record(self):
+        jobs = self.jobs()
+        finished = [job.finished_at for job in jobs if job.finished_at]
+        started = [job.started_at for job in jobs if job.started_at]
+        artifacts = {}
+        manifest = load_manifest(self.job['output_folder'])
+        if manifest is not None:
+            for name, artifact in summarize_artifacts(latest_entries(manifest['entries'])).items():
+                artifacts[name] = {'status': artifact['status'], 'rows': artifact['rows'], 'files': artifact['file_count']}
+        return {
+            'case': self.name,
+            'source': self.source,
+            'output_folder': self.job['output_folder'],
+            'status': self.status(),
+            'started': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(min(started))) if started else None,
+            'finished': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(max(finished))) if self.finished and finished else None,
+            'extract_seconds': self.extract_seconds,
+            'total_seconds': round(max(finished) - min(started), 3) if self.finished and started and finished else None,
+            'failed_steps': [{'step': job.name, 'error': job.error} for job in jobs if job.state == FAILED],
+            'artifacts': artifacts,
+        }
+
+
+class BatchRunner:
+    """Schedules cases on a JobManager and keeps the batch summary up to date.
+
+    hooks_for(case_name) returns the pipeline hooks of one case (its log
+    lines should name the case).
+    """
+
+    def __init__(self, manager, output_root, hooks_for, defaults=None, parallel_cases=DEFAULT_PARALLEL_CASES,
+                 cleanup=False, log=print, remote=None):
+        self.manager = manager
+        self.remote = remote
+        self.output_root = output_root
+        self.hooks_for = hooks_for
+        self.defaults = {key: value for key, value in (defaults or {}).items() if key not in CASE_KEYS}
+        self.parallel_cases = max(1, parallel_cases)
+        self.cleanup = cleanup
+        self.log = log
+        self.cases = []
+        self.used_outputs = set()
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        os.makedirs(output_root, exist_ok=True)
+
+    def _output_for(self, name):
+        base = os.path.join(self.output_root, safe_folder_name(name))
+        path, counter = base, 2
+        while path in self.used_outputs or os.path.exists(path):
+            path = f"{base}_{counter}"
+            counter += 1
+        return path
+
+    def add(self, spec):
+        """Queue one case; raises ValueError for an entry that cannot run"""
+        job = {key: '' for key in core.CONFIG_KEYS}
+        job.update(self.defaults)
+        job.update(spec)
+        if not (job.get('zip') or job.get('reg_folder')):
+            raise ValueError("a case needs a zip or a reg_folder")
+        name = case_name_of(job)
+        job['case_name'] = job.get('case_name') or name
+        job['output_folder'] = job.get('output_folder') or self._output_for(name)
+        if job.get('zip'):
+            job['extract_to'] = job.get('extract_to') or os.path.join(
+                self.output_root, EXTRACT_DIR, os.path.basename(job['output_folder']))
+        normalize_job(job)
+        # Jump lists and prefetch files are found by walking, so the evidence root is a fine default
+        evidence_root = job.get('extract_to') or job['reg_folder']
+        for key in ('reg_folder', 'jump_folder', 'prefetch_folder'):
+            job[key] = job.get(key) or evidence_root
+        self.used_outputs.add(job['output_folder'])
+
+        with self.lock:
+            case = BatchCase(len(self.cases), name, job)
+            self.cases.append(case)
+        self.log(f"🗂️ Queued case {name} ({case.source}) -> {job['output_folder']}")
+        self.feed()
+        return case
+
+    def feed(self):
+        """Submit waiting cases while fewer than parallel_cases are in flight and no other ZIP is being extracted"""
+        with self.lock:
+            if self.stop.is_set():
+                return
+            in_flight = [case for case in self.cases if case.submitted and not case.finished]
+            extracting = any(case.extracting for case in in_flight)
+            for case in self.cases:
+                if len(in_flight) >= self.parallel_cases:
+                    break
+                if case.submitted:
+                    continue
+                if case.job.get('zip') and extracting:
+                    break
+                self._submit(case)
+                in_flight.append(case)
+                extracting = extracting or case.extracting
+
+    def _submit(self, case):
+        offset = case.seq * CASE_PRIORITY_STRIDE
+        hooks = self.hooks_for(case.name)
+        job = case.job
+        deps = []
+        if job.get('zip'):
+            def extract(cancel):
+                started = time.monotonic()
+                case.started = case.started or utc_now()
+                hooks.log(f"📦 Extracting {job['zip']} to {job['extract_to']}")
+                with open_manifest(job['output_folder']).stage("Evidence", "Extract ZIP", inputs=[job['extract_to']]):
+                    core.extract_zip(job['zip'], job['extract_to'], cancel)
+                case.extract_seconds = round(time.monotonic() - started, 3)
+                hooks.log(f"📁 Extracted in {case.extract_seconds:.1f}s")
+            case.extract_job = Job(f"{case.name}: Extract ZIP", extract, kind='io', priority=offset)
+            deps = [case.extract_job]
+
+        def run_case(cancel):
+            if case.extract_job is not None and case.extract_job.state != DONE:
+                raise RuntimeError(f"extraction failed: {case.extract_job.error}")
+            case.started = case.started or utc_now()
+            hooks.log("🚀 Starting triage")
+            # The ZIP is already extracted; the pipeline must not extract it again
+            children = build_triage_pipeline(dict(job, zip=''), hooks, self.remote)
+            return [claim(child, case.name, offset) for child in children]
+        case.case_job = Job(case.name, run_case, kind='io', priority=offset, deps=deps)
+
+        if case.extract_job is not None:
+            self.manager.submit(case.extract_job)
+        self.manager.submit(case.case_job)
+
+    def _case_finished(self, case):
+        case.reported = True
+        status = case.status()
+        icon = {'done': "✅", 'failed': "⚠️", 'cancelled': "🛑"}.get(status, "ℹ️")
+        self.log(f"{icon} Case {case.name} {status} -> {case.job['output_folder']}")
+        if self.cleanup and case.job.get('zip') and os.path.isdir(case.job['extract_to']):
+            shutil.rmtree(case.job['extract_to'], ignore_errors=True)
+            self.log(f"🧹 Removed extracted evidence of {case.name}")
+        self.write_summary()
+
+    def poll(self):
+        """Report cases that finished since the last call and feed new ones; True while any case is unfinished"""
+        with self.lock:
+            cases = list(self.cases)
+        for case in cases:
+            if case.finished and not case.reported:
+                self._case_finished(case)
+        self.feed()
+        if self.stop.is_set():
+            return any(case.submitted and not case.finished for case in cases)
+        return any(not case.finished for case in cases)
+
+    def wait(self):
+        while self.poll() and not self.stop.is_set():
+            self.manager.wait(timeout=POLL_INTERVAL)
+        self.poll()
+
+    def watch(self, folder, interval=WATCH_INTERVAL, settle=WATCH_SETTLE):
+        """Queue every ZIP that appears in folder (once it stops growing) until stop is set"""
+        self.log(f"👀 Watching {folder} for evidence ZIPs. Ctrl+C stops.")
+        seen = {case.source for case in self.cases}
+        sizes = {}
+        while not self.stop.is_set():
+            now = time.monotonic()
+            try:
+                names = sorted(os.listdir(folder))
+            except OSError as e:
+                self.log(f"⚠️ Cannot list {folder}: {e}")
+                names = []
+            for name in names:
+                path = os.path.join(folder, name)
+                if path in seen or not name.lower().endswith('.zip'):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                signature = (stat.st_size, stat.st_mtime)
+                last = sizes.get(path)
+                if last is None or last[0] != signature:
+                    sizes[path] = (signature, now)
+                    continue
+                if now - last[1] < settle:
+                    continue
+                seen.add(path)
+                try:
+                    self.add({'zip': path})
+                except ValueError as e:
+                    self.log(f"❌ Skipping {path}: {e}")
+            self.poll()
+            self.stop.wait(interval)
+        self.wait()
+
+    def summary(self):
+        with self.lock:
+            records = [case.record() for case in self.cases]
+        counts = {}
+        for record in records:
+            counts[record['status']] = counts.get(record['status'], 0) + 1
+        return {'updated': utc_now(), 'output_root': os.path.abspath(self.output_root),
+                'counts': counts, 'cases': records}
+
+    def write_summary(self):
+        summary = self.summary()
+        base = os.path.join(self.output_root, BATCH_SUMMARY_NAME)
+        with open(base + ".json.tmp", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        os.replace(base + ".json.tmp", base + ".json")
+        with open(base + ".csv.tmp", 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+            writer.writeheader()
+            for record in summary['cases']:
+                row = dict(record)
+                row['failed_steps'] = "; ".join(f"{s['step']}: {s['error']}" for s in record['failed_steps'])
+                row['artifacts'] = "; ".join(f"{name}: {a['rows']} rows ({a['status']})"
+                                             for name, a in record['artifacts'].items())
+                writer.writerow(row)
+        os.replace(base + ".csv.tmp", base + ".csv")
+        return summary
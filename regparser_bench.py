@@ -0,0 +1,242 @@
+"""Benchmarks of the parsing hot paths on synthetic cases.
+
+Generates a case per scale with regparser_synth (cached under --work so
+repeated runs reuse the hives), times each parser a few times and writes
+the results as JSON. Passing a previous result file as --baseline compares
+the new medians against it and exits with status 1 when any benchmark got
+slower than the tolerance allows, so a run can gate a change.
+
+Every run also times the cold start of the CLI: importing regparser_cli in
+fresh interpreters must stay under IMPORT_BUDGET_SECONDS and must not load
+any of LAZY_MODULES, which only the options that need them may import.
+
+    python regparser_bench.py --scales small,medium --output bench.json
+    python regparser_bench.py --scales small,medium --baseline bench.json --tolerance 0.25
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import statistics
+import subprocess
+
+import regparser_core as core
+from regparser_events import ProgressTracker
+from regparser_manifest import environment, utc_now
+from regparser_synth import SCALES, generate_case
+from regparser_usb import correlate_usb_devices
+
+
+BENCH_VERSION = 1
+DEFAULT_SCALES = ['small', 'medium']
+DEFAULT_REPEAT = 3
+# Relative slowdown of a median before it counts as a regression
+DEFAULT_TOLERANCE = 0.20
+# Medians below this are timer noise and never reported as regressions
+MIN_COMPARABLE_SECONDS = 0.05
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+COLD_START_MODULE = 'regparser_cli'
+# Median import time of COLD_START_MODULE (about 0.13 s when recorded), with headroom
+IMPORT_BUDGET_SECONDS = 0.2
+# Never imported by a plain parsing run: GUI, reports, optional exporters and run modes
+LAZY_MODULES = ('tkinter', 'reportlab', 'numpy', 'pyarrow', 'cProfile', 'pstats', 'http.server', 'urllib.request',
+                'regparser_reports', 'regparser_viewer', 'regparser_profiling', 'regparser_metrics',
+                'regparser_batch', 'regparser_distributed')
+
+
+def _registry(case, out):
+    tracker = ProgressTracker("bench")
+    core.parse_registry_hive(case['SYSTEM'], os.path.join(out, "registry.csv"), progress=tracker)
+    return tracker.keys
+
+
+def _usb(case, out):
+    return core.parse_usb_devices_from_system_hive(case['SYSTEM'], os.path.join(out, "usb.csv"))
+
+
+def _bluetooth(case, out):
+    return core.parse_bluetooth_from_system_hives([case['SYSTEM']], os.path.join(out, "bluetooth.csv"),
+                                                  log=lambda message: None)
+
+
+def _network(case, out):
+    return core.parse_network_profiles_from_software_hives([case['SOFTWARE']], os.path.join(out, "network.csv"),
+                                                           log=lambda message: None)
+
+
+def _usb_correlation(case, out):
+    return correlate_usb_devices([case[name] for name in ('SYSTEM', 'SOFTWARE', 'NTUSER.DAT')],
+                                 os.path.join(out, "usb_correlation.csv"), log=lambda message: None)
+
+
+def _find_hives(case, out):
+    return len(core.find_hives(case['folder']))
+
+
+# name -> (function(case, output_dir) returning the item count, unit of the count)
+BENCHMARKS = {
+    'parse_registry_hive': (_registry, 'keys'),
+    'parse_usb_devices_from_system_hive': (_usb, 'devices'),
+    'correlate_usb_devices': (_usb_correlation, 'devices'),
+    'parse_bluetooth_from_system_hives': (_bluetooth, 'devices'),
+    'parse_network_profiles_from_software_hives': (_network, 'profiles'),
+    'find_hives': (_find_hives, 'hives'),
+}
+
+
+def prepare_case(work_dir, scale, seed=0, log=print):
+    """Hive paths of the synthetic case for scale, generating it on first use"""
+    folder = os.path.join(work_dir, f"{scale}-seed{seed}")
+    marker = os.path.join(folder, "case.json")
+    if os.path.exists(marker):
+        with open(marker, encoding='utf-8') as f:
+            return json.load(f)
+    log(f"🧩 Generating {scale} case in {folder}")
+    shutil.rmtree(folder, ignore_errors=True)
+    case = generate_case(folder, scale, seed)
+    case['folder'] = folder
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump(case, f, indent=2)
+    return case
+
+
+def run_benchmark(func, case, repeat):
+    """Run func repeat times, each into a fresh output folder; returns (timings, item count)"""
+    timings, items = [], 0
+    for _ in range(repeat):
+        out = tempfile.mkdtemp(prefix="regparser_bench_")
+        try:
+            started = time.perf_counter()
+            items = func(case, out) or 0
+            timings.append(time.perf_counter() - started)
+        finally:
+            shutil.rmtree(out, ignore_errors=True)
+    return timings, items
+
+
+def run_suite(scales, names, work_dir, repeat=DEFAULT_REPEAT, seed=0, log=print):
+    results = []
+    for scale in scales:
+        case = prepare_case(work_dir, scale, seed, log)
+        hive_bytes = sum(os.path.getsize(case[name]) for name in ('SYSTEM', 'SOFTWARE', 'NTUSER.DAT'))
+        for name in names:
+            func, unit = BENCHMARKS[name]
+            timings, items = run_benchmark(func, case, repeat)
+            median = statistics.median(timings)
+            results.append({
+                'benchmark': name,
+                'scale': scale,
+                'repeat': repeat,
+                'min_seconds': round(min(timings), 6),
+                'median_seconds': round(median, 6),
+                'items': items,
+                'unit': unit,
+                'items_per_second': round(items / median, 1) if median else None,
+                'hive_bytes': hive_bytes,
+            })
+            log(f"⏱ {scale:<7} {name:<44} median {median:8.3f}s  min {min(timings):8.3f}s  "
+                f"{items:,} {unit}")
+    return results
+
+
+def measure_cold_start(module=COLD_START_MODULE, repeat=DEFAULT_REPEAT):
+    """Median seconds to import module in a fresh interpreter, and the LAZY_MODULES that import loaded"""
+    code = f"import sys, {module}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    timings, loaded = [], []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True)
+        # Last line of -X importtime: "import time: self | cumulative | module" of the module itself
+        cumulative = proc.stderr.strip().splitlines()[-1].split('|')[1]
+        timings.append(int(cumulative) / 1_000_000)
+        loaded = [name for name in proc.stdout.strip().split(',') if name]
+    return statistics.median(timings), loaded
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Benchmarks whose median is more than tolerance slower than in baseline"""
+    previous = {(r['benchmark'], r['scale']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result['benchmark'], result['scale']))
+        if not before or before['median_seconds'] < MIN_COMPARABLE_SECONDS:
+            continue
+        ratio = result['median_seconds'] / before['median_seconds']
+        if ratio > 1 + tolerance:
+            regressions.append({'benchmark': result['benchmark'], 'scale': result['scale'],
+                                'baseline_seconds': before['median_seconds'],
+                                'median_seconds': result['median_seconds'], 'ratio': round(ratio, 3)})
+    return regressions
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="regparser_bench", description="Benchmark RegParser on synthetic hives")
+    parser.add_argument("--scales", default=",".join(DEFAULT_SCALES),
+                        help=f"comma-separated scales out of {', '.join(SCALES)} (default: %(default)s)")
+    parser.add_argument("--benchmarks", default=",".join(BENCHMARKS),
+                        help="comma-separated benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work", default=os.path.join(tempfile.gettempdir(), "regparser_bench"),
+                        help="folder for the generated cases, reused between runs")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative slowdown of a median (default: %(default)s)")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_SECONDS,
+                        help=f"seconds {COLD_START_MODULE} may take to import (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    names = [n.strip() for n in args.benchmarks.split(",") if n.strip()]
+    unknown = [s for s in scales if s not in SCALES] + [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"❌ Unknown scale or benchmark: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    import_seconds, loaded = measure_cold_start(repeat=args.repeat)
+    print(f"⏱ cold start: import {COLD_START_MODULE} median {import_seconds:.3f}s "
+          f"(budget {args.import_budget:.3f}s)")
+    report = {
+        'version': BENCH_VERSION,
+        'created': utc_now(),
+        'environment': dict(environment(), cpu_count=os.cpu_count()),
+        'cold_start': {'module': COLD_START_MODULE, 'median_seconds': round(import_seconds, 6),
+                       'budget_seconds': args.import_budget, 'lazy_modules_loaded': loaded},
+        'results': run_suite(scales, names, args.work, args.repeat, args.seed),
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+    failed = False
+    if loaded:
+        print(f"❌ Importing {COLD_START_MODULE} loaded {', '.join(loaded)}; import them where they are used")
+        failed = True
+    if import_seconds > args.import_budget:
+        print(f"❌ Importing {COLD_START_MODULE} took {import_seconds:.3f}s, over the {args.import_budget:.3f}s budget")
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report['results'], baseline, args.tolerance)
+        for r in regressions:
+            print(f"❌ {r['scale']} {r['benchmark']}: {r['median_seconds']:.3f}s vs "
+                  f"{r['baseline_seconds']:.3f}s baseline (x{r['ratio']})")
+        if regressions:
+            return 1
+        print(f"✅ No benchmark slower than its baseline by more than {args.tolerance:.0%}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
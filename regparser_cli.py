@@ -0,0 +1,324 @@
+"""Headless command-line entry point for RegParser.
+
+Runs hive scanning, the parsers and report export without a display, either
+from arguments or from a JSON job file in the format written by the GUI's
+"Save Configuration" (extra keys ``tasks``, ``hives``, ``report``, ``zip``,
+``extract_to`` and ``timeline_*`` are honoured when present).
+
+    python regparser_cli.py --config case.json
+    python regparser_cli.py --reg-folder /evidence/C --output /cases/42 --tasks registry,usb
+    python regparser_cli.py --zip kape.zip --output /cases/42 --report html,pdf
+    python regparser_cli.py --output /cases/42 --search '"secret plans" usb*'
+    python regparser_cli.py --reg-folder /evidence/C --output /cases/42 --profile
+    python regparser_cli.py --config case.json --metrics /var/lib/node_exporter/regparser.prom --metrics-port 9464
+    python regparser_cli.py --batch cases.json --output /cases --report html --cleanup-extracted
+    python regparser_cli.py --watch /intake --output /cases --examiner "Night shift"
+    python regparser_cli.py --batch cases.json --output /cases --distribute 0.0.0.0:8765 --token s3cret
+    python regparser_cli.py --batch cases.json --output /cases --memory-limit 3G --io-workers 1
+
+With --batch or --watch, --output is the root that gets one folder per case
+and the other options (or the --config file) are the defaults of every case.
+With --distribute the parser steps run on worker nodes started with
+regparser_distributed.py; see that module for the protocol. A resource
+governor (regparser_governor) sizes the worker pools and holds back new
+steps near the memory ceiling unless --no-governor is given.
+
+Only the standard library and python-registry are imported at startup;
+reportlab is pulled in by the PDF export only, and --search, --profile,
+--metrics, --batch/--watch, --distribute and the governor import their
+modules in the branch that uses them. regparser_bench checks the import
+time of this module against a recorded budget.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import types
+import argparse
+import datetime
+import multiprocessing
+
+import regparser_core as core
+from regparser_events import ProgressTracker
+from regparser_jobs import JobManager, FAILED, CANCELLED, DEFAULT_IO_SLOTS
+from regparser_pipeline import ALL_TASKS, build_triage_pipeline, normalize_job
+# The pipeline validates the timeline options, so this module is loaded anyway
+from regparser_timeline import TIMELINE_FORMATS, TIMELINE_SOURCES
+
+
+# Console progress lines are rate limited so huge hives don't flood batch logs
+PROGRESS_INTERVAL = 5.0
+
+
+def log(message):
+    timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+    print(f"[{timestamp}] {message}", flush=True)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="regparser",
+        description="RegParser headless batch mode")
+    parser.add_argument("--config", help="JSON job file (same format as Save Configuration)")
+    parser.add_argument("--reg-folder", help="folder containing registry hives")
+    parser.add_argument("--jump-folder", help="folder containing jump lists")
+    parser.add_argument("--prefetch-folder", help="folder containing prefetch files")
+    parser.add_argument("--output", dest="output_folder", help="output folder")
+    parser.add_argument("--zip", help="collection ZIP to extract and scan for hives")
+    parser.add_argument("--extract-to", help="folder to extract --zip into (default: next to the ZIP)")
+    parser.add_argument("--case-name")
+    parser.add_argument("--examiner")
+    parser.add_argument("--organization")
+    parser.add_argument("--logo", dest="logo_path", help="organization logo for reports")
+    parser.add_argument("--date", help="analysis date for reports (default: today)")
+    parser.add_argument("--tasks", help=f"comma separated subset of: {','.join(ALL_TASKS)} (default: all)")
+    parser.add_argument("--hives", help="comma separated hive file names to parse (default: every scanned hive)")
+    parser.add_argument("--report", help="comma separated report formats: html,pdf (default: none)")
+    parser.add_argument("--workers", type=int,
+                        help="most concurrent CPU-bound jobs; the governor may run fewer (default: CPU count)")
+    parser.add_argument("--io-workers", type=int, default=DEFAULT_IO_SLOTS,
+                        help="concurrent disk-heavy jobs: extraction, scanning, hashing (default: %(default)s)")
+    parser.add_argument("--memory-limit", metavar="SIZE",
+                        help="memory ceiling of the run and its child processes, e.g. 3G or 75%% "
+                        "(default: 80%% of physical RAM)")
+    parser.add_argument("--no-governor", action='store_true',
+                        help="run fixed --workers/--io-workers pools without watching memory")
+    parser.add_argument("--profile", nargs='?', const='all', metavar="MODE",
+                        help="write cProfile/tracemalloc profiles of every step to <output>/Profiling "
+                        "(cpu, memory or all; default: all)")
+    parser.add_argument("--metrics", nargs='?', const='', metavar="FILE",
+                        help="keep an OpenMetrics text file up to date (default: <output>/regparser.prom) "
+                        "and write <output>/run_summary.json at the end")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="also serve the metrics on http://127.0.0.1:PORT/metrics (implies --metrics)")
+    parser.add_argument("--metrics-interval", type=float,
+                        help="seconds between metrics file updates (default: 10)")
+    parser.add_argument("--batch", metavar="FILE", help="JSON or CSV list of cases to process one after another")
+    parser.add_argument("--watch", metavar="FOLDER", help="process every evidence ZIP dropped into FOLDER until stopped")
+    parser.add_argument("--parallel-cases", type=int,
+                        help="batch cases in flight at once, e.g. one parsing while the next extracts (default: 2)")
+    parser.add_argument("--cleanup-extracted", action='store_true',
+                        help="delete a batch case's extracted evidence once the case has finished")
+    parser.add_argument("--distribute", nargs='?', const='', metavar="[HOST:]PORT",
+                        help="hand the parser steps to worker nodes polling this address "
+                        "(default: 127.0.0.1:8765; use 0.0.0.0:PORT for other machines)")
+    parser.add_argument("--token", help="shared secret worker nodes must present (default: $REGPARSER_TOKEN)")
+    parser.add_argument("--search", metavar="QUERY", help="search the case outputs under --output instead of parsing "
+                        '(words must all match, "quoted phrase", prefix*)')
+    parser.add_argument("--limit", type=int, default=50, help="maximum --search hits to print (default: 50)")
+    parser.add_argument("--timeline-format", choices=list(TIMELINE_FORMATS), help="super-timeline output format (default: csv)")
+    parser.add_argument("--timeline-from", help="keep timeline events at or after this UTC time (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument("--timeline-to", help="keep timeline events at or before this UTC time (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument("--timeline-sources", help=f"comma separated subset of: {','.join(TIMELINE_SOURCES)} (default: all)")
+    return parser
+
+
+def load_job(args):
+    """Merge the job file (if any), the defaults of a --batch case list and command-line overrides"""
+    job = {key: '' for key in core.CONFIG_KEYS}
+    if args.config:
+        with open(args.config, 'r') as f:
+            job.update(json.load(f))
+    if getattr(args, 'batch', None):
+        from regparser_batch import load_case_list
+        job.update(load_case_list(args.batch)[0])
+
+    timeline_keys = ['timeline_format', 'timeline_from', 'timeline_to', 'timeline_sources']
+    for key in core.CONFIG_KEYS + ['zip', 'extract_to', 'date', 'tasks', 'hives', 'report'] + timeline_keys:
+        value = getattr(args, key, None)
+        if value is not None:
+            job[key] = value
+
+    return normalize_job(job)
+
+
+def make_hooks(manager, prefix=""):
+    """Pipeline hooks that log to the console (each line prefixed, e.g. with a batch case name)
+    and report stages to the manager's profiler and metrics when those are on"""
+    def case_log(message):
+        log(prefix + message)
+
+    def case_report(tracker):
+        if not tracker.finished:
+            case_log(f"⏳ {tracker.describe()}")
+
+    def start(stage, **totals):
+        tracker = ProgressTracker(stage, case_report, interval=PROGRESS_INTERVAL, **totals)
+        if manager.metrics is not None:
+            manager.metrics.watch_stage(tracker)
+        return tracker
+
+    def finish(tracker):
+        tracker.finish()
+        case_log(f"⏱ {tracker.describe()}")
+        for observer in (manager.profiler, manager.metrics):
+            if observer is not None:
+                observer.record_stage(tracker)
+
+    return types.SimpleNamespace(log=case_log, start_tracker=start, finish_tracker=finish)
+
+
+def run_job(job, manager, remote=None):
+    """Run every requested task for one case on manager. Returns the finished jobs.
+
+    Independent steps run concurrently; cancel_all() on the manager stops them
+    and leaves partial outputs renamed to *.incomplete.
+    """
+    os.makedirs(job['output_folder'], exist_ok=True)
+    if job.get('zip') and not job.get('extract_to'):
+        job['extract_to'] = os.path.join(
+            os.path.dirname(os.path.abspath(job['zip'])),
+            f"zip_extract_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+    manager.submit_all(build_triage_pipeline(job, make_hooks(manager), remote))
+    manager.wait()
+    jobs = manager.snapshot()
+    for finished in jobs:
+        if finished.state == FAILED:
+            log(f"❌ {finished.name}: {finished.error}")
+    return jobs
+
+
+def run_search(output_folder, query, limit):
+    """Print the rows of output_folder's CSVs matching query, one per line, with their source file"""
+    from regparser_search import search_case, update_search_index
+    update_search_index(output_folder, log=log)
+    started = time.perf_counter()
+    hits = search_case(output_folder, query, limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    for hit in hits:
+        values = " | ".join(f"{column}={value}" for column, value in hit['row'].items() if value)
+        print(f"[{hit['artifact']}] {hit['file']}: {values}")
+    log(f"🔎 {len(hits)} match(es) for {query!r} in {elapsed:.1f} ms" + (" (limit reached)" if len(hits) >= limit else ""))
+    return 0 if hits else 1
+
+
+def run_batch(runner, args):
+    """Queue the --batch cases (and watch --watch) until every case has finished. Returns (jobs, rejected)."""
+    from regparser_batch import load_case_list
+    rejected = 0
+    if args.batch:
+        for spec in load_case_list(args.batch)[1]:
+            try:
+                runner.add(spec)
+            except ValueError as e:
+                rejected += 1
+                log(f"❌ Skipping case {spec}: {e}")
+    if args.watch:
+        runner.watch(args.watch)
+    else:
+        runner.wait()
+    summary = runner.write_summary()
+    counts = ", ".join(f"{count} {status}" for status, count in sorted(summary['counts'].items()))
+    log(f"🗂️ Batch finished: {counts or 'no cases'}. Summary: {os.path.join(args.output_folder, 'batch_summary.json')}")
+    return runner.manager.snapshot(), rejected
+
+
+def install_cancel_handlers(manager, stop=None):
+    """Ctrl+C / SIGTERM cancel the running jobs cooperatively instead of killing them mid-write"""
+    def handle(signum, frame):
+        log("🛑 Cancel requested. Stopping...")
+        if stop is not None:
+            stop.set()
+        manager.cancel_all()
+
+    signal.signal(signal.SIGINT, handle)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, handle)
+
+
+def main(argv=None):
+    started = time.perf_counter()
+    args = build_arg_parser().parse_args(argv)
+    if args.profile is not None:
+        from regparser_profiling import PROFILE_MODES
+        if args.profile not in PROFILE_MODES:
+            log(f"❌ --profile takes one of: {', '.join(PROFILE_MODES)}")
+            return 2
+    if args.search is not None:
+        if not args.output_folder:
+            log("❌ --search needs --output (the case output folder)")
+            return 2
+        return run_search(args.output_folder, args.search, args.limit)
+    try:
+        job = load_job(args)
+    except (OSError, ValueError) as e:
+        log(f"❌ {e}")
+        return 2
+
+    manager = JobManager(cpu_slots=args.workers, io_slots=args.io_workers)
+    governor = None
+    if not args.no_governor:
+        from regparser_governor import ResourceGovernor, parse_memory_limit
+        try:
+            ceiling = parse_memory_limit(args.memory_limit) if args.memory_limit else None
+        except ValueError as e:
+            log(f"❌ {e}")
+            return 2
+        governor = ResourceGovernor(ceiling, args.workers, args.io_workers, log=log).start(manager)
+    coordinator = None
+    if args.distribute is not None:
+        from regparser_distributed import Coordinator, parse_address, DEFAULT_PORT, TOKEN_ENV
+        try:
+            host, port = parse_address(args.distribute or DEFAULT_PORT)
+            coordinator = Coordinator(manager, host, port, args.token or os.environ.get(TOKEN_ENV), log=log).start()
+        except (OSError, ValueError) as e:
+            log(f"❌ Cannot serve worker nodes on {args.distribute}: {e}")
+            return 2
+    runner = None
+    if args.batch or args.watch:
+        from regparser_batch import BatchRunner, DEFAULT_PARALLEL_CASES
+        runner = BatchRunner(manager, job['output_folder'], lambda name: make_hooks(manager, f"[{name}] "),
+                             job, args.parallel_cases or DEFAULT_PARALLEL_CASES, args.cleanup_extracted, log,
+                             coordinator)
+    install_cancel_handlers(manager, runner.stop if runner is not None else None)
+    if args.profile:
+        from regparser_profiling import Profiler
+        os.makedirs(job['output_folder'], exist_ok=True)
+        manager.profiler = Profiler(job['output_folder'], args.profile, log)
+    metrics = None
+    if args.metrics is not None or args.metrics_port is not None:
+        from regparser_metrics import RunMetrics, METRICS_INTERVAL
+        metrics = RunMetrics(manager, job['output_folder'], args.metrics or None, args.metrics_port,
+                             args.metrics_interval or METRICS_INTERVAL, log).start()
+    rejected = 0
+    try:
+        if runner is None:
+            jobs = run_job(job, manager, coordinator)
+        else:
+            jobs, rejected = run_batch(runner, args)
+    except (OSError, ValueError) as e:
+        log(f"❌ {e}")
+        jobs, rejected = manager.snapshot(), 1
+    if coordinator is not None:
+        coordinator.stop()
+    if manager.profiler is not None:
+        manager.profiler.finish()
+    code = exit_code(jobs, started)
+    if rejected and code == 0:
+        code = 1
+    if metrics is not None:
+        metrics.stop(code)
+    if governor is not None:
+        governor.stop()
+    return code
+
+
+def exit_code(jobs, started):
+    """Log how the run ended; 0 all done, 1 some step failed, 130 canceled"""
+    if any(j.state == CANCELLED for j in jobs):
+        log("🛑 Job canceled. Partial outputs were marked .incomplete")
+        return 130
+    failures = sum(1 for j in jobs if j.state == FAILED)
+    elapsed = time.perf_counter() - started
+    if failures:
+        log(f"⚠️ Finished with {failures} failed step(s) in {elapsed:.2f}s")
+        return 1
+    log(f"✅ All tasks complete in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,522 @@
+"""GUI-independent parsing engine shared by the Tk front end and the headless CLI.
+
+Nothing in here may import tkinter or reportlab: the CLI imports this module on
+processing servers that have neither.
+"""
+import os
+import csv
+import sys
+import zipfile
+import threading
+import contextlib
+import io
+from Registry import Registry
+
+import regparser_hashing as hashing
+from regparser_times import filetime_to_str, filetimes_to_str, systemtime_to_str
+
+
+BASE_DIR = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+APP_VERSION = "RegParser v2.2"
+
+# Keys of the configuration written by ForensicParserApp.save_config. The same
+# JSON doubles as the job file for the headless CLI.
+CONFIG_KEYS = [
+    'reg_folder', 'jump_folder', 'prefetch_folder', 'output_folder',
+    'case_name', 'examiner', 'organization', 'logo_path'
+]
+
+# How often the traversal loops look at their cancel token
+CANCEL_CHECK_EVERY = 256
+# Keys whose last-write times the registry dump decodes in one batch
+TIME_BATCH_KEYS = 4096
+
+KNOWN_HIVE_NAMES = [
+    'SYSTEM', 'SOFTWARE', 'SAM', 'SECURITY', 'NTUSER.DAT', 'USRCLASS.DAT',
+    'AMCACHE.HVE', 'DRIVERS', 'usrClass.dat', 'BBI', 'BCD', 'COMPONENTS',
+    'DEFAULT', 'ELAM', 'SCHEMA.DAT'
+]
+
+
+class JobCancelled(Exception):
+    """Raised inside a parser when its job's CancelToken has been cancelled"""
+
+
+class CancelToken:
+    """Per-job cancellation flag shared between the GUI/CLI and one worker"""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def cancel(self):
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def check(self):
+        if self.event.is_set():
+            raise JobCancelled()
+
+
+def mark_incomplete(path):
+    """Rename a partially written output to <path>.incomplete so it is never mistaken for a result"""
+    if os.path.exists(path):
+        os.replace(path, path + ".incomplete")
+
+
+@contextlib.contextmanager
+def incomplete_on_cancel(path):
+    try:
+        yield
+    except JobCancelled:
+        mark_incomplete(path)
+        raise
+
+
+def find_hives(folder):
+    """Walk folder and return the paths of files that look like registry hives"""
+    known = {hive.upper() for hive in KNOWN_HIVE_NAMES}
+    hives = []
+    for root_dir, dirs, files in os.walk(folder):
+        for file in files:
+            # Check for known hive names (case-insensitive)
+            if file.upper() in known:
+                hives.append(os.path.join(root_dir, file))
+            # Also check for files without extensions that might be hives
+            elif '.' not in file and len(file) > 2:
+                full_path = os.path.join(root_dir, file)
+                # Basic heuristic: check file size (registry hives are typically > 10KB)
+                try:
+                    if os.path.getsize(full_path) > 10240:  # 10KB
+                        hives.append(full_path)
+                except OSError:
+                    pass
+    return hives
+
+
+def zip_member_target(dest_dir, filename):
+    """Where a member lands under dest_dir; absolute paths, drives and '..' are dropped as ZipFile.extract does"""
+    parts = [part for part in filename.replace('\\', '/').split('/') if part not in ('', '.', '..')]
+    if parts:
+        parts[0] = os.path.splitdrive(parts[0])[1] or parts[0]
+    return os.path.join(dest_dir, *parts)
+
+
+def extract_zip(zip_path, dest_dir, cancel=None):
+    """Extract a collection ZIP (e.g. KAPE output) into dest_dir.
+
+    Members are streamed out in chunks and hashed on the way, so the
+    extracted evidence never has to be read again to be hashed.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for member in zip_ref.infolist():
+            if cancel is not None:
+                cancel.check()
+            target = zip_member_target(dest_dir, member.filename)
+            if member.is_dir():
+                os.makedirs(target, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with zip_ref.open(member) as source, open(target, 'wb') as destination:
+                digests = hashing.copy_and_hash(source, destination, cancel)
+            hashing.remember(target, digests)
+    return dest_dir
+
+
+def open_hive(hive_path):
+    """Load a hive for python-registry; the one read that loads it also hashes it"""
+    return Registry.Registry(io.BytesIO(hashing.read_and_hash(hive_path)))
+
+
+def approx_value_size(data):
+    """Rough on-disk size of a decoded value, used for bytes-visited progress"""
+    if isinstance(data, bytes):
+        return len(data)
+    if isinstance(data, str):
+        return 2 * len(data)
+    if isinstance(data, list):
+        return sum(2 * len(str(item)) + 2 for item in data)
+    return 0
+
+
+def key_filetime(key):
+    """Raw last-write FILETIME of a python-registry key; timestamp() builds a datetime on every call"""
+    return key._nkrecord.unpack_qword(0x4)
+
+
+def hive_data_size(hive_path):
+    """Size of the hbin area of a hive (file size minus the 4 KB base block)"""
+    return max(os.path.getsize(hive_path) - 4096, 0)
+
+
+def parse_registry_hive(hive_path, output_csv, progress=None, cancel=None, reg=None):
+    """Enhanced registry hive parser with better error handling
+
+    progress, when given, is a regparser_events.ProgressTracker that receives
+    keys, values, rows and an estimate of hbin bytes visited per key. cancel
+    is a CancelToken checked every CANCEL_CHECK_EVERY keys. reg is the hive
+    when the caller has loaded it already for another pass.
+    """
+    if reg is None:
+        reg = open_hive(hive_path)
+    keys_seen = 0
+    # (last-write FILETIME, rows) per key; the times of a whole batch are decoded in one call
+    pending = []
+
+    with incomplete_on_cancel(output_csv), open(output_csv, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Key Path', 'Value Name', 'Value Type', 'Value Data', 'Last Modified'])
+
+        def get_value_type(value):
+            """Convert registry value type to readable string"""
+            type_map = {
+                Registry.RegSZ: "REG_SZ",
+                Registry.RegExpandSZ: "REG_EXPAND_SZ",
+                Registry.RegBin: "REG_BINARY",
+                Registry.RegDWord: "REG_DWORD",
+                Registry.RegMultiSZ: "REG_MULTI_SZ",
+                Registry.RegQWord: "REG_QWORD"
+            }
+            return type_map.get(value.value_type(), f"Unknown({value.value_type()})")
+
+        def flush():
+            times = filetimes_to_str([filetime for filetime, _ in pending], suffix="")
+            for formatted, (_, rows) in zip(times, pending):
+                for row in rows:
+                    if row[4] is None:
+                        row[4] = formatted
+                writer.writerows(rows)
+            pending.clear()
+
+        def recursive_parse(key, path=""):
+            nonlocal keys_seen
+            keys_seen += 1
+            if cancel is not None and keys_seen % CANCEL_CHECK_EVERY == 0:
+                cancel.check()
+            current_path = path + "\\" + key.name() if path else key.name()
+            # nk cell header plus name; values add their vk cell and data below
+            visited = 80 + len(current_path) - len(path)
+            value_count = 0
+            rows = []
+
+            # Parse values in current key
+            for value in key.values():
+                value_count += 1
+                try:
+                    val_name = value.name() or "(Default)"
+                    val_type = get_value_type(value)
+
+                    # Handle different data types
+                    try:
+                        raw_data = value.value()
+                        visited += 24 + len(val_name) + approx_value_size(raw_data)
+                        val_data = str(raw_data)
+                        # Truncate very long binary data
+                        if val_type == "REG_BINARY" and len(val_data) > 100:
+                            val_data = val_data[:100] + "... (truncated)"
+                    except:
+                        val_data = "[Error reading value]"
+
+                    # Last Modified is filled in by flush()
+                    rows.append([current_path, val_name, val_type, val_data, None])
+                except Exception as e:
+                    # Log error but continue processing
+                    rows.append([current_path, "[Error]", "ERROR", f"Failed to read: {e}", ""])
+
+            if rows:
+                pending.append((key_filetime(key), rows))
+                if len(pending) >= TIME_BATCH_KEYS:
+                    flush()
+
+            if progress is not None:
+                progress.add(keys=1, values=value_count, rows=value_count, nbytes=visited)
+
+            # Recursively process subkeys
+            for subkey in key.subkeys():
+                try:
+                    recursive_parse(subkey, current_path)
+                except JobCancelled:
+                    raise
+                except Exception as e:
+                    # Log error but continue with other subkeys
+                    pending.append((0, [[current_path + "\\" + subkey.name(), "[Error]", "ERROR",
+                                         f"Failed to access subkey: {e}", ""]]))
+
+        recursive_parse(reg.root())
+        flush()
+
+def parse_usb_devices_from_system_hive(hive_path, output_csv, progress=None, cancel=None):
+    """Enhanced USB device parser with more comprehensive data extraction"""
+    reg = open_hive(hive_path)
+
+    # Try multiple ControlSets for comprehensive coverage
+    control_sets = ["ControlSet001", "ControlSet002", "CurrentControlSet"]
+    usbstor_key = None
+    usb_key = None
+
+    for cs in control_sets:
+        if usbstor_key is None:
+            try:
+                usbstor_key = reg.open(f"{cs}\\Enum\\USBSTOR")
+            except Registry.RegistryKeyNotFoundException:
+                pass
+        if usb_key is None:
+            try:
+                usb_key = reg.open(f"{cs}\\Enum\\USB")
+            except Registry.RegistryKeyNotFoundException:
+                pass
+        if usbstor_key and usb_key:
+            break
+
+    if progress is not None:
+        # One progress item per device ID key across both Enum branches
+        for key in (usbstor_key, usb_key):
+            if key:
+                progress.total_items += key.subkeys_number()
+
+    with incomplete_on_cancel(output_csv), open(output_csv, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.writer(csvfile)
+        # Enhanced column set with additional forensically relevant fields
+        writer.writerow([
+            'Type', 'Device ID', 'Instance ID', 'Key Last Modified', 'Device Description',
+            'Friendly Name', 'Service', 'Class GUID', 'Parent ID Prefix', 'Serial Number',
+            'Hardware IDs', 'Compatible IDs', 'Driver', 'Manufacturer', 'Location Information'
+        ])
+
+        def parse_usb_keys(key, key_type):
+            if not key:
+                return
+
+            device_count = 0
+            for device_id_key in key.subkeys():
+                if cancel is not None:
+                    cancel.check()
+                device_id = device_id_key.name()
+                for instance_key in device_id_key.subkeys():
+                    instance_id = instance_key.name()
+
+                    # Enhanced timestamp handling
+                    try:
+                        last_modified = filetime_to_str(key_filetime(instance_key)) or "N/A"
+                    except Exception:
+                        last_modified = "N/A"
+
+                    # Comprehensive value extraction with error handling
+                    def get_value_safe(key, val_name):
+                        try:
+                            value = key.value(val_name).value()
+                            if isinstance(value, list):
+                                return "; ".join(str(v) for v in value)
+                            return str(value)
+                        except Registry.RegistryValueNotFoundException:
+                            return ""
+                        except Exception:
+                            return "[Error reading value]"
+
+                    device_desc = get_value_safe(instance_key, "DeviceDesc")
+                    friendly_name = get_value_safe(instance_key, "FriendlyName")
+                    service = get_value_safe(instance_key, "Service")
+                    class_guid = get_value_safe(instance_key, "ClassGUID")
+                    parent_id_prefix = get_value_safe(instance_key, "ParentIdPrefix")
+                    hardware_ids = get_value_safe(instance_key, "HardwareID")
+                    compatible_ids = get_value_safe(instance_key, "CompatibleIDs")
+                    driver = get_value_safe(instance_key, "Driver")
+                    manufacturer = get_value_safe(instance_key, "Mfg")
+                    location_info = get_value_safe(instance_key, "LocationInformation")
+
+                    # Enhanced serial number extraction
+                    serial_number = instance_id  # Default to instance ID
+                    serial_number_val = get_value_safe(instance_key, "SerialNumber")
+                    if serial_number_val:
+                        serial_number = serial_number_val
+
+                    writer.writerow([
+                        key_type, device_id, instance_id, last_modified, device_desc,
+                        friendly_name, service, class_guid, parent_id_prefix, serial_number,
+                        hardware_ids, compatible_ids, driver, manufacturer, location_info
+                    ])
+                    device_count += 1
+                    if progress is not None:
+                        progress.add(keys=1, rows=1)
+
+                if progress is not None:
+                    progress.add(items=1)
+
+            return device_count
+
+        usbstor_count = 0
+        usb_count = 0
+
+        if usbstor_key:
+            usbstor_count = parse_usb_keys(usbstor_key, "USBSTOR") or 0
+        else:
+            writer.writerow(["USBSTOR", "No devices found or key missing", "", "", "", "", "", "", "", "", "", "", "", "", ""])
+
+        if usb_key:
+            usb_count = parse_usb_keys(usb_key, "USB") or 0
+        else:
+            writer.writerow(["USB", "No devices found or key missing", "", "", "", "", "", "", "", "", "", "", "", "", ""])
+
+    return usbstor_count + usb_count
+
+
+def parse_bluetooth_from_system_hives(hive_paths, output_csv, log=print, progress=None, cancel=None):
+    """Extract paired Bluetooth devices from every SYSTEM hive in hive_paths"""
+
+    def decode_device_name(raw_bytes):
+        if not raw_bytes:
+            return ""
+
+        # Try UTF-16 first (some devices use it)
+        try:
+            name = raw_bytes.decode('utf-16-le').strip('\x00')
+            if name and all(32 <= ord(c) < 127 or c.isspace() for c in name):  # basic ASCII printable
+                return name
+        except:
+            pass
+
+        # Try UTF-8 next
+        try:
+            return raw_bytes.decode('utf-8', errors='replace').strip('\x00')
+        except:
+            pass
+
+        return raw_bytes.hex()  # Raw hex fallback
+
+    def parse_cod(cod):
+        major_device_classes = {
+            0x00: 'Miscellaneous',
+            0x01: 'Computer',
+            0x02: 'Phone',
+            0x03: 'LAN/Network Access Point',
+            0x04: 'Audio/Video',
+            0x05: 'Peripheral',
+            0x06: 'Imaging',
+            0x07: 'Wearable',
+            0x08: 'Toy',
+            0x09: 'Health',
+        }
+        try:
+            major = (cod >> 8) & 0x1F
+            return major_device_classes.get(major, 'Unknown')
+        except:
+            return ""
+
+    with incomplete_on_cancel(output_csv), open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Hive', 'MAC Address', 'Name', 'ClassOfDevice', 'Device Type', 'LastSeen', 'LastConnected'])
+
+        device_count = 0
+        for hive_path in hive_paths:
+            if os.path.basename(hive_path).upper() != "SYSTEM":
+                continue
+            try:
+                reg = open_hive(hive_path)
+                try:
+                    root = reg.open("ControlSet001\\Services\\BTHPORT\\Parameters\\Devices")
+                except:
+                    log(f"⚠️ Devices key not found in {os.path.basename(hive_path)}")
+                    continue
+
+                if progress is not None:
+                    progress.total_items += root.subkeys_number()
+
+                for dev in root.subkeys():
+                    if cancel is not None:
+                        cancel.check()
+                    mac = dev.name()
+
+                    def get_value(name):
+                        try:
+                            return dev.value(name).value()
+                        except:
+                            return None
+
+                    name_bin = get_value("Name")
+                    name = decode_device_name(name_bin) if name_bin else ""
+                    class_of_device = get_value("COD")
+                    device_type = parse_cod(class_of_device) if class_of_device else ""
+                    last_seen = filetime_to_str(get_value("LastSeen"))
+                    last_conn = filetime_to_str(get_value("LastConnected"))
+
+                    writer.writerow([
+                        os.path.basename(hive_path),
+                        mac,
+                        name,
+                        class_of_device if class_of_device else "",
+                        device_type,
+                        last_seen,
+                        last_conn
+                    ])
+                    device_count += 1
+                    if progress is not None:
+                        progress.add(keys=1, rows=1, items=1)
+
+                log(f"✅ Bluetooth devices parsed from {os.path.basename(hive_path)}")
+            except JobCancelled:
+                raise
+            except Exception as e:
+                log(f"❌ Bluetooth parse failed for {os.path.basename(hive_path)}: {e}")
+
+    return device_count
+
+
+def parse_network_profiles_from_software_hives(hive_paths, output_csv, log=print, progress=None, cancel=None):
+    """Extract NetworkList profiles from every SOFTWARE hive in hive_paths"""
+
+    def parse_timestamp(value):
+        if isinstance(value, bytes):
+            if len(value) == 8:
+                return filetime_to_str(value)
+            elif len(value) >= 16:
+                return systemtime_to_str(value)
+            else:
+                return "Invalid binary time"
+        elif isinstance(value, int):
+            return filetime_to_str(value)
+        else:
+            return "N/A"
+
+    with incomplete_on_cancel(output_csv), open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Hive', 'ProfileName', 'Description', 'DateCreated', 'Managed', 'DateLastConnected'])
+
+        profile_count = 0
+        for hive_path in hive_paths:
+            if os.path.basename(hive_path).upper() != "SOFTWARE":
+                continue
+            try:
+                reg = open_hive(hive_path)
+                profiles = reg.open("Microsoft\\Windows NT\\CurrentVersion\\NetworkList\\Profiles")
+                if progress is not None:
+                    progress.total_items += profiles.subkeys_number()
+                for profile in profiles.subkeys():
+                    if cancel is not None:
+                        cancel.check()
+                    def get_val(name):
+                        try:
+                            return profile.value(name).value()
+                        except:
+                            return None
+
+                    name = get_val("ProfileName")
+                    desc = get_val("Description")
+                    date_created = parse_timestamp(get_val("DateCreated"))
+                    managed = get_val("Managed")
+                    date_last_connected = parse_timestamp(get_val("DateLastConnected"))
+
+                    writer.writerow([os.path.basename(hive_path), name, desc, date_created, managed, date_last_connected])
+                    profile_count += 1
+                    if progress is not None:
+                        progress.add(keys=1, rows=1, items=1)
+
+                log(f"✅ Network profiles parsed from {os.path.basename(hive_path)}")
+            except JobCancelled:
+                raise
+            except Exception as e:
+                log(f"❌ Network parse failed for {os.path.basename(hive_path)}: {e}")
+
+    return profile_count
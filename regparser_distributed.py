@@ -0,0 +1,852 @@
+"""Coordinator/worker mode: the parser steps of a run execute on other machines.
+
+The coordinator is an ordinary CLI run (single case or batch) started with
+--distribute. Its pipeline hands every per-hive and per-artifact parser step
+to Coordinator.run() instead of running it locally. Worker nodes poll the
+coordinator over HTTP, download the step's inputs, run the same parser
+(regparser_pipeline.run_parser) and upload the outputs, which land in the
+coordinator's case folder exactly where a local run writes them. The run
+manifest, timeline, search index and reports are then built on the
+coordinator as usual.
+
+Workers heartbeat every few seconds. A worker that stays silent for
+LEASE_TIMEOUT counts as lost and its tasks go back to the queue, up to
+MAX_ATTEMPTS times per task; so do tasks whose transfer failed. Both
+directions of every transfer are checked against SHA-256. Before uploading,
+a worker puts the coordinator's paths and file times back into output rows
+that name a downloaded input, so the CSVs read as if parsed in place.
+Unless started with --no-governor, a worker only leases another task while
+a regparser_governor.ResourceGovernor finds room below its memory ceiling.
+
+Protocol (JSON over HTTP; with a token, every request carries X-RegParser-Token):
+
+    POST /api/register                 {name, slots}       -> {worker, heartbeat}
+    POST /api/lease                    {worker}            -> task | 204 nothing now | 410 run finished
+    POST /api/heartbeat                {worker, tasks}     -> {cancel: [task ids]}
+    GET  /api/tasks/<id>/inputs/<n>?lease=L                -> file bytes
+    PUT  /api/tasks/<id>/outputs/<name>?lease=L            <- file bytes, X-SHA256 header
+    POST /api/tasks/<id>/complete      {lease, result, progress, messages}
+    POST /api/tasks/<id>/fail          {lease, error, retry, messages}
+
+    python regparser_cli.py --reg-folder /evidence/C --output /cases/42 --distribute 0.0.0.0:8765 --token s3cret
+    python regparser_distributed.py --coordinator http://10.0.0.5:8765 --token s3cret --slots 4
+"""
+import os
+import csv
+import sys
+import hmac
+import json
+import time
+import shutil
+import socket
+import hashlib
+import secrets
+import argparse
+import tempfile
+import itertools
+import threading
+import collections
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import regparser_core as core
+import regparser_hashing as hashing
+from regparser_core import CancelToken, JobCancelled
+from regparser_events import ProgressTracker
+from regparser_governor import ResourceGovernor, parse_memory_limit, JOB_BASE_MEMORY
+from regparser_jobs import QUEUED, DONE, FAILED, CANCELLED
+from regparser_pipeline import run_parser, FOLDER_OUTPUT_PARSERS, MULTI_OUTPUT_PARSERS
+from regparser_prefetch import find_prefetch_files
+from regparser_jumplists import find_jump_list_files
+from regparser_shellbags import USER_HIVE_NAMES
+from regparser_usb import USB_HIVE_NAMES
+from regparser_times import unix_to_str
+
+
+DEFAULT_PORT = 8765
+REMOTE_KIND = 'remote'
+LEASED = 'leased'
+TOKEN_HEADER = "X-RegParser-Token"
+TOKEN_ENV = "REGPARSER_TOKEN"
+HEARTBEAT_INTERVAL = 2.0
+# A worker silent for this long is dropped and its tasks are queued again
+LEASE_TIMEOUT = 15.0
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 1.0
+RETRY_INTERVAL = 5.0
+REQUEST_TIMEOUT = 60
+TRANSFER_CHUNK = 1024 * 1024
+STAGING_PREFIX = ".remote-"
+# Hive names a parser actually reads; the other hives of its input list are not shipped
+INPUT_NAMES = {'bluetooth': ('SYSTEM',), 'network': ('SOFTWARE',), 'shellbags': USER_HIVE_NAMES,
+               'usb_correlation': USB_HIVE_NAMES}
+# Parsers that read meaning from where their inputs sit (user profile folders, one
+# machine per SYSTEM hive), so the worker rebuilds their layout below a common root
+LAYOUT_PARSERS = ('usb_correlation',)
+# Evidence folders are shipped as the files their parser looks for
+FOLDER_FILES = {'prefetch': find_prefetch_files, 'jumplists': find_jump_list_files}
+# Parsers whose rows name their input file (and, for folders, its file times); of a
+# registry_shellbags step only the shellbags part does, not the registry dump
+SOURCE_NAMING_PARSERS = ('shellbags', 'prefetch', 'jumplists', 'usb_correlation', 'registry_shellbags')
+SOURCE_TIME_COLUMNS = ('SourceCreated', 'SourceModified', 'SourceAccessed')
+
+
+def tracker_counts(tracker):
+    return [tracker.keys, tracker.values, tracker.rows, tracker.bytes, tracker.items, tracker.total_items]
+
+
+def restore_sources(csv_paths, sources):
+    """Rewrite cells naming a local copy of an input (sources: local path -> input
+    entry) to the input's original path, and that row's source times to the original's"""
+    for path in csv_paths:
+        temp_path = path + ".tmp"
+        with open(path, 'r', newline='', encoding='utf-8-sig') as src, \
+                open(temp_path, 'w', newline='', encoding='utf-8-sig') as dst:
+            reader = csv.reader(src)
+            writer = csv.writer(dst)
+            header = next(reader, None)
+            if header is None:
+                continue
+            writer.writerow(header)
+            time_columns = [header.index(name) for name in SOURCE_TIME_COLUMNS if name in header]
+            for row in reader:
+                for index, cell in enumerate(row):
+                    item = sources.get(cell)
+                    if item is None:
+                        continue
+                    row[index] = item['path']
+                    if len(time_columns) == len(item['times']) and row[time_columns[0]]:
+                        for column, value in zip(time_columns, item['times']):
+                            row[column] = value
+                writer.writerow(row)
+        os.replace(temp_path, path)
+
+
+def parse_address(value, default_host="127.0.0.1"):
+    """(host, port) of "PORT" or "HOST:PORT" """
+    host, _, port = str(value).rpartition(':')
+    return host or default_host, int(port)
+
+
+class TransferError(Exception):
+    """A download or upload between worker and coordinator failed; another attempt may succeed"""
+
+
+class RemoteTask:
+    """One parser step waiting for, or leased to, a worker node"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, task, files, output, folder_input):
+        self.id = next(RemoteTask._ids)
+        self.task = task
+        # [{'path', 'rel', 'bytes', 'sha256'}]; rel is where the worker puts the file
+        self.files = files
+        outputs = output if task in MULTI_OUTPUT_PARSERS else [output]
+        # Output files by upload name; a MULTI_OUTPUT_PARSERS step has several
+        self.outputs = {os.path.basename(path): path for path in outputs}
+        self.output = outputs[0]
+        self.folder_input = folder_input
+        self.folder_output = task in FOLDER_OUTPUT_PARSERS
+        self.state = QUEUED
+        self.lease = None
+        self.worker = None
+        self.attempts = 0
+        self.progress = None
+        self.uploads = {}
+        self.result = None
+        self.error = None
+        self.messages = []
+
+    def staging_dir(self):
+        parent = self.output if self.folder_output else os.path.dirname(self.output)
+        return os.path.join(parent, STAGING_PREFIX + self.lease)
+
+    def describe(self):
+        """What a worker needs to run the task"""
+        return {
+            'id': self.id,
+            'lease': self.lease,
+            'task': self.task,
+            'inputs': [{key: f[key] for key in ('path', 'rel', 'bytes', 'sha256', 'times')} for f in self.files],
+            'folder_input': self.folder_input,
+            'output': os.path.basename(self.output),
+            'outputs': list(self.outputs),
+            'folder_output': self.folder_output,
+        }
+
+
+class RemoteWorker:
+    def __init__(self, worker_id, name, slots, address):
+        self.id = worker_id
+        self.name = name
+        self.slots = slots
+        self.address = address
+        self.tasks = set()
+        self.last_seen = time.monotonic()
+
+
+class Coordinator:
+    """Serves the parser steps of this process's runs to worker nodes.
+
+    Pass it as ``remote`` to build_triage_pipeline(); its jobs then run as
+    REMOTE_KIND jobs whose slot count follows the capacity of the workers
+    currently connected.
+    """
+
+    kind = REMOTE_KIND
+
+    def __init__(self, manager, host="127.0.0.1", port=DEFAULT_PORT, token=None, heartbeat=HEARTBEAT_INTERVAL,
+                 lease_timeout=LEASE_TIMEOUT, max_attempts=MAX_ATTEMPTS, log=print):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.token = token
+        self.heartbeat = heartbeat
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.log = log
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.tasks = {}
+        self.queue = collections.deque()
+        self.workers = {}
+        self.worker_ids = itertools.count(1)
+        self.closing = False
+        self.completed = 0
+        self.requeued = 0
+        self.waiting_logged = False
+        self.stop_event = threading.Event()
+        self.server = None
+        self.thread = None
+
+    # -- lifecycle --------------------------------------------------------------
+
+    def start(self):
+        self.manager.set_slots(REMOTE_KIND, 0)
+        self.server = ThreadingHTTPServer((self.host, self.port), _handler(self))
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, name="coordinator-http", daemon=True).start()
+        self.thread = threading.Thread(target=self._reap_loop, name="coordinator-reaper", daemon=True)
+        self.thread.start()
+        self.log(f"🛰️ Coordinating worker nodes on http://{self.host}:{self.port}")
+        if not self.token and self.host not in ("127.0.0.1", "localhost", "::1"):
+            self.log("⚠️ Evidence is served to the network without a token; pass --token")
+        return self
+
+    def stop(self):
+        """Tell polling workers the run is over, then stop serving"""
+        with self.lock:
+            self.closing = True
+            for remote in list(self.queue):
+                self._settle(remote, CANCELLED)
+            self.changed.notify_all()
+        deadline = time.monotonic() + self.heartbeat * 2
+        with self.lock:
+            while self.workers and time.monotonic() < deadline:
+                self.changed.wait(0.2)
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        self.log(f"🛰️ Coordinator stopped: {self.completed} remote task(s) done, {self.requeued} requeued")
+
+    def _reap_loop(self):
+        while not self.stop_event.wait(self.heartbeat):
+            now = time.monotonic()
+            with self.lock:
+                for worker in [w for w in self.workers.values() if now - w.last_seen > self.lease_timeout]:
+                    self.log(f"⚠️ Worker {worker.name} lost; requeueing {len(worker.tasks)} task(s)")
+                    self._drop_worker(worker, f"worker {worker.name} lost")
+                if not self.workers and not self.waiting_logged and not self.closing:
+                    self.log("⏳ No worker node connected; parser steps wait for one to join")
+                    self.waiting_logged = True
+
+    # -- pipeline side ----------------------------------------------------------
+
+    def run(self, task, inputs, output, progress=None, cancel=None, log=print):
+        """Queue a parser step for the workers and wait for it; same call and result as run_parser()"""
+        files, folder_input = self._input_files(task, inputs)
+        remote = RemoteTask(task, files, output, folder_input)
+        base = tracker_counts(progress) if progress is not None else None
+        seen = None
+        with self.lock:
+            if self.closing:
+                raise RuntimeError("coordinator is shutting down")
+            self.tasks[remote.id] = remote
+            self.queue.append(remote)
+            self.changed.notify_all()
+        while True:
+            with self.lock:
+                finished = remote.state in (DONE, FAILED)
+                if not finished and cancel is not None and cancel.cancelled:
+                    self._settle(remote, CANCELLED)
+                    raise JobCancelled()
+                counts = remote.progress
+                if counts is seen and not finished:
+                    self.changed.wait(POLL_INTERVAL)
+                    continue
+            seen = counts
+            if progress is not None and counts:
+                (progress.keys, progress.values, progress.rows, progress.bytes,
+                 progress.items, progress.total_items) = [b + c for b, c in zip(base, counts)]
+                progress.report()
+            if finished:
+                break
+        for message in remote.messages:
+            log(f"[{remote.worker.name}] {message}")
+        if remote.state == FAILED:
+            raise RuntimeError(remote.error)
+        return remote.result
+
+    @staticmethod
+    def _input_files(task, inputs):
+        """(files to ship, whether the parser reads one folder) for a step's inputs.
+
+        Hashing every file here also records its digests for the run manifest,
+        as a local parser would while reading it.
+        """
+        names = INPUT_NAMES.get(task)
+        if names:
+            inputs = [path for path in inputs if os.path.basename(path).upper() in names]
+        if task in FOLDER_FILES:
+            folder = inputs[0]
+            files = [{'path': path, 'rel': os.path.relpath(path, folder)} for path in FOLDER_FILES[task](folder)]
+        else:
+            files = [{'path': path, 'rel': f"{n}/{os.path.basename(path)}"} for n, path in enumerate(inputs)]
+            if task in LAYOUT_PARSERS and len(inputs) > 1:
+                try:
+                    root = os.path.commonpath([os.path.abspath(path) for path in inputs])
+                except ValueError:
+                    # Inputs on different drives keep the numbered layout
+                    root = None
+                if root:
+                    for item in files:
+                        item['rel'] = os.path.relpath(os.path.abspath(item['path']), root).replace(os.sep, '/')
+        for item in files:
+            # Stat before hashing reads the file and moves its access time
+            stat = os.stat(item['path'])
+            item['bytes'] = stat.st_size
+            item['times'] = [unix_to_str(t) for t in (stat.st_ctime, stat.st_mtime, stat.st_atime)]
+            item['sha256'] = hashing.hash_file(item['path'])['sha256']
+        return files, task in FOLDER_FILES
+
+    # -- worker side (HTTP handler threads) -------------------------------------
+
+    def register(self, payload, address):
+        with self.lock:
+            worker_id = f"w{next(self.worker_ids)}"
+            worker = RemoteWorker(worker_id, str(payload.get('name') or worker_id),
+                                  max(1, int(payload.get('slots') or 1)), address)
+            self.workers[worker_id] = worker
+            self.waiting_logged = False
+            self._update_slots()
+        self.log(f"🛰️ Worker {worker.name} joined from {address} with {worker.slots} slot(s)")
+        return 200, {'worker': worker_id, 'heartbeat': self.heartbeat}
+
+    def lease(self, payload):
+        with self.lock:
+            worker = self._seen(payload.get('worker'))
+            if worker is None:
+                return 404, None
+            if self.closing:
+                self._drop_worker(worker, "run finished")
+                self.changed.notify_all()
+                return 410, None
+            if len(worker.tasks) >= worker.slots or not self.queue:
+                return 204, None
+            remote = self.queue.popleft()
+            remote.state = LEASED
+            remote.lease = secrets.token_hex(8)
+            remote.worker = worker
+            remote.attempts += 1
+            remote.progress = None
+            worker.tasks.add(remote.id)
+            return 200, remote.describe()
+
+    def heartbeat_from(self, payload):
+        with self.lock:
+            worker = self._seen(payload.get('worker'))
+            if worker is None:
+                return 404, None
+            cancel = []
+            for task_id, counts in (payload.get('tasks') or {}).items():
+                remote = self.tasks.get(int(task_id))
+                if remote is None or remote.state != LEASED or remote.worker is not worker:
+                    cancel.append(int(task_id))
+                else:
+                    remote.progress = counts
+            self.changed.notify_all()
+            return 200, {'cancel': cancel}
+
+    def input_path(self, task_id, n, lease):
+        with self.lock:
+            remote = self._leased(task_id, lease)
+            if remote is None or not 0 <= n < len(remote.files):
+                return None
+            return remote.files[n]['path']
+
+    def staging_path(self, task_id, name, lease):
+        """Where an upload is written until the task completes, or None if it is not expected"""
+        with self.lock:
+            remote = self._leased(task_id, lease)
+            if remote is None or name != os.path.basename(name) or name.startswith('.'):
+                return None
+            if not remote.folder_output and name not in remote.outputs:
+                return None
+            staging = remote.staging_dir()
+        os.makedirs(staging, exist_ok=True)
+        return os.path.join(staging, name)
+
+    def uploaded(self, task_id, name, lease, path):
+        with self.lock:
+            remote = self._leased(task_id, lease)
+            if remote is None:
+                return False
+            remote.uploads[name] = path
+            return True
+
+    def complete(self, task_id, payload):
+        with self.lock:
+            remote = self._leased(task_id, payload.get('lease'))
+            if remote is None:
+                return 409, None
+            for name, staged in remote.uploads.items():
+                target = os.path.join(remote.output, name) if remote.folder_output else remote.outputs[name]
+                os.replace(staged, target)
+            remote.result = payload.get('result')
+            remote.progress = payload.get('progress') or remote.progress
+            remote.messages = payload.get('messages') or []
+            self.completed += 1
+            self._settle(remote, DONE)
+            return 200, {}
+
+    def fail(self, task_id, payload):
+        with self.lock:
+            remote = self._leased(task_id, payload.get('lease'))
+            if remote is None:
+                return 409, None
+            remote.messages = payload.get('messages') or []
+            error = str(payload.get('error') or "worker reported a failure")
+            if payload.get('retry'):
+                self.log(f"⚠️ Task {remote.id} ({remote.task}) failed on {remote.worker.name}: {error}")
+                self._requeue(remote, error)
+            else:
+                remote.error = error
+                self._settle(remote, FAILED)
+            return 200, {}
+
+    # -- internals, called with self.lock held ----------------------------------
+
+    def _seen(self, worker_id):
+        worker = self.workers.get(worker_id)
+        if worker is not None:
+            worker.last_seen = time.monotonic()
+        return worker
+
+    def _leased(self, task_id, lease):
+        remote = self.tasks.get(task_id)
+        if remote is None or remote.state != LEASED or not lease or not hmac.compare_digest(remote.lease, str(lease)):
+            return None
+        return remote
+
+    def _update_slots(self):
+        self.manager.set_slots(REMOTE_KIND, sum(worker.slots for worker in self.workers.values()))
+
+    def _drop_worker(self, worker, reason):
+        self.workers.pop(worker.id, None)
+        for task_id in list(worker.tasks):
+            self._requeue(self.tasks[task_id], reason)
+        self._update_slots()
+
+    def _release(self, remote):
+        if remote.worker is not None:
+            remote.worker.tasks.discard(remote.id)
+        if remote.lease is not None:
+            shutil.rmtree(remote.staging_dir(), ignore_errors=True)
+        remote.uploads = {}
+
+    def _requeue(self, remote, reason):
+        self._release(remote)
+        if remote.attempts >= self.max_attempts:
+            remote.error = f"{reason}; gave up after {remote.attempts} attempt(s)"
+            self._settle(remote, FAILED)
+            return
+        self.requeued += 1
+        self.log(f"♻️ Requeued task {remote.id} ({remote.task}): {reason}")
+        remote.state = QUEUED
+        remote.lease = None
+        self.queue.appendleft(remote)
+        self.changed.notify_all()
+
+    def _settle(self, remote, state):
+        self._release(remote)
+        if remote in self.queue:
+            self.queue.remove(remote)
+        remote.state = state
+        if state in (DONE, CANCELLED):
+            self.tasks.pop(remote.id, None)
+        self.changed.notify_all()
+
+
+def _handler(coordinator):
+    class CoordinatorHandler(BaseHTTPRequestHandler):
+        def _authorized(self):
+            if not coordinator.token:
+                return True
+            if hmac.compare_digest(self.headers.get(TOKEN_HEADER, ''), coordinator.token):
+                return True
+            self._reply(403)
+            return False
+
+        def _route(self):
+            url = urlsplit(self.path)
+            parts = url.path.strip('/').split('/')
+            lease = parse_qs(url.query).get('lease', [''])[0]
+            return parts, lease
+
+        def _reply(self, status, payload=None):
+            body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            parts, _ = self._route()
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._reply(400)
+                return
+            if parts == ['api', 'register']:
+                self._reply(*coordinator.register(payload, self.client_address[0]))
+            elif parts == ['api', 'lease']:
+                self._reply(*coordinator.lease(payload))
+            elif parts == ['api', 'heartbeat']:
+                self._reply(*coordinator.heartbeat_from(payload))
+            elif len(parts) == 4 and parts[:2] == ['api', 'tasks'] and parts[2].isdigit() and parts[3] == 'complete':
+                self._reply(*coordinator.complete(int(parts[2]), payload))
+            elif len(parts) == 4 and parts[:2] == ['api', 'tasks'] and parts[2].isdigit() and parts[3] == 'fail':
+                self._reply(*coordinator.fail(int(parts[2]), payload))
+            else:
+                self._reply(404)
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            parts, lease = self._route()
+            if len(parts) != 5 or parts[:2] != ['api', 'tasks'] or parts[3] != 'inputs' \
+                    or not parts[2].isdigit() or not parts[4].isdigit():
+                self._reply(404)
+                return
+            path = coordinator.input_path(int(parts[2]), int(parts[4]), lease)
+            if path is None:
+                self._reply(409)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(os.path.getsize(path)))
+            self.end_headers()
+            with open(path, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile, TRANSFER_CHUNK)
+
+        def do_PUT(self):
+            if not self._authorized():
+                return
+            parts, lease = self._route()
+            if len(parts) != 5 or parts[:2] != ['api', 'tasks'] or parts[3] != 'outputs' or not parts[2].isdigit():
+                self._reply(404)
+                return
+            task_id, name = int(parts[2]), parts[4]
+            path = coordinator.staging_path(task_id, name, lease)
+            if path is None:
+                self._reply(409)
+                return
+            remaining = int(self.headers.get('Content-Length') or 0)
+            digest = hashlib.sha256()
+            with open(path, 'wb') as f:
+                while remaining > 0:
+                    chunk = self.rfile.read(min(TRANSFER_CHUNK, remaining))
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            if remaining or digest.hexdigest() != self.headers.get('X-SHA256', ''):
+                os.remove(path)
+                self._reply(400, {'error': "upload truncated or checksum mismatch"})
+                return
+            self._reply(200 if coordinator.uploaded(task_id, name, lease, path) else 409)
+
+        def log_message(self, format, *args):
+            pass
+    return CoordinatorHandler
+
+
+class WorkerNode:
+    """Polls a coordinator for parser steps and runs up to ``slots`` of them at once"""
+
+    def __init__(self, url, slots=None, token=None, name=None, work_dir=None, keep_alive=False, log=print,
+                 governor=None):
+        self.url = url.rstrip('/')
+        self.slots = slots or os.cpu_count() or 1
+        self.token = token
+        self.name = name or socket.gethostname()
+        self.work_dir = work_dir or tempfile.gettempdir()
+        self.keep_alive = keep_alive
+        self.log = log
+        self.governor = governor
+        self.id = None
+        self.heartbeat = HEARTBEAT_INTERVAL
+        self.lock = threading.Lock()
+        # task id -> (CancelToken, ProgressTracker) of the tasks running here
+        self.running = {}
+        self.threads = []
+        self.stop_event = threading.Event()
+
+    def _request(self, method, path, payload=None, data=None, headers=None):
+        headers = dict(headers or {})
+        if self.token:
+            headers[TOKEN_HEADER] = self.token
+        if payload is not None:
+            data = json.dumps(payload).encode('utf-8')
+            headers['Content-Type'] = "application/json"
+        # Data goes in with the headers: assigning Request.data later drops Content-Length
+        return urllib.request.Request(self.url + path, data=data, headers=headers, method=method)
+
+    def _call(self, method, path, payload=None):
+        """(status, decoded reply) of one API call; connection problems raise OSError"""
+        try:
+            with urllib.request.urlopen(self._request(method, path, payload), timeout=REQUEST_TIMEOUT) as response:
+                body = response.read()
+                return response.status, json.loads(body) if body else None
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+    def run(self):
+        """Work until the coordinator's run is over (or forever with keep_alive). Returns an exit code."""
+        self.log(f"🛰️ Worker {self.name} ({self.slots} slot(s)) polling {self.url}")
+        threading.Thread(target=self._heartbeat_loop, name="worker-heartbeat", daemon=True).start()
+        unreachable = False
+        code = 0
+        while not self.stop_event.is_set():
+            try:
+                if self.id is None:
+                    status, reply = self._call('POST', '/api/register', {'name': self.name, 'slots': self.slots})
+                    if status == 403:
+                        self.log("❌ The coordinator rejected the token")
+                        code = 2
+                        break
+                    if status != 200:
+                        self.stop_event.wait(RETRY_INTERVAL)
+                        continue
+                    self.id, self.heartbeat = reply['worker'], reply['heartbeat']
+                    self.log(f"✅ Registered with the coordinator as {self.id}")
+                if len(self.running) >= self.slots or (
+                        self.running and self.governor is not None and not self.governor.fits(JOB_BASE_MEMORY)):
+                    self.stop_event.wait(POLL_INTERVAL / 4)
+                    continue
+                status, task = self._call('POST', '/api/lease', {'worker': self.id})
+                unreachable = False
+            except OSError as e:
+                if not unreachable:
+                    self.log(f"⏳ Coordinator unreachable ({e}); retrying every {RETRY_INTERVAL:g}s")
+                    unreachable = True
+                self.stop_event.wait(RETRY_INTERVAL)
+                continue
+            if status == 200:
+                self._start(task)
+            elif status == 404:
+                # The coordinator restarted or gave up on us; tasks we still run were requeued
+                self._cancel_running()
+                self.id = None
+            elif status == 410:
+                self.log("✅ The coordinator finished its run")
+                self.id = None
+                if not self.keep_alive:
+                    break
+                self.stop_event.wait(RETRY_INTERVAL)
+            else:
+                self.stop_event.wait(POLL_INTERVAL)
+        self.stop()
+        return code
+
+    def stop(self):
+        """Stop polling, cancel the running tasks and wait for them to clean up"""
+        self.stop_event.set()
+        self._cancel_running()
+        for thread in self.threads:
+            thread.join()
+
+    def _cancel_running(self):
+        with self.lock:
+            for cancel, _ in self.running.values():
+                cancel.cancel()
+
+    def _heartbeat_loop(self):
+        while not self.stop_event.wait(self.heartbeat):
+            if self.id is None:
+                continue
+            with self.lock:
+                tasks = {str(task_id): tracker_counts(tracker) for task_id, (_, tracker) in self.running.items()}
+            try:
+                status, reply = self._call('POST', '/api/heartbeat', {'worker': self.id, 'tasks': tasks})
+            except OSError:
+                continue
+            if status == 404:
+                self._cancel_running()
+            elif status == 200:
+                with self.lock:
+                    for task_id in reply['cancel']:
+                        if task_id in self.running:
+                            self.running[task_id][0].cancel()
+
+    def _start(self, task):
+        entry = (CancelToken(), ProgressTracker(task['task']))
+        with self.lock:
+            self.running[task['id']] = entry
+        thread = threading.Thread(target=self._execute, args=(task,) + entry, name=f"task-{task['id']}", daemon=True)
+        self.threads = [t for t in self.threads if t.is_alive()] + [thread]
+        thread.start()
+
+    def _execute(self, task, cancel, tracker):
+        base = f"/api/tasks/{task['id']}"
+        query = f"?lease={task['lease']}"
+        messages = []
+        # local copy -> input entry, longest first so no path is replaced inside a longer one
+        sources = {}
+
+        def task_log(message):
+            self.log(f"[task {task['id']}] {message}")
+            for local_path, item in sources.items():
+                message = message.replace(local_path, item['path'])
+            messages.append(message)
+
+        folder = tempfile.mkdtemp(prefix=f"regparser_task{task['id']}_", dir=self.work_dir)
+        started = time.monotonic()
+        try:
+            in_dir = os.path.join(folder, "in")
+            out_dir = os.path.join(folder, "out")
+            os.makedirs(os.path.join(in_dir, "0"))
+            os.makedirs(out_dir)
+            local = []
+            for n, item in enumerate(task['inputs']):
+                target = core.zip_member_target(in_dir if not task['folder_input'] else os.path.join(in_dir, "0"),
+                                                item['rel'])
+                self._download(f"{base}/inputs/{n}{query}", target, item['sha256'], cancel)
+                local.append(target)
+                sources[target] = item
+            sources = dict(sorted(sources.items(), key=lambda entry: -len(entry[0])))
+            inputs = [os.path.join(in_dir, "0")] if task['folder_input'] else local
+            output = out_dir if task['folder_output'] else os.path.join(out_dir, task['output'])
+            if task['task'] in MULTI_OUTPUT_PARSERS:
+                output = [os.path.join(out_dir, name) for name in task['outputs']]
+            self.log(f"🔍 Task {task['id']}: {task['task']} on {len(local)} file(s)")
+            result = run_parser(task['task'], inputs, output, tracker, cancel, task_log)
+            produced = [os.path.join(out_dir, name) for name in sorted(os.listdir(out_dir))
+                        if os.path.isfile(os.path.join(out_dir, name))]
+            if task['task'] in SOURCE_NAMING_PARSERS:
+                naming = output[1:] if task['task'] in MULTI_OUTPUT_PARSERS else produced
+                restore_sources([path for path in naming if path.lower().endswith('.csv') and os.path.exists(path)],
+                                sources)
+            for path in produced:
+                cancel.check()
+                self._upload(f"{base}/outputs/{os.path.basename(path)}{query}", path)
+            status, _ = self._call('POST', f"{base}/complete",
+                                   {'lease': task['lease'], 'result': result, 'messages': messages,
+                                    'progress': tracker_counts(tracker)})
+            if status == 200:
+                self.log(f"✅ Task {task['id']} ({task['task']}) done in {time.monotonic() - started:.1f}s")
+            else:
+                self.log(f"⚠️ Task {task['id']} finished after the coordinator reassigned it ({status})")
+        except JobCancelled:
+            self.log(f"🛑 Task {task['id']} canceled by the coordinator")
+        except Exception as e:
+            retry = isinstance(e, (TransferError, OSError))
+            self.log(f"❌ Task {task['id']} ({task['task']}) failed: {e}")
+            try:
+                self._call('POST', f"{base}/fail", {'lease': task['lease'], 'error': f"{type(e).__name__}: {e}",
+                                                    'retry': retry, 'messages': messages})
+            except OSError:
+                pass
+        finally:
+            with self.lock:
+                self.running.pop(task['id'], None)
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def _download(self, path, target, sha256, cancel):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            with urllib.request.urlopen(self._request('GET', path), timeout=REQUEST_TIMEOUT) as response, \
+                    open(target, 'wb') as f:
+                digests = hashing.copy_and_hash(response, f, cancel)
+        except urllib.error.HTTPError as e:
+            raise TransferError(f"download of {os.path.basename(target)} refused ({e.code})")
+        if digests['sha256'] != sha256:
+            raise TransferError(f"checksum mismatch downloading {os.path.basename(target)}")
+        hashing.remember(target, digests)
+
+    def _upload(self, path, local_path):
+        headers = {'Content-Length': str(os.path.getsize(local_path)),
+                   'Content-Type': "application/octet-stream",
+                   'X-SHA256': hashing.hash_file(local_path)['sha256']}
+        try:
+            with open(local_path, 'rb') as f:
+                request = self._request('PUT', path, data=f, headers=headers)
+                with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT):
+                    pass
+        except urllib.error.HTTPError as e:
+            raise TransferError(f"upload of {os.path.basename(local_path)} refused ({e.code})")
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="regparser_distributed",
+                                     description="Run RegParser parser steps for a coordinator (regparser_cli.py --distribute)")
+    parser.add_argument("--coordinator", required=True, metavar="URL", help="e.g. http://10.0.0.5:8765")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                        help=f"shared secret of the coordinator (default: ${TOKEN_ENV})")
+    parser.add_argument("--slots", type=int, help="tasks run at once (default: CPU count)")
+    parser.add_argument("--name", help="name shown in the coordinator's log (default: host name)")
+    parser.add_argument("--work", help="folder for downloaded inputs and outputs (default: system temp)")
+    parser.add_argument("--memory-limit", metavar="SIZE",
+                        help="memory ceiling of the worker and its child processes, e.g. 3G or 75%% "
+                        "(default: 80%% of physical RAM)")
+    parser.add_argument("--no-governor", action='store_true',
+                        help="lease up to --slots tasks regardless of memory")
+    parser.add_argument("--keep-alive", action='store_true',
+                        help="keep waiting for the next run instead of exiting when the coordinator finishes")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    governor = None
+    if not args.no_governor:
+        try:
+            ceiling = parse_memory_limit(args.memory_limit) if args.memory_limit else None
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 2
+        governor = ResourceGovernor(ceiling).start()
+    worker = WorkerNode(args.coordinator, args.slots, args.token, args.name, args.work, args.keep_alive,
+                        governor=governor)
+    try:
+        return worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+        return 130
+    finally:
+        if governor is not None:
+            governor.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Thread-safe log/progress bus between worker threads and the Tk main loop.
+
+Workers never touch Tk widgets. They post events here; the GUI drains the
+queue from an ``after()`` timer and applies them in batches.
+"""
+import os
+import queue
+import logging
+import time
+import datetime
+from logging.handlers import RotatingFileHandler
+
+
+LOG_DIR = os.path.join(os.path.expanduser("~"), ".regparser")
+LOG_FILE = os.path.join(LOG_DIR, "regparser.log")
+
+
+class EventBus:
+    """Queue of ('log' | 'status' | 'progress' | 'stage' | 'call', ...) events"""
+
+    def __init__(self, log_file=LOG_FILE, max_bytes=5 * 1024 * 1024, backup_count=3):
+        self.events = queue.SimpleQueue()
+        self.logger = logging.getLogger("regparser")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if log_file and not self.logger.handlers:
+            try:
+                os.makedirs(os.path.dirname(log_file), exist_ok=True)
+                handler = RotatingFileHandler(log_file, maxBytes=max_bytes,
+                                              backupCount=backup_count, encoding='utf-8')
+                handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(message)s"))
+                self.logger.addHandler(handler)
+            except OSError:
+                # A read-only profile must not stop the app from starting
+                pass
+
+    def log(self, message):
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        self.events.put(('log', f"[{timestamp}] {message}", message))
+        self.logger.info(message)
+
+    def status(self, text):
+        self.events.put(('status', text))
+
+    def progress(self, current, total):
+        self.events.put(('progress', current, total))
+
+    def stage(self, tracker):
+        """Publish a ProgressTracker; the GUI re-renders it on every tick"""
+        self.events.put(('stage', tracker))
+
+    def call(self, func, *args):
+        """Run func(*args) on the Tk thread, e.g. to show results a worker produced"""
+        self.events.put(('call', func, args))
+
+    def drain(self, max_events=2000):
+        """Pop up to max_events pending events without blocking"""
+        drained = []
+        while len(drained) < max_events:
+            try:
+                drained.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return drained
+
+
+def format_duration(seconds):
+    return str(datetime.timedelta(seconds=int(seconds)))
+
+
+class ProgressTracker:
+    """Real work counters for one parsing stage.
+
+    Parsers call add() from their inner loops. The callback fires at most
+    once per ``interval`` seconds (and on finish) with the tracker itself, so
+    reporting costs the same whether a hive has a thousand keys or ten
+    million. Readers on other threads may call fraction()/describe() at any
+    time; the counters are plain ints.
+    """
+
+    CHECK_EVERY = 64
+
+    def __init__(self, stage, callback=None, total_bytes=0, total_items=0, interval=0.25):
+        self.stage = stage
+        self.callback = callback
+        self.total_bytes = total_bytes
+        self.total_items = total_items
+        self.interval = interval
+        self.keys = 0
+        self.values = 0
+        self.rows = 0
+        self.bytes = 0
+        self.items = 0
+        self.started = time.monotonic()
+        self.finished = None
+        self.last_report = 0.0
+        self.pending = 0
+
+    def add(self, keys=0, values=0, rows=0, nbytes=0, items=0):
+        self.keys += keys
+        self.values += values
+        self.rows += rows
+        self.bytes += nbytes
+        self.items += items
+        self.pending += 1
+        if self.pending >= self.CHECK_EVERY:
+            self.pending = 0
+            now = time.monotonic()
+            if now - self.last_report >= self.interval:
+                self.last_report = now
+                self.report()
+
+    def sync_bytes(self, nbytes):
+        """Replace the running byte estimate with an exact figure (e.g. after a hive completes)"""
+        self.bytes = nbytes
+
+    def report(self):
+        if self.callback:
+            self.callback(self)
+
+    def finish(self):
+        self.finished = time.monotonic()
+        self.report()
+
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def fraction(self):
+        """Completed share of the stage, or None when the total is unknown"""
+        if self.finished:
+            return 1.0
+        if self.total_items:
+            return min(self.items / self.total_items, 0.99)
+        if self.total_bytes:
+            # Byte counts are estimates of cells visited, never claim completion early
+            return min(self.bytes / self.total_bytes, 0.99)
+        return None
+
+    def eta(self):
+        fraction = self.fraction()
+        if not fraction or self.finished:
+            return None
+        return self.elapsed() * (1 - fraction) / fraction
+
+    def describe(self):
+        elapsed = self.elapsed()
+        rate_base = max(elapsed, 1e-6)
+        parts = [self.stage]
+        fraction = self.fraction()
+        if fraction is not None:
+            parts.append(f"{int(fraction * 100)}%")
+        if self.keys:
+            parts.append(f"{self.keys:,} keys ({self.keys / rate_base:,.0f}/s)")
+        if self.rows:
+            parts.append(f"{self.rows:,} rows")
+        if self.bytes:
+            parts.append(f"{self.bytes / rate_base / (1024 * 1024):.1f} MB/s")
+        parts.append(f"elapsed {format_duration(elapsed)}")
+        eta = self.eta()
+        if eta is not None:
+            parts.append(f"ETA {format_duration(eta)}")
+        return " · ".join(parts)
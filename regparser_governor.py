@@ -0,0 +1,385 @@
+"""Adaptive resource governor under JobManager: pool sizes, memory ceiling, disk concurrency.
+
+Setting ``manager.governor`` (ResourceGovernor.start() does it) makes the
+manager ask the governor before it starts any local job:
+
+- pool sizes: CPU slots follow the CPU count, capped by how many jobs of
+  the queued size fit in the memory budget; a job's estimate is a base
+  cost plus a multiple of its weight, which for hive dumps and the other
+  hive steps is the size of the hives they open. Disk-heavy ('io') jobs
+  keep their own, separate slot limit.
+- memory: a sampler thread watches the RSS of this process and its child
+  processes. A job starts only if its estimate fits below the ceiling and
+  in the RAM still available; above PAUSE_FRACTION of the ceiling no new
+  job starts until usage falls below RESUME_FRACTION. With nothing
+  running a job always starts, so one oversized hive is slow, not stuck.
+- process pools: pool_workers() sizes the per-file pools of the prefetch
+  and jump list parsers from the cores and memory left to them.
+
+A worker node (regparser_distributed) runs a governor without a manager
+and only leases more tasks while fits() says they have room.
+
+Remote jobs (regparser_distributed) use no local memory and are not held.
+psutil is used when installed (requirements.txt lists it); otherwise
+memory is read from /proc on Linux and from the Win32 API on Windows, where
+a Toolhelp32 snapshot finds the child processes. Where neither works the
+governor says so and runs without a memory ceiling.
+"""
+import os
+import re
+import sys
+import time
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+MIB = 1024 * 1024
+# Job kinds that run on this machine; others (e.g. remote) are never held back
+GOVERNED_KINDS = ('cpu', 'io')
+# Memory of a job beyond what its weight accounts for (interpreter, parser state)
+JOB_BASE_MEMORY = 64 * MIB
+# A hive dump holds the file and its decoded cells; estimate = base + weight * factor
+WEIGHT_MEMORY_FACTOR = 3
+# Memory of one prefetch / jump list pool worker process
+POOL_WORKER_MEMORY = 48 * MIB
+# Default ceiling as a share of physical RAM
+DEFAULT_CEILING_FRACTION = 0.8
+PAUSE_FRACTION = 0.9
+RESUME_FRACTION = 0.75
+# RAM left to the rest of the machine however high the ceiling is set
+MEMORY_RESERVE = 256 * MIB
+SAMPLE_INTERVAL = 1.0
+# Jobs younger than this may not have grown into their RSS yet, so their estimate still counts
+RAMP_SECONDS = 5.0
+
+_UNITS = {'': 1, 'K': 1024, 'M': MIB, 'G': 1024 * MIB, 'T': 1024 * 1024 * MIB}
+_installed = None
+
+
+def parse_memory_limit(text):
+    """Bytes of a limit such as 3G, 512M, 2.5GB or 75% (of physical RAM)"""
+    match = re.fullmatch(r'\s*([\d.]+)\s*(%|[KMGT]?)i?B?\s*', str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Not a memory size: {text!r} (e.g. 3G, 512M or 75%)")
+    number, unit = float(match.group(1)), match.group(2).upper()
+    if unit == '%':
+        total, _ = memory_status()
+        if total is None:
+            raise ValueError("Physical memory size is unknown here; give the limit in bytes (e.g. 3G)")
+        return int(total * number / 100)
+    return int(number * _UNITS[unit])
+
+
+def format_bytes(count):
+    return f"{count / (1024 * MIB):.1f} GiB" if count >= 1024 * MIB else f"{count / MIB:.0f} MiB"
+
+
+# -- platform probes ------------------------------------------------------------
+
+# ctypes (and with it the Win32 structures) is only needed on Windows
+if sys.platform == 'win32':
+    import ctypes
+
+    class _MemoryStatus(ctypes.Structure):
+        _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                    ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                    ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                    ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                    ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+    class _ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [('cb', ctypes.c_ulong), ('PageFaultCount', ctypes.c_ulong),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+    class _ProcessEntry(ctypes.Structure):
+        _fields_ = [('dwSize', ctypes.c_ulong), ('cntUsage', ctypes.c_ulong),
+                    ('th32ProcessID', ctypes.c_ulong), ('th32DefaultHeapID', ctypes.c_size_t),
+                    ('th32ModuleID', ctypes.c_ulong), ('cntThreads', ctypes.c_ulong),
+                    ('th32ParentProcessID', ctypes.c_ulong), ('pcPriClassBase', ctypes.c_long),
+                    ('dwFlags', ctypes.c_ulong), ('szExeFile', ctypes.c_wchar * 260)]
+
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _kernel32.CreateToolhelp32Snapshot.restype = ctypes.c_void_p
+    _kernel32.CreateToolhelp32Snapshot.argtypes = [ctypes.c_ulong, ctypes.c_ulong]
+    _kernel32.Process32FirstW.argtypes = [ctypes.c_void_p, ctypes.POINTER(_ProcessEntry)]
+    _kernel32.Process32NextW.argtypes = [ctypes.c_void_p, ctypes.POINTER(_ProcessEntry)]
+    _kernel32.OpenProcess.restype = ctypes.c_void_p
+    _kernel32.OpenProcess.argtypes = [ctypes.c_ulong, ctypes.c_int, ctypes.c_ulong]
+    _kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+    _psapi = ctypes.WinDLL('psapi', use_last_error=True)
+    _psapi.GetProcessMemoryInfo.argtypes = [ctypes.c_void_p, ctypes.POINTER(_ProcessMemoryCounters), ctypes.c_ulong]
+    INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+TH32CS_SNAPPROCESS = 0x2
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+
+def memory_status():
+    """(total, available) physical memory in bytes, or (None, None) when unknown"""
+    if psutil is not None:
+        memory = psutil.virtual_memory()
+        return memory.total, memory.available
+    if sys.platform == 'win32':
+        status = _MemoryStatus(dwLength=ctypes.sizeof(_MemoryStatus))
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys, status.ullAvailPhys
+        return None, None
+    try:
+        with open('/proc/meminfo', encoding='ascii') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return (int(fields['MemTotal'].split()[0]) * 1024,
+                int(fields.get('MemAvailable', fields['MemFree']).split()[0]) * 1024)
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def process_tree_rss():
+    """Resident memory of this process and its descendants in bytes, or None when unknown"""
+    if psutil is not None:
+        me = psutil.Process()
+        total = me.memory_info().rss
+        for child in me.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return total
+    if sys.platform == 'win32':
+        return _win32_tree_rss()
+    return _proc_tree_rss()
+
+
+def _process_tree(parents):
+    """This process and its descendants, given a pid -> parent pid map"""
+    children = {}
+    for pid, parent in parents.items():
+        if pid != parent:
+            children.setdefault(parent, []).append(pid)
+    tree, stack = [], [os.getpid()]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, ()))
+    return tree
+
+
+def _proc_tree_rss():
+    try:
+        pids = [name for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        return None
+    parents, pages = {}, {}
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                # The command name may hold spaces; the fields after it do not
+                fields = f.read().rpartition(b')')[2].split()
+        except OSError:
+            continue
+        parents[int(pid)] = int(fields[1])
+        pages[int(pid)] = int(fields[21])
+    if os.getpid() not in parents:
+        return None
+    return sum(pages.get(pid, 0) for pid in _process_tree(parents)) * os.sysconf('SC_PAGE_SIZE')
+
+
+def _win32_tree_rss():
+    """Working sets of this process and its descendants, found through a Toolhelp32 snapshot"""
+    snapshot = _kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if snapshot is None or snapshot == INVALID_HANDLE_VALUE:
+        return None
+    parents = {}
+    try:
+        entry = _ProcessEntry(dwSize=ctypes.sizeof(_ProcessEntry))
+        more = _kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+        while more:
+            parents[entry.th32ProcessID] = entry.th32ParentProcessID
+            more = _kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+    finally:
+        _kernel32.CloseHandle(snapshot)
+    total, known = 0, False
+    for pid in _process_tree(parents):
+        process = _kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not process:
+            continue
+        try:
+            counters = _ProcessMemoryCounters(cb=ctypes.sizeof(_ProcessMemoryCounters))
+            if _psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                total += counters.WorkingSetSize
+                known = known or pid == os.getpid()
+        finally:
+            _kernel32.CloseHandle(process)
+    return total if known else None
+
+
+# -- the governor -----------------------------------------------------------------
+
+class ResourceGovernor:
+    """Sizes a JobManager's pools and holds back new jobs while memory runs short.
+
+    ceiling: bytes this process tree may use (default: DEFAULT_CEILING_FRACTION
+    of physical RAM; None when that is unknown disables the memory checks).
+    cpu_limit: upper bound of CPU slots (default: CPU count). io_slots: jobs
+    of kind 'io' (extraction, scanning, hashing) run at once.
+    """
+
+    def __init__(self, ceiling=None, cpu_limit=None, io_slots=None, interval=SAMPLE_INTERVAL, log=print):
+        total, available = memory_status()
+        rss = process_tree_rss()
+        # A ceiling on memory that cannot be read would never hold anything back
+        self.watching = rss is not None
+        self.ceiling = ceiling or (int(total * DEFAULT_CEILING_FRACTION) if total else None)
+        if not self.watching:
+            self.ceiling = None
+        self.cpu_limit = cpu_limit or os.cpu_count() or 1
+        self.io_slots = io_slots
+        self.interval = interval
+        self.log = log
+        self.manager = None
+        self.rss = rss or 0
+        self.available = available
+        self.paused = False
+        self.peak_rss = self.rss
+        self.paused_seconds = 0.0
+        self.sampled_at = time.time()
+        self._paused_since = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, manager=None):
+        """Attach to manager (if any), size its pools and start sampling. Returns self."""
+        global _installed
+        self.manager = manager
+        if not self.watching:
+            self.log("⚠️ The memory of this process and its children cannot be read here (install psutil); "
+                     "memory watching is disabled")
+        ceiling = format_bytes(self.ceiling) if self.ceiling else "unknown (memory checks off)"
+        if manager is not None:
+            manager.governor = self
+            if self.io_slots:
+                manager.set_slots('io', self.io_slots)
+            self._resize()
+            self.log(f"⚖️ Resource governor: {manager.slots['cpu']} CPU / {manager.slots['io']} disk slot(s), "
+                     f"memory ceiling {ceiling}")
+        else:
+            self.log(f"⚖️ Resource governor: memory ceiling {ceiling}")
+        _installed = self
+        self._thread = threading.Thread(target=self._loop, name="resource-governor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        global _installed
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if _installed is self:
+            _installed = None
+        if self.manager is not None and self.manager.governor is self:
+            self.manager.governor = None
+            self.manager.wake()
+        if self._paused_since is not None:
+            self.paused_seconds += time.monotonic() - self._paused_since
+            self._paused_since = None
+
+    def held_seconds(self):
+        """Seconds new jobs were held back for memory so far"""
+        if self._paused_since is None:
+            return self.paused_seconds
+        return self.paused_seconds + time.monotonic() - self._paused_since
+
+    def estimate(self, job):
+        """Bytes a job is expected to need while it runs"""
+        return JOB_BASE_MEMORY + int(job.weight or 0) * WEIGHT_MEMORY_FACTOR
+
+    def admit(self, job, running):
+        """Whether job may start now, given the manager's running jobs. Called with the manager's lock held."""
+        if job.kind not in GOVERNED_KINDS or self.ceiling is None:
+            return True
+        local = [j for j in running if j.kind in GOVERNED_KINDS]
+        if not local:
+            return True
+        now = time.time()
+        # Young jobs have not grown into the last sample yet
+        pending = sum(self.estimate(j) for j in local if now - (j.started_at or now) < RAMP_SECONDS)
+        return self.fits(self.estimate(job), pending)
+
+    def fits(self, need, pending=0):
+        """Whether need more bytes fit below the ceiling and in the free RAM, on top of pending ones"""
+        if self.ceiling is None:
+            return True
+        if self.paused or self.rss + pending + need > self.ceiling:
+            return False
+        return self.available is None or self.available - pending - need >= MEMORY_RESERVE
+
+    def pool_workers(self, requested=None):
+        """Worker processes for a per-file pool: the cores not taken by other CPU jobs, within the memory left"""
+        if requested:
+            return requested
+        busy = self.manager.running.get('cpu', 1) if self.manager is not None else 1
+        workers = max(1, self.cpu_limit // max(busy, 1))
+        if self.ceiling is not None:
+            headroom = self.ceiling - self.rss
+            if self.available is not None:
+                headroom = min(headroom, self.available - MEMORY_RESERVE)
+            workers = min(workers, max(1, headroom // POOL_WORKER_MEMORY))
+        return workers
+
+    def sample(self):
+        """Read memory usage, pause or resume admissions and resize the CPU pool"""
+        self.rss = process_tree_rss() or 0
+        _, self.available = memory_status()
+        self.sampled_at = time.time()
+        self.peak_rss = max(self.peak_rss, self.rss)
+        if self.ceiling is None:
+            return
+        low_ram = self.available is not None and self.available < MEMORY_RESERVE
+        if not self.paused and (self.rss >= self.ceiling * PAUSE_FRACTION or low_ram):
+            self.paused = True
+            self._paused_since = time.monotonic()
+            self.log(f"⚠️ Memory at {format_bytes(self.rss)} of {format_bytes(self.ceiling)}; "
+                     f"holding new jobs until running ones finish")
+        elif self.paused and self.rss < self.ceiling * RESUME_FRACTION and not low_ram:
+            self.paused = False
+            self.paused_seconds += time.monotonic() - self._paused_since
+            self._paused_since = None
+            self.log(f"♻️ Memory back at {format_bytes(self.rss)}; starting new jobs again")
+            if self.manager is not None:
+                self.manager.wake()
+        if self.manager is not None:
+            self._resize()
+
+    def _resize(self):
+        """CPU slots: the CPU count, or fewer when that many queued jobs would not fit in memory"""
+        slots = self.cpu_limit
+        if self.ceiling is not None:
+            queued = sorted(self.estimate(job) for job in self.manager.snapshot()
+                            if job.kind == 'cpu' and not job.finished)
+            typical = queued[len(queued) // 2] if queued else JOB_BASE_MEMORY
+            budget = self.ceiling if self.available is None else min(self.ceiling, self.rss + self.available)
+            slots = max(1, min(slots, budget // typical))
+        if slots != self.manager.slots.get('cpu'):
+            self.manager.set_slots('cpu', slots)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                self.log(f"⚠️ Resource governor sample failed: {e}")
+
+
+def pool_workers(requested=None):
+    """Worker count for a process pool: requested, else the running governor's choice, else the CPU count"""
+    if requested:
+        return requested
+    if _installed is not None:
+        return _installed.pool_workers()
+    return os.cpu_count() or 1
@@ -0,0 +1,210 @@
+"""MD5/SHA-1/SHA-256 of evidence computed from the bytes the parsers already read.
+
+Each hive parser loads its hive into memory through core.open_hive, ZIP
+members are streamed out chunk by chunk and prefetch/jump list files are
+read or mapped whole, and the digests are taken from that buffer instead of
+reading the evidence a second time. The three algorithms run on their own
+threads (hashlib releases the GIL on large updates), in parallel with each
+other and with the reader.
+
+Parsers that open the same hive still read it for themselves, but only one
+of them hashes it: digests are remembered per file (keyed by size and
+mtime), and a reader that finds the file claimed by another thread, or by a
+child process started through run_in_process(inputs=...), skips hashing.
+Run manifests wait for such a claim and pick up the digests without
+touching the file.
+"""
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+HASH_ALGORITHMS = ('md5', 'sha1', 'sha256')
+HASH_CHUNK = 1024 * 1024
+# Smaller updates are cheaper inline than handed to the hashing threads
+THREADED_MIN_BYTES = 256 * 1024
+
+_pool = None
+_pool_lock = threading.Lock()
+_known = {}
+# path -> Event set once whoever claimed the file has hashed it (or given up)
+_claims = {}
+_known_lock = threading.Lock()
+# Called with {path: entry} for every newly remembered file; set in child processes
+_relay = None
+
+
+def _hash_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=len(HASH_ALGORITHMS), thread_name_prefix="hash")
+        return _pool
+
+
+class MultiHasher:
+    """All HASH_ALGORITHMS over one stream.
+
+    update() hands large chunks to the hashing threads and returns at once;
+    the next update (or hexdigests) waits for them, so one chunk is hashed
+    while the caller reads or writes the next one. Callers must not modify a
+    chunk after passing it in.
+    """
+
+    def __init__(self, algorithms=HASH_ALGORITHMS):
+        self.hashes = {name: hashlib.new(name) for name in algorithms}
+        self.pending = []
+
+    def _wait(self):
+        for future in self.pending:
+            future.result()
+        self.pending = []
+
+    def update(self, chunk):
+        self._wait()
+        if len(chunk) < THREADED_MIN_BYTES:
+            for digest in self.hashes.values():
+                digest.update(chunk)
+        else:
+            pool = _hash_pool()
+            self.pending = [pool.submit(digest.update, chunk) for digest in self.hashes.values()]
+        return self
+
+    def hexdigests(self):
+        self._wait()
+        return {name: digest.hexdigest() for name, digest in self.hashes.items()}
+
+
+def hash_bytes(data):
+    """Digests of an in-memory buffer (bytes, memoryview or mmap)"""
+    return MultiHasher().update(data).hexdigests()
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def remember(path, digests):
+    """Record digests for path as it is on disk right now"""
+    try:
+        key = _stat_key(path)
+    except OSError:
+        return
+    remembered = {os.path.abspath(path): (key, digests)}
+    with _known_lock:
+        _known.update(remembered)
+    if _relay is not None:
+        _relay(remembered)
+
+
+def relay_to(callback):
+    """Hand every digest remembered from now on to callback as well (a child process's pipe)"""
+    global _relay
+    _relay = callback
+
+
+def known_digests(path):
+    """Digests recorded for path, or None if unknown or the file changed since"""
+    with _known_lock:
+        known = _known.get(os.path.abspath(path))
+    if known is None:
+        return None
+    try:
+        return known[1] if known[0] == _stat_key(path) else None
+    except OSError:
+        return None
+
+
+def claim(path):
+    """True if the caller should hash path: its digests are unknown and nobody else is hashing it"""
+    if known_digests(path) is not None:
+        return False
+    key = os.path.abspath(path)
+    with _known_lock:
+        if key in _claims:
+            return False
+        _claims[key] = threading.Event()
+    return True
+
+
+def release(path):
+    """End a claim(), whether or not its digests were remembered"""
+    with _known_lock:
+        event = _claims.pop(os.path.abspath(path), None)
+    if event is not None:
+        event.set()
+
+
+def wait_for(path):
+    """Digests of path once any claim on it has ended, or None if still unknown"""
+    with _known_lock:
+        event = _claims.get(os.path.abspath(path))
+    if event is not None:
+        event.wait()
+    return known_digests(path)
+
+
+def known_under(folder):
+    """{path: digests} of every remembered file below folder"""
+    prefix = os.path.join(os.path.abspath(folder), '')
+    with _known_lock:
+        paths = sorted(path for path in _known if path.startswith(prefix))
+    return {path: digests for path in paths if (digests := known_digests(path)) is not None}
+
+
+def snapshot(paths=None):
+    """Everything remembered in this process (or only for paths), for handing to another process"""
+    with _known_lock:
+        if paths is None:
+            return dict(_known)
+        keys = [os.path.abspath(path) for path in paths]
+        return {key: _known[key] for key in keys if key in _known}
+
+
+def merge(remembered):
+    """Adopt another process's snapshot()"""
+    with _known_lock:
+        _known.update(remembered)
+
+
+def read_and_hash(path):
+    """Return the whole file's bytes, hashing them unless known or being hashed elsewhere"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if claim(path):
+        try:
+            remember(path, hash_bytes(data))
+        finally:
+            release(path)
+    return data
+
+
+def hash_file(path):
+    """Digests of a file, streamed in chunks unless known or being hashed elsewhere"""
+    while not claim(path):
+        digests = wait_for(path)
+        if digests is not None:
+            return digests
+    try:
+        hasher = MultiHasher()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                hasher.update(chunk)
+        digests = hasher.hexdigests()
+        remember(path, digests)
+    finally:
+        release(path)
+    return digests
+
+
+def copy_and_hash(source, destination, cancel=None):
+    """Copy file object source to destination, hashing the stream on the way. Returns digests."""
+    hasher = MultiHasher()
+    for chunk in iter(lambda: source.read(HASH_CHUNK), b''):
+        if cancel is not None:
+            cancel.check()
+        hasher.update(chunk)
+        destination.write(chunk)
+    return hasher.hexdigests()
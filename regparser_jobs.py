@@ -0,0 +1,371 @@
+"""Bounded job manager used by the GUI buttons, the triage pipeline and the CLI.
+
+Jobs are queued with a priority and optional dependencies and run on a fixed
+pool of worker threads. CPU-heavy and IO-heavy jobs have separate slot
+limits so a burst of external tools can't starve the disk-bound steps (or
+the reverse). A job may return a list of child jobs; it only counts as
+finished, for its dependents, once all of its children have finished.
+
+In-process parsers share the GIL, so CPU-heavy work that should use another
+core goes through run_in_process().
+
+Setting ``manager.profiler`` to a regparser_profiling.Profiler profiles every
+job submitted from then on; left at None, jobs run untouched. Likewise
+``manager.metrics`` (a regparser_metrics.RunMetrics) hears of every job that
+reaches a final state, and ``manager.governor`` (a
+regparser_governor.ResourceGovernor) is asked before any job starts.
+"""
+import os
+import sys
+import time
+import itertools
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from regparser_core import CancelToken, JobCancelled, mark_incomplete
+from regparser_events import ProgressTracker
+import regparser_hashing as hashing
+from regparser_governor import pool_workers
+
+
+QUEUED, RUNNING, WAITING, DONE, FAILED, CANCELLED = (
+    'queued', 'running', 'waiting', 'done', 'failed', 'cancelled')
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+DEFAULT_IO_SLOTS = 2
+PROCESS_POLL_INTERVAL = 0.1
+# Below this many items a process pool's start-up cost outweighs the parallelism
+POOL_MIN_ITEMS = 32
+POOL_CHUNKSIZE = 8
+
+
+class Job:
+    """One unit of work: func(cancel) runs on a worker thread.
+
+    priority: lower runs first. weight: estimated cost (e.g. bytes); among
+    equal priorities heavier jobs start first so long tails overlap.
+    """
+
+    _seq = itertools.count()
+
+    def __init__(self, name, func, kind='cpu', priority=10, weight=0, deps=()):
+        self.name = name
+        self.func = func
+        self.kind = kind
+        self.priority = priority
+        self.weight = weight
+        self.deps = list(deps)
+        self.seq = next(Job._seq)
+        self.cancel = CancelToken()
+        self.state = QUEUED
+        self.error = None
+        self.parent = None
+        self.children = []
+        self.queued_at = time.time()
+        self.started_at = None
+        # When func returned; a job that spawned children finishes later, once they have
+        self.returned_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+    def sort_key(self):
+        return (self.priority, -self.weight, self.seq)
+
+    def wait_time(self):
+        return ((self.started_at or time.time()) - self.queued_at)
+
+    def run_time(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobManager:
+    def __init__(self, cpu_slots=None, io_slots=DEFAULT_IO_SLOTS):
+        self.slots = {'cpu': cpu_slots or os.cpu_count() or 1, 'io': io_slots}
+        self.running = {'cpu': 0, 'io': 0}
+        self.jobs = []
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.workers = []
+        self.profiler = None
+        self.metrics = None
+        self.governor = None
+
+    def submit(self, job):
+        with self.lock:
+            self._add(job)
+            self._ensure_workers()
+            self.changed.notify_all()
+        return job
+
+    def submit_all(self, jobs):
+        for job in jobs:
+            self.submit(job)
+        return jobs
+
+    def set_slots(self, kind, count):
+        """Change (or add) the slot limit of a job kind, e.g. remote capacity as worker nodes come and go"""
+        with self.lock:
+            self.slots[kind] = count
+            self.running.setdefault(kind, 0)
+            self._ensure_workers()
+            self.changed.notify_all()
+
+    def wake(self):
+        """Have idle workers look for startable jobs again, e.g. once the governor admits work"""
+        with self.lock:
+            self.changed.notify_all()
+
+    def cancel(self, job):
+        with self.lock:
+            self._cancel(job)
+            self.changed.notify_all()
+
+    def cancel_all(self):
+        """Cancel every unfinished job. Returns how many were affected."""
+        with self.lock:
+            pending = [job for job in self.jobs if not job.finished]
+            for job in pending:
+                self._cancel(job)
+            self.changed.notify_all()
+        return len(pending)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.jobs)
+
+    def active_count(self):
+        with self.lock:
+            return sum(1 for job in self.jobs if not job.finished)
+
+    def clear_finished(self):
+        with self.lock:
+            self.jobs = [job for job in self.jobs if not job.finished]
+
+    def wait(self, jobs=None, timeout=None):
+        """Block until the given jobs (default: all) have finished"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while True:
+                targets = jobs if jobs is not None else self.jobs
+                if all(job.finished for job in targets):
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.changed.wait(remaining if remaining is not None else 0.5)
+
+    # -- internals, called with self.lock held --------------------------------
+
+    def _add(self, job):
+        if self.profiler is not None:
+            self.profiler.instrument(job)
+        job.state = QUEUED
+        job.queued_at = time.time()
+        self.jobs.append(job)
+
+    def _ensure_workers(self):
+        wanted = sum(self.slots.values())
+        while len(self.workers) < wanted:
+            worker = threading.Thread(target=self._work, name=f"job-worker-{len(self.workers) + 1}", daemon=True)
+            self.workers.append(worker)
+            worker.start()
+
+    def _cancel(self, job):
+        job.cancel.cancel()
+        for child in job.children:
+            self._cancel(child)
+        if job.state == QUEUED:
+            self._finish(job, CANCELLED)
+
+    def _finish(self, job, state):
+        job.state = state
+        job.finished_at = time.time()
+        if self.metrics is not None:
+            self.metrics.job_finished(job)
+        parent = job.parent
+        if parent is not None and parent.state == WAITING and all(c.finished for c in parent.children):
+            self._finish(parent, CANCELLED if parent.cancel.cancelled else DONE)
+
+    def _next_job(self):
+        running = [j for j in self.jobs if j.state == RUNNING] if self.governor is not None else ()
+        for job in sorted((j for j in self.jobs if j.state == QUEUED), key=Job.sort_key):
+            if any(dep.state == CANCELLED for dep in job.deps):
+                self._finish(job, CANCELLED)
+                continue
+            if not all(dep.finished for dep in job.deps):
+                continue
+            if self.running[job.kind] >= self.slots[job.kind]:
+                continue
+            if self.governor is not None and not self.governor.admit(job, running):
+                continue
+            return job
+        return None
+
+    def _work(self):
+        while True:
+            with self.lock:
+                job = self._next_job()
+                while job is None:
+                    self.changed.wait()
+                    job = self._next_job()
+                job.state = RUNNING
+                job.started_at = time.time()
+                self.running[job.kind] += 1
+
+            children = None
+            try:
+                job.cancel.check()
+                children = job.func(job.cancel)
+                state = DONE
+            except JobCancelled:
+                state = CANCELLED
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                state = FAILED
+
+            with self.lock:
+                job.returned_at = time.time()
+                self.running[job.kind] -= 1
+                if state == DONE and children:
+                    job.state = WAITING
+                    for child in children:
+                        child.parent = job
+                        job.children.append(child)
+                        self._add(child)
+                        if job.cancel.cancelled:
+                            self._cancel(child)
+                    self._ensure_workers()
+                else:
+                    self._finish(job, state)
+                self.changed.notify_all()
+
+
+def _process_entry(conn, func, args, report_progress, profile_path=None, known=None):
+    """Child side of run_in_process: run func and stream tracker snapshots back"""
+    if known:
+        hashing.merge(known)
+    # Digests go back as soon as they exist, so the parent can end its claims early
+    hashing.relay_to(lambda remembered: conn.send(('digests', remembered)))
+    profile = None
+    if profile_path:
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+    tracker = None
+    if report_progress:
+        def send(t):
+            conn.send(('progress', (t.keys, t.values, t.rows, t.bytes, t.items, t.total_items)))
+        tracker = ProgressTracker("child", send)
+    try:
+        result = func(*args, progress=tracker) if tracker else func(*args)
+        if tracker:
+            send(tracker)
+        # Digests taken while the child read its evidence belong to the parent's run
+        conn.send(('digests', hashing.snapshot()))
+        conn.send(('result', result))
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(profile_path)
+        conn.close()
+
+
+def run_in_process(func, args, cancel=None, progress=None, inputs=(), outputs=()):
+    """Run a module-level function in a child process so it gets its own core.
+
+    func must accept progress= when a tracker is given. Tracker counters from
+    the child are mirrored into progress. On cancel the child is terminated,
+    outputs are renamed *.incomplete and JobCancelled is raised. The spawn
+    start method is used everywhere so forking a threaded GUI is never an issue.
+    A job being profiled gets the child's profile too. inputs are files the
+    child hashes as it reads them: their known digests go to the child, and
+    unknown ones are claimed here so readers in this process skip hashing them.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    claimed = [path for path in inputs if hashing.claim(path)]
+    # Only a run with --profile (or the GUI's profiler) imports regparser_profiling
+    profiling = sys.modules.get('regparser_profiling')
+    profile_path = profiling.child_profile_path() if profiling is not None else None
+    proc = ctx.Process(target=_process_entry, args=(child_conn, func, args, progress is not None,
+                                                    profile_path, hashing.snapshot(inputs)), daemon=True)
+    try:
+        proc.start()
+    except Exception:
+        for path in claimed:
+            hashing.release(path)
+        raise
+    child_conn.close()
+
+    base = None
+    if progress is not None:
+        base = (progress.keys, progress.values, progress.rows, progress.bytes, progress.items, progress.total_items)
+    try:
+        while True:
+            if cancel is not None and cancel.cancelled:
+                proc.terminate()
+                proc.join()
+                for path in outputs:
+                    mark_incomplete(path)
+                raise JobCancelled()
+            if not parent_conn.poll(PROCESS_POLL_INTERVAL):
+                if not proc.is_alive() and not parent_conn.poll():
+                    raise RuntimeError(f"worker process exited with code {proc.exitcode}")
+                continue
+            try:
+                kind, payload = parent_conn.recv()
+            except EOFError:
+                raise RuntimeError(f"worker process exited with code {proc.exitcode}")
+            if kind == 'progress' and progress is not None:
+                keys, values, rows, nbytes, items, total_items = payload
+                progress.keys = base[0] + keys
+                progress.values = base[1] + values
+                progress.rows = base[2] + rows
+                progress.bytes = base[3] + nbytes
+                progress.items = base[4] + items
+                progress.total_items = base[5] + total_items
+                progress.report()
+            elif kind == 'digests':
+                hashing.merge(payload)
+                for path in claimed:
+                    if hashing.known_digests(path) is not None:
+                        hashing.release(path)
+            elif kind == 'result':
+                return payload
+            elif kind == 'error':
+                raise RuntimeError(payload)
+    finally:
+        parent_conn.close()
+        proc.join(timeout=5)
+        for path in claimed:
+            hashing.release(path)
+
+
+@contextlib.contextmanager
+def process_map(func, items, workers=None, min_items=POOL_MIN_ITEMS, chunksize=POOL_CHUNKSIZE):
+    """Yield an iterator of func(item) results, in input order.
+
+    Large batches are spread over a spawn-based process pool, sized by the
+    resource governor when one runs; small ones (or a single-core machine)
+    run in-process. Leaving the block early, e.g. on
+    cancel, drops the work that has not started yet.
+    """
+    items = list(items)
+    workers = pool_workers(workers)
+    if len(items) < min_items or workers < 2:
+        yield map(func, items)
+        return
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        yield pool.map(func, items, chunksize=chunksize)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
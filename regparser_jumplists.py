@@ -0,0 +1,395 @@
+"""Native Jump List parser, replacing JLECmd.exe.
+
+AutomaticDestinations-ms files are OLE Compound Files: a DestList stream
+(MRU metadata) plus one Shell Link (LNK) stream per entry, named by the
+entry number in hex. CustomDestinations-ms files are a sequence of LNK
+structures grouped into categories; they are located by the LNK header.
+
+Files are memory-mapped, parsed in a process pool and rows are streamed
+into ``<timestamp>_AutomaticDestinations.csv`` and
+``<timestamp>_CustomDestinations.csv`` as each file completes.
+"""
+import os
+import csv
+import mmap
+import uuid
+import struct
+import datetime
+from array import array
+
+from regparser_core import JobCancelled, incomplete_on_cancel
+from regparser_times import filetime_to_str, unix_to_str
+from regparser_jobs import process_map
+from regparser_hashing import hash_bytes, remember
+
+
+CFB_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+CFB_MAX_SECTOR = 0xFFFFFFFA
+CFB_STREAM, CFB_ROOT = 2, 5
+
+LNK_HEADER = (b'\x4c\x00\x00\x00\x01\x14\x02\x00\x00\x00\x00\x00'
+              b'\xc0\x00\x00\x00\x00\x00\x00\x46')
+
+# Shell Link flags (MS-SHLLINK 2.1.1)
+HAS_ID_LIST = 0x01
+HAS_LINK_INFO = 0x02
+HAS_NAME = 0x04
+HAS_RELATIVE_PATH = 0x08
+HAS_WORKING_DIR = 0x10
+HAS_ARGUMENTS = 0x20
+HAS_ICON_LOCATION = 0x40
+IS_UNICODE = 0x80
+TRACKER_BLOCK_SIGNATURE = 0xA0000003
+
+DRIVE_TYPES = {0: 'Unknown', 1: 'No root dir', 2: 'Removable', 3: 'Fixed',
+               4: 'Network', 5: 'CD-ROM', 6: 'RAM disk'}
+
+UUID_EPOCH = datetime.datetime(1582, 10, 15)
+
+SOURCE_COLUMNS = ['SourceFile', 'SourceCreated', 'SourceModified', 'SourceAccessed', 'AppId']
+LNK_COLUMNS = [
+    'TargetCreated', 'TargetModified', 'TargetAccessed', 'FileSize', 'FileAttributes',
+    'LocalPath', 'CommonPath', 'NetworkPath', 'DriveType', 'VolumeSerialNumber', 'VolumeLabel',
+    'RelativePath', 'WorkingDirectory', 'Arguments', 'Name', 'IconLocation', 'MachineID',
+]
+AUTOMATIC_COLUMNS = (SOURCE_COLUMNS + [
+    'DestListVersion', 'EntryNumber', 'Path', 'Hostname', 'LastModified', 'CreationTime',
+    'MacAddress', 'Pinned', 'InteractionCount'] + LNK_COLUMNS + ['ParsingError'])
+CUSTOM_COLUMNS = SOURCE_COLUMNS + ['EntryNumber'] + LNK_COLUMNS + ['ParsingError']
+
+
+class JumpListError(ValueError):
+    """The file is not a jump list this parser understands"""
+
+
+class CompoundFile:
+    """Just enough of [MS-CFB] to read the streams of a jump list"""
+
+    def __init__(self, buf):
+        if len(buf) < 512 or bytes(buf[:8]) != CFB_SIGNATURE:
+            raise JumpListError("not an OLE compound file")
+        self.buf = buf
+        sector_shift, mini_shift = struct.unpack_from('<HH', buf, 0x1E)
+        self.sector_size = 1 << sector_shift
+        self.mini_size = 1 << mini_shift
+        (fat_count, first_dir, _, self.cutoff, first_minifat, _minifat_count,
+         first_difat, difat_count) = struct.unpack_from('<8I', buf, 0x2C)
+        self.large_sizes = sector_shift != 9
+
+        difat = list(struct.unpack_from('<109I', buf, 0x4C))
+        sector = first_difat
+        for _ in range(difat_count):
+            if sector > CFB_MAX_SECTOR:
+                break
+            entries = array('I')
+            entries.frombytes(self._sector(sector))
+            difat.extend(entries[:-1])
+            sector = entries[-1]
+        self.fat = array('I')
+        for sector in difat[:fat_count]:
+            if sector <= CFB_MAX_SECTOR:
+                self.fat.frombytes(self._sector(sector))
+
+        directory = self._chain_bytes(first_dir, self.fat, self._sector)
+        self.entries = {}
+        root = None
+        for offset in range(0, len(directory) - 127, 128):
+            name_len, entry_type = struct.unpack_from('<HB', directory, offset + 64)
+            start, size = struct.unpack_from('<IQ', directory, offset + 116)
+            if not self.large_sizes:
+                size &= 0xFFFFFFFF
+            name = bytes(directory[offset:offset + max(name_len - 2, 0)]).decode('utf-16-le', errors='replace')
+            if entry_type == CFB_ROOT:
+                root = (start, size)
+            elif entry_type == CFB_STREAM:
+                self.entries[name] = (start, size)
+        self.minifat = array('I', self._chain_bytes(first_minifat, self.fat, self._sector)) if root else array('I')
+        self.ministream = self._chain_bytes(root[0], self.fat, self._sector)[:root[1]] if root else b''
+
+    def _sector(self, sector):
+        start = (sector + 1) * self.sector_size
+        if start + self.sector_size > len(self.buf):
+            raise JumpListError("sector beyond end of file")
+        return self.buf[start:start + self.sector_size]
+
+    def _mini_sector(self, sector):
+        start = sector * self.mini_size
+        return self.ministream[start:start + self.mini_size]
+
+    def _chain_bytes(self, sector, table, read):
+        parts = []
+        for _ in range(len(table) + 1):
+            if sector > CFB_MAX_SECTOR:
+                return b''.join(parts)
+            if sector >= len(table):
+                raise JumpListError("sector chain points outside the allocation table")
+            parts.append(read(sector))
+            sector = table[sector]
+        raise JumpListError("sector chain loops")
+
+    def stream_names(self):
+        return list(self.entries)
+
+    def read_stream(self, name):
+        start, size = self.entries[name]
+        if size < self.cutoff:
+            data = self._chain_bytes(start, self.minifat, self._mini_sector)
+        else:
+            data = self._chain_bytes(start, self.fat, self._sector)
+        return data[:size]
+
+
+def _string_at(data, offset, unicode):
+    """NUL-terminated ANSI or UTF-16 string starting at offset"""
+    if unicode:
+        end = offset
+        while end + 1 < len(data) and (data[end] or data[end + 1]):
+            end += 2
+        return bytes(data[offset:end]).decode('utf-16-le', errors='replace')
+    end = data.find(b'\x00', offset)
+    return bytes(data[offset:end if end >= 0 else len(data)]).decode('cp1252', errors='replace')
+
+
+def parse_lnk(data):
+    """Decode the forensically useful parts of a Shell Link into a dict of LNK_COLUMNS"""
+    if len(data) < 76 or bytes(data[:20]) != LNK_HEADER:
+        raise JumpListError("not a Shell Link")
+    flags, attributes, created, accessed, modified, file_size = struct.unpack_from('<IIQQQI', data, 20)
+    info = dict.fromkeys(LNK_COLUMNS, '')
+    info.update({
+        'TargetCreated': filetime_to_str(created),
+        'TargetModified': filetime_to_str(modified),
+        'TargetAccessed': filetime_to_str(accessed),
+        'FileSize': file_size,
+        'FileAttributes': f"0x{attributes:08X}",
+    })
+    offset = 76
+    if flags & HAS_ID_LIST:
+        offset += 2 + struct.unpack_from('<H', data, offset)[0]
+
+    if flags & HAS_LINK_INFO:
+        info_size, header_size, info_flags, volume_offset, base_offset, network_offset, suffix_offset = \
+            struct.unpack_from('<7I', data, offset)
+        base = offset
+        unicode_base = unicode_suffix = 0
+        if header_size >= 0x24:
+            unicode_base, unicode_suffix = struct.unpack_from('<II', data, base + 28)
+        if info_flags & 0x1:
+            if volume_offset:
+                volume = base + volume_offset
+                _, drive_type, serial, label_offset = struct.unpack_from('<4I', data, volume)
+                info['DriveType'] = DRIVE_TYPES.get(drive_type, str(drive_type))
+                info['VolumeSerialNumber'] = f"{serial:08X}"
+                if label_offset == 0x14:
+                    info['VolumeLabel'] = _string_at(data, volume + struct.unpack_from('<I', data, volume + 16)[0], True)
+                else:
+                    info['VolumeLabel'] = _string_at(data, volume + label_offset, False)
+            if unicode_base:
+                info['LocalPath'] = _string_at(data, base + unicode_base, True)
+            elif base_offset:
+                info['LocalPath'] = _string_at(data, base + base_offset, False)
+        if info_flags & 0x2 and network_offset:
+            network = base + network_offset
+            net_name_offset = struct.unpack_from('<I', data, network + 8)[0]
+            info['NetworkPath'] = _string_at(data, network + net_name_offset, False)
+        if unicode_suffix:
+            info['CommonPath'] = _string_at(data, base + unicode_suffix, True)
+        elif suffix_offset:
+            info['CommonPath'] = _string_at(data, base + suffix_offset, False)
+        offset += info_size
+
+    unicode = bool(flags & IS_UNICODE)
+    for flag, column in ((HAS_NAME, 'Name'), (HAS_RELATIVE_PATH, 'RelativePath'),
+                         (HAS_WORKING_DIR, 'WorkingDirectory'), (HAS_ARGUMENTS, 'Arguments'),
+                         (HAS_ICON_LOCATION, 'IconLocation')):
+        if flags & flag:
+            chars = struct.unpack_from('<H', data, offset)[0]
+            width = 2 if unicode else 1
+            raw = bytes(data[offset + 2:offset + 2 + chars * width])
+            info[column] = raw.decode('utf-16-le' if unicode else 'cp1252', errors='replace')
+            offset += 2 + chars * width
+
+    # Extra data blocks run until a terminal block smaller than 4 bytes
+    while offset + 8 <= len(data):
+        block_size, signature = struct.unpack_from('<II', data, offset)
+        if block_size < 8:
+            break
+        if signature == TRACKER_BLOCK_SIGNATURE and block_size >= 0x60:
+            info['MachineID'] = _string_at(data[offset + 16:offset + 32], 0, False)
+        offset += block_size
+    return info
+
+
+def _droid_time_and_mac(raw):
+    """Creation time and MAC address encoded in a version 1 UUID (file droid)"""
+    try:
+        droid = uuid.UUID(bytes_le=bytes(raw))
+    except ValueError:
+        return '', ''
+    if droid.version != 1:
+        return '', ''
+    created = UUID_EPOCH + datetime.timedelta(microseconds=droid.time // 10)
+    mac = ':'.join(f"{(droid.node >> shift) & 0xFF:02x}" for shift in range(40, -8, -8))
+    return created.strftime('%Y-%m-%d %H:%M:%S UTC'), mac
+
+
+def parse_destlist(data):
+    """Yield one dict per DestList entry (Windows 7 format 1, Windows 10 formats 3/4)"""
+    if len(data) < 32:
+        return
+    version, count = struct.unpack_from('<II', data, 0)
+    offset = 32
+    for _ in range(count):
+        if offset + 114 > len(data):
+            break
+        hostname = _string_at(data[offset + 72:offset + 88], 0, False)
+        entry_number = struct.unpack_from('<I', data, offset + 88)[0]
+        modified, pin = struct.unpack_from('<Qi', data, offset + 100)
+        created, mac = _droid_time_and_mac(data[offset + 24:offset + 40])
+        if version == 1:
+            interaction_count = ''
+            path_chars = struct.unpack_from('<H', data, offset + 112)[0]
+            path_offset = offset + 114
+            entry_size = 114 + path_chars * 2
+        else:
+            interaction_count = struct.unpack_from('<I', data, offset + 116)[0]
+            path_chars = struct.unpack_from('<H', data, offset + 128)[0]
+            path_offset = offset + 130
+            entry_size = 130 + path_chars * 2 + 4
+        yield {
+            'DestListVersion': version,
+            'EntryNumber': entry_number,
+            'Path': bytes(data[path_offset:path_offset + path_chars * 2]).decode('utf-16-le', errors='replace'),
+            'Hostname': hostname,
+            'LastModified': filetime_to_str(modified),
+            'CreationTime': created,
+            'MacAddress': mac,
+            'Pinned': pin != -1,
+            'InteractionCount': interaction_count,
+        }
+        offset += entry_size
+
+
+def parse_automatic_destinations(buf):
+    """Rows for one AutomaticDestinations file: DestList entries joined with their LNK streams"""
+    cfb = CompoundFile(buf)
+    names = set(cfb.stream_names())
+    rows = []
+    seen = set()
+    entries = list(parse_destlist(cfb.read_stream('DestList'))) if 'DestList' in names else []
+    for entry in entries:
+        stream = f"{entry['EntryNumber']:x}"
+        row = dict(entry)
+        if stream in names:
+            seen.add(stream)
+            try:
+                row.update(parse_lnk(cfb.read_stream(stream)))
+            except (JumpListError, struct.error) as e:
+                row['ParsingError'] = f"LNK {stream}: {e}"
+        rows.append(row)
+    # LNK streams without a DestList entry (e.g. a damaged DestList)
+    for stream in sorted(names - seen - {'DestList'}):
+        row = {'EntryNumber': int(stream, 16) if all(c in '0123456789abcdefABCDEF' for c in stream) else stream}
+        try:
+            row.update(parse_lnk(cfb.read_stream(stream)))
+        except (JumpListError, struct.error) as e:
+            row['ParsingError'] = f"LNK {stream}: {e}"
+        rows.append(row)
+    return rows
+
+
+def parse_custom_destinations(buf):
+    """Rows for one CustomDestinations file, one per embedded LNK"""
+    rows = []
+    position = buf.find(LNK_HEADER)
+    number = 0
+    while position >= 0:
+        following = buf.find(LNK_HEADER, position + len(LNK_HEADER))
+        end = following if following >= 0 else len(buf)
+        row = {'EntryNumber': number}
+        try:
+            row.update(parse_lnk(buf[position:end]))
+        except (JumpListError, struct.error) as e:
+            row['ParsingError'] = f"LNK {number}: {e}"
+        rows.append(row)
+        number += 1
+        position = following
+    return rows
+
+
+def parse_jump_list_file(path):
+    """Pool worker: returns (path, kind, rows, error, digests)"""
+    kind = 'custom' if path.lower().endswith('.customdestinations-ms') else 'automatic'
+    digests = None
+    try:
+        stat = os.stat(path)
+        source = {
+            'SourceFile': path,
+            'SourceCreated': unix_to_str(stat.st_ctime),
+            'SourceModified': unix_to_str(stat.st_mtime),
+            'SourceAccessed': unix_to_str(stat.st_atime),
+            'AppId': os.path.basename(path).split('.', 1)[0],
+        }
+        if stat.st_size == 0:
+            return path, kind, [], "empty file", hash_bytes(b'')
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            # The pages are mapped for parsing anyway; hashing them costs no extra read
+            digests = hash_bytes(buf)
+            view = memoryview(buf)
+            try:
+                if kind == 'custom':
+                    rows = parse_custom_destinations(buf)
+                else:
+                    rows = parse_automatic_destinations(view)
+            finally:
+                view.release()
+        return path, kind, [dict(source, **row) for row in rows], None, digests
+    except (OSError, ValueError, struct.error, IndexError) as e:
+        return path, kind, [], f"{type(e).__name__}: {e}", digests
+
+
+def find_jump_list_files(folder):
+    suffixes = ('.automaticdestinations-ms', '.customdestinations-ms')
+    return sorted(os.path.join(root, name) for root, _, files in os.walk(folder)
+                  for name in files if name.lower().endswith(suffixes))
+
+
+def parse_jump_lists_folder(folder, out_dir, workers=None, progress=None, cancel=None, log=print):
+    """Parse every jump list under folder into out_dir. Returns (rows, failed files).
+
+    On cancel the pool is stopped, both CSVs are renamed *.incomplete and
+    JobCancelled is raised.
+    """
+    paths = find_jump_list_files(folder)
+    if progress is not None:
+        progress.total_items = len(paths)
+        progress.total_bytes = sum(os.path.getsize(p) for p in paths)
+    stamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+    automatic_csv = os.path.join(out_dir, f"{stamp}_AutomaticDestinations.csv")
+    custom_csv = os.path.join(out_dir, f"{stamp}_CustomDestinations.csv")
+    row_count = failed = 0
+
+    with process_map(parse_jump_list_file, paths, workers) as results, \
+            incomplete_on_cancel(automatic_csv), incomplete_on_cancel(custom_csv):
+        with open(automatic_csv, 'w', newline='', encoding='utf-8-sig') as automatic_file, \
+                open(custom_csv, 'w', newline='', encoding='utf-8-sig') as custom_file:
+            writers = {
+                'automatic': csv.DictWriter(automatic_file, fieldnames=AUTOMATIC_COLUMNS, restval=''),
+                'custom': csv.DictWriter(custom_file, fieldnames=CUSTOM_COLUMNS, restval='', extrasaction='ignore'),
+            }
+            for writer in writers.values():
+                writer.writeheader()
+            for path, kind, rows, error, digests in results:
+                if cancel is not None and cancel.cancelled:
+                    raise JobCancelled()
+                if digests:
+                    remember(path, digests)
+                if error:
+                    failed += 1
+                    log(f"⚠️ {os.path.basename(path)}: {error}")
+                    rows = [{'SourceFile': path, 'ParsingError': error}]
+                writers[kind].writerows(rows)
+                row_count += len(rows)
+                if progress is not None:
+                    progress.add(rows=len(rows), items=1, nbytes=os.path.getsize(path))
+    return row_count, failed
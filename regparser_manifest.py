@@ -0,0 +1,257 @@
+"""Per-case run manifest consumed by report export.
+
+Every parser stage appends one entry to ``<output>/run_manifest.json``: what
+it read, what it wrote (with sizes), how many rows it produced, how long it
+took, how it ended and which tool produced it, plus the MD5/SHA-1/SHA-256
+of every input taken while it was read. Reports read only this file,
+so exporting never walks output folders or counts rows in large CSVs.
+
+    manifest = open_manifest(output)
+    with manifest.stage("Prefetch", "Prefetch", tracker, inputs=[folder], outputs=[out_dir]) as entry:
+        parsed, failed = parse_prefetch_folder(...)
+        entry['failed_items'] = failed
+"""
+import os
+import csv
+import sys
+import copy
+import json
+import time
+import datetime
+import threading
+import contextlib
+import importlib.metadata
+
+import regparser_hashing as hashing
+from regparser_core import APP_VERSION, JobCancelled
+
+
+MANIFEST_NAME = "run_manifest.json"
+HASH_LIST_NAME = "evidence_hashes.csv"
+MANIFEST_VERSION = 1
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S UTC'
+BUILTIN_TOOL = f"{APP_VERSION} built-in parser"
+
+# Stage status, worst last: an artifact is reported with its worst stage status
+COMPLETE = 'complete'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+STATUS_ORDER = [COMPLETE, CANCELLED, FAILED]
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+# Called with (manifest path, entry) after every stage entry is saved, e.g. by run metrics
+_stage_listeners = []
+
+
+def utc_now():
+    return datetime.datetime.now(datetime.timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+def package_version(name):
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return "not installed"
+
+
+def environment():
+    return {
+        'app': APP_VERSION,
+        'python': sys.version.split()[0],
+        'python-registry': package_version('python-registry'),
+        'platform': sys.platform,
+    }
+
+
+def input_entries(paths):
+    """Describe stage inputs with the digests taken while they were read.
+
+    Files get their size and digests; folders list the files below them that
+    the parser hashed. Nothing is read here.
+    """
+    entries = []
+    for path in paths:
+        entry = {'path': path}
+        if os.path.isfile(path):
+            entry['bytes'] = os.path.getsize(path)
+            entry.update(hashing.wait_for(path) or {})
+        elif os.path.isdir(path):
+            entry['files'] = [dict(path=file_path, **digests)
+                              for file_path, digests in hashing.known_under(path).items()]
+        entries.append(entry)
+    return entries
+
+
+def hashed_inputs(entries):
+    """Unique (path, digests) of every hashed input file across manifest entries, latest first wins"""
+    hashed = {}
+    for entry in entries:
+        for item in entry['inputs']:
+            for file_entry in item.get('files', [item]):
+                if all(name in file_entry for name in hashing.HASH_ALGORITHMS):
+                    hashed[file_entry['path']] = {name: file_entry[name] for name in hashing.HASH_ALGORITHMS}
+    return hashed
+
+
+def output_entries(paths, since=0.0):
+    """Describe stage outputs that exist on disk.
+
+    A file that was renamed ``.incomplete`` on cancel is recorded under its
+    new name. A folder stands for the files written into it since ``since``
+    (parsers that name their outputs with a timestamp).
+    """
+    candidates = []
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                candidates.extend(sorted(e.path for e in entries if e.is_file() and e.stat().st_mtime >= since))
+        elif os.path.exists(path):
+            candidates.append(path)
+        elif os.path.exists(path + ".incomplete"):
+            candidates.append(path + ".incomplete")
+    return [{'path': path, 'bytes': os.path.getsize(path), 'incomplete': path.endswith(".incomplete")}
+            for path in candidates]
+
+
+class RunManifest:
+    """Thread-safe, append-only list of stage entries persisted as JSON"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                return data
+        except (OSError, ValueError):
+            pass
+        return {'version': MANIFEST_VERSION, 'created': utc_now(), 'updated': utc_now(),
+                'environment': environment(), 'entries': []}
+
+    def _save(self):
+        # Write-then-rename so a crash never leaves a truncated manifest behind
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=1, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+    def add(self, entry):
+        with self.lock:
+            self.data['entries'].append(entry)
+            self.data['updated'] = entry.get('finished') or utc_now()
+            self._save()
+            if any(item.get('files') or 'sha256' in item for item in entry['inputs']):
+                self._save_hash_list()
+        for listener in list(_stage_listeners):
+            listener(self.path, entry)
+
+    def _save_hash_list(self):
+        """evidence_hashes.csv next to the manifest, for chain-of-custody paperwork"""
+        path = os.path.join(os.path.dirname(self.path), HASH_LIST_NAME)
+        with open(path + ".tmp", 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Path'] + [name.upper() for name in hashing.HASH_ALGORITHMS])
+            for file_path, digests in sorted(hashed_inputs(self.data['entries']).items()):
+                writer.writerow([file_path] + [digests[name] for name in hashing.HASH_ALGORITHMS])
+        os.replace(path + ".tmp", path)
+
+    @contextlib.contextmanager
+    def stage(self, artifact, stage, tracker=None, inputs=(), outputs=(), tool=BUILTIN_TOOL):
+        """Record one stage. Yields the entry so the caller can add fields
+        (e.g. ``failed_items``); rows default to what the tracker counted
+        while the block ran. Exceptions are recorded and re-raised.
+        """
+        entry = {'artifact': artifact, 'stage': stage, 'tool': tool, 'started': utc_now()}
+        rows_before = tracker.rows if tracker is not None else 0
+        started_wall = time.time()
+        started = time.monotonic()
+        try:
+            yield entry
+            entry['status'] = COMPLETE
+        except JobCancelled:
+            entry['status'] = CANCELLED
+            raise
+        except Exception as e:
+            entry['status'] = FAILED
+            entry['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            entry['finished'] = utc_now()
+            # Inputs are described last so digests taken during the stage are included
+            entry['inputs'] = input_entries(inputs)
+            entry['duration'] = round(time.monotonic() - started, 3)
+            if 'rows' not in entry:
+                entry['rows'] = tracker.rows - rows_before if tracker is not None else 0
+            # mtime resolution is coarse on some filesystems
+            entry['outputs'] = output_entries(outputs, since=started_wall - 2)
+            entry['bytes'] = sum(o['bytes'] for o in entry['outputs'])
+            self.add(entry)
+
+
+def add_stage_listener(listener):
+    _stage_listeners.append(listener)
+
+
+def remove_stage_listener(listener):
+    if listener in _stage_listeners:
+        _stage_listeners.remove(listener)
+
+
+def open_manifest(output_folder):
+    """The shared RunManifest of an output folder (one instance per process)"""
+    path = os.path.abspath(os.path.join(output_folder, MANIFEST_NAME))
+    with _manifests_lock:
+        manifest = _manifests.get(path)
+        if manifest is None:
+            os.makedirs(output_folder, exist_ok=True)
+            manifest = _manifests[path] = RunManifest(path)
+        return manifest
+
+
+def load_manifest(output_folder):
+    """Manifest data of an output folder, or None when nothing has run there yet"""
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with _manifests_lock:
+        manifest = _manifests.get(os.path.abspath(path))
+    if manifest is not None:
+        with manifest.lock:
+            return copy.deepcopy(manifest.data)
+    data = RunManifest(path).data
+    return data if data['entries'] else None
+
+
+def latest_entries(entries):
+    """The most recent entry of every (artifact, stage); earlier runs of a stage are superseded"""
+    latest = {}
+    for entry in entries:
+        latest[(entry['artifact'], entry['stage'])] = entry
+    return list(latest.values())
+
+
+def summarize_artifacts(entries):
+    """Aggregate the latest entry of every stage into one record per artifact"""
+    artifacts = {}
+    for entry in latest_entries(entries):
+        summary = artifacts.setdefault(entry['artifact'], {
+            'name': entry['artifact'], 'file_count': 0, 'rows': 0, 'bytes': 0,
+            'duration': 0.0, 'failed_items': 0, 'status': COMPLETE, 'errors': [], 'tools': [],
+        })
+        summary['file_count'] += len(entry['outputs'])
+        summary['rows'] += entry['rows']
+        summary['bytes'] += entry['bytes']
+        summary['duration'] += entry['duration']
+        summary['failed_items'] += entry.get('failed_items', 0)
+        if STATUS_ORDER.index(entry['status']) > STATUS_ORDER.index(summary['status']):
+            summary['status'] = entry['status']
+        if entry.get('error'):
+            summary['errors'].append(f"{entry['stage']}: {entry['error']}")
+        if entry['tool'] not in summary['tools']:
+            summary['tools'].append(entry['tool'])
+    return artifacts
@@ -0,0 +1,333 @@
+"""Machine-readable metrics of a processing run for unattended servers.
+
+RunMetrics collects counters from three places that already exist: the
+ProgressTrackers of running stages (keys, values, rows, bytes read, live),
+the run manifest's stage entries (bytes written, stage latency, hives
+parsed, outcomes) and the job manager (queue depths, busy workers, errors
+by type). A background thread rewrites an OpenMetrics text file every
+``interval`` seconds, suitable for node_exporter's textfile collector, and
+can serve the same text on a local port. stop() writes a final JSON summary.
+
+    metrics = RunMetrics(manager, output, path="/var/lib/node_exporter/regparser.prom", port=9464)
+    metrics.start()
+    ...
+    summary = metrics.stop()
+"""
+import os
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from regparser_core import APP_VERSION
+from regparser_jobs import QUEUED, RUNNING, WAITING, DONE, FAILED, CANCELLED
+from regparser_manifest import add_stage_listener, remove_stage_listener, utc_now, COMPLETE
+
+
+METRICS_NAME = "regparser.prom"
+SUMMARY_NAME = "run_summary.json"
+METRICS_INTERVAL = 10.0
+METRICS_HOST = "127.0.0.1"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+STAGE_BUCKETS = (0.1, 0.5, 1, 5, 15, 60, 300, 900, 3600)
+JOB_STATES = (QUEUED, RUNNING, WAITING, DONE, FAILED, CANCELLED)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class RunMetrics:
+    """Counters, gauges and histograms of one run; thread-safe"""
+
+    def __init__(self, manager, output_folder, path=None, port=None, interval=METRICS_INTERVAL, log=print):
+        self.manager = manager
+        self.output_folder = output_folder
+        self.path = path or os.path.join(output_folder, METRICS_NAME)
+        self.port = port
+        self.interval = interval
+        self.log = log
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.started_at = utc_now()
+        self.active = set()
+        # Counters of finished stages; running trackers are added on read
+        self.finished_counts = {'keys': 0, 'values': 0, 'rows': 0, 'bytes_read': 0}
+        self.bytes_written = 0
+        self.hives_parsed = 0
+        self.stage_outcomes = {}
+        self.stage_latency = {}
+        self.errors = {}
+        self.jobs_finished = {}
+        self.busy_seconds = {kind: 0.0 for kind in manager.slots}
+        self.last_sample = None
+        self.rates = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.server = None
+
+    # -- inputs -----------------------------------------------------------------
+
+    def watch_stage(self, tracker):
+        with self.lock:
+            self.active.add(tracker)
+
+    def record_stage(self, tracker):
+        """A tracker finished: fold its counters into the totals"""
+        with self.lock:
+            self.active.discard(tracker)
+            for name, value in self._tracker_counts(tracker).items():
+                self.finished_counts[name] += value
+
+    def on_manifest_entry(self, manifest_path, entry):
+        # Batch runs keep one manifest per case below the output root
+        root = os.path.abspath(self.output_folder)
+        if os.path.commonpath([root, os.path.dirname(manifest_path)]) != root:
+            return
+        artifact = entry['artifact']
+        with self.lock:
+            self.bytes_written += entry.get('bytes', 0)
+            key = (artifact, entry['status'])
+            self.stage_outcomes[key] = self.stage_outcomes.get(key, 0) + 1
+            self.stage_latency.setdefault(artifact, Histogram()).observe(entry.get('duration', 0.0))
+            if artifact == "Registry" and entry['status'] == COMPLETE:
+                self.hives_parsed += 1
+
+    def job_finished(self, job):
+        """Called by the JobManager (with its lock held) whenever a job reaches a final state"""
+        with self.lock:
+            self.jobs_finished[job.state] = self.jobs_finished.get(job.state, 0) + 1
+            if job.started_at is not None and job.returned_at is not None:
+                self.busy_seconds[job.kind] = self.busy_seconds.get(job.kind, 0.0) + job.returned_at - job.started_at
+            if job.error:
+                error_type = job.error.split(":", 1)[0]
+                self.errors[error_type] = self.errors.get(error_type, 0) + 1
+
+    @staticmethod
+    def _tracker_counts(tracker):
+        return {'keys': tracker.keys, 'values': tracker.values, 'rows': tracker.rows, 'bytes_read': tracker.bytes}
+
+    # -- sampling ---------------------------------------------------------------
+
+    def totals(self):
+        with self.lock:
+            totals = dict(self.finished_counts)
+            for tracker in self.active:
+                for name, value in self._tracker_counts(tracker).items():
+                    totals[name] += value
+        return totals
+
+    def sample(self):
+        """Queue depths, busy slot-seconds so far and per-second rates since the previous sample"""
+        manager = self.manager
+        wall = time.time()
+        with manager.lock:
+            running = dict(manager.running)
+            states = {}
+            busy = {kind: 0.0 for kind in manager.slots}
+            for job in manager.jobs:
+                states[job.state] = states.get(job.state, 0) + 1
+                if job.state == RUNNING and job.started_at is not None:
+                    busy[job.kind] += wall - job.started_at
+        now = time.monotonic()
+        totals = self.totals()
+        with self.lock:
+            for kind, seconds in self.busy_seconds.items():
+                busy[kind] = busy.get(kind, 0.0) + seconds
+            if self.last_sample is not None:
+                then, before = self.last_sample
+                elapsed = max(now - then, 1e-6)
+                self.rates = {name: (totals[name] - before[name]) / elapsed for name in totals}
+            self.last_sample = (now, totals)
+        return totals, running, states, busy
+
+    def render(self):
+        """The current metrics as OpenMetrics text"""
+        totals, running, states, busy = self.sample()
+        elapsed = time.monotonic() - self.started
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"# HELP {name} {help_text}")
+            suffix = "_total" if kind == 'counter' else ""
+            for labels, value in samples:
+                lines.append(f"{name}{suffix}{_labels(labels)} {value}")
+
+        with self.lock:
+            family("regparser_info", 'gauge', "RegParser version.", [((('version', APP_VERSION),), 1)])
+            family("regparser_run_seconds", 'gauge', "Seconds since the run started.", [((), round(elapsed, 3))])
+            family("regparser_hives_parsed", 'counter', "Registry hives dumped completely.", [((), self.hives_parsed)])
+            for name, help_text in (('keys', "Registry keys visited."), ('values', "Registry values decoded."),
+                                    ('rows', "Rows processed by all stages.")):
+                family(f"regparser_{name}", 'counter', help_text, [((), totals[name])])
+                family(f"regparser_{name}_per_second", 'gauge', f"{name.title()} per second since the last sample.",
+                       [((), round(self.rates.get(name, 0.0), 3))])
+            family("regparser_read_bytes", 'counter', "Evidence bytes read (cell estimates for hives).",
+                   [((), totals['bytes_read'])])
+            family("regparser_written_bytes", 'counter', "Bytes of finished stage outputs.", [((), self.bytes_written)])
+            family("regparser_stages", 'counter', "Finished stages by artifact and outcome.",
+                   [((('artifact', artifact), ('status', status)), count)
+                    for (artifact, status), count in sorted(self.stage_outcomes.items())])
+            lines.append("# TYPE regparser_stage_duration_seconds histogram")
+            lines.append("# HELP regparser_stage_duration_seconds Stage wall-clock latency by artifact.")
+            for artifact, histogram in sorted(self.stage_latency.items()):
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f"regparser_stage_duration_seconds_bucket"
+                                 f"{_labels((('artifact', artifact), ('le', float(bound))))} {count}")
+                lines.append(f"regparser_stage_duration_seconds_bucket"
+                             f"{_labels((('artifact', artifact), ('le', '+Inf')))} {histogram.count}")
+                lines.append(f"regparser_stage_duration_seconds_count{_labels((('artifact', artifact),))} "
+                             f"{histogram.count}")
+                lines.append(f"regparser_stage_duration_seconds_sum{_labels((('artifact', artifact),))} "
+                             f"{round(histogram.sum, 3)}")
+            family("regparser_errors", 'counter', "Failed jobs by exception type.",
+                   [((('type', error_type),), count) for error_type, count in sorted(self.errors.items())])
+            family("regparser_jobs", 'gauge', "Jobs known to the manager by state (queue depth).",
+                   [((('state', state),), states.get(state, 0)) for state in JOB_STATES])
+            family("regparser_worker_slots", 'gauge', "Concurrent job slots by kind.",
+                   [((('kind', kind),), slots) for kind, slots in sorted(self.manager.slots.items())])
+            family("regparser_workers_busy", 'gauge', "Jobs running now by kind.",
+                   [((('kind', kind),), running.get(kind, 0)) for kind in sorted(self.manager.slots)])
+            family("regparser_worker_busy_seconds", 'counter', "Slot-seconds spent running jobs by kind.",
+                   [((('kind', kind),), round(seconds, 3)) for kind, seconds in sorted(busy.items())])
+            family("regparser_worker_utilization", 'gauge', "Busy share of the slots since the run started.",
+                   [((('kind', kind),), round(busy.get(kind, 0.0) / max(elapsed * slots, 1e-6), 4))
+                    for kind, slots in sorted(self.manager.slots.items())])
+            governor = self.manager.governor
+            if governor is not None:
+                family("regparser_memory_rss_bytes", 'gauge', "Resident memory of the process tree at the last sample.",
+                       [((), governor.rss)])
+                if governor.ceiling is not None:
+                    family("regparser_memory_ceiling_bytes", 'gauge', "Memory ceiling of the resource governor.",
+                           [((), governor.ceiling)])
+                family("regparser_memory_paused", 'gauge', "1 while new jobs are held back for memory.",
+                       [((), int(governor.paused))])
+                family("regparser_memory_held_seconds", 'counter', "Seconds new jobs were held back for memory.",
+                       [((), round(governor.held_seconds(), 3))])
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        text = self.render()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, self.path)
+        return text
+
+    # -- lifecycle --------------------------------------------------------------
+
+    def start(self):
+        self.manager.metrics = self
+        add_stage_listener(self.on_manifest_entry)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.sample()
+        self.thread = threading.Thread(target=self._loop, name="metrics-writer", daemon=True)
+        self.thread.start()
+        if self.port is not None:
+            try:
+                self.server = ThreadingHTTPServer((METRICS_HOST, self.port), _handler(self))
+            except OSError as e:
+                self.log(f"⚠️ Cannot serve metrics on port {self.port}: {e}. Only the file is written.")
+            else:
+                self.server.daemon_threads = True
+                threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+                self.log(f"📈 Serving metrics on http://{METRICS_HOST}:{self.server.server_address[1]}/metrics")
+        self.log(f"📈 Writing metrics to {self.path} every {self.interval:g}s")
+        return self
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                self.log(f"⚠️ Could not write metrics: {e}")
+
+    def stop(self, exit_code=None):
+        """Final metrics file and run summary; returns the summary"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        remove_stage_listener(self.on_manifest_entry)
+        if self.manager.metrics is self:
+            self.manager.metrics = None
+        self.write()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        summary = self.summary(exit_code)
+        summary_path = os.path.join(self.output_folder, SUMMARY_NAME)
+        with open(summary_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        os.replace(summary_path + ".tmp", summary_path)
+        self.log(f"📈 Run summary written to {summary_path}")
+        return summary
+
+    def summary(self, exit_code=None):
+        elapsed = time.monotonic() - self.started
+        totals = self.totals()
+        governor = self.manager.governor
+        with self.lock:
+            summary = {
+                'app': APP_VERSION,
+                'output_folder': os.path.abspath(self.output_folder),
+                'started': self.started_at,
+                'finished': utc_now(),
+                'wall_seconds': round(elapsed, 3),
+                'exit_code': exit_code,
+                'hives_parsed': self.hives_parsed,
+                'totals': dict(totals, bytes_written=self.bytes_written),
+                'per_second': {name: round(value / max(elapsed, 1e-6), 1) for name, value in totals.items()},
+                'stages': [{'artifact': artifact, 'status': status, 'count': count}
+                           for (artifact, status), count in sorted(self.stage_outcomes.items())],
+                'stage_seconds': {artifact: {'count': h.count, 'sum': round(h.sum, 3)}
+                                  for artifact, h in sorted(self.stage_latency.items())},
+                'jobs': self.jobs_finished,
+                'errors': self.errors,
+                'worker_utilization': {kind: round(self.busy_seconds.get(kind, 0.0) / max(elapsed * slots, 1e-6), 4)
+                                       for kind, slots in self.manager.slots.items()},
+            }
+        if governor is not None:
+            summary['memory'] = {'peak_rss_bytes': governor.peak_rss, 'ceiling_bytes': governor.ceiling,
+                                 'held_seconds': round(governor.held_seconds(), 3)}
+        return summary
+
+
+def _handler(metrics):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+    return MetricsHandler
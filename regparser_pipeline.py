@@ -0,0 +1,531 @@
+"""Dependency-aware full triage built on JobManager.
+
+    [zip extract] -> scan -> dedup -> registry dump (one child job per hive)
+                                   -> USB, USB correlation, Bluetooth, network, shellbags
+    [zip extract] -> jump lists, prefetch
+    every parser above -> timeline, search index -> report (HTML and PDF child jobs)
+
+Independent steps run side by side up to the manager's slot limits and each
+hive is dumped in its own process, so a triage keeps every core busy.
+
+``hooks`` is anything with log(message), start_tracker(stage, **totals) and
+finish_tracker(tracker): the GUI app itself, or a small namespace in the CLI.
+Every parser step records itself in the output folder's run manifest.
+
+Parser steps call run_parser(), or, given ``remote`` (a
+regparser_distributed.Coordinator), hand the same call to a worker node.
+"""
+import os
+import datetime
+import functools
+
+import regparser_core as core
+import regparser_hashing as hashing
+from regparser_jobs import Job, run_in_process
+from regparser_manifest import open_manifest
+from regparser_shellbags import (parse_shellbags_from_user_hives, dump_registry_and_shellbags, merge_shellbag_parts,
+                                 USER_HIVE_NAMES)
+from regparser_usb import correlate_usb_devices, USB_HIVE_NAMES
+from regparser_prefetch import parse_prefetch_folder
+from regparser_jumplists import parse_jump_lists_folder
+from regparser_timeline import build_timeline, window_bound, TIMELINE_FORMATS, TIMELINE_SOURCES
+from regparser_search import update_search_index
+
+
+ALL_TASKS = ['registry', 'usb', 'usb_correlation', 'bluetooth', 'network', 'shellbags', 'jumplists', 'prefetch', 'timeline', 'search']
+REPORT_FORMATS = ['html', 'pdf']
+REPORT_BASENAME = "forensic_analysis_report"
+
+# Hive names each single-step hive parser loads
+HIVE_STEP_NAMES = {'usb': ('SYSTEM',), 'usb_correlation': USB_HIVE_NAMES, 'bluetooth': ('SYSTEM',),
+                   'network': ('SOFTWARE',), 'shellbags': USER_HIVE_NAMES}
+
+# task -> parser(inputs, output, progress, cancel, log). inputs are hive paths (or one
+# evidence folder), output the CSV (or folder) to write, or for MULTI_OUTPUT_PARSERS a
+# list of CSVs. Worker nodes run the same table.
+PARSERS = {
+    'registry': lambda inputs, output, progress, cancel, log: run_in_process(
+        core.parse_registry_hive, (inputs[0], output), cancel, progress, inputs=inputs[:1], outputs=[output]),
+    'registry_shellbags': lambda inputs, output, progress, cancel, log: run_in_process(
+        dump_registry_and_shellbags, (inputs[0], output[0], output[1]), cancel, progress,
+        inputs=inputs[:1], outputs=output),
+    'usb': lambda inputs, output, progress, cancel, log: core.parse_usb_devices_from_system_hive(
+        inputs[0], output, progress, cancel),
+    'usb_correlation': lambda inputs, output, progress, cancel, log: correlate_usb_devices(
+        inputs, output, log, progress, cancel),
+    'bluetooth': lambda inputs, output, progress, cancel, log: core.parse_bluetooth_from_system_hives(
+        inputs, output, log, progress, cancel),
+    'network': lambda inputs, output, progress, cancel, log: core.parse_network_profiles_from_software_hives(
+        inputs, output, log, progress, cancel),
+    'shellbags': lambda inputs, output, progress, cancel, log: parse_shellbags_from_user_hives(
+        inputs, output, log, progress, cancel),
+    'prefetch': lambda inputs, output, progress, cancel, log: parse_prefetch_folder(
+        inputs[0], output, progress=progress, cancel=cancel, log=log),
+    'jumplists': lambda inputs, output, progress, cancel, log: parse_jump_lists_folder(
+        inputs[0], output, progress=progress, cancel=cancel, log=log),
+}
+# Parsers whose output is a folder of timestamped files rather than one CSV
+FOLDER_OUTPUT_PARSERS = ('prefetch', 'jumplists')
+# Parsers that write several CSVs: a user hive's registry dump and its shellbags part
+MULTI_OUTPUT_PARSERS = ('registry_shellbags',)
+# Under <output>/Shellbags: the shellbags parts of the registry dumps until the Shellbags step joins them
+SHELLBAG_PARTS_DIR = "parts"
+
+
+def run_parser(task, inputs, output, progress=None, cancel=None, log=print):
+    """Run one PARSERS entry here and return its result"""
+    return PARSERS[task](inputs, output, progress, cancel, log)
+
+
+def split_list(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [item.strip() for item in value if item.strip()]
+
+
+def normalize_job(job):
+    """Fill defaults of a job dict and validate it in place; raises ValueError on bad values"""
+    job['tasks'] = split_list(job.get('tasks')) or list(ALL_TASKS)
+    job['hives'] = split_list(job.get('hives')) or []
+    job['report'] = split_list(job.get('report')) or []
+    job['timeline_sources'] = split_list(job.get('timeline_sources')) or []
+    job.setdefault('date', '')
+    job['date'] = job['date'] or datetime.datetime.now().strftime("%Y-%m-%d")
+
+    unknown = [t for t in job['tasks'] if t not in ALL_TASKS]
+    if unknown:
+        raise ValueError(f"Unknown task(s): {', '.join(unknown)}")
+    unknown = [r for r in job['report'] if r not in REPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown report format(s): {', '.join(unknown)}")
+    unknown = [s for s in job['timeline_sources'] if s not in TIMELINE_SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown timeline source(s): {', '.join(unknown)}")
+    if job.get('timeline_format') and job['timeline_format'] not in TIMELINE_FORMATS:
+        raise ValueError(f"Unknown timeline format: {job['timeline_format']}")
+    window_bound(job.get('timeline_from'))
+    window_bound(job.get('timeline_to'), end=True)
+    if not job.get('output_folder'):
+        raise ValueError("An output folder is required (--output or output_folder in the job file)")
+    return job
+
+
+def dedup_hives(hives, log=print):
+    """Drop byte-identical copies of a hive (e.g. RegBack or repeated collections).
+
+    Only files that share a size are hashed, so unique hives cost one stat.
+    Their digests are remembered, so the parsers that load them later do not
+    hash them again.
+    """
+    by_size = {}
+    for path in hives:
+        try:
+            by_size.setdefault(os.path.getsize(path), []).append(path)
+        except OSError:
+            log(f"⚠️ Cannot read {path}; skipping")
+    keep = set()
+    for paths in by_size.values():
+        if len(paths) == 1:
+            keep.add(paths[0])
+            continue
+        seen = {}
+        for path in paths:
+            digest = hashing.hash_file(path)['sha1']
+            if digest in seen:
+                log(f"♻️ Skipping duplicate hive {path} (identical to {seen[digest]})")
+            else:
+                seen[digest] = path
+                keep.add(path)
+    return [path for path in hives if path in keep]
+
+
+def step_hives(task, hives):
+    """The hives the task's step opens (USB reads only the first SYSTEM hive)"""
+    opened = [path for path in hives if os.path.basename(path).upper() in HIVE_STEP_NAMES[task]]
+    return opened[:1] if task == 'usb' else opened
+
+
+def remove_empty_dir(path):
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass
+
+
+def registry_output_names(hives):
+    """Map each hive to a CSV name, disambiguating hives that share a file name
+
+    (every user profile has its own NTUSER.DAT; parallel dumps must not write
+    to the same file).
+    """
+    names = {}
+    used = set()
+    for path in hives:
+        base = os.path.basename(path)
+        name = f"{base}.csv"
+        if name.upper() in used:
+            parent = os.path.basename(os.path.dirname(path)) or "hive"
+            name = f"{base}_{parent}.csv"
+            counter = 2
+            while name.upper() in used:
+                name = f"{base}_{parent}_{counter}.csv"
+                counter += 1
+        used.add(name.upper())
+        names[path] = name
+    return names
+
+
+def report_export_jobs(case, registry_files, formats, hooks):
+    """One io job per report format, rendering concurrently from one summary and one copy of the logos"""
+    import regparser_reports
+    output = case['output_folder']
+    summary = regparser_reports.cached_analysis_summary(output, registry_files)
+    assets = regparser_reports.copy_report_assets(case, output, hooks.log)
+    generators = {'html': regparser_reports.generate_html_report, 'pdf': regparser_reports.generate_pdf_report}
+
+    def export(fmt):
+        def run(cancel):
+            label = f"{fmt.upper()} report"
+            out_file = os.path.join(output, f"{REPORT_BASENAME}.{fmt}")
+            tracker = hooks.start_tracker(label)
+            try:
+                hooks.log(f"🔍 Rendering {label}...")
+                generators[fmt](out_file, case, summary, hooks.log, progress=tracker, cancel=cancel, assets=assets)
+                hooks.log(f"✅ {label} saved: {out_file}")
+            except core.JobCancelled:
+                hooks.log(f"🛑 {label} export canceled.")
+                raise
+            except Exception as e:
+                hooks.log(f"❌ Failed to export {label}: {e}")
+                raise
+            finally:
+                hooks.finish_tracker(tracker)
+        return run
+
+    return [Job(f"{fmt.upper()} report", export(fmt), kind='io', priority=5) for fmt in formats]
+
+
+def build_triage_pipeline(job, hooks, remote=None):
+    """Return the list of top-level Jobs for one case.
+
+    job is a dict in the save_config format plus ``tasks``, ``hives`` (name
+    filter), ``report`` (formats), ``date`` and optionally ``zip`` /
+    ``extract_to`` and ``timeline_format`` / ``timeline_from`` /
+    ``timeline_to`` / ``timeline_sources``. The returned jobs share a context dict (``jobs[0].context``)
+    holding the scanned hive list. With ``remote``, the parser steps become
+    remote.kind jobs that run on worker nodes.
+    """
+    log = hooks.log
+    output = job['output_folder']
+    tasks = job.get('tasks') or ALL_TASKS
+    # shellbag_parts: user hive -> the shellbags part its registry dump writes
+    context = {'hives': [], 'shellbag_parts': {}}
+    manifest = open_manifest(output)
+    jobs = []
+    roots = []
+    parse = remote.run if remote is not None else run_parser
+    parser_kind = remote.kind if remote is not None else 'cpu'
+
+    def step(name, func, kind='cpu', priority=10, weight=0, deps=()):
+        new_job = Job(name, func, kind=kind, priority=priority, weight=weight, deps=deps)
+        new_job.context = context
+        jobs.append(new_job)
+        return new_job
+
+    if job.get('zip'):
+        def extract(cancel):
+            log(f"📦 Extracting ZIP file: {job['zip']}")
+            with manifest.stage("Evidence", "Extract ZIP", inputs=[job['extract_to']]):
+                core.extract_zip(job['zip'], job['extract_to'], cancel)
+            log(f"📁 Extraction path: {job['extract_to']}")
+            job['reg_folder'] = job.get('reg_folder') or job['extract_to']
+        roots = [step("Extract ZIP", extract, kind='io', priority=0)]
+
+    def scan(cancel):
+        folder = job.get('reg_folder')
+        if not folder:
+            return
+        if not os.path.isdir(folder):
+            log("⚠️ Select a valid registry hive folder.")
+            return
+        log(f"🔎 Scanning for registry hives in {folder}")
+        hives = core.find_hives(folder)
+        log(f"✅ Found {len(hives)} potential registry hives.")
+        wanted = {name.upper() for name in job.get('hives') or []}
+        if wanted:
+            hives = [h for h in hives if os.path.basename(h).upper() in wanted]
+        context['hives'] = hives
+
+    def dedup(cancel):
+        context['hives'] = dedup_hives(context['hives'], log)
+        # The hive steps wait for this job, so the governor sees these weights when they start
+        for task, hive_job in hive_jobs.items():
+            if hive_job.kind != 'io':
+                hive_job.weight = sum(core.hive_data_size(path) for path in step_hives(task, context['hives']))
+        if 'registry' not in tasks or not context['hives']:
+            return None
+        out_dir = os.path.join(output, "Registry")
+        os.makedirs(out_dir, exist_ok=True)
+        names = registry_output_names(context['hives'])
+        # Shellbags are read by the dumps of the user hives, which load those hives anyway
+        shellbag_hives = step_hives('shellbags', context['hives']) if 'shellbags' in tasks else []
+        parts_dir = os.path.join(output, "Shellbags", SHELLBAG_PARTS_DIR)
+        if shellbag_hives:
+            os.makedirs(parts_dir, exist_ok=True)
+        children = []
+        for hive_path in context['hives']:
+            size = core.hive_data_size(hive_path)
+            out_file = os.path.join(out_dir, names[hive_path])
+            part = None
+            if hive_path in shellbag_hives:
+                part = context['shellbag_parts'][hive_path] = os.path.join(
+                    parts_dir, f"{names[hive_path][:-4]}_shellbags.csv")
+            label = f"Registry {names[hive_path][:-4]}"
+            children.append(Job(label, functools.partial(dump_hive, label, hive_path, out_file, part, size),
+                                kind=parser_kind, priority=1, weight=size))
+        return children
+
+    def dump_hive(label, hive_path, out_file, shellbags_part, size, cancel):
+        hive_name = os.path.basename(hive_path)
+        tracker = hooks.start_tracker(label, total_bytes=size)
+        try:
+            log(f"🔍 Parsing {hive_path}")
+            with manifest.stage("Registry", label, tracker, inputs=[hive_path], outputs=[out_file]):
+                if shellbags_part is None:
+                    parse('registry', [hive_path], out_file, tracker, cancel, log)
+                else:
+                    error = parse('registry_shellbags', [hive_path], [out_file, shellbags_part], tracker, cancel, log)
+                    if error:
+                        log(f"❌ Shellbag parse failed for {hive_path}: {error}")
+            tracker.sync_bytes(size)
+            log(f"✅ Saved to {out_file}")
+        except core.JobCancelled:
+            log(f"🛑 Parsing {hive_name} canceled. Partial output kept as {out_file}.incomplete")
+            raise
+        except Exception as e:
+            log(f"❌ Failed parsing {hive_name}: {e}")
+            raise
+        finally:
+            hooks.finish_tracker(tracker)
+
+    def usb(cancel):
+        system_hive_path = next(iter(step_hives('usb', context['hives'])), None)
+        if not system_hive_path:
+            log("⚠️ No SYSTEM hive found; skipping USB devices.")
+            return
+        out_dir = os.path.join(output, "USB_Devices")
+        os.makedirs(out_dir, exist_ok=True)
+        out_file = os.path.join(out_dir, "USB_Devices.csv")
+        tracker = hooks.start_tracker("USB Devices")
+        try:
+            log(f"🔍 Parsing USB devices from {system_hive_path}")
+            with manifest.stage("USB_Devices", "USB Devices", tracker, inputs=[system_hive_path], outputs=[out_file]):
+                parse('usb', [system_hive_path], out_file, tracker, cancel, log)
+            log(f"✅ USB device information saved to {out_file}")
+        except core.JobCancelled:
+            log("🛑 USB device parsing canceled.")
+            raise
+        except Exception as e:
+            log(f"❌ Failed parsing USB devices: {e}")
+            raise
+        finally:
+            hooks.finish_tracker(tracker)
+
+    def usb_correlation(cancel):
+        hives = step_hives('usb_correlation', context['hives'])
+        if not any(os.path.basename(h).upper() == "SYSTEM" for h in hives):
+            log("⚠️ No SYSTEM hive found; skipping USB correlation.")
+            return
+        out_dir = os.path.join(output, "USB_Devices")
+        os.makedirs(out_dir, exist_ok=True)
+        out_file = os.path.join(out_dir, "USB_Correlation.csv")
+        tracker = hooks.start_tracker("USB Correlation")
+        try:
+            log(f"🔍 Correlating USB devices across {len(hives)} hives...")
+            with manifest.stage("USB_Devices", "USB Correlation", tracker, inputs=hives, outputs=[out_file]):
+                device_count = parse('usb_correlation', hives, out_file, tracker, cancel, log)
+            log(f"✅ Correlated {device_count} USB devices. Output: {out_file}")
+        except core.JobCancelled:
+            log("🛑 USB correlation canceled.")
+            raise
+        except Exception as e:
+            log(f"❌ USB correlation failed: {e}")
+            raise
+        finally:
+            hooks.finish_tracker(tracker)
+
+    def bluetooth(cancel):
+        if not context['hives']:
+            return
+        out_dir = os.path.join(output, "Bluetooth_Devices")
+        os.makedirs(out_dir, exist_ok=True)
+        bt_file = os.path.join(out_dir, "Bluetooth_SYSTEM.csv")
+        hives = step_hives('bluetooth', context['hives'])
+        tracker = hooks.start_tracker("Bluetooth")
+        try:
+            log("🔍 Parsing Bluetooth devices...")
+            with manifest.stage("Bluetooth_Devices", "Bluetooth", tracker, inputs=hives, outputs=[bt_file]):
+                device_count = parse('bluetooth', hives, bt_file, tracker, cancel, log)
+            log(f"✅ Found {device_count} Bluetooth devices. Output: {bt_file}")
+        except core.JobCancelled:
+            log("🛑 Bluetooth parsing canceled.")
+            raise
+        except Exception as e:
+            log(f"❌ Bluetooth parsing failed: {e}")
+            raise
+        finally:
+            hooks.finish_tracker(tracker)
+
+    def network(cancel):
+        if not context['hives']:
+            return
+        out_dir = os.path.join(output, "Network_Connections")
+        os.makedirs(out_dir, exist_ok=True)
+        net_file = os.path.join(out_dir, "NetworkProfiles_SOFTWARE.csv")
+        hives = step_hives('network', context['hives'])
+        tracker = hooks.start_tracker("Network Profiles")
+        try:
+            log("🔍 Parsing network profiles...")
+            with manifest.stage("Network_Connections", "Network Profiles", tracker, inputs=hives, outputs=[net_file]):
+                profile_count = parse('network', hives, net_file, tracker, cancel, log)
+            log(f"✅ Found {profile_count} network profiles. Output: {net_file}")
+        except core.JobCancelled:
+            log("🛑 Network parsing canceled.")
+            raise
+        except Exception as e:
+            log(f"❌ Network parsing failed: {e}")
+            raise
+        finally:
+            hooks.finish_tracker(tracker)
+
+    def shellbags(cancel):
+        user_hives = step_hives('shellbags', context['hives'])
+        if not user_hives:
+            log("⚠️ No NTUSER.DAT or UsrClass.dat hive found; skipping shellbags.")
+            return
+        out_dir = os.path.join(output, "Shellbags")
+        os.makedirs(out_dir, exist_ok=True)
+        out_file = os.path.join(out_dir, "Shellbags.csv")
+        tracker = hooks.start_tracker("Shellbags")
+        try:
+            log("🔍 Parsing Shellbags...")
+            with manifest.stage("Shellbags", "Shellbags", tracker, inputs=user_hives, outputs=[out_file]):
+                if 'registry' in tasks:
+                    parts = [(hive_path, context['shellbag_parts'][hive_path]) for hive_path in user_hives]
+                    row_count = merge_shellbag_parts(parts, out_file, log, tracker, cancel)
+                    remove_empty_dir(os.path.join(out_dir, SHELLBAG_PARTS_DIR))
+                else:
+                    row_count = parse('shellbags', user_hives, out_file, tracker, cancel, log)
+            log(f"✅ Found {row_count} shellbag entries. Output: {out_file}")
+        except core.JobCancelled:
+            log("🛑 Shellbags parsing canceled. Partial output marked .incomplete")
+            raise
+        except Exception as e:
+            log(f"❌ Shellbags parsing failed: {e}")
+            raise
+        finally:
+            hooks.finish_tracker(tracker)
+
+    def prefetch(cancel):
+        out_dir = os.path.join(output, "Prefetch")
+        os.makedirs(out_dir, exist_ok=True)
+        tracker = hooks.start_tracker("Prefetch")
+        try:
+            log("🔍 Parsing Prefetch files...")
+            with manifest.stage("Prefetch", "Prefetch", tracker, inputs=[job['prefetch_folder']], outputs=[out_dir]) as entry:
+                parsed, failed = parse('prefetch', [job['prefetch_folder']], out_dir, tracker, cancel, log)
+                entry['failed_items'] = failed
+            log(f"✅ Parsed {parsed} prefetch files ({failed} failed). Output: {out_dir}")
+        except core.JobCancelled:
+            log("🛑 Prefetch parsing canceled. Partial outputs marked .incomplete")
+            raise
+        except Exception as e:
+            log(f"❌ Prefetch parsing failed: {e}")
+            raise
+        finally:
+            hooks.finish_tracker(tracker)
+
+    def jump_lists(cancel):
+        out_dir = os.path.join(output, "JumpLists")
+        os.makedirs(out_dir, exist_ok=True)
+        tracker = hooks.start_tracker("Jump Lists")
+        try:
+            log("🔍 Parsing Jump Lists...")
+            with manifest.stage("JumpLists", "Jump Lists", tracker, inputs=[job['jump_folder']], outputs=[out_dir]) as entry:
+                rows, failed = parse('jumplists', [job['jump_folder']], out_dir, tracker, cancel, log)
+                entry['failed_items'] = failed
+            log(f"✅ Jump Lists parsed: {rows} entries ({failed} files failed). Output: {out_dir}")
+        except core.JobCancelled:
+            log("🛑 Jump Lists parsing canceled. Partial outputs marked .incomplete")
+            raise
+        except Exception as e:
+            log(f"❌ Jump Lists parsing failed: {e}")
+            raise
+        finally:
+            hooks.finish_tracker(tracker)
+
+    scan_job = step("Scan hives", scan, kind='io', priority=0, deps=roots)
+    dedup_job = step("Deduplicate hives", dedup, kind='io', priority=0, deps=[scan_job])
+    hive_tasks = {'usb': ("USB devices", usb), 'usb_correlation': ("USB correlation", usb_correlation),
+                  'bluetooth': ("Bluetooth", bluetooth), 'network': ("Network profiles", network),
+                  'shellbags': ("Shellbags", shellbags)}
+    # With the registry dump, Shellbags only joins the parts the dumps wrote
+    hive_kinds = {'shellbags': 'io'} if 'registry' in tasks else {}
+    hive_jobs = {task: step(name, func, kind=hive_kinds.get(task, parser_kind), priority=2, deps=[dedup_job])
+                 for task, (name, func) in hive_tasks.items() if task in tasks}
+
+    if 'jumplists' in tasks and job.get('jump_folder'):
+        step("Jump Lists", jump_lists, kind=parser_kind, priority=3, deps=roots)
+    if 'prefetch' in tasks and job.get('prefetch_folder'):
+        step("Prefetch", prefetch, kind=parser_kind, priority=3, deps=roots)
+
+    parser_jobs = list(jobs)
+
+    if 'search' in tasks:
+        def search_index(cancel):
+            tracker = hooks.start_tracker("Search index")
+            try:
+                log("🔍 Updating search index...")
+                indexed = update_search_index(output, tracker, cancel, log)
+                log(f"✅ Search index up to date ({indexed} new or changed outputs indexed).")
+            except core.JobCancelled:
+                log("🛑 Search indexing canceled. Indexed outputs stay searchable.")
+                raise
+            except Exception as e:
+                log(f"❌ Search indexing failed: {e}")
+                raise
+            finally:
+                hooks.finish_tracker(tracker)
+        step("Search index", search_index, priority=4, deps=parser_jobs)
+
+    if 'timeline' in tasks:
+        def timeline(cancel):
+            fmt = job.get('timeline_format') or 'csv'
+            out_dir = os.path.join(output, "Timeline")
+            os.makedirs(out_dir, exist_ok=True)
+            out_file = os.path.join(out_dir, "Timeline" + TIMELINE_FORMATS.get(fmt, ''))
+            tracker = hooks.start_tracker("Timeline")
+            try:
+                log("🔍 Building super-timeline...")
+                with manifest.stage("Timeline", "Timeline", tracker, outputs=[out_file]):
+                    count = build_timeline(output, out_file, fmt, job.get('timeline_from'), job.get('timeline_to'),
+                                           job.get('timeline_sources'), progress=tracker, cancel=cancel, log=log)
+                log(f"✅ Timeline holds {count} events. Output: {out_file}")
+            except core.JobCancelled:
+                log("🛑 Timeline build canceled. Partial output marked .incomplete")
+                raise
+            except Exception as e:
+                log(f"❌ Timeline build failed: {e}")
+                raise
+            finally:
+                hooks.finish_tracker(tracker)
+        step("Timeline", timeline, priority=4, deps=parser_jobs)
+
+    if job.get('report'):
+        def report(cancel):
+            return report_export_jobs(job, len(context['hives']), job['report'], hooks)
+        step("Report", report, kind='io', priority=5, deps=list(jobs))
+
+    return jobs
@@ -0,0 +1,331 @@
+"""Native Windows Prefetch (.pf) parser, replacing PECmd.exe.
+
+Handles format versions 17 (XP/2003), 23 (Vista/7), 26 (8.x) and 30/31
+(10/11). Windows 10+ files are wrapped in a MAM container compressed with
+Xpress Huffman; on Windows the ntdll decompressor is used when available,
+elsewhere the pure-Python decoder below.
+
+Files are parsed in a process pool and rows are streamed into the same two
+CSVs PECmd writes (``<timestamp>_PECmd_Output.csv`` and
+``<timestamp>_PECmd_Output_Timeline.csv``) as results arrive.
+"""
+import os
+import csv
+import struct
+import datetime
+
+from regparser_core import JobCancelled, incomplete_on_cancel
+from regparser_times import filetime_to_str, unix_to_str
+from regparser_jobs import process_map
+from regparser_hashing import hash_bytes, remember
+
+
+PREFETCH_VERSIONS = (17, 23, 26, 30, 31)
+SCCA_SIGNATURE = b'SCCA'
+MAM_SIGNATURE = b'MAM'
+COMPRESSION_FORMAT_XPRESS_HUFF = 4
+
+XPRESS_CHUNK = 65536
+HUFFMAN_TABLE_BITS = 15
+
+MAX_RUN_TIMES = 8
+MAX_VOLUME_COLUMNS = 2
+
+OUTPUT_COLUMNS = (
+    ['SourceFilename', 'SourceCreated', 'SourceModified', 'SourceAccessed',
+     'ExecutableName', 'Hash', 'Size', 'Version', 'RunCount', 'LastRun']
+    + [f'PreviousRun{i}' for i in range(MAX_RUN_TIMES - 1)]
+    + [f'Volume{i}{field}' for i in range(MAX_VOLUME_COLUMNS) for field in ('Name', 'Serial', 'Created')]
+    + ['Directories', 'FilesLoaded', 'ParsingError']
+)
+TIMELINE_COLUMNS = ['RunTime', 'ExecutableName']
+
+
+class PrefetchError(ValueError):
+    """The file is not a prefetch file this parser understands"""
+
+
+def _build_decode_table(lengths):
+    """Canonical Huffman decode table indexed by the next 15 bits of input"""
+    table = [0] * (1 << HUFFMAN_TABLE_BITS)
+    position = 0
+    for symbol in sorted((s for s in range(512) if lengths[s]), key=lambda s: (lengths[s], s)):
+        span = 1 << (HUFFMAN_TABLE_BITS - lengths[symbol])
+        if position + span > len(table):
+            raise PrefetchError("invalid Huffman table")
+        table[position:position + span] = [symbol] * span
+        position += span
+    return table
+
+
+def xpress_huffman_decompress(data, output_size):
+    """Decompress an MS-XCA LZ77+Huffman stream (pure Python)"""
+    out = bytearray()
+    in_len = len(data)
+    pos = 0
+    while len(out) < output_size:
+        if pos + 256 > in_len:
+            raise PrefetchError("truncated Xpress Huffman stream")
+        lengths = []
+        for byte in data[pos:pos + 256]:
+            lengths.append(byte & 0x0F)
+            lengths.append(byte >> 4)
+        decode = _build_decode_table(lengths)
+        pos += 256
+        if pos + 4 > in_len:
+            raise PrefetchError("truncated Xpress Huffman stream")
+        bits = (data[pos] | data[pos + 1] << 8) << 16 | data[pos + 2] | data[pos + 3] << 8
+        pos += 4
+        extra = 16
+        chunk_end = min(len(out) + XPRESS_CHUNK, output_size)
+        while len(out) < chunk_end:
+            symbol = decode[bits >> 17]
+            length = lengths[symbol]
+            bits = (bits << length) & 0xFFFFFFFF
+            extra -= length
+            if extra < 0:
+                if pos + 2 <= in_len:
+                    bits |= (data[pos] | data[pos + 1] << 8) << -extra
+                pos += 2
+                extra += 16
+            if symbol < 256:
+                out.append(symbol)
+                continue
+            symbol -= 256
+            match_length = symbol & 0x0F
+            offset_bits = symbol >> 4
+            if match_length == 15:
+                match_length = data[pos]
+                pos += 1
+                if match_length == 255:
+                    match_length = data[pos] | data[pos + 1] << 8
+                    pos += 2
+                    if match_length < 15:
+                        raise PrefetchError("invalid match length")
+                    match_length -= 15
+                match_length += 15
+            match_length += 3
+            offset = ((bits >> (32 - offset_bits)) if offset_bits else 0) + (1 << offset_bits)
+            bits = (bits << offset_bits) & 0xFFFFFFFF
+            extra -= offset_bits
+            if extra < 0:
+                if pos + 2 <= in_len:
+                    bits |= (data[pos] | data[pos + 1] << 8) << -extra
+                pos += 2
+                extra += 16
+            start = len(out) - offset
+            if start < 0:
+                raise PrefetchError("match offset before start of output")
+            if offset >= match_length:
+                out += out[start:start + match_length]
+            else:
+                # Overlapping copy repeats the last `offset` bytes
+                pattern = out[start:]
+                out += (pattern * (match_length // offset + 1))[:match_length]
+    return bytes(out[:output_size])
+
+
+def _native_decompress(data, output_size):
+    """RtlDecompressBufferEx from ntdll (Windows 8+), or None if unavailable"""
+    if os.name != 'nt':
+        return None
+    try:
+        import ctypes
+        ntdll = ctypes.windll.ntdll
+        workspace_size = ctypes.c_ulong()
+        fragment_size = ctypes.c_ulong()
+        status = ntdll.RtlGetCompressionWorkSpaceSize(
+            ctypes.c_ushort(COMPRESSION_FORMAT_XPRESS_HUFF),
+            ctypes.byref(workspace_size), ctypes.byref(fragment_size))
+        if status != 0:
+            return None
+        workspace = ctypes.create_string_buffer(workspace_size.value)
+        output = ctypes.create_string_buffer(output_size)
+        final_size = ctypes.c_ulong()
+        status = ntdll.RtlDecompressBufferEx(
+            ctypes.c_ushort(COMPRESSION_FORMAT_XPRESS_HUFF),
+            output, ctypes.c_ulong(output_size),
+            ctypes.c_char_p(data), ctypes.c_ulong(len(data)),
+            ctypes.byref(final_size), workspace)
+        if status != 0 or final_size.value != output_size:
+            return None
+        return output.raw
+    except (AttributeError, OSError):
+        return None
+
+
+def decompress_mam(data):
+    """Unwrap a Windows 10+ MAM container; returns the raw SCCA data"""
+    flags = data[3]
+    if flags & 0x0F != COMPRESSION_FORMAT_XPRESS_HUFF:
+        raise PrefetchError(f"unsupported MAM compression format {flags & 0x0F}")
+    output_size = struct.unpack_from('<I', data, 4)[0]
+    # Bit 7 marks a CRC32 field ahead of the compressed data
+    payload = data[12:] if flags & 0x80 else data[8:]
+    return _native_decompress(bytes(payload), output_size) or xpress_huffman_decompress(payload, output_size)
+
+
+def _utf16_at(data, offset, chars):
+    return data[offset:offset + chars * 2].decode('utf-16-le', errors='replace')
+
+
+def parse_prefetch_bytes(data):
+    """Decode one prefetch file's bytes into a dict of PECmd-style fields"""
+    if data[:3] == MAM_SIGNATURE:
+        data = decompress_mam(data)
+    if len(data) < 84 or data[4:8] != SCCA_SIGNATURE:
+        raise PrefetchError("missing SCCA signature")
+    version = struct.unpack_from('<I', data, 0)[0]
+    if version not in PREFETCH_VERSIONS:
+        raise PrefetchError(f"unsupported prefetch version {version}")
+
+    executable = data[16:76].decode('utf-16-le', errors='replace').split('\x00', 1)[0]
+    prefetch_hash = struct.unpack_from('<I', data, 76)[0]
+    (metrics_offset, _metrics_count, _chains_offset, _chains_count,
+     strings_offset, strings_size, volumes_offset, volume_count, _volumes_size) = struct.unpack_from('<9I', data, 84)
+
+    if version == 17:
+        run_times = [struct.unpack_from('<Q', data, 120)[0]]
+        run_count = struct.unpack_from('<I', data, 144)[0]
+        volume_entry_size = 40
+    elif version == 23:
+        run_times = [struct.unpack_from('<Q', data, 128)[0]]
+        run_count = struct.unpack_from('<I', data, 152)[0]
+        volume_entry_size = 104
+    else:
+        run_times = list(struct.unpack_from('<8Q', data, 128))
+        if version == 26:
+            run_count = struct.unpack_from('<I', data, 208)[0]
+            volume_entry_size = 104
+        else:
+            # Windows 10 has two file information layouts told apart by the metrics offset
+            run_count = struct.unpack_from('<I', data, 200 if metrics_offset == 0x128 else 208)[0]
+            volume_entry_size = 96
+
+    files_loaded = [name for name in data[strings_offset:strings_offset + strings_size]
+                    .decode('utf-16-le', errors='replace').split('\x00') if name]
+
+    volumes = []
+    directories = []
+    for index in range(volume_count):
+        entry = volumes_offset + index * volume_entry_size
+        if entry + 36 > len(data):
+            break
+        (path_offset, path_chars, created, serial, _refs_offset, _refs_size,
+         dirs_offset, dirs_count) = struct.unpack_from('<IIQIIIII', data, entry)
+        volumes.append({
+            'name': _utf16_at(data, volumes_offset + path_offset, path_chars),
+            'serial': f"{serial:08X}",
+            'created': filetime_to_str(created),
+        })
+        cursor = volumes_offset + dirs_offset
+        for _ in range(dirs_count):
+            if cursor + 2 > len(data):
+                break
+            chars = struct.unpack_from('<H', data, cursor)[0]
+            directories.append(_utf16_at(data, cursor + 2, chars))
+            cursor += 2 + (chars + 1) * 2
+
+    return {
+        'executable': executable,
+        'hash': f"{prefetch_hash:08X}",
+        'size': len(data),
+        'version': version,
+        'run_count': run_count,
+        'run_times': [filetime_to_str(ft) for ft in run_times if ft],
+        'volumes': volumes,
+        'directories': directories,
+        'files_loaded': files_loaded,
+    }
+
+
+def parse_prefetch_file(path):
+    """Pool worker: returns (path, record or None, error message or None, stat, digests)"""
+    try:
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return path, None, f"{type(e).__name__}: {e}", None, None
+    times = (stat.st_ctime, stat.st_mtime, stat.st_atime)
+    digests = hash_bytes(data)
+    try:
+        return path, parse_prefetch_bytes(data), None, times, digests
+    except (ValueError, struct.error, IndexError) as e:
+        return path, None, f"{type(e).__name__}: {e}", times, digests
+
+
+def prefetch_rows(path, record, error, stat):
+    """Build the output row and timeline rows for one parsed file"""
+    row = dict.fromkeys(OUTPUT_COLUMNS, '')
+    row['SourceFilename'] = path
+    if stat:
+        row['SourceCreated'], row['SourceModified'], row['SourceAccessed'] = (unix_to_str(t) for t in stat)
+    if record is None:
+        row['ParsingError'] = error
+        return row, []
+    run_times = record['run_times']
+    row.update({
+        'ExecutableName': record['executable'],
+        'Hash': record['hash'],
+        'Size': record['size'],
+        'Version': record['version'],
+        'RunCount': record['run_count'],
+        'LastRun': run_times[0] if run_times else '',
+        'Directories': ", ".join(record['directories']),
+        'FilesLoaded': ", ".join(record['files_loaded']),
+    })
+    for index, run_time in enumerate(run_times[1:MAX_RUN_TIMES]):
+        row[f'PreviousRun{index}'] = run_time
+    for index, volume in enumerate(record['volumes'][:MAX_VOLUME_COLUMNS]):
+        row[f'Volume{index}Name'] = volume['name']
+        row[f'Volume{index}Serial'] = volume['serial']
+        row[f'Volume{index}Created'] = volume['created']
+    timeline = [[run_time, record['executable']] for run_time in run_times]
+    return row, timeline
+
+
+def find_prefetch_files(folder):
+    return sorted(os.path.join(root, name) for root, _, files in os.walk(folder)
+                  for name in files if name.lower().endswith('.pf'))
+
+
+def parse_prefetch_folder(folder, out_dir, workers=None, progress=None, cancel=None, log=print):
+    """Parse every .pf under folder into out_dir. Returns (parsed, failed) counts.
+
+    Rows are written as each file completes. On cancel the pool is stopped,
+    both CSVs are renamed *.incomplete and JobCancelled is raised.
+    """
+    paths = find_prefetch_files(folder)
+    if progress is not None:
+        progress.total_items = len(paths)
+        progress.total_bytes = sum(os.path.getsize(p) for p in paths)
+    stamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+    output_csv = os.path.join(out_dir, f"{stamp}_PECmd_Output.csv")
+    timeline_csv = os.path.join(out_dir, f"{stamp}_PECmd_Output_Timeline.csv")
+    parsed = failed = 0
+
+    with process_map(parse_prefetch_file, paths, workers) as results, \
+            incomplete_on_cancel(output_csv), incomplete_on_cancel(timeline_csv):
+        with open(output_csv, 'w', newline='', encoding='utf-8-sig') as out_file, \
+                open(timeline_csv, 'w', newline='', encoding='utf-8-sig') as timeline_file:
+            writer = csv.DictWriter(out_file, fieldnames=OUTPUT_COLUMNS)
+            writer.writeheader()
+            timeline_writer = csv.writer(timeline_file)
+            timeline_writer.writerow(TIMELINE_COLUMNS)
+            for path, record, error, stat, digests in results:
+                if cancel is not None and cancel.cancelled:
+                    raise JobCancelled()
+                if digests:
+                    remember(path, digests)
+                row, timeline = prefetch_rows(path, record, error, stat)
+                writer.writerow(row)
+                timeline_writer.writerows(timeline)
+                if record is None:
+                    failed += 1
+                    log(f"⚠️ {os.path.basename(path)}: {error}")
+                else:
+                    parsed += 1
+                if progress is not None:
+                    progress.add(rows=1 + len(timeline), items=1, nbytes=os.path.getsize(path))
+    return parsed, failed
@@ -0,0 +1,323 @@
+"""Opt-in per-job profiling: cProfile, tracemalloc and wall-clock breakdowns.
+
+A Profiler attached to a JobManager wraps every job submitted while it is
+active. Each job gets its own cProfile (job threads are profiled
+separately, and hive dumps running in a child process write theirs from
+the child), a tracemalloc diff of the allocation sites that grew while it
+ran, and a row in the run's wall-clock breakdown. Results go to
+``<output>/Profiling/<started>/``:
+
+    NNN_<job>.prof       pstats data (pstats, snakeviz, ...), child processes in NNN_<job>.childN.prof
+    NNN_<job>.txt        time by component, top functions and allocation sites
+    breakdown.json/.txt  every job and stage with wait, wall and CPU time
+    allocations.txt      top allocation sites and peak traced memory of the run
+
+Without a Profiler nothing here runs. tracemalloc is process-wide, so the
+allocation diff of a job also shows what concurrent jobs allocated.
+"""
+import io
+import os
+import re
+import json
+import time
+import pstats
+import cProfile
+import datetime
+import itertools
+import threading
+import tracemalloc
+
+from regparser_core import JobCancelled
+
+
+PROFILE_DIR = "Profiling"
+PROFILE_MODES = ['cpu', 'memory', 'all']
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+# Frames kept per allocation; more frames make tracing slower
+TRACE_FRAMES = 1
+# The profiler's own bookkeeping and module imports are not the case's allocations
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+# (component, fragments of the source file, fragments of the function name); first match wins
+COMPONENTS = [
+    ('python-registry', ('/Registry/',), ()),
+    ('CSV writing', ('/csv.py',), ('_csv.',)),
+    ('ZIP extraction', ('/zipfile', '/shutil.py'), ('zlib.',)),
+    ('Tk', ('/tkinter/',), ('_tkinter.',)),
+    ('SQLite', ('/sqlite3/',), ('sqlite3.',)),
+    ('reports', ('/reportlab/',), ()),
+    ('text encoding', (), ("of 'str' objects", "of 'bytes' objects", 'builtins.repr', 'builtins.format')),
+    ('file I/O', (), ('_io.', 'io.open', 'posix.', 'nt.')),
+    ('waiting', ('/threading.py', '/selectors.py', '/connection.py'), ('sleep', 'acquire', 'poll')),
+    ('RegParser', ('/regparser_', '/testgui8.py'), ()),
+]
+
+_local = threading.local()
+
+
+def child_profile_path():
+    """Where a child process started by the current job should write its profile, or None when not profiling"""
+    run = getattr(_local, 'run', None)
+    return run.next_child_path() if run is not None else None
+
+
+def safe_name(name):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_')[:60] or "job"
+
+
+def component_of(filename, function):
+    filename = filename.replace('\\', '/')
+    for label, files, functions in COMPONENTS:
+        if any(part in filename for part in files) or any(part in function for part in functions):
+            return label
+    return 'other'
+
+
+def time_by_component(stats):
+    """Own (tottime) seconds per component of a pstats.Stats"""
+    totals = {}
+    for (filename, _, function), (_, _, tottime, _, _) in stats.stats.items():
+        label = component_of(filename, function)
+        totals[label] = totals.get(label, 0.0) + tottime
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def format_allocations(statistics, limit=TOP_ALLOCATIONS):
+    lines = []
+    for stat in statistics[:limit]:
+        frame = stat.traceback[0]
+        size = getattr(stat, 'size_diff', stat.size)
+        count = getattr(stat, 'count_diff', stat.count)
+        lines.append(f"{size / 1024:12,.1f} KiB {count:10,} blocks  {frame.filename}:{frame.lineno}")
+    return lines
+
+
+class _JobRun:
+    """Profile files of one running job"""
+
+    def __init__(self, base):
+        self.base = base
+        self.children = []
+
+    def next_child_path(self):
+        path = f"{self.base}.child{len(self.children) + 1}.prof"
+        self.children.append(path)
+        return path
+
+
+class Profiler:
+    """Collects profiles of the jobs it instruments; finish() writes the run summary"""
+
+    def __init__(self, output_folder, mode='all', log=print):
+        self.cpu = mode in ('cpu', 'all')
+        self.memory = mode in ('memory', 'all')
+        self.log = log
+        started = datetime.datetime.now()
+        self.folder = os.path.join(output_folder, PROFILE_DIR, started.strftime('%Y%m%d_%H%M%S'))
+        os.makedirs(self.folder, exist_ok=True)
+        self.started_at = started.isoformat(' ', 'seconds')
+        self.started = time.perf_counter()
+        self.started_wall = time.time()
+        self.lock = threading.Lock()
+        self.counter = itertools.count(1)
+        self.jobs = []
+        self.stages = []
+        self.sections = {}
+        self.components = {}
+        self.finished = False
+        self.owns_tracing = False
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self.owns_tracing = True
+
+    def instrument(self, job):
+        """Replace job.func with a profiled call of it"""
+        func = job.func
+
+        def profiled(cancel):
+            seq = next(self.counter)
+            run = _JobRun(os.path.join(self.folder, f"{seq:03d}_{safe_name(job.name)}"))
+            profile = cProfile.Profile() if self.cpu else None
+            before = tracemalloc.take_snapshot() if self.memory and tracemalloc.is_tracing() else None
+            outcome = 'done'
+            _local.run = run if self.cpu else None
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                if profile is not None:
+                    try:
+                        profile.enable()
+                    except ValueError:
+                        # Interpreters where only one profiler may be active at a time
+                        profile = None
+                return func(cancel)
+            except JobCancelled:
+                outcome = 'cancelled'
+                raise
+            except Exception as e:
+                outcome = type(e).__name__
+                raise
+            finally:
+                if profile is not None:
+                    profile.disable()
+                wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+                _local.run = None
+                self._record_job(job, seq, run, profile, before, wall, cpu, outcome)
+        job.func = profiled
+        return job
+
+    def _record_job(self, job, seq, run, profile, before, wall, cpu, outcome):
+        record = {
+            'seq': seq, 'job': job.name, 'kind': job.kind, 'state': outcome,
+            'wait_seconds': round(job.wait_time(), 4), 'wall_seconds': round(wall, 4),
+            'cpu_seconds': round(cpu, 4),
+            'started_offset': round(job.started_at - self.started_wall, 4) if job.started_at else None,
+        }
+        report = [f"{job.name} ({job.kind}): {outcome}, wall {wall:.3f}s, thread CPU {cpu:.3f}s, "
+                  f"waited {job.wait_time():.3f}s", ""]
+        try:
+            if profile is not None:
+                profile.dump_stats(run.base + ".prof")
+                stats = pstats.Stats(profile)
+                children = [path for path in run.children if os.path.exists(path)]
+                for path in children:
+                    stats.add(path)
+                if children:
+                    report.append(f"Includes {len(children)} child process profile(s).")
+                components = time_by_component(stats)
+                record['components'] = {label: round(seconds, 4) for label, seconds in components.items()}
+                report.append("Time by component (own time):")
+                total = sum(components.values()) or 1.0
+                report += [f"  {label:<16} {seconds:10.3f}s  {seconds / total:6.1%}" for label, seconds in components.items()]
+                report.append("")
+                report.append(self._print_stats(stats, 'cumulative'))
+                report.append(self._print_stats(stats, 'tottime'))
+                with self.lock:
+                    for label, seconds in components.items():
+                        self.components[label] = self.components.get(label, 0.0) + seconds
+            if before is not None and tracemalloc.is_tracing():
+                after = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+                grown = after.compare_to(before.filter_traces(SNAPSHOT_FILTERS), 'lineno')
+                current, peak = tracemalloc.get_traced_memory()
+                record['traced_current_bytes'], record['traced_peak_bytes'] = current, peak
+                report.append(f"Allocation sites that grew during the job (traced now {current / 2 ** 20:.1f} MiB, "
+                              f"peak {peak / 2 ** 20:.1f} MiB; includes concurrent jobs):")
+                report += format_allocations(grown)
+            with open(run.base + ".txt", 'w', encoding='utf-8') as f:
+                f.write("\n".join(report) + "\n")
+        except OSError as e:
+            self.log(f"⚠️ Could not write profile of {job.name}: {e}")
+        with self.lock:
+            self.jobs.append(record)
+
+    @staticmethod
+    def _print_stats(stats, order):
+        buffer = io.StringIO()
+        stats.stream = buffer
+        stats.sort_stats(order).print_stats(TOP_FUNCTIONS)
+        return f"Top functions by {order}:\n" + buffer.getvalue()
+
+    def record_stage(self, tracker):
+        """Add a finished ProgressTracker to the breakdown"""
+        with self.lock:
+            self.stages.append({
+                'stage': tracker.stage, 'wall_seconds': round(tracker.elapsed(), 4),
+                'keys': tracker.keys, 'values': tracker.values, 'rows': tracker.rows, 'bytes': tracker.bytes,
+            })
+
+    def section(self, name):
+        """Context manager that profiles a recurring piece of work on the calling thread (e.g. the Tk pump)"""
+        with self.lock:
+            entry = self.sections.get(name)
+            if entry is None:
+                entry = self.sections[name] = {'profile': cProfile.Profile() if self.cpu else None,
+                                               'calls': 0, 'wall': 0.0}
+        return _Section(entry)
+
+    def finish(self):
+        """Write the breakdown and run-wide allocation summary; safe to call more than once"""
+        with self.lock:
+            if self.finished:
+                return self.folder
+            self.finished = True
+        total = time.perf_counter() - self.started
+        summary = {
+            'started': self.started_at,
+            'wall_seconds': round(total, 4),
+            'modes': [mode for mode, on in (('cpu', self.cpu), ('memory', self.memory)) if on],
+            'jobs': sorted(self.jobs, key=lambda record: record['seq']),
+            'stages': self.stages,
+            'sections': {},
+            'components': {label: round(seconds, 4) for label, seconds in
+                           sorted(self.components.items(), key=lambda item: -item[1])},
+        }
+        for name, entry in self.sections.items():
+            summary['sections'][name] = {'calls': entry['calls'], 'wall_seconds': round(entry['wall'], 4)}
+            if entry['profile'] is not None:
+                base = os.path.join(self.folder, safe_name(name))
+                entry['profile'].dump_stats(base + ".prof")
+                with open(base + ".txt", 'w', encoding='utf-8') as f:
+                    f.write(self._print_stats(pstats.Stats(entry['profile']), 'cumulative'))
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            summary['traced_peak_bytes'] = peak
+            top = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS).statistics('lineno')
+            with open(os.path.join(self.folder, "allocations.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"Traced memory now {current / 2 ** 20:.1f} MiB, peak {peak / 2 ** 20:.1f} MiB\n\n")
+                f.write("Largest live allocation sites at the end of the run:\n")
+                f.write("\n".join(format_allocations(top)) + "\n")
+            if self.owns_tracing:
+                tracemalloc.stop()
+        with open(os.path.join(self.folder, "breakdown.json"), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        with open(os.path.join(self.folder, "breakdown.txt"), 'w', encoding='utf-8') as f:
+            f.write(self._format_breakdown(summary))
+        self.log(f"📊 Profiles written to {self.folder}")
+        return self.folder
+
+    @staticmethod
+    def _format_breakdown(summary):
+        lines = [f"Run started {summary['started']}, wall {summary['wall_seconds']:.3f}s", "",
+                 f"{'Job':<40} {'Kind':<4} {'State':<10} {'Waited':>9} {'Wall':>9} {'CPU':>9}"]
+        for record in summary['jobs']:
+            lines.append(f"{record['job'][:40]:<40} {record['kind']:<4} {record['state'][:10]:<10} "
+                         f"{record['wait_seconds']:9.3f} {record['wall_seconds']:9.3f} {record['cpu_seconds']:9.3f}")
+        if summary['stages']:
+            lines += ["", f"{'Stage':<40} {'Wall':>9} {'Keys':>12} {'Rows':>12}"]
+            for stage in summary['stages']:
+                lines.append(f"{stage['stage'][:40]:<40} {stage['wall_seconds']:9.3f} "
+                             f"{stage['keys']:12,} {stage['rows']:12,}")
+        for name, section in summary['sections'].items():
+            lines.append(f"\n{name}: {section['calls']:,} calls, {section['wall_seconds']:.3f}s")
+        if summary['components']:
+            total = sum(summary['components'].values()) or 1.0
+            lines += ["", "Own time by component, all profiled jobs:"]
+            lines += [f"  {label:<16} {seconds:10.3f}s  {seconds / total:6.1%}"
+                      for label, seconds in summary['components'].items()]
+        return "\n".join(lines) + "\n"
+
+
+class _Section:
+    def __init__(self, entry):
+        self.entry = entry
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        if self.entry['profile'] is not None:
+            self.entry['profile'].enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.entry['profile'] is not None:
+            self.entry['profile'].disable()
+        self.entry['calls'] += 1
+        self.entry['wall'] += time.perf_counter() - self.started
+        return False
@@ -0,0 +1,822 @@
+"""HTML and PDF case report generation.
+
+The generators take a plain ``case`` dict in the save_config format (plus
+``date``) so the GUI and the headless CLI produce identical reports.
+"""
+import os
+import csv
+import gzip
+import html
+import json
+import base64
+import shutil
+import datetime
+import threading
+from contextlib import contextmanager
+
+from regparser_core import BASE_DIR, CANCEL_CHECK_EVERY, incomplete_on_cancel
+from regparser_events import format_duration
+from regparser_manifest import (load_manifest, latest_entries, summarize_artifacts, hashed_inputs,
+                                COMPLETE, MANIFEST_NAME)
+
+
+OUTPUT_FOLDERS = ['Registry', 'JumpLists', 'Prefetch', 'Shellbags', 'USB_Devices', 'Bluetooth_Devices', 'Network_Connections', 'Timeline']
+# Artifact rows embedded in reports, most telling first; the timeline only repeats them
+REPORT_TABLE_ARTIFACTS = ['USB_Devices', 'Bluetooth_Devices', 'Network_Connections', 'Shellbags', 'JumpLists', 'Prefetch', 'Registry']
+# Rows per compressed JSON chunk in the HTML report; the browser inflates only the chunks on screen
+HTML_CHUNK_ROWS = 2000
+# Browsers cap element heights, which bounds what a virtual scroller can address
+HTML_TABLE_MAX_ROWS = 500000
+PDF_FONT_SIZE = 6.5
+PDF_ROW_HEIGHT = 9
+PDF_MARGIN = 30
+# Rows per table in the PDF. reportlab holds every page's content in memory
+# until save(), so each table gets an excerpt and the full rows stay in its CSV
+PDF_TABLE_MAX_ROWS = 10000
+PDF_ROW_LIMITS = {'Registry': 20000, 'Timeline': 5000}
+# Rows of all tables together; Registry is a table per hive, so its excerpts share what the others leave
+PDF_TOTAL_ROWS = 60000
+
+# (output folder, registry file count) -> (manifest stamp, summary)
+_summary_cache = {}
+_summary_cache_lock = threading.Lock()
+
+
+def copy_app_logo_to_output(output_dir, log=print):
+    src_path = os.path.join(BASE_DIR, "app_logo.png")
+    if os.path.exists(src_path):
+        try:
+            dest_path = os.path.join(output_dir, "app_logo.png")
+            shutil.copy2(src_path, dest_path)
+            return "app_logo.png"  # Relative path
+        except Exception as e:
+            log(f"⚠️ Failed to copy app logo: {e}")
+    return None
+
+
+def copy_logo_to_output(logo_path, output_dir, log=print):
+    """Copy logo file to output directory and return relative path"""
+    if not logo_path or not os.path.exists(logo_path):
+        return None
+
+    try:
+        logo_filename = os.path.basename(logo_path)
+        logo_dest = os.path.join(output_dir, logo_filename)
+
+        # Copy logo file to output directory
+        shutil.copy2(logo_path, logo_dest)
+
+        return logo_filename  # Return relative path
+    except Exception as e:
+        log(f"⚠️ Failed to copy logo: {e}")
+        return None
+
+
+def copy_report_assets(case, output_dir, log=print):
+    """Copy both logos next to the reports once; every format links or embeds the same copies"""
+    return {
+        'logo': copy_logo_to_output(case['logo_path'], output_dir, log),
+        'app_logo': copy_app_logo_to_output(output_dir, log),
+    }
+
+
+def format_size(nbytes):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if nbytes < 1024 or unit == 'GB':
+            return f"{nbytes:,.0f} {unit}" if unit == 'B' else f"{nbytes:,.1f} {unit}"
+        nbytes /= 1024
+
+
+def describe_artifact(artifact):
+    """One-line result of an artifact, e.g. '2 files, 1,234 rows, 3.1 MB in 0:00:04'"""
+    text = (f"{artifact['file_count']} files, {artifact['rows']:,} rows, "
+            f"{format_size(artifact['bytes'])} in {format_duration(artifact['duration'])}")
+    if artifact['failed_items']:
+        text += f", {artifact['failed_items']} inputs failed"
+    if artifact['status'] != COMPLETE:
+        text += f" ({artifact['status']})"
+    return text
+
+
+def source_status_cell(summary, folder, input_folder):
+    """Evidence Sources status cell for a folder-based artifact, taken from the manifest"""
+    if not input_folder:
+        return '<td class="status-missing">Not configured</td>'
+    artifact = summary['artifacts'].get(folder)
+    if not artifact:
+        return '<td class="status-pending">Not parsed yet</td>'
+    if artifact['status'] == COMPLETE:
+        return f'<td class="status-complete">Parsed successfully ({artifact["rows"]:,} rows)</td>'
+    return f'<td class="status-missing">Parsing {artifact["status"]}</td>'
+
+
+def report_tables(entries, artifacts=REPORT_TABLE_ARTIFACTS):
+    """[{'artifact', 'path'}] of the completed CSV outputs of artifacts, in that order"""
+    tables = []
+    latest = latest_entries(entries)
+    for artifact in artifacts:
+        for entry in latest:
+            if entry['artifact'] != artifact or entry['status'] != COMPLETE:
+                continue
+            for output in entry['outputs']:
+                path = output['path']
+                if path.endswith('.csv') and not output['incomplete'] and os.path.exists(path):
+                    tables.append({'artifact': artifact, 'path': path})
+    return tables
+
+
+def table_title(table):
+    return f"{table['artifact'].replace('_', ' ')}: {os.path.basename(table['path'])}"
+
+
+@contextmanager
+def open_table_rows(path):
+    """(columns, row iterator) of an output CSV; rows are read lazily"""
+    with open(path, 'r', newline='', encoding='utf-8-sig', errors='replace') as f:
+        reader = csv.reader(f)
+        yield next(reader, []), reader
+
+
+def get_analysis_summary(output_base, registry_files):
+    """Generate analysis summary for the report from the output folder's run manifest.
+
+    Nothing under the output folder is listed or read besides the manifest, so
+    the cost does not depend on how much the parsers wrote.
+    """
+    summary = {
+        'registry_files': registry_files,
+        'output_folders': [],
+        'artifacts': {},
+        'environment': {},
+        'hashes': {},
+        'tables': [],
+        'timeline_tables': [],
+    }
+
+    manifest = load_manifest(output_base) if output_base else None
+    if manifest:
+        artifacts = summarize_artifacts(manifest['entries'])
+        summary['artifacts'] = artifacts
+        summary['environment'] = manifest['environment']
+        summary['hashes'] = hashed_inputs(manifest['entries'])
+        summary['tables'] = report_tables(manifest['entries'])
+        summary['timeline_tables'] = report_tables(manifest['entries'], ['Timeline'])
+        summary['output_folders'] = [artifacts[folder] for folder in OUTPUT_FOLDERS if folder in artifacts]
+
+    return summary
+
+
+def cached_analysis_summary(output_base, registry_files):
+    """get_analysis_summary, reused until the run manifest changes.
+
+    Every stage that writes outputs records itself in the manifest, so its
+    mtime and size stand for the state of the outputs. Callers share the
+    returned dict and must not modify it.
+    """
+    try:
+        stat = os.stat(os.path.join(output_base, MANIFEST_NAME))
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = None
+    key = (os.path.abspath(output_base), registry_files)
+    with _summary_cache_lock:
+        cached = _summary_cache.get(key)
+        if cached and stamp is not None and cached[0] == stamp:
+            return cached[1]
+    summary = get_analysis_summary(output_base, registry_files)
+    with _summary_cache_lock:
+        _summary_cache[key] = (stamp, summary)
+    return summary
+
+
+# Client side of the embedded artifact tables: inflates gzip+base64 chunks on demand
+# (DecompressionStream), renders only the rows in view and filters chunk by chunk.
+HTML_TABLE_SCRIPT = """
+<script>
+(function () {
+    const ROW_HEIGHT = 24, VIEW_ROWS = 20, CACHE_CHUNKS = 8;
+    const meta = JSON.parse(document.getElementById('rp-meta').textContent);
+    const container = document.getElementById('rp-tables');
+
+    async function inflate(text) {
+        const bytes = Uint8Array.from(atob(text), c => c.charCodeAt(0));
+        const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+        return JSON.parse(await new Response(stream).text());
+    }
+
+    function el(tag, className, text) {
+        const node = document.createElement(tag);
+        if (className) node.className = className;
+        if (text !== undefined) node.textContent = text;
+        return node;
+    }
+
+    meta.tables.forEach(function (table) {
+        const cache = new Map();
+        let order = null, generation = 0;
+
+        function chunk(c) {
+            if (!cache.has(c)) {
+                if (cache.size >= CACHE_CHUNKS) cache.delete(cache.keys().next().value);
+                cache.set(c, inflate(document.getElementById('rp-' + table.id + '-' + c).textContent));
+            }
+            return cache.get(c);
+        }
+        async function row(index) {
+            return (await chunk(Math.floor(index / meta.chunk_rows)))[index % meta.chunk_rows];
+        }
+        const count = () => order ? order.length : table.rows;
+
+        const section = el('div', 'rp-table');
+        section.appendChild(el('h3', null, table.title));
+        const controls = el('div', 'rp-controls');
+        const filter = el('input'); filter.placeholder = 'Filter rows...';
+        const jump = el('input'); jump.placeholder = 'Row #'; jump.size = 8;
+        const prev = el('button', null, '\u25B2 Page'), next = el('button', null, '\u25BC Page');
+        const status = el('span', 'rp-status');
+        [filter, jump, prev, next, status].forEach(n => controls.appendChild(n));
+        section.appendChild(controls);
+        const viewport = el('div', 'rp-viewport');
+        viewport.style.height = (ROW_HEIGHT * (VIEW_ROWS + 1)) + 'px';
+        const header = el('div', 'rp-row rp-head');
+        table.columns.forEach(c => header.appendChild(el('div', 'rp-cell', c)));
+        const spacer = el('div', 'rp-spacer');
+        viewport.appendChild(header);
+        viewport.appendChild(spacer);
+        section.appendChild(viewport);
+        if (table.truncated) {
+            section.appendChild(el('p', 'rp-note', 'Showing the first ' + table.rows.toLocaleString() +
+                ' rows; the full table is in ' + table.path));
+        }
+        container.appendChild(section);
+
+        async function render() {
+            const total = count();
+            spacer.style.height = (total * ROW_HEIGHT) + 'px';
+            const first = Math.min(Math.floor(viewport.scrollTop / ROW_HEIGHT), Math.max(total - VIEW_ROWS, 0));
+            const last = Math.min(first + VIEW_ROWS + 2, total);
+            const token = ++generation;
+            const rows = [];
+            for (let i = first; i < last; i++) rows.push(await row(order ? order[i] : i));
+            if (token !== generation) return;
+            spacer.replaceChildren();
+            rows.forEach(function (values, k) {
+                const line = el('div', 'rp-row');
+                line.style.top = ((first + k) * ROW_HEIGHT) + 'px';
+                values.forEach(v => { const cell = el('div', 'rp-cell', v); cell.title = v; line.appendChild(cell); });
+                spacer.appendChild(line);
+            });
+            status.textContent = total ? 'Rows ' + (first + 1).toLocaleString() + '-' + last.toLocaleString() +
+                ' of ' + total.toLocaleString() : 'No matching rows';
+        }
+
+        async function applyFilter() {
+            const needle = filter.value.trim().toLowerCase();
+            const token = ++generation;
+            if (!needle) { order = null; viewport.scrollTop = 0; return render(); }
+            const matches = [];
+            for (let c = 0; c * meta.chunk_rows < table.rows; c++) {
+                status.textContent = 'Filtering... ' + Math.round(100 * c * meta.chunk_rows / table.rows) + '%';
+                const rows = await chunk(c);
+                if (token !== generation) return;
+                rows.forEach((values, k) => {
+                    if (values.some(v => v.toLowerCase().includes(needle))) matches.push(c * meta.chunk_rows + k);
+                });
+            }
+            order = matches;
+            viewport.scrollTop = 0;
+            render();
+        }
+
+        let timer = null;
+        filter.addEventListener('input', () => { clearTimeout(timer); timer = setTimeout(applyFilter, 300); });
+        jump.addEventListener('change', () => { viewport.scrollTop = (parseInt(jump.value, 10) - 1) * ROW_HEIGHT; });
+        prev.addEventListener('click', () => { viewport.scrollTop -= VIEW_ROWS * ROW_HEIGHT; });
+        next.addEventListener('click', () => { viewport.scrollTop += VIEW_ROWS * ROW_HEIGHT; });
+        viewport.addEventListener('scroll', () => requestAnimationFrame(render));
+        render();
+    });
+})();
+</script>
+"""
+
+
+def encode_chunk(rows):
+    return base64.b64encode(gzip.compress(json.dumps(rows, ensure_ascii=False).encode('utf-8'), mtime=0)).decode('ascii')
+
+
+def write_table_data(f, tables, log=print, progress=None, cancel=None):
+    """Stream every table into f as gzip+base64 JSON chunks, then their metadata.
+
+    At most HTML_CHUNK_ROWS rows are held in memory at a time.
+    """
+    meta = {'chunk_rows': HTML_CHUNK_ROWS, 'tables': []}
+    for index, table in enumerate(tables):
+        try:
+            with open_table_rows(table['path']) as (columns, reader):
+                rows, chunk, count, truncated = [], 0, 0, False
+                for record in reader:
+                    if count >= HTML_TABLE_MAX_ROWS:
+                        truncated = True
+                        break
+                    rows.append(record)
+                    count += 1
+                    if len(rows) >= HTML_CHUNK_ROWS:
+                        if cancel is not None:
+                            cancel.check()
+                        if progress is not None:
+                            progress.add(rows=len(rows))
+                        f.write(f'<script type="application/octet-stream" id="rp-{index}-{chunk}">{encode_chunk(rows)}</script>\n')
+                        rows, chunk = [], chunk + 1
+                if rows:
+                    f.write(f'<script type="application/octet-stream" id="rp-{index}-{chunk}">{encode_chunk(rows)}</script>\n')
+            if progress is not None:
+                progress.add(rows=len(rows), items=1, nbytes=os.path.getsize(table['path']))
+        except OSError as e:
+            log(f"⚠️ Skipped {table['path']} in the HTML report: {e}")
+            continue
+        meta['tables'].append({'title': table_title(table), 'path': table['path'], 'columns': columns,
+                               'rows': count, 'truncated': truncated, 'id': index})
+    meta_json = json.dumps(meta, ensure_ascii=False).replace('</', '<\\/')
+    f.write(f'<script type="application/json" id="rp-meta">{meta_json}</script>\n')
+    return meta
+
+
+def generate_html_report(output_path, case, summary, log=print, progress=None, cancel=None, assets=None):
+    """Write the HTML report; assets comes from copy_report_assets (the logos are copied if it is None)"""
+    output_dir = os.path.dirname(output_path)
+    assets = assets or copy_report_assets(case, output_dir, log)
+    logo_filename = assets['logo']
+    app_logo_filename = assets['app_logo']
+    analysis_summary = summary
+
+    # Generate logo HTML
+    logo_html = ""
+    if logo_filename:
+        logo_html = f'<img src="{logo_filename}" alt="Organization Logo" style="max-height: 120px; float: right;">'
+    
+    app_logo_html = f'<img src="{app_logo_filename}" alt="App Logo" style="max-height: 100px;">' if app_logo_filename else ""
+
+
+    env = analysis_summary['environment']
+    runtime_html = f"<li><strong>Runtime:</strong> Python {env['python']}, python-registry {env['python-registry']}</li>" if env else ""
+
+    hash_rows = "".join(
+        f'<tr><td class="path-cell">{html.escape(path)}</td><td class="path-cell">{digests["md5"]}</td>'
+        f'<td class="path-cell">{digests["sha1"]}</td><td class="path-cell">{digests["sha256"]}</td></tr>'
+        for path, digests in sorted(analysis_summary['hashes'].items()))
+    hashes_html = f"""
+        <div class="section">
+            <h2>Evidence Integrity</h2>
+            <p>Digests computed while the evidence was read for parsing.</p>
+            <table>
+                <tr><th>File</th><th>MD5</th><th>SHA-1</th><th>SHA-256</th></tr>
+                {hash_rows}
+            </table>
+        </div>""" if hash_rows else ""
+
+    tables_html = """
+        <div class="section">
+            <h2>Artifact Data</h2>
+            <p>Parsed rows, loaded on demand as you scroll. Type in a filter box to search a table.</p>
+            <div id="rp-tables"></div>
+        </div>""" if analysis_summary['tables'] else ""
+
+    # Generate analysis summary HTML
+    summary_html = ""
+    if analysis_summary['output_folders']:
+        summary_html = "<ul>"
+        for folder in analysis_summary['output_folders']:
+            summary_html += f"<li>{folder['name']}: {describe_artifact(folder)}</li>"
+            for error in folder['errors']:
+                summary_html += f"<li class=\"status-missing\">{folder['name']} error: {html.escape(error)}</li>"
+        summary_html += "</ul>"
+    else:
+        summary_html = "<p>No output files generated yet.</p>"
+
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Forensic Analysis Report</title>
+        <meta charset="UTF-8">
+        <style>
+            body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
+            .header {{ background-color: #f8f9fa; padding: 20px; border-radius: 5px; border-left: 5px solid #007bff; margin-bottom: 20px; }}
+            .organization-info {{ overflow: hidden; margin-bottom: 15px; }}
+            .case-details {{ display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin-top: 15px; }}
+            .section {{ margin: 20px 0; }}
+            .section h2 {{ color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px; }}
+            .artifact {{ background-color: #f9f9f9; padding: 15px; margin: 10px 0; border-left: 4px solid #2196F3; border-radius: 4px; }}
+            .artifact h3 {{ margin-top: 0; color: #34495e; }}
+            table {{ border-collapse: collapse; width: 100%; margin: 15px 0; }}
+            th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
+            th {{ background-color: #f2f2f2; font-weight: bold; }}
+            tr:nth-child(even) {{ background-color: #f9f9f9; }}
+            .path-cell {{ font-family: 'Courier New', monospace; font-size: 0.9em; word-break: break-all; }}
+            .status-complete {{ color: #27ae60; font-weight: bold; }}
+            .status-pending {{ color: #f39c12; font-weight: bold; }}
+            .status-missing {{ color: #e74c3c; font-weight: bold; }}
+            .rp-table {{ margin: 15px 0 30px; }}
+            .rp-controls {{ margin: 5px 0; }}
+            .rp-controls input, .rp-controls button {{ margin-right: 6px; }}
+            .rp-status, .rp-note {{ color: #7f8c8d; font-size: 0.9em; }}
+            .rp-viewport {{ overflow: auto; position: relative; border: 1px solid #ddd; }}
+            .rp-row {{ display: flex; height: 24px; line-height: 24px; }}
+            .rp-head {{ position: sticky; top: 0; z-index: 1; background-color: #f2f2f2; font-weight: bold; width: max-content; }}
+            .rp-spacer {{ position: relative; }}
+            .rp-spacer .rp-row {{ position: absolute; left: 0; }}
+            .rp-spacer .rp-row:nth-child(even) {{ background-color: #f9f9f9; }}
+            .rp-cell {{ flex: 0 0 180px; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; padding: 0 6px; border-right: 1px solid #eee; font-size: 0.85em; }}
+            .footer {{ margin-top: 40px; padding: 20px; background-color: #ecf0f1; border-radius: 5px; text-align: center; font-size: 0.9em; color: #7f8c8d; }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <div class="organization-info">
+                {logo_html}
+                <h1>Forensic Analysis Report</h1>
+                {f'<h2 style="color: #2980b9; margin: 5px 0;">{case["organization"]}</h2>' if case["organization"] else ''}
+            </div>
+            <div class="case-details">
+                <div>
+                    <p><strong>Case Name:</strong> {case['case_name'] or 'Not specified'}</p>
+                    <p><strong>Examiner:</strong> {case['examiner'] or 'Not specified'}</p>
+                </div>
+                <div>
+                    <p><strong>Analysis Date:</strong> {case['date']}</p>
+                    <p><strong>Report Generated:</strong> {datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
+                </div>
+            </div>
+        </div>
+    
+        <div class="section">
+            <h2>Executive Summary</h2>
+            <div class="artifact">
+                <h3>Analysis Overview</h3>
+                <p>This report contains the results of digital forensic analysis performed on various system artifacts including registry hives, jump lists, prefetch files, and other system artifacts.</p>
+                <p>All steps have been taken to maintain integrity of evidence.</p>
+                <h4>Processed Artifacts Summary:</h4>
+                {summary_html}
+            </div>
+        </div>
+    
+        <div class="section">
+        <p> </p> 
+            <h2>Evidence Sources</h2>
+            <table>
+                <tr>
+                    <th>Artifact Type</th>
+                    <th>Source Path</th>
+                    <th>Status</th>
+                    <th>Output Location</th>
+                </tr>
+                <tr>
+                    <td>Registry Hives</td>
+                    <td class="path-cell">{case['reg_folder'] or 'Not specified'}</td>
+                    <td class="{'status-complete' if case['reg_folder'] else 'status-missing'}">{f'{analysis_summary["registry_files"]} files detected' if case['reg_folder'] else 'Not configured'}</td>
+                    <td class="path-cell">{os.path.join(case['output_folder'], 'Registry') if case['output_folder'] else 'Not set'}</td>
+                </tr>
+                <tr>
+                    <td>Jump Lists</td>
+                    <td class="path-cell">{case['jump_folder'] or 'Not specified'}</td>
+                    {source_status_cell(analysis_summary, 'JumpLists', case['jump_folder'])}
+                    <td class="path-cell">{os.path.join(case['output_folder'], 'JumpLists') if case['output_folder'] else 'Not set'}</td>
+                </tr>
+                <tr>
+                    <td>Prefetch Files</td>
+                    <td class="path-cell">{case['prefetch_folder'] or 'Not specified'}</td>
+                    {source_status_cell(analysis_summary, 'Prefetch', case['prefetch_folder'])}
+                    <td class="path-cell">{os.path.join(case['output_folder'], 'Prefetch') if case['output_folder'] else 'Not set'}</td>
+                </tr>
+                <tr>
+                    <td>Shellbags</td>
+                    <td class="path-cell">{case['reg_folder'] or 'Not specified'}</td>
+                    <td class="{'status-complete' if case['reg_folder'] else 'status-missing'}">{'Available from Registry' if case['reg_folder'] else 'Requires Registry'}</td>
+                    <td class="path-cell">{os.path.join(case['output_folder'], 'Shellbags') if case['output_folder'] else 'Not set'}</td>
+                </tr>
+                <tr>
+                    <td>USB Devices</td>
+                    <td class="path-cell">{case['reg_folder'] or 'Not specified'}</td>
+                    <td class="{'status-complete' if case['reg_folder'] else 'status-missing'}">{'Available from SYSTEM hive' if case['reg_folder'] else 'Requires SYSTEM hive'}</td>
+                    <td class="path-cell">{os.path.join(case['output_folder'], 'USB_Devices') if case['output_folder'] else 'Not set'}</td>
+                </tr>
+                <tr>
+                    <td>Bluetooth Devices</td>
+                    <td class="path-cell">{case['reg_folder'] or 'Not specified'}</td>
+                    <td class="{'status-complete' if case['reg_folder'] else 'status-missing'}">{'Available from SYSTEM hive' if case['reg_folder'] else 'Requires SYSTEM hive'}</td>
+                    <td class="path-cell">{os.path.join(case['output_folder'], 'Bluetooth_Devices') if case['output_folder'] else 'Not set'}</td>
+                </tr>
+                <tr>
+                    <td>Network Profiles</td>
+                    <td class="path-cell">{case['reg_folder'] or 'Not specified'}</td>
+                    <td class="{'status-complete' if case['reg_folder'] else 'status-missing'}">{'Available from SOFTWARE hive' if case['reg_folder'] else 'Requires SOFTWARE hive'}</td>
+                    <td class="path-cell">{os.path.join(case['output_folder'], 'Network_Connections') if case['output_folder'] else 'Not set'}</td>
+                </tr>
+            </table>
+        </div>
+    
+        {hashes_html}
+
+        {tables_html}
+
+        <div class="section">
+            <h2>Tool Information</h2>
+            <div class="artifact">
+                <h3>Forensic Tools Used</h3>
+                <ul>
+                    <li><strong>Registry Analysis:</strong> Custom Python parser using python-registry library</li>
+                    <li><strong>Jump Lists:</strong> Built-in parser (AutomaticDestinations, CustomDestinations, LNK)</li>
+                    <li><strong>Shellbags:</strong> Built-in parser (BagMRU shell items)</li>
+                    <li><strong>Prefetch:</strong> Built-in parser (versions 17-31, Xpress Huffman)</li>
+                    <li><strong>Report Generation:</strong> RegParser v2.2</li>
+                    {runtime_html}
+                </ul>
+            </div>
+        </div>
+    
+        <div class="footer">
+            {app_logo_html}
+            <p>This report was generated by RegParser v2.2 developed by Soukarya Sur. Follow me on linkedin.com/in/soukarya-sur-096589256</p>
+            <p>For questions about this analysis, please contact: {case['examiner'] or 'the assigned examiner'}</p>
+            <p>RegParser v2.2 will not be responsible for any data loss.</p>
+        </div>
+    """
+
+    tables = analysis_summary['tables']
+    if progress is not None:
+        progress.total_items += len(tables)
+        progress.total_bytes += sum(os.path.getsize(table['path']) for table in tables)
+    with incomplete_on_cancel(output_path), open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+        # Row data goes after the visible page so the browser paints the summary first
+        if tables:
+            write_table_data(f, tables, log, progress, cancel)
+            f.write(HTML_TABLE_SCRIPT)
+        f.write("</body>\n</html>\n")
+
+
+def pdf_row_cap(table):
+    return PDF_ROW_LIMITS.get(table['artifact'], PDF_TABLE_MAX_ROWS)
+
+
+def pdf_excerpt_note():
+    """Lines telling the PDF reader that its tables are excerpts"""
+    caps = ", ".join(f"{artifact} {limit:,}" for artifact, limit in PDF_ROW_LIMITS.items())
+    return [
+        f"Artifact tables are excerpts: at most {PDF_TABLE_MAX_ROWS:,} rows per table ({caps})",
+        f"and {PDF_TOTAL_ROWS:,} rows in all, of which Registry tables share what the others leave. A table",
+        "ends with a note when rows were left out; the full rows are in the CSV files of the output folders.",
+    ]
+
+
+def draw_pdf_table(pdf, table, limit=None, progress=None, cancel=None):
+    """Draw one artifact table on as many landscape pages as it needs. Returns the rows drawn.
+
+    Rows are streamed from the CSV; past limit rows (None: no limit) the
+    table ends with a note pointing at the CSV.
+    """
+    from reportlab.lib.pagesizes import A4, landscape
+
+    width, height = landscape(A4)
+    title = table_title(table)
+    with open_table_rows(table['path']) as (columns, reader):
+        if not columns:
+            return 0
+        column_width = (width - 2 * PDF_MARGIN) / len(columns)
+        # Helvetica averages about half an em per character; measuring every cell would dominate the run
+        max_chars = max(4, int(column_width / (PDF_FONT_SIZE * 0.5)))
+
+        def clip(value):
+            value = value.replace('\n', ' ').replace('\r', ' ')
+            return value if len(value) <= max_chars else value[:max_chars - 1] + "…"
+
+        def start_page(continued):
+            pdf.setPageSize((width, height))
+            y = height - PDF_MARGIN
+            pdf.setFont("Helvetica-Bold", 10)
+            pdf.drawString(PDF_MARGIN, y, title + (" (continued)" if continued else ""))
+            pdf.setFont("Helvetica", 7)
+            pdf.drawRightString(width - PDF_MARGIN, 15, f"Page {pdf.getPageNumber()}")
+            y -= 16
+            pdf.setFont("Helvetica-Bold", PDF_FONT_SIZE)
+            for index, column in enumerate(columns):
+                pdf.drawString(PDF_MARGIN + index * column_width, y, clip(column))
+            pdf.line(PDF_MARGIN, y - 3, width - PDF_MARGIN, y - 3)
+            pdf.setFont("Helvetica", PDF_FONT_SIZE)
+            return y - PDF_ROW_HEIGHT - 2
+
+        y = start_page(False)
+        count = 0
+        cut = False
+        for record in reader:
+            if limit is not None and count >= limit:
+                if limit:
+                    note = f"First {limit:,} rows shown; the full table is in {table['path']}"
+                else:
+                    note = f"Left out, the PDF holds {PDF_TOTAL_ROWS:,} rows in all; the full table is in {table['path']}"
+                pdf.setFont("Helvetica-Oblique", 7)
+                pdf.drawString(PDF_MARGIN, max(y, PDF_MARGIN), note)
+                cut = True
+                break
+            if y < PDF_MARGIN:
+                pdf.showPage()
+                y = start_page(True)
+            for index, value in enumerate(record[:len(columns)]):
+                if value:
+                    pdf.drawString(PDF_MARGIN + index * column_width, y, clip(value))
+            y -= PDF_ROW_HEIGHT
+            count += 1
+            if count % CANCEL_CHECK_EVERY == 0:
+                if cancel is not None:
+                    cancel.check()
+                if progress is not None:
+                    progress.add(rows=CANCEL_CHECK_EVERY)
+        if not count and not cut:
+            pdf.drawString(PDF_MARGIN, y, "No rows.")
+        pdf.showPage()
+    if progress is not None:
+        progress.add(rows=count % CANCEL_CHECK_EVERY, items=1, nbytes=os.path.getsize(table['path']))
+    return count
+
+
+def generate_pdf_report(output_path, case, summary, log=print, progress=None, cancel=None, assets=None):
+    """Write the PDF report; assets comes from copy_report_assets (the logos are copied if it is None)"""
+    output_dir = os.path.dirname(output_path)
+    assets = assets or copy_report_assets(case, output_dir, log)
+    logo_filename = assets['logo']
+    app_logo_filename = assets['app_logo']
+
+    # reportlab is only needed here; importing it lazily keeps HTML-only and
+    # headless runs from paying for it at startup
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    # The canvas keeps finished pages in memory until save(), hence the row caps;
+    # nothing is written if the export is canceled
+    pdf = canvas.Canvas(output_path, pagesize=A4, pageCompression=1)
+    width, height = A4
+    y = height - 40
+
+    pdf.setFont("Helvetica-Bold", 16)
+    pdf.drawString(40, y, "Forensic Analysis Report")
+    y -= 25
+
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(40, y, f"Organization: {case['organization']}")
+    y -= 15
+    pdf.drawString(40, y, f"Case Name: {case['case_name']}")
+    y -= 15
+    pdf.drawString(40, y, f"Examiner: {case['examiner']}")
+    y -= 15
+    pdf.drawString(40, y, f"Date: {case['date']}")
+    y -= 30
+
+    if logo_filename:
+        try:
+            logo_path = os.path.join(output_dir, logo_filename)
+            # Draw org logo at top-right corner
+            pdf.drawImage(logo_path, width - 100, 400, width=70, preserveAspectRatio=True, mask='auto')
+        except Exception as e:
+            log(f"⚠️ Failed to draw organization logo: {e}")
+
+    # Executive Summary
+    pdf.setFont("Helvetica-Bold", 12)
+    pdf.drawString(40, y, "Executive Summary")
+    y -= 18
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(40, y, "This report contains the results of forensic analysis on various artifacts.")
+    y -= 15
+    if summary['tables'] or summary['timeline_tables']:
+        for line in pdf_excerpt_note():
+            pdf.drawString(40, y, line)
+            y -= 15
+    y -= 15
+
+    # Summary
+    pdf.setFont("Helvetica-Bold", 11)
+    pdf.drawString(40, y, "Processed Artifacts:")
+    y -= 18
+    pdf.setFont("Helvetica", 10)
+
+    for folder in summary['output_folders']:
+        if y < 60:
+            pdf.showPage()
+            y = height - 40
+            pdf.setFont("Helvetica", 10)
+        pdf.drawString(50, y, f"- {folder['name']}: {describe_artifact(folder)}")
+        y -= 15
+
+    y -= 10
+    pdf.setFont("Helvetica-Bold", 11)
+    pdf.drawString(40, y, "Evidence Sources:")
+    y -= 20
+    pdf.setFont("Helvetica", 10)
+
+    def draw_source(label, input_path, output_folder):
+        nonlocal y
+        if y < 60:
+            pdf.showPage()
+            y = height - 40
+            pdf.setFont("Helvetica", 10)
+
+        # The manifest says whether the parser ran and what it produced
+        artifact = summary['artifacts'].get(os.path.basename(output_folder))
+        if artifact and artifact['file_count']:
+            pdf.drawString(50, y, f"{label}:")
+            y -= 15
+            pdf.drawString(70, y, f"Input Path: {input_path or 'Not set'}")
+            y -= 15
+            pdf.drawString(70, y, f"Output Folder: {output_folder}")
+            y -= 15
+            pdf.drawString(70, y, f"Result: {describe_artifact(artifact)}")
+            y -= 20
+        else:
+            pdf.drawString(50, y, f"{label}: Not parsed")
+            y -= 20
+
+    draw_source("Registry Hives", case['reg_folder'], os.path.join(case['output_folder'], 'Registry'))
+    draw_source("Jump Lists", case['jump_folder'], os.path.join(case['output_folder'], 'JumpLists'))
+    draw_source("Prefetch", case['prefetch_folder'], os.path.join(case['output_folder'], 'Prefetch'))
+    draw_source("USB Devices", case['reg_folder'], os.path.join(case['output_folder'], 'USB_Devices'))
+    draw_source("Shellbags", case['reg_folder'], os.path.join(case['output_folder'], 'Shellbags'))
+    draw_source("Bluetooth Devices", case['reg_folder'], os.path.join(case['output_folder'], 'Bluetooth_Devices'))
+    draw_source("Network Profiles", case['reg_folder'], os.path.join(case['output_folder'], 'Network_Connections'))
+
+    if summary['hashes']:
+        y -= 10
+        if y < 80:
+            pdf.showPage()
+            y = height - 40
+        pdf.setFont("Helvetica-Bold", 11)
+        pdf.drawString(40, y, "Evidence Integrity:")
+        y -= 15
+        for path, digests in sorted(summary['hashes'].items()):
+            if y < 80:
+                pdf.showPage()
+                y = height - 40
+            pdf.setFont("Helvetica", 9)
+            pdf.drawString(50, y, path)
+            y -= 11
+            pdf.setFont("Courier", 7)
+            pdf.drawString(60, y, f"MD5 {digests['md5']}  SHA-1 {digests['sha1']}")
+            y -= 9
+            pdf.drawString(60, y, f"SHA-256 {digests['sha256']}")
+            y -= 13
+
+    y -= 10
+    if y < 140:
+        pdf.showPage()
+        y = height - 40
+    pdf.setFont("Helvetica-Bold", 11)
+    pdf.drawString(40, y, "Tool Info:")
+    y -= 15
+    pdf.setFont("Helvetica", 10)
+    tools = [
+        "Registry Analysis: Internal Python Parser",
+        "Jump Lists: Built-in parser",
+        "Shellbags: Built-in parser",
+        "Prefetch: Built-in parser",
+        "Report Generation: RegParser v2.2"
+    ]
+    if summary['environment']:
+        env = summary['environment']
+        tools.append(f"Runtime: Python {env['python']}, python-registry {env['python-registry']}")
+    for tool in tools:
+        pdf.drawString(50, y, f"- {tool}")
+        y -= 15
+
+    y -= 10
+    pdf.setFont("Helvetica-Oblique", 8)
+    pdf.drawString(40, y, "Generated by RegParser v2.2 developed by Soukarya Sur")
+    y -= 10
+    pdf.drawString(40, y, f"LinkedIn: linkedin.com/in/soukarya-sur-096589256")
+    y -= 10
+    pdf.drawString(40, y, f"For queries contact: {case['examiner'] or 'N/A'}")
+
+    if app_logo_filename:
+        try:
+            app_logo_path = os.path.join(output_dir, app_logo_filename)
+            # Draw app logo at bottom-right corner (leave margin)
+            pdf.drawImage(app_logo_path, width - 100, 20, width=70, preserveAspectRatio=True, mask='auto')
+        except Exception as e:
+            log(f"⚠️ Failed to draw app logo: {e}")
+
+    tables = summary['tables'] + summary['timeline_tables']
+    if tables:
+        pdf.showPage()
+        if progress is not None:
+            progress.total_items += len(tables)
+            progress.total_bytes += sum(os.path.getsize(table['path']) for table in tables)
+        left = PDF_TOTAL_ROWS
+        for index, table in enumerate(tables):
+            # Registry tables only get what the other tables after them (the timeline) cannot need
+            reserved = 0
+            if table['artifact'] == 'Registry':
+                reserved = sum(pdf_row_cap(later) for later in tables[index + 1:] if later['artifact'] != 'Registry')
+            limit = max(0, min(pdf_row_cap(table), left - reserved))
+            rows = draw_pdf_table(pdf, table, limit, progress, cancel)
+            left -= rows
+            log(f"🧩 PDF report: {table_title(table)} ({rows:,} rows)")
+
+    pdf.save()
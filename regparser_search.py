@@ -0,0 +1,261 @@
+"""Per-case full-text search over every CSV the parsers wrote.
+
+The index lives in ``<output>/search_index.sqlite``: a contentless FTS5
+table holds only the inverted index (terms -> posting lists with positions),
+and each posting's rowid encodes the file and the byte offset of its CSV
+record. Hits are read back from the CSV itself, so the index stays a
+fraction of the output size while phrase and prefix queries answer in
+milliseconds.
+
+Updates are incremental: outputs listed in the run manifest are indexed once
+and only re-indexed when they change. Postings of superseded files are
+dropped from results at once and purged by a rebuild once they outnumber
+the live ones.
+"""
+import os
+import re
+import csv
+import sqlite3
+import threading
+
+from regparser_core import CANCEL_CHECK_EVERY
+from regparser_manifest import load_manifest, latest_entries, COMPLETE
+
+
+INDEX_NAME = "search_index.sqlite"
+# rowid = file id << OFFSET_BITS | byte offset of the record in that file
+OFFSET_BITS = 40
+INSERT_BATCH = 5000
+DEFAULT_LIMIT = 100
+# Outputs that only repeat other outputs' rows
+UNINDEXED_ARTIFACTS = ('Timeline',)
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+# Timestamps and Python bytes reprs add many tokens nobody searches for
+TIMESTAMP_PREFIX_RE = re.compile(r'\d{4}-\d\d-\d\d[ T]\d\d:\d\d')
+
+_index_locks = {}
+_index_locks_guard = threading.Lock()
+
+
+def _index_lock(path):
+    with _index_locks_guard:
+        return _index_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+class _LineFeed:
+    """Binary line iterator for csv.reader that knows the byte offset of the next line.
+
+    csv.reader pulls exactly the lines of one record per next(), so the
+    offset read just before next() is where that record starts.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.offset = f.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode('utf-8', errors='replace')
+
+
+def _open_csv(path):
+    f = open(path, 'rb')
+    if f.read(3) != b'\xef\xbb\xbf':
+        f.seek(0)
+    return f
+
+
+def read_record(path, offset):
+    """(header, record) of the CSV record starting at offset"""
+    with _open_csv(path) as f:
+        header = next(csv.reader(_LineFeed(f)), [])
+        f.seek(offset)
+        return header, next(csv.reader(_LineFeed(f)), [])
+
+
+def record_text(record):
+    return " ".join(value for value in record
+                    if value and not TIMESTAMP_PREFIX_RE.match(value) and not value.startswith(("b'", 'b"')))
+
+
+def to_fts_query(text):
+    """Translate a search box query into FTS5 syntax.
+
+    Words and "quoted phrases" must all match; a trailing * makes the last
+    word a prefix. Punctuation splits words the way the index does, so
+    C:\\Users\\bob and app.exe search as phrases.
+    """
+    parts = []
+    for match in re.finditer(r'"([^"]*)"(\*?)|(\S+)', text):
+        phrase, phrase_star, word = match.groups()
+        raw = phrase if phrase is not None else word
+        tokens = TOKEN_RE.findall(raw.lower())
+        if not tokens:
+            continue
+        prefix = phrase_star if phrase is not None else ('*' if word.endswith('*') else '')
+        parts.append('"' + " ".join(tokens) + '"' + (' *' if prefix else ''))
+    return " AND ".join(parts)
+
+
+class SearchIndex:
+    """Inverted index of one output folder; safe to share between threads"""
+
+    def __init__(self, output_folder):
+        self.output_folder = output_folder
+        self.path = os.path.join(output_folder, INDEX_NAME)
+        self.lock = _index_lock(self.path)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT, artifact TEXT, "
+            "size INTEGER, mtime_ns INTEGER, rows INTEGER DEFAULT 0, live INTEGER DEFAULT 1)")
+        # content='' keeps only the posting lists; columnsize=0 drops per-row lengths (no bm25 needed)
+        self.connection.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS postings USING fts5(text, content='', columnsize=0)")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def wanted_outputs(self):
+        """{path: artifact} of the completed CSV outputs the manifest currently stands behind"""
+        manifest = load_manifest(self.output_folder)
+        wanted = {}
+        for entry in latest_entries(manifest['entries']) if manifest else []:
+            if entry['status'] != COMPLETE or entry['artifact'] in UNINDEXED_ARTIFACTS:
+                continue
+            for output in entry['outputs']:
+                path = output['path']
+                if path.endswith('.csv') and not output['incomplete'] and os.path.exists(path):
+                    wanted[path] = entry['artifact']
+        return wanted
+
+    def update(self, progress=None, cancel=None, log=print):
+        """Index new or changed outputs and retire superseded ones. Returns the number of files indexed."""
+        with self.lock:
+            wanted = self.wanted_outputs()
+            live = {path: (file_id, size, mtime_ns) for file_id, path, size, mtime_ns in self.connection.execute(
+                "SELECT id, path, size, mtime_ns FROM files WHERE live = 1")}
+            todo = []
+            for path, artifact in wanted.items():
+                stat = os.stat(path)
+                known = live.pop(path, None)
+                if known and known[1:] == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                if known:
+                    live[path] = known
+                todo.append((path, artifact, stat))
+            if live:
+                self.connection.executemany("UPDATE files SET live = 0 WHERE id = ?",
+                                            [(file_id,) for file_id, _, _ in live.values()])
+                self.connection.commit()
+            if self._garbage_exceeds_live():
+                log("♻️ Search index: rebuilding to purge superseded outputs")
+                self._clear()
+                todo = [(path, artifact, os.stat(path)) for path, artifact in wanted.items()]
+            if progress is not None:
+                progress.total_items += len(todo)
+                progress.total_bytes += sum(stat.st_size for _, _, stat in todo)
+            for path, artifact, stat in todo:
+                self._index_file(path, artifact, stat, progress, cancel)
+            return len(todo)
+
+    def _garbage_exceeds_live(self):
+        dead, alive = self.connection.execute(
+            "SELECT COALESCE(SUM(CASE live WHEN 0 THEN rows END), 0), "
+            "COALESCE(SUM(CASE live WHEN 1 THEN rows END), 0) FROM files").fetchone()
+        return dead > alive
+
+    def _clear(self):
+        self.connection.execute("DELETE FROM files")
+        self.connection.execute("INSERT INTO postings(postings) VALUES ('delete-all')")
+        self.connection.commit()
+
+    def _index_file(self, path, artifact, stat, progress, cancel):
+        cursor = self.connection.execute(
+            "INSERT INTO files (path, artifact, size, mtime_ns, live) VALUES (?, ?, ?, ?, 0)",
+            (path, artifact, stat.st_size, stat.st_mtime_ns))
+        base = cursor.lastrowid << OFFSET_BITS
+        rows = 0
+        batch = []
+        try:
+            with _open_csv(path) as f:
+                feed = _LineFeed(f)
+                reader = csv.reader(feed)
+                next(reader, None)
+                while True:
+                    offset = feed.offset
+                    record = next(reader, None)
+                    if record is None:
+                        break
+                    rows += 1
+                    if cancel is not None and rows % CANCEL_CHECK_EVERY == 0:
+                        cancel.check()
+                    batch.append((base | offset, record_text(record)))
+                    if len(batch) >= INSERT_BATCH:
+                        self.connection.executemany("INSERT INTO postings (rowid, text) VALUES (?, ?)", batch)
+                        if progress is not None:
+                            progress.add(rows=len(batch))
+                        batch = []
+            self.connection.executemany("INSERT INTO postings (rowid, text) VALUES (?, ?)", batch)
+            if progress is not None:
+                progress.add(rows=len(batch), items=1, nbytes=stat.st_size)
+            # The file only becomes searchable once all of it is in
+            self.connection.execute("UPDATE files SET rows = ?, live = 1 WHERE id = ?", (rows, cursor.lastrowid))
+        except BaseException:
+            # A half-indexed file stays dead; its postings are purged by the next rebuild
+            self.connection.execute("UPDATE files SET rows = ? WHERE id = ?", (rows, cursor.lastrowid))
+            raise
+        finally:
+            self.connection.commit()
+
+    def search(self, query, limit=DEFAULT_LIMIT, artifacts=None):
+        """Matching rows, in file order: [{'artifact', 'file', 'offset', 'row': {column: value}}]"""
+        fts_query = to_fts_query(query)
+        if not fts_query:
+            return []
+        with self.lock:
+            files = {file_id: (path, artifact) for file_id, path, artifact in self.connection.execute(
+                "SELECT id, path, artifact FROM files WHERE live = 1")}
+            cursor = self.connection.execute(
+                "SELECT rowid FROM postings WHERE postings MATCH ? ORDER BY rowid", (fts_query,))
+            hits = []
+            for (rowid,) in cursor:
+                file_id, offset = rowid >> OFFSET_BITS, rowid & ((1 << OFFSET_BITS) - 1)
+                if file_id not in files or (artifacts and files[file_id][1] not in artifacts):
+                    continue
+                hits.append((file_id, offset))
+                if len(hits) >= limit:
+                    break
+        results = []
+        for file_id, offset in hits:
+            path, artifact = files[file_id]
+            header, record = read_record(path, offset)
+            results.append({'artifact': artifact, 'file': path, 'offset': offset,
+                            'row': dict(zip(header, record))})
+        return results
+
+
+def update_search_index(output_folder, progress=None, cancel=None, log=print):
+    """Bring output_folder's index up to date with its run manifest. Returns the files indexed."""
+    with SearchIndex(output_folder) as index:
+        return index.update(progress, cancel, log)
+
+
+def search_case(output_folder, query, limit=DEFAULT_LIMIT, artifacts=None):
+    with SearchIndex(output_folder) as index:
+        return index.search(query, limit, artifacts)
@@ -0,0 +1,320 @@
+"""Native shellbag extraction from NTUSER.DAT / UsrClass.dat, replacing SBECmd.exe.
+
+Each BagMRU key holds numbered values with one shell item each; its subkey
+of the same number holds that folder's children. A folder's full path is its
+parent's path plus its own item name, so paths come from a memoized cache
+keyed by BagMRU key path instead of being rebuilt from the root per entry.
+
+In a triage run that also dumps the registry, the walk happens in the dump's
+child process, on the hive that process has loaded anyway
+(dump_registry_and_shellbags); the Shellbags step then only joins the
+per-hive parts (merge_shellbag_parts).
+"""
+import os
+import csv
+import uuid
+import struct
+from Registry import Registry
+
+from regparser_core import (JobCancelled, incomplete_on_cancel, open_hive, key_filetime, parse_registry_hive,
+                            CANCEL_CHECK_EVERY)
+from regparser_times import filetime_to_str, fat_datetime
+
+
+USER_HIVE_NAMES = ('NTUSER.DAT', 'USRCLASS.DAT')
+
+BAGMRU_PATHS = {
+    'NTUSER.DAT': [
+        "Software\\Microsoft\\Windows\\Shell\\BagMRU",
+        "Software\\Microsoft\\Windows\\ShellNoRoam\\BagMRU",
+    ],
+    'USRCLASS.DAT': [
+        "Local Settings\\Software\\Microsoft\\Windows\\Shell\\BagMRU",
+        "Wow6432Node\\Local Settings\\Software\\Microsoft\\Windows\\Shell\\BagMRU",
+    ],
+}
+
+KNOWN_FOLDERS = {
+    '20d04fe0-3aea-1069-a2d8-08002b30309d': 'My Computer',
+    '450d8fba-ad25-11d0-98a8-0800361b1103': 'My Documents',
+    '59031a47-3f72-44a7-89c5-5595fe6b30ee': 'Users Files',
+    '208d2c60-3aea-1069-a2d7-08002b30309d': 'My Network Places',
+    'f02c1a0d-be21-4350-88b0-7367fc96ef3c': 'Network',
+    '645ff040-5081-101b-9f08-00aa002f954e': 'Recycle Bin',
+    '21ec2020-3aea-1069-a2dd-08002b30309d': 'Control Panel',
+    '26ee0668-a00a-44d7-9371-beb064c98683': 'Control Panel',
+    '031e4825-7b94-4dc3-b131-e946b44c8dd5': 'Libraries',
+    '679f85cb-0220-4080-b29b-5540cc05aab6': 'Quick access',
+    '5e6c858f-0e22-4760-9afe-ea3317b67173': 'User Profile',
+    'b4bfcc3a-db2c-424c-b029-7fe99a87c641': 'Desktop',
+    'd3162b92-9365-467a-956b-92703aca08af': 'Documents',
+    'a8cdff1c-4878-43be-b5fd-f8091c1c60d0': 'Documents',
+    '374de290-123f-4565-9164-39c4925e467b': 'Downloads',
+    '088e3905-0323-4b02-9826-5d99428e115f': 'Downloads',
+    '1cf1260c-4dd0-4ebb-811f-33c572699fde': 'Music',
+    '3dfdf296-dbec-4fb4-81d1-6a3438bcf4de': 'Music',
+    '3add1653-eb32-4cb0-bbd7-dfa0abb5acca': 'Pictures',
+    '24ad3ad4-a569-4530-98e1-ab02f9417aa8': 'Pictures',
+    'a0953c92-50dc-43bf-be83-3742fed03c9c': 'Videos',
+    'f86fa3ab-70d2-4fc7-9c99-fcbf05467f3a': 'Videos',
+    '0db7e03f-fc29-4dc6-9020-ff41b59e513a': '3D Objects',
+    '9e3995ab-1f9c-4f13-b827-48b24b6c7174': 'User Pinned',
+    '4336a54d-038b-4685-ab02-99bb52d3fb8b': 'Public',
+}
+
+BEEF0004_SIGNATURE = b'\x04\x00\xef\xbe'
+MTP_SIGNATURE = 0x10312005
+
+SHELLBAG_COLUMNS = [
+    'Hive', 'BagMRU Key', 'Value', 'MRU Position', 'NodeSlot', 'Absolute Path', 'Shell Type',
+    'Created', 'Modified', 'Accessed', 'MFT Entry', 'MFT Sequence', 'Key Last Write',
+]
+
+
+def _guid_name(raw):
+    guid = str(uuid.UUID(bytes_le=bytes(raw)))
+    return KNOWN_FOLDERS.get(guid, '{' + guid + '}')
+
+
+def _ascii_z(data, offset):
+    end = data.find(b'\x00', offset)
+    return data[offset:end if end >= 0 else len(data)].decode('cp1252', errors='replace')
+
+
+def _utf16_z(data, offset):
+    end = offset
+    while end + 1 < len(data) and (data[end] or data[end + 1]):
+        end += 2
+    return data[offset:end].decode('utf-16-le', errors='replace')
+
+
+def _first_utf16_string(data, start, min_chars=2):
+    """First run of printable UTF-16 text at an even offset >= start; used by opaque item types"""
+    for offset in range(start, len(data) - 2 * min_chars, 2):
+        text = _utf16_z(data, offset)
+        if len(text) >= min_chars and text.isprintable():
+            return text
+    return ""
+
+
+def _beef0004(data):
+    """Long name, creation/access times and MFT reference from an 0xBEEF0004 extension block"""
+    position = data.find(BEEF0004_SIGNATURE)
+    if position < 4:
+        return None
+    start = position - 4
+    version = struct.unpack_from('<H', data, start + 2)[0]
+    info = {
+        'Created': fat_datetime(data[start + 8:start + 12]),
+        'Accessed': fat_datetime(data[start + 12:start + 16]),
+    }
+    offset = start + 18
+    if version >= 7:
+        entry_low, entry_high, sequence = struct.unpack_from('<IHH', data, start + 20)
+        info['MFT Entry'] = entry_low | entry_high << 32
+        info['MFT Sequence'] = sequence
+        offset += 18
+    if version >= 3:
+        offset += 2
+    if version >= 9:
+        offset += 4
+    if version >= 8:
+        offset += 4
+    info['name'] = _utf16_z(data, offset)
+    return info
+
+
+def decode_shell_item(data):
+    """Return (name, shell type, extra fields) for one shell item (including its size field)"""
+    class_type = data[2] if len(data) > 2 else 0
+    extra = {}
+    if class_type == 0x1F:
+        return _guid_name(data[4:20]), "Root folder", extra
+    if 0x20 <= class_type <= 0x2F:
+        name = _ascii_z(data, 3)
+        if len(name) >= 2 and name[1] == ':':
+            return name.rstrip('\\'), "Drive", extra
+        if len(data) >= 20:
+            return _guid_name(data[4:20]), "Volume", extra
+        return "Volume", "Volume", extra
+    if 0x30 <= class_type <= 0x3F:
+        extra['Modified'] = fat_datetime(data[8:12])
+        unicode = class_type & 0x04
+        name = _utf16_z(data, 14) if unicode else _ascii_z(data, 14)
+        ext = _beef0004(data)
+        if ext:
+            name = ext.pop('name') or name
+            extra.update(ext)
+        return name, "Directory" if class_type & 0x01 else "File", extra
+    if 0x40 <= class_type <= 0x4F:
+        return _ascii_z(data, 5), "Network location", extra
+    if class_type == 0x52:
+        return _first_utf16_string(data, 0x18), "Zip file contents", extra
+    if class_type == 0x71:
+        return _guid_name(data[14:30]), "Control panel", extra
+    if class_type == 0x61:
+        return _first_utf16_string(data, 8) or _ascii_z(data, 0x2C), "URI", extra
+    if len(data) >= 10 and struct.unpack_from('<I', data, 6)[0] == MTP_SIGNATURE:
+        return _first_utf16_string(data, 0x1E), "MTP", extra
+    ext = _beef0004(data)
+    if ext:
+        name = ext.pop('name')
+        extra.update(ext)
+        return name, "Delegate" if class_type == 0x74 else f"0x{class_type:02X}", extra
+    return _first_utf16_string(data, 4) or f"Unknown (0x{class_type:02X})", f"0x{class_type:02X}", extra
+
+
+def _mru_positions(key):
+    """Map value name -> position in MRUListEx (0 = most recent)"""
+    try:
+        raw = key.value("MRUListEx").value()
+    except Registry.RegistryValueNotFoundException:
+        return {}
+    positions = {}
+    for index, (slot,) in enumerate(struct.iter_unpack('<I', raw[:len(raw) - len(raw) % 4])):
+        if slot == 0xFFFFFFFF:
+            break
+        positions[str(slot)] = index
+    return positions
+
+
+def _node_slot(key):
+    try:
+        return key.value("NodeSlot").value()
+    except Registry.RegistryValueNotFoundException:
+        return ""
+
+
+def parse_shellbags_from_user_hives(hive_paths, output_csv, log=print, progress=None, cancel=None):
+    """Extract shellbags from every NTUSER.DAT / UsrClass.dat in hive_paths. Returns the row count."""
+    row_count = 0
+    with incomplete_on_cancel(output_csv), open(output_csv, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(SHELLBAG_COLUMNS)
+        for hive_path in hive_paths:
+            if os.path.basename(hive_path).upper() not in USER_HIVE_NAMES:
+                continue
+            try:
+                rows = _hive_shellbags(open_hive(hive_path), hive_path, writer, progress, cancel)
+                if rows is None:
+                    log(f"⚠️ No BagMRU key in {hive_path}")
+                else:
+                    row_count += rows
+                    log(f"✅ Shellbags parsed from {hive_path}")
+            except JobCancelled:
+                raise
+            except Exception as e:
+                log(f"❌ Shellbag parse failed for {hive_path}: {e}")
+    return row_count
+
+
+def dump_registry_and_shellbags(hive_path, registry_csv, shellbags_csv, progress=None, cancel=None):
+    """Registry dump of a user hive plus its shellbags, from one load of the hive.
+
+    Runs as the hive's registry dump (in its child process). The shellbags
+    go to shellbags_csv, a part for merge_shellbag_parts(). A failed
+    shellbag walk does not fail the dump: the part is removed and the error
+    returned, else None.
+    """
+    reg = open_hive(hive_path)
+    parse_registry_hive(hive_path, registry_csv, progress, cancel, reg=reg)
+    try:
+        with incomplete_on_cancel(shellbags_csv), open(shellbags_csv, 'w', newline='', encoding='utf-8-sig') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(SHELLBAG_COLUMNS)
+            _hive_shellbags(reg, hive_path, writer, None, cancel)
+    except JobCancelled:
+        raise
+    except Exception as e:
+        if os.path.exists(shellbags_csv):
+            os.remove(shellbags_csv)
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def merge_shellbag_parts(hive_parts, output_csv, log=print, progress=None, cancel=None):
+    """Join the parts of dump_registry_and_shellbags() into output_csv, in the order given.
+
+    hive_parts is a list of (hive path, part path). A missing part (its dump
+    failed) is skipped; the others are deleted once joined. Returns the row count.
+    """
+    row_count = 0
+    with incomplete_on_cancel(output_csv), open(output_csv, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(SHELLBAG_COLUMNS)
+        for hive_path, part in hive_parts:
+            if not os.path.exists(part):
+                log(f"⚠️ No shellbags from {hive_path}; its registry dump did not finish")
+                continue
+            rows = 0
+            with open(part, 'r', newline='', encoding='utf-8-sig') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                for row in reader:
+                    writer.writerow(row)
+                    rows += 1
+                    if cancel is not None and rows % CANCEL_CHECK_EVERY == 0:
+                        cancel.check()
+            if progress is not None:
+                progress.add(rows=rows)
+            log(f"✅ Shellbags parsed from {hive_path}" if rows else f"⚠️ No shellbags in {hive_path}")
+            row_count += rows
+    for _, part in hive_parts:
+        if os.path.exists(part):
+            os.remove(part)
+    return row_count
+
+
+def _hive_shellbags(reg, hive_path, writer, progress, cancel):
+    """Write the rows of every BagMRU tree of a loaded user hive; their count, or None without a BagMRU key"""
+    rows = None
+    for bagmru_path in BAGMRU_PATHS[os.path.basename(hive_path).upper()]:
+        try:
+            root = reg.open(bagmru_path)
+        except Registry.RegistryKeyNotFoundException:
+            continue
+        rows = (rows or 0) + _walk_bagmru(root, bagmru_path, hive_path, writer, progress, cancel)
+    return rows
+
+
+def _walk_bagmru(root, root_path, hive_path, writer, progress, cancel):
+    rows = 0
+    # BagMRU key path -> absolute path of the folder that key describes
+    path_cache = {root_path: ""}
+    stack = [(root, root_path)]
+    visited = 0
+    while stack:
+        key, key_path = stack.pop()
+        visited += 1
+        if cancel is not None and visited % CANCEL_CHECK_EVERY == 0:
+            cancel.check()
+        parent_path = path_cache[key_path]
+        positions = _mru_positions(key)
+        subkeys = {sub.name(): sub for sub in key.subkeys()}
+        key_rows = 0
+        for value in key.values():
+            slot = value.name()
+            if not slot.isdigit():
+                continue
+            data = value.value()
+            if not isinstance(data, bytes) or len(data) < 3:
+                continue
+            name, shell_type, extra = decode_shell_item(data)
+            absolute = f"{parent_path}\\{name}" if parent_path else name
+            child_path = f"{key_path}\\{slot}"
+            child = subkeys.get(slot)
+            if child is not None:
+                path_cache[child_path] = absolute
+                stack.append((child, child_path))
+            writer.writerow([
+                hive_path, key_path, slot, positions.get(slot, ''),
+                _node_slot(child) if child is not None else '', absolute, shell_type,
+                extra.get('Created', ''), extra.get('Modified', ''), extra.get('Accessed', ''),
+                extra.get('MFT Entry', ''), extra.get('MFT Sequence', ''),
+                filetime_to_str(key_filetime(child)) if child is not None else '',
+            ])
+            key_rows += 1
+        rows += key_rows
+        if progress is not None:
+            progress.add(keys=1, values=key_rows, rows=key_rows)
+    return rows
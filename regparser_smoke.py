@@ -0,0 +1,216 @@
+"""Localhost smoke test of coordinator/worker mode, including a lost worker.
+
+Runs the same synthetic case twice: once locally with regparser_cli.py, and
+once as a coordinator on 127.0.0.1 with worker nodes started from
+regparser_distributed.py. The first worker is killed (its whole process
+tree, no goodbye) while it holds a task; a second worker starts at once
+and picks the task up again once the lease of the dead one runs out. The
+distributed run must succeed and leave the same output files, byte for
+byte, as the local one (only the run manifest, which records timings and
+hosts, is left out of the comparison). Exits with status 1 otherwise.
+
+    python regparser_smoke.py
+    python regparser_smoke.py --scale large --tasks registry,usb --kill-after 3
+"""
+import os
+import re
+import sys
+import time
+import shutil
+import signal
+import socket
+import secrets
+import argparse
+import tempfile
+import subprocess
+
+from regparser_bench import prepare_case
+from regparser_distributed import LEASE_TIMEOUT
+from regparser_manifest import MANIFEST_NAME
+from regparser_synth import SCALES
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(BASE_DIR, "regparser_cli.py")
+WORKER = os.path.join(BASE_DIR, "regparser_distributed.py")
+DEFAULT_SCALE = 'medium'
+DEFAULT_TASKS = "registry,usb,usb_correlation,bluetooth,network,shellbags"
+# How long the first worker works on its task before it is killed
+DEFAULT_KILL_AFTER = 1.0
+# Upper bound for one run; a lost task only comes back after LEASE_TIMEOUT
+RUN_TIMEOUT = 1800
+POLL_INTERVAL = 0.2
+# Files every run writes differently (timings, host names)
+SKIP_COMPARE = {MANIFEST_NAME}
+# What the coordinator logs when it gives up on a worker
+LOST_PATTERN = re.compile(r"Worker worker-1 lost; requeueing (\d+) task")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start(args, log_path):
+    """Start a Python script in its own process group, output to log_path"""
+    if os.name == 'nt':
+        group_kwargs = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group_kwargs = {'start_new_session': True}
+    log_file = open(log_path, 'w', encoding='utf-8')
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    proc = subprocess.Popen([sys.executable] + args, stdout=log_file, stderr=subprocess.STDOUT, cwd=BASE_DIR,
+                            env=env, **group_kwargs)
+    proc.log_file = log_file
+    return proc
+
+
+def kill(proc):
+    """Kill proc and its children outright, as a crash or pulled cable would"""
+    if proc.poll() is None:
+        if os.name == 'nt':
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+    proc.log_file.close()
+
+
+def wait(proc, timeout=RUN_TIMEOUT):
+    try:
+        return proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill(proc)
+        return None
+    finally:
+        proc.log_file.close()
+
+
+def wait_for_task(proc, work_dir, timeout=RUN_TIMEOUT):
+    """Wait until the worker has a task folder; False if it exited or timed out first"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and proc.poll() is None:
+        if any(name.startswith("regparser_task") for name in os.listdir(work_dir)):
+            return True
+        time.sleep(POLL_INTERVAL)
+    return False
+
+
+def output_files(folder):
+    """Relative paths of the files under folder that both runs must agree on"""
+    files = set()
+    for root, _, names in os.walk(folder):
+        for name in names:
+            if name not in SKIP_COMPARE:
+                files.add(os.path.relpath(os.path.join(root, name), folder))
+    return files
+
+
+def same_bytes(first, second):
+    if os.path.getsize(first) != os.path.getsize(second):
+        return False
+    with open(first, 'rb') as a, open(second, 'rb') as b:
+        while True:
+            chunk = a.read(1024 * 1024)
+            if chunk != b.read(1024 * 1024):
+                return False
+            if not chunk:
+                return True
+
+
+def compare_outputs(local, remote):
+    """Problems found between the two output folders (empty if they match)"""
+    local_files, remote_files = output_files(local), output_files(remote)
+    problems = [f"only in the local run: {path}" for path in sorted(local_files - remote_files)]
+    problems += [f"only in the distributed run: {path}" for path in sorted(remote_files - local_files)]
+    problems += [f"differs: {path}" for path in sorted(local_files & remote_files)
+                 if not same_bytes(os.path.join(local, path), os.path.join(remote, path))]
+    problems += [f"left incomplete: {path}" for path in sorted(remote_files) if path.endswith(".incomplete")]
+    return problems
+
+
+def run_smoke(work_dir, scale=DEFAULT_SCALE, tasks=DEFAULT_TASKS, kill_after=DEFAULT_KILL_AFTER, log=print):
+    """Run the scenario under work_dir; returns the list of problems found"""
+    case = prepare_case(work_dir, scale, log=log)
+    run_dir = tempfile.mkdtemp(prefix="run_", dir=work_dir)
+    local_out, remote_out = os.path.join(run_dir, "local"), os.path.join(run_dir, "distributed")
+    common = ["--reg-folder", case['folder'], "--tasks", tasks, "--report", ""]
+
+    log(f"🔍 Local run into {local_out}")
+    started = time.monotonic()
+    code = wait(start([CLI, "--output", local_out] + common, os.path.join(run_dir, "local.log")))
+    if code != 0:
+        return [f"local run exited with {code}; see {run_dir}/local.log"]
+    log(f"✅ Local run done in {time.monotonic() - started:.1f}s")
+
+    port, token = free_port(), secrets.token_hex(8)
+    coordinator = start([CLI, "--output", remote_out, "--distribute", f"127.0.0.1:{port}", "--token", token] + common,
+                        os.path.join(run_dir, "coordinator.log"))
+    workers = []
+
+    def start_worker(name):
+        folder = os.path.join(run_dir, name)
+        os.makedirs(folder)
+        worker = start([WORKER, "--coordinator", f"http://127.0.0.1:{port}", "--token", token, "--slots", "1",
+                        "--name", name, "--work", folder], os.path.join(run_dir, f"{name}.log"))
+        workers.append(worker)
+        return worker, folder
+
+    try:
+        log(f"🛰️ Coordinator on 127.0.0.1:{port}, starting worker-1")
+        first, first_dir = start_worker("worker-1")
+        if not wait_for_task(first, first_dir):
+            return [f"worker-1 never received a task; see {run_dir}/coordinator.log and worker-1.log"]
+        time.sleep(kill_after)
+        if first.poll() is not None:
+            return ["worker-1 finished before it could be killed; use a larger --scale or a smaller --kill-after"]
+        kill(first)
+        log(f"💥 Killed worker-1 mid-task; starting worker-2 (the task returns after {LEASE_TIMEOUT:.0f}s)")
+        start_worker("worker-2")
+        started = time.monotonic()
+        code = wait(coordinator)
+        if code != 0:
+            return [f"distributed run exited with {code}; see {run_dir}/coordinator.log"]
+        log(f"✅ Distributed run done {time.monotonic() - started:.1f}s after the kill")
+        with open(os.path.join(run_dir, "coordinator.log"), encoding='utf-8') as f:
+            lost = LOST_PATTERN.search(f.read())
+        if not lost or not int(lost.group(1)):
+            return [f"the coordinator never requeued a task of worker-1; see {run_dir}/coordinator.log"]
+    finally:
+        for proc in [coordinator] + workers:
+            if not proc.log_file.closed:
+                kill(proc)
+
+    problems = compare_outputs(local_out, remote_out)
+    if not problems:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return problems
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="regparser_smoke",
+                                     description="Smoke-test coordinator/worker mode on localhost against a local run")
+    parser.add_argument("--scale", default=DEFAULT_SCALE, choices=list(SCALES), help="synthetic case scale (default: %(default)s)")
+    parser.add_argument("--tasks", default=DEFAULT_TASKS, help="comma-separated tasks (default: %(default)s)")
+    parser.add_argument("--kill-after", type=float, default=DEFAULT_KILL_AFTER,
+                        help="seconds the first worker works on its task before it is killed (default: %(default)s)")
+    parser.add_argument("--work", default=os.path.join(tempfile.gettempdir(), "regparser_smoke"),
+                        help="folder for the generated case (reused between runs) and the run outputs")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    problems = run_smoke(args.work, args.scale, args.tasks, args.kill_after)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        print(f"❌ Smoke test failed; logs and outputs are kept under {args.work}")
+        return 1
+    print("✅ Distributed output matches the local run after losing a worker mid-task")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
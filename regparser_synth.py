@@ -0,0 +1,1018 @@
+"""Synthetic registry hives for benchmarks and regression runs.
+
+Writes valid ``regf`` files of a configurable shape (key count, depth,
+fan-out, value-type mix, large binary values) plus the realistic subtrees
+the artifact extractors read: USBSTOR/USB and the volume mounts of the same
+disks across SYSTEM, SOFTWARE and NTUSER.DAT, BTHPORT devices and
+NetworkList profiles under SOFTWARE, and a BagMRU tree of folders under
+NTUSER.DAT. Prefetch files of every SCCA layout can be added too, the
+Windows 10 ones MAM-compressed with an Xpress Huffman encoder, and jump
+lists: OLE compound files with DestList versions 1, 3 and 4, and
+CustomDestinations files. Everything is derived from a seed, so the same
+arguments always produce byte-identical hives that can be shared instead
+of real evidence.
+
+    python regparser_synth.py /tmp/case --scale medium
+    python regparser_synth.py /tmp/case --keys 500000 --depth 6 --fanout 12 --usb 200
+    python regparser_synth.py /tmp/case --scale small --prefetch 40 --jumplists 10
+"""
+import os
+import sys
+import zlib
+import heapq
+import struct
+import uuid
+import random
+import argparse
+
+
+REG_SZ, REG_EXPAND_SZ, REG_BINARY, REG_DWORD, REG_MULTI_SZ, REG_QWORD = 1, 2, 3, 4, 7, 11
+# Device property values carry their DEVPROP type in the upper half of the value type
+DEVPROP_TYPE_FILETIME = 0xFFFF0010
+VALUE_TYPES = {'sz': REG_SZ, 'expand_sz': REG_EXPAND_SZ, 'binary': REG_BINARY,
+               'dword': REG_DWORD, 'multi_sz': REG_MULTI_SZ, 'qword': REG_QWORD}
+
+# 2019-04-17 18:40:00 UTC
+DEFAULT_TIMESTAMP = 132000000000000000
+# Largest data cell before a value is split into a big-data (db) segment list
+BIG_DATA_SEGMENT = 16344
+HBIN_HEADER_SIZE = 32
+BASE_BLOCK_SIZE = 4096
+# Shell items of the BagMRU tree: "My Computer" root folder and version 9 BEEF0004 extension blocks
+MY_COMPUTER_GUID = uuid.UUID("20d04fe0-3aea-1069-a2d8-08002b30309d")
+BEEF0004_VERSION = 9
+
+DEFAULT_SHAPE = {
+    'keys': 2000,
+    'depth': 5,
+    'fanout': 8,
+    'values_per_key': 3,
+    # Relative weights of the generated value types
+    'value_mix': {'sz': 5, 'dword': 3, 'binary': 2, 'qword': 1, 'multi_sz': 1, 'expand_sz': 1},
+    # Every Nth value is a large REG_BINARY of large_value_size bytes (0 disables)
+    'large_value_every': 500,
+    'large_value_size': 64 * 1024,
+}
+
+# Per-hive shape and artifact counts of the named scales used by the benchmarks
+SCALES = {
+    'small': {'keys': 2000, 'depth': 5, 'usb': 10, 'bluetooth': 5, 'networks': 10, 'files': 500, 'shellbags': 20},
+    'medium': {'keys': 50000, 'depth': 6, 'usb': 100, 'bluetooth': 25, 'networks': 100, 'files': 10000, 'shellbags': 200},
+    'large': {'keys': 500000, 'depth': 7, 'usb': 1000, 'bluetooth': 100, 'networks': 1000, 'files': 100000, 'shellbags': 2000},
+}
+
+
+class Key:
+    """An explicit registry key; generated trees hand out GeneratedKeys instead"""
+
+    def __init__(self, name, timestamp=DEFAULT_TIMESTAMP):
+        self.name = name
+        self.timestamp = timestamp
+        self.subkeys = []
+        self.values = []
+
+    def add_key(self, name, timestamp=None):
+        key = Key(name, timestamp or self.timestamp)
+        self.subkeys.append(key)
+        return key
+
+    def path(self, *names):
+        """Return the descendant at names, creating missing keys on the way"""
+        key = self
+        for name in names:
+            existing = next((k for k in key.subkeys if k.name.upper() == name.upper()), None)
+            key = existing or key.add_key(name)
+        return key
+
+    def add_value(self, name, vtype, data):
+        self.values.append((name, vtype, data))
+        return self
+
+    def children(self):
+        return self.subkeys
+
+
+class GeneratedKey:
+    """A key of a seeded random tree whose values and children are produced when written.
+
+    Only the path being written is alive at any time, so a hive with
+    millions of keys needs memory for its bytes, not for a key tree.
+    """
+
+    def __init__(self, tree, name, depth, index, extra=()):
+        self.tree = tree
+        self.name = name
+        self.depth = depth
+        self.index = index
+        self.extra = list(extra)
+        rng = random.Random(tree.seed * 1000003 + index)
+        self.timestamp = DEFAULT_TIMESTAMP + rng.randrange(10 ** 15)
+        self.child_count = tree.reserve(tree.shape['fanout']) if depth < tree.shape['depth'] else 0
+        self.values = [tree.make_value(rng) for _ in range(tree.shape['values_per_key'])]
+
+    @property
+    def subkeys(self):
+        return range(self.child_count + len(self.extra))
+
+    def children(self):
+        generated = [GeneratedKey(self.tree, f"Key{self.index:07d}_{i:03d}", self.depth + 1, self.tree.next_index())
+                     for i in range(self.child_count)]
+        return generated + self.extra
+
+
+class GeneratedTree:
+    """Shared budget and value factory of one generated tree"""
+
+    def __init__(self, shape, seed):
+        self.shape = dict(DEFAULT_SHAPE, **shape)
+        self.seed = seed
+        self.remaining = self.shape['keys'] - 1
+        self.index = 0
+        self.values_made = 0
+        mix = self.shape['value_mix']
+        self.type_names = list(mix)
+        self.type_weights = [mix[name] for name in self.type_names]
+
+    def reserve(self, wanted):
+        # Children are reserved when their parent is created, so siblings share the budget fairly
+        granted = max(0, min(wanted, self.remaining))
+        self.remaining -= granted
+        return granted
+
+    def next_index(self):
+        self.index += 1
+        return self.index
+
+    def make_value(self, rng):
+        self.values_made += 1
+        every = self.shape['large_value_every']
+        if every and self.values_made % every == 0:
+            return (f"Blob{self.values_made}", REG_BINARY, rng.randbytes(self.shape['large_value_size']))
+        type_name = rng.choices(self.type_names, self.type_weights)[0]
+        name = f"{type_name.title()}Value{self.values_made}"
+        vtype = VALUE_TYPES[type_name]
+        if vtype in (REG_SZ, REG_EXPAND_SZ):
+            data = f"C:\\Program Files\\Vendor{rng.randrange(1000)}\\app{rng.randrange(100000)}.exe"
+        elif vtype == REG_MULTI_SZ:
+            data = [f"entry{rng.randrange(10000)}" for _ in range(rng.randrange(1, 5))]
+        elif vtype == REG_DWORD:
+            data = rng.randrange(2 ** 32)
+        elif vtype == REG_QWORD:
+            data = rng.randrange(2 ** 64)
+        else:
+            data = rng.randbytes(rng.randrange(8, 256))
+        return (name, vtype, data)
+
+
+def encode_value(vtype, data):
+    if isinstance(data, bytes):
+        return data
+    if vtype in (REG_SZ, REG_EXPAND_SZ):
+        return (data + "\x00").encode("utf-16-le")
+    if vtype == REG_MULTI_SZ:
+        return ("\x00".join(data) + "\x00\x00").encode("utf-16-le")
+    if vtype == REG_DWORD:
+        return struct.pack("<I", data)
+    if vtype == REG_QWORD:
+        return struct.pack("<Q", data)
+    raise ValueError(f"Unsupported value type {vtype}")
+
+
+def lh_hash(name):
+    h = 0
+    for c in name.upper():
+        h = (h * 37 + ord(c)) & 0xFFFFFFFF
+    return h
+
+
+class HiveWriter:
+    """Cells of one hbin area; offsets are relative to the first hbin as in the regf format"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def alloc(self, payload):
+        size = (len(payload) + 4 + 7) & ~7
+        offset = len(self.data) + HBIN_HEADER_SIZE
+        self.data += struct.pack("<i", -size) + payload + b"\x00" * (size - 4 - len(payload))
+        return offset
+
+    def patch(self, offset, fmt, pos, value):
+        struct.pack_into(fmt, self.data, offset - HBIN_HEADER_SIZE + 4 + pos, value)
+
+    def write_value(self, name, vtype, data):
+        raw = encode_value(vtype, data)
+        encoded_name = name.encode("latin-1")
+        vk = bytearray(20 + len(encoded_name))
+        vk[0:2] = b"vk"
+        struct.pack_into("<H", vk, 2, len(encoded_name))
+        if len(raw) <= 4:
+            # Resident data lives in the offset field itself
+            struct.pack_into("<I", vk, 4, len(raw) | 0x80000000)
+            vk[8:8 + len(raw)] = raw
+        elif len(raw) > BIG_DATA_SEGMENT:
+            segments = [self.alloc(raw[i:i + BIG_DATA_SEGMENT]) for i in range(0, len(raw), BIG_DATA_SEGMENT)]
+            segment_list = self.alloc(b"".join(struct.pack("<I", s) for s in segments))
+            struct.pack_into("<I", vk, 4, len(raw))
+            struct.pack_into("<I", vk, 8, self.alloc(b"db" + struct.pack("<HI", len(segments), segment_list)))
+        else:
+            struct.pack_into("<I", vk, 4, len(raw))
+            struct.pack_into("<I", vk, 8, self.alloc(raw))
+        struct.pack_into("<I", vk, 12, vtype)
+        struct.pack_into("<H", vk, 16, 1)
+        vk[20:] = encoded_name
+        return self.alloc(bytes(vk))
+
+    def write_key(self, key, parent_offset=None):
+        name = key.name.encode("latin-1")
+        nk = bytearray(76 + len(name))
+        nk[0:2] = b"nk"
+        struct.pack_into("<H", nk, 2, 0x2C if parent_offset is None else 0x20)
+        struct.pack_into("<Q", nk, 4, key.timestamp)
+        struct.pack_into("<I", nk, 16, parent_offset if parent_offset is not None else 0xFFFFFFFF)
+        struct.pack_into("<I", nk, 20, len(key.subkeys))
+        for pos in (28, 32, 40, 44, 48):
+            struct.pack_into("<I", nk, pos, 0xFFFFFFFF)
+        struct.pack_into("<I", nk, 36, len(key.values))
+        struct.pack_into("<H", nk, 72, len(name))
+        nk[76:] = name
+        offset = self.alloc(bytes(nk))
+        if key.values:
+            value_offsets = [self.write_value(*value) for value in key.values]
+            self.patch(offset, "<I", 40, self.alloc(b"".join(struct.pack("<I", o) for o in value_offsets)))
+        if key.subkeys:
+            children = sorted(key.children(), key=lambda k: k.name.upper())
+            child_offsets = [self.write_key(child, offset) for child in children]
+            body = b"lh" + struct.pack("<H", len(children)) + b"".join(
+                struct.pack("<II", o, lh_hash(c.name)) for o, c in zip(child_offsets, children))
+            self.patch(offset, "<I", 28, self.alloc(body))
+        return offset
+
+
+def write_hive(root, path):
+    """Write root (a Key or GeneratedKey) and everything below it as a regf file at path"""
+    writer = HiveWriter()
+    root_offset = writer.write_key(root)
+    size = (len(writer.data) + HBIN_HEADER_SIZE + 4095) & ~4095
+    free = size - HBIN_HEADER_SIZE - len(writer.data)
+    hbin = b"hbin" + struct.pack("<II", 0, size) + b"\x00" * 8 + struct.pack("<Q", 0) + b"\x00" * 4
+    base = bytearray(BASE_BLOCK_SIZE)
+    base[0:4] = b"regf"
+    struct.pack_into("<IIQIIIIIII", base, 4, 1, 1, root.timestamp, 1, 5, 0, 1, root_offset, size, 1)
+    checksum = 0
+    for i in range(0, 508, 4):
+        checksum ^= struct.unpack_from("<I", base, i)[0]
+    struct.pack_into("<I", base, 508, checksum)
+    with open(path, "wb") as f:
+        f.write(base)
+        f.write(hbin)
+        f.write(writer.data)
+        if free:
+            f.write(struct.pack("<i", free) + b"\x00" * (free - 4))
+    return os.path.getsize(path)
+
+
+def _filetime(rng):
+    return DEFAULT_TIMESTAMP + rng.randrange(10 ** 15)
+
+
+def _systemtime(rng):
+    return struct.pack("<8H", rng.randrange(2010, 2025), rng.randrange(1, 13), 0, rng.randrange(1, 29),
+                       rng.randrange(24), rng.randrange(60), rng.randrange(60), rng.randrange(1000))
+
+
+def _guid(rng):
+    return "{%08x-%04x-%04x-%04x-%012x}" % (rng.randrange(16 ** 8), rng.randrange(16 ** 4), rng.randrange(16 ** 4),
+                                             rng.randrange(16 ** 4), rng.randrange(16 ** 12))
+
+
+def usb_device_specs(count, seed=0):
+    """Identities, volumes and times of count USB disks.
+
+    The SYSTEM, SOFTWARE and NTUSER.DAT traces of a case are all written from
+    the same specs, so they correlate the way a real machine's would.
+    """
+    rng = random.Random(seed)
+    devices = []
+    for i in range(count):
+        vendor, product = f"Vendor{rng.randrange(50)}", f"Disk{rng.randrange(200)}"
+        first_install = _filetime(rng)
+        last_arrival = first_install + rng.randrange(10 ** 14)
+        devices.append({
+            'vendor': vendor, 'product': product,
+            'device_id': f"Disk&Ven_{vendor}&Prod_{product}&Rev_1.00",
+            'serial': f"{rng.randrange(16 ** 12):012X}{i:04d}",
+            'vid': f"{rng.randrange(16 ** 4):04X}", 'pid': f"{rng.randrange(16 ** 4):04X}",
+            'prefix': f"7&{rng.randrange(16 ** 8):08x}&0",
+            'volume': _guid(rng),
+            # Only the last device mounted on a letter still holds it
+            'letter': f"{chr(ord('E') + i % 22)}:" if i + 22 >= count else "",
+            'label': f"USB_{i}",
+            'volume_serial': rng.randrange(2 ** 32),
+            'first_install': first_install,
+            'last_arrival': last_arrival,
+            'last_removal': last_arrival + rng.randrange(1, 10 ** 11),
+            'user_mount': last_arrival + rng.randrange(10 ** 9) if i % 4 != 3 else 0,
+            # Older volumes point MountedDevices at the RemovableMedia ParentIdPrefix instead
+            'removable_media': i % 3 == 0,
+        })
+    return devices
+
+
+def _usbstor_path(device):
+    return f"USBSTOR#{device['device_id']}#{device['serial']}&0"
+
+
+def add_usb_devices(root, devices, rng):
+    """USBSTOR disks, matching USB\\VID_&PID_ entries, disk interfaces and volume mounts of a SYSTEM hive"""
+    root.path("Select").add_value("Current", REG_DWORD, 1)
+    (root.path("ControlSet001", "Control", "ComputerName", "ComputerName")
+         .add_value("ComputerName", REG_SZ, "SYNTHETIC-PC"))
+    enum = root.path("ControlSet001", "Enum")
+    interfaces = root.path("ControlSet001", "Control", "DeviceClasses", "{53f56307-b6bf-11d0-94f2-00a0c91efb8b}")
+    mounted = root.path("MountedDevices")
+    for i, spec in enumerate(devices):
+        vendor, product = spec['vendor'], spec['product']
+        disk = enum.path("USBSTOR", spec['device_id'], f"{spec['serial']}&0")
+        disk.timestamp = spec['last_arrival']
+        (disk.add_value("DeviceDesc", REG_SZ, "@disk.inf,%disk_devdesc%;Disk drive")
+             .add_value("FriendlyName", REG_SZ, f"{vendor} {product} USB Device")
+             .add_value("Service", REG_SZ, "disk")
+             .add_value("ClassGUID", REG_SZ, "{4d36e967-e325-11ce-bfc1-08002be10318}")
+             .add_value("HardwareID", REG_MULTI_SZ, [f"USBSTOR\\Disk{vendor}{product}", "GenDisk"])
+             .add_value("CompatibleIDs", REG_MULTI_SZ, ["USBSTOR\\Disk", "USBSTOR\\RAW"])
+             .add_value("Driver", REG_SZ, f"{{4d36e967-e325-11ce-bfc1-08002be10318}}\\{i:04d}")
+             .add_value("Mfg", REG_SZ, "@disk.inf,%genmanufacturer%;(Standard disk drives)")
+             .add_value("ParentIdPrefix", REG_SZ, spec['prefix']))
+        properties = disk.path("Properties", "{83da6326-97a6-4088-9453-a1923f573b29}")
+        for name, field in (("0064", 'first_install'), ("0066", 'last_arrival'), ("0067", 'last_removal')):
+            properties.path(name).add_value("", DEVPROP_TYPE_FILETIME, struct.pack("<Q", spec[field]))
+        device = enum.path("USB", f"VID_{spec['vid']}&PID_{spec['pid']}", spec['serial'])
+        device.timestamp = spec['last_arrival']
+        (device.add_value("DeviceDesc", REG_SZ, "USB Mass Storage Device")
+               .add_value("Service", REG_SZ, "USBSTOR")
+               .add_value("LocationInformation", REG_SZ, f"Port_#{rng.randrange(1, 9):04d}.Hub_#0001"))
+        interfaces.add_key(f"##?#{_usbstor_path(spec)}#{{53f56307-b6bf-11d0-94f2-00a0c91efb8b}}", spec['last_arrival'])
+        if spec['removable_media']:
+            target = f"\\??\\STORAGE#RemovableMedia#{spec['prefix']}&RM#{{53f5630d-b6bf-11d0-94f2-00a0c91efb8b}}"
+        else:
+            target = f"_??_{_usbstor_path(spec)}#{{53f56307-b6bf-11d0-94f2-00a0c91efb8b}}"
+        target = target.encode("utf-16-le")
+        mounted.add_value(f"\\??\\Volume{spec['volume']}", REG_BINARY, target)
+        if spec['letter']:
+            mounted.add_value(f"\\DosDevices\\{spec['letter']}", REG_BINARY, target)
+
+
+def add_usb_volumes(root, devices, rng):
+    """Windows Portable Devices and EMDMgmt entries of a SOFTWARE hive for the same disks"""
+    portable = root.path("Microsoft", "Windows Portable Devices", "Devices")
+    emdmgmt = root.path("Microsoft", "Windows NT", "CurrentVersion", "EMDMgmt")
+    for spec in devices:
+        name = f"WPDBUSENUMROOT#UMB#2&37C186B&{rng.randrange(1, 4)}&STORAGE#VOLUME#_??_{_usbstor_path(spec)}#".upper()
+        portable.add_key(name, spec['first_install']).add_value("FriendlyName", REG_SZ, spec['label'])
+        name = (f"_??_{_usbstor_path(spec)}#{{53f56307-b6bf-11d0-94f2-00a0c91efb8b}}"
+                f"{spec['label']}_{spec['volume_serial']}")
+        (emdmgmt.add_key(name, spec['first_install'])
+                .add_value("LastTestedTime", REG_QWORD, 0)
+                .add_value("CacheSizeInMB", REG_DWORD, 0))
+
+
+def add_usb_mount_points(root, devices, rng):
+    """Explorer MountPoints2 keys of an NTUSER.DAT for the volumes its user opened"""
+    mount_points = root.path("Software", "Microsoft", "Windows", "CurrentVersion", "Explorer", "MountPoints2")
+    for spec in devices:
+        if spec['user_mount']:
+            mount_points.add_key(spec['volume'], spec['user_mount'])
+
+
+# Hive name -> the USB traces written into it
+USB_TRACES = {'SYSTEM': add_usb_devices, 'SOFTWARE': add_usb_volumes, 'NTUSER.DAT': add_usb_mount_points}
+
+
+def add_bluetooth_devices(root, count, rng):
+    devices = root.path("ControlSet001", "Services", "BTHPORT", "Parameters", "Devices")
+    for _ in range(count):
+        device = devices.add_key(f"{rng.randrange(16 ** 12):012x}", _filetime(rng))
+        (device.add_value("Name", REG_BINARY, f"Headset {rng.randrange(1000)}".encode("utf-8") + b"\x00")
+               .add_value("COD", REG_DWORD, rng.choice([0x240404, 0x5a020c, 0x2c0100, 0x240418]))
+               .add_value("LastSeen", REG_QWORD, _filetime(rng))
+               .add_value("LastConnected", REG_QWORD, _filetime(rng)))
+
+
+def add_network_profiles(root, count, rng):
+    profiles = root.path("Microsoft", "Windows NT", "CurrentVersion", "NetworkList", "Profiles")
+    for i in range(count):
+        guid = "{%08X-%04X-%04X-%04X-%012X}" % (rng.randrange(16 ** 8), rng.randrange(16 ** 4), rng.randrange(16 ** 4),
+                                                 rng.randrange(16 ** 4), rng.randrange(16 ** 12))
+        profile = profiles.add_key(guid, _filetime(rng))
+        (profile.add_value("ProfileName", REG_SZ, f"Network {i}")
+                .add_value("Description", REG_SZ, f"Wi-Fi {rng.randrange(10000)}")
+                .add_value("DateCreated", REG_BINARY, _systemtime(rng))
+                .add_value("DateLastConnected", REG_BINARY, _systemtime(rng))
+                .add_value("Managed", REG_DWORD, rng.randrange(2))
+                .add_value("Category", REG_DWORD, rng.randrange(3)))
+
+
+def _fat_datetime(rng):
+    date = (rng.randrange(30, 45) << 9) | (rng.randrange(1, 13) << 5) | rng.randrange(1, 29)
+    time = (rng.randrange(24) << 11) | (rng.randrange(60) << 5) | rng.randrange(30)
+    return struct.pack("<HH", date, time)
+
+
+def _shell_item(class_type, body):
+    """A shell item as a BagMRU value stores it: size field, class type, body and the 0 terminator"""
+    return struct.pack("<HB", len(body) + 3, class_type) + body + b"\x00\x00"
+
+
+def _directory_item(name, rng):
+    """An 0x31 directory item with its short name and an BEEF0004 block holding the long name"""
+    short = name.upper().replace(" ", "")[:8].encode("ascii") + b"\x00"
+    short += b"\x00" * (len(short) % 2)
+    long_name = name.encode("utf-16-le") + b"\x00\x00"
+    ext = (struct.pack("<HI", BEEF0004_VERSION, 0xBEEF0004) + _fat_datetime(rng) + _fat_datetime(rng)
+           + struct.pack("<HH", 0x2E, 0) + struct.pack("<IHH", rng.randrange(2 ** 32), 0, rng.randrange(1, 9))
+           + b"\x00" * 8 + struct.pack("<HII", 0, 0, 0) + long_name)
+    ext = struct.pack("<H", len(ext) + 4) + ext + struct.pack("<H", 14 + len(short))
+    body = b"\x00" + struct.pack("<I", 0) + _fat_datetime(rng) + struct.pack("<H", 0x10) + short
+    return _shell_item(0x31, body + ext)
+
+
+def _add_bag(key, item, slots):
+    """Store item as the next numbered value of key and return its subkey, numbered after the NodeSlot"""
+    name = str(sum(1 for value in key.values if value[0].isdigit()))
+    key.add_value(name, REG_BINARY, item)
+    child = key.add_key(name)
+    child.add_value("NodeSlot", REG_DWORD, len(slots) + 1)
+    slots.append(child)
+    return child
+
+
+def _add_mru_lists(key):
+    """MRUListEx of key and its descendants, the last added entry most recent"""
+    numbers = [int(value[0]) for value in key.values if value[0].isdigit()]
+    if numbers:
+        key.add_value("MRUListEx", REG_BINARY, struct.pack(f"<{len(numbers) + 1}I", *reversed(numbers), 0xFFFFFFFF))
+    for child in key.subkeys:
+        _add_mru_lists(child)
+
+
+def add_shellbags(root, count, rng):
+    """A BagMRU tree of an NTUSER.DAT: My Computer, C: and count folders nested below it"""
+    bagmru = root.path("Software", "Microsoft", "Windows", "Shell", "BagMRU")
+    slots = []
+    computer = _add_bag(bagmru, _shell_item(0x1F, b"\x50" + MY_COMPUTER_GUID.bytes_le), slots)
+    folders = [_add_bag(computer, _shell_item(0x2F, b"C:\\".ljust(22, b"\x00")), slots)]
+    for i in range(count):
+        parent = rng.choice(folders)
+        folders.append(_add_bag(parent, _directory_item(f"Folder {i}", rng), slots))
+    _add_mru_lists(bagmru)
+
+
+def generate_hive(path, shape=None, seed=0, usb=0, bluetooth=0, networks=0, root_name="ROOT",
+                  usb_hive='SYSTEM', usb_seed=None, shellbags=0):
+    """Write a hive with a generated tree of shape plus the requested artifact subtrees. Returns its size.
+
+    usb devices are written as the traces a usb_hive (a USB_TRACES name) holds;
+    hives given the same usb_seed describe the same devices.
+    """
+    rng = random.Random(seed)
+    artifacts = Key("artifacts")
+    if usb:
+        devices = usb_device_specs(usb, seed if usb_seed is None else usb_seed)
+        USB_TRACES[usb_hive](artifacts, devices, rng)
+    if bluetooth:
+        add_bluetooth_devices(artifacts, bluetooth, rng)
+    if networks:
+        add_network_profiles(artifacts, networks, rng)
+    if shellbags:
+        add_shellbags(artifacts, shellbags, rng)
+    tree = GeneratedTree(shape or {}, seed)
+    root = GeneratedKey(tree, root_name, 0, 0, extra=artifacts.subkeys)
+    return write_hive(root, path)
+
+
+def add_filler_files(folder, count, seed=0, per_folder=200):
+    """Write count small non-hive files (documents, logs, extensionless stubs) spread over subfolders"""
+    rng = random.Random(seed)
+    extensions = ['.txt', '.log', '.dll', '.ini', '.lnk', '']
+    for i in range(count):
+        sub = os.path.join(folder, "Files", f"dir{i // per_folder:04d}")
+        if i % per_folder == 0:
+            os.makedirs(sub, exist_ok=True)
+        # Extensionless files stay below find_hives' size threshold, so only the hives match
+        with open(os.path.join(sub, f"file{i:06d}{rng.choice(extensions)}"), "wb") as f:
+            f.write(rng.randbytes(rng.randrange(16, 2048)))
+
+
+def generate_case(folder, scale='small', seed=0):
+    """Write SYSTEM, SOFTWARE, a user's NTUSER.DAT and filler files of a named scale under folder.
+
+    Returns the hive paths.
+    """
+    counts = SCALES[scale]
+    config = os.path.join(folder, "Windows", "System32", "config")
+    profile = os.path.join(folder, "Users", "synthetic")
+    os.makedirs(config, exist_ok=True)
+    os.makedirs(profile, exist_ok=True)
+    paths = {
+        'SYSTEM': os.path.join(config, "SYSTEM"),
+        'SOFTWARE': os.path.join(config, "SOFTWARE"),
+        'NTUSER.DAT': os.path.join(profile, "NTUSER.DAT"),
+    }
+    shape = {'keys': counts['keys'], 'depth': counts['depth']}
+    generate_hive(paths['SYSTEM'], shape, seed, usb=counts['usb'], bluetooth=counts['bluetooth'], usb_seed=seed)
+    generate_hive(paths['SOFTWARE'], shape, seed + 1, usb=counts['usb'], networks=counts['networks'],
+                  usb_hive='SOFTWARE', usb_seed=seed)
+    generate_hive(paths['NTUSER.DAT'], dict(shape, keys=max(counts['keys'] // 4, 1)), seed + 2,
+                  usb=counts['usb'], usb_hive='NTUSER.DAT', usb_seed=seed, shellbags=counts['shellbags'])
+    add_filler_files(folder, counts['files'], seed)
+    return paths
+
+
+# -- prefetch ------------------------------------------------------------------
+
+# Offset of the metrics array, which is also where the file information of each version ends.
+# Windows 10 writes 0x128 or 0x130; the parser tells the layouts apart by it
+PREFETCH_METRICS_OFFSETS = {17: 0x98, 23: 0xF0, 26: 0x130, 30: 0x130}
+PREFETCH_VOLUME_ENTRY_SIZES = {17: 40, 23: 104, 26: 104, 30: 96}
+XPRESS_BLOCK = 65536
+XPRESS_MAX_CODE_LENGTH = 15
+XPRESS_MAX_OFFSET = 65535
+XPRESS_END_OF_STREAM = 256
+MAM_SIGNATURE = b"MAM"
+COMPRESSION_FORMAT_XPRESS_HUFF = 4
+
+
+def prefetch_spec(rng, index=0):
+    """Fields of one synthetic prefetch file, as the parser reports them (times as FILETIMEs)"""
+    executable = f"PROGRAM{index}.EXE"
+    run_times = sorted((_filetime(rng) for _ in range(rng.randrange(1, 9))), reverse=True)
+    folder = f"\\VOLUME{{01d0{rng.randrange(16 ** 12):012x}-{rng.randrange(16 ** 8):08x}}}"
+    directories = [f"{folder}\\WINDOWS", f"{folder}\\WINDOWS\\SYSTEM32", f"{folder}\\PROGRAM FILES\\APP{index}"]
+    return {
+        'executable': executable,
+        'hash': rng.randrange(2 ** 32),
+        'run_count': len(run_times) + rng.randrange(100),
+        'run_times': run_times,
+        'files_loaded': [f"{directories[1]}\\NTDLL.DLL", f"{directories[1]}\\KERNEL32.DLL",
+                         f"{directories[2]}\\{executable}"]
+                        + [f"{directories[2]}\\LIB{i}.DLL" for i in range(rng.randrange(20))],
+        'volumes': [{'name': folder, 'serial': rng.randrange(2 ** 32), 'created': _filetime(rng),
+                     'directories': directories}],
+    }
+
+
+def _utf16z(text):
+    return text.encode("utf-16-le") + b"\x00\x00"
+
+
+def prefetch_scca(version, spec, metrics_offset=None):
+    """Uncompressed SCCA bytes of a prefetch file of version 17, 23, 26 or 30 holding spec.
+
+    Metrics and trace chains are left empty; the parser does not read them.
+    """
+    metrics_offset = metrics_offset or PREFETCH_METRICS_OFFSETS[version]
+    info = bytearray(metrics_offset - 84)
+    run_times = spec['run_times'][:1] if version in (17, 23) else spec['run_times'][:8]
+    struct.pack_into(f"<{len(run_times)}Q", info, (120 if version == 17 else 128) - 84, *run_times)
+    if version == 17:
+        run_count_at = 144
+    elif version == 23:
+        run_count_at = 152
+    else:
+        run_count_at = 200 if metrics_offset == 0x128 else 208
+    struct.pack_into("<I", info, run_count_at - 84, spec['run_count'])
+
+    strings = b"".join(_utf16z(name) for name in spec['files_loaded'])
+    strings_offset = metrics_offset
+    volumes_offset = strings_offset + len(strings)
+    entry_size = PREFETCH_VOLUME_ENTRY_SIZES[version]
+    entries = bytearray(entry_size * len(spec['volumes']))
+    data = bytearray()
+    for index, volume in enumerate(spec['volumes']):
+        path_offset = len(entries) + len(data)
+        data += _utf16z(volume['name'])
+        dirs_offset = len(entries) + len(data)
+        for name in volume['directories']:
+            data += struct.pack("<H", len(name)) + _utf16z(name)
+        struct.pack_into("<IIQIIIII", entries, index * entry_size, path_offset, len(volume['name']),
+                         volume['created'], volume['serial'], 0, 0, dirs_offset, len(volume['directories']))
+    volumes = bytes(entries + data)
+
+    # The file information starts with the section offsets and counts
+    struct.pack_into("<9I", info, 0, metrics_offset, 0, metrics_offset, 0, strings_offset, len(strings),
+                     volumes_offset, len(spec['volumes']), len(volumes))
+    size = volumes_offset + len(volumes)
+    header = struct.pack("<I4sII60sII", version, b"SCCA", 0x11 if version == 17 else 0x0F, size,
+                         spec['executable'].encode("utf-16-le")[:58], spec['hash'], 0)
+    return header + bytes(info) + strings + volumes
+
+
+def _huffman_lengths(counts):
+    """Code lengths of at most XPRESS_MAX_CODE_LENGTH bits for the symbol counts; unused symbols get 0"""
+    while True:
+        heap = [(count, symbol, (symbol,)) for symbol, count in enumerate(counts) if count]
+        if len(heap) == 1:
+            # A lone symbol still needs a one-bit code
+            spare = 1 if heap[0][1] == 0 else 0
+            heap.append((0, spare, (spare,)))
+        heapq.heapify(heap)
+        lengths = [0] * len(counts)
+        node = len(counts)
+        while len(heap) > 1:
+            first, second = heapq.heappop(heap), heapq.heappop(heap)
+            for symbol in first[2] + second[2]:
+                lengths[symbol] += 1
+            heapq.heappush(heap, (first[0] + second[0], node, first[2] + second[2]))
+            node += 1
+        if max(lengths) <= XPRESS_MAX_CODE_LENGTH:
+            return lengths
+        # Flatten the distribution until the longest code fits
+        counts = [(count + 1) // 2 for count in counts]
+
+
+def _canonical_codes(lengths):
+    """Codes in the order the decoder fills its table: by length, then by symbol"""
+    codes = [0] * len(lengths)
+    position = 0
+    for symbol in sorted((s for s in range(len(lengths)) if lengths[s]), key=lambda s: (lengths[s], s)):
+        codes[symbol] = position >> (XPRESS_MAX_CODE_LENGTH - lengths[symbol])
+        position += 1 << (XPRESS_MAX_CODE_LENGTH - lengths[symbol])
+    return codes
+
+
+class _BitWriter:
+    """MS-XCA bit output: 16-bit little-endian words, most significant bit first.
+
+    Two words are reserved ahead of the bytes written directly (long match
+    lengths), which is where the decoder expects them.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.slots = [len(out), len(out) + 2]
+        out += bytes(4)
+        self.bits = 0
+        self.free = 16
+
+    def write(self, count, value):
+        if count <= self.free:
+            self.bits = self.bits << count | value
+            self.free -= count
+            return
+        count -= self.free
+        struct.pack_into("<H", self.out, self.slots[0], (self.bits << self.free | value >> count) & 0xFFFF)
+        self.slots = [self.slots[1], len(self.out)]
+        self.out += bytes(2)
+        self.free = 16 - count
+        self.bits = value & ((1 << count) - 1)
+
+    def flush(self):
+        struct.pack_into("<H", self.out, self.slots[0], (self.bits << self.free) & 0xFFFF)
+
+
+def _longest_match(data, pos, end, chains, tries=16):
+    """(length, offset) of the longest earlier match for data[pos:end], (0, 0) if none; records pos"""
+    key = data[pos:pos + 3]
+    candidates = chains.setdefault(key, [])
+    best = (0, 0)
+    limit = min(end - pos, XPRESS_BLOCK)
+    for candidate in reversed(candidates[-tries:]):
+        offset = pos - candidate
+        if offset > XPRESS_MAX_OFFSET:
+            break
+        length = 0
+        while length < limit and data[candidate + length] == data[pos + length]:
+            length += 1
+        if length > best[0]:
+            best = (length, offset)
+    candidates.append(pos)
+    return best if best[0] >= 3 else (0, 0)
+
+
+def xpress_huffman_compress(data):
+    """MS-XCA LZ77+Huffman stream of data, as RtlCompressBuffer writes it for Windows 10 prefetch.
+
+    Greedy matches, a new Huffman table for every 64 KiB of output and the
+    end-of-stream symbol after the last block.
+    """
+    out = bytearray()
+    chains = {}
+    blocks = range(0, len(data), XPRESS_BLOCK) if data else [0]
+    for block_start in blocks:
+        block_end = min(block_start + XPRESS_BLOCK, len(data))
+        tokens = []
+        counts = [0] * 512
+        pos = block_start
+        while pos < block_end:
+            length, offset = _longest_match(data, pos, block_end, chains)
+            if not length:
+                tokens.append((data[pos], 0, 0))
+                counts[data[pos]] += 1
+                pos += 1
+                continue
+            symbol = 256 + ((offset.bit_length() - 1) << 4) + min(length - 3, 15)
+            tokens.append((symbol, length, offset))
+            counts[symbol] += 1
+            for skipped in range(pos + 1, min(pos + length, len(data) - 2)):
+                chains.setdefault(data[skipped:skipped + 3], []).append(skipped)
+            pos += length
+        if block_end == len(data):
+            tokens.append((XPRESS_END_OF_STREAM, 0, 0))
+            counts[XPRESS_END_OF_STREAM] += 1
+        lengths = _huffman_lengths(counts)
+        codes = _canonical_codes(lengths)
+        out += bytes(lengths[i] | lengths[i + 1] << 4 for i in range(0, 512, 2))
+        writer = _BitWriter(out)
+        for symbol, length, offset in tokens:
+            writer.write(lengths[symbol], codes[symbol])
+            if not length:
+                continue
+            extra = length - 3
+            if extra >= 15:
+                if extra - 15 < 255:
+                    out.append(extra - 15)
+                else:
+                    out += struct.pack("<BH", 255, extra)
+            offset_bits = offset.bit_length() - 1
+            writer.write(offset_bits, offset - (1 << offset_bits))
+        writer.flush()
+    return bytes(out)
+
+
+def mam_compress(scca, crc=False):
+    """Wrap SCCA bytes in the MAM container of Windows 10+ prefetch files"""
+    payload = xpress_huffman_compress(scca)
+    if not crc:
+        return struct.pack("<3sBI", MAM_SIGNATURE, COMPRESSION_FORMAT_XPRESS_HUFF, len(scca)) + payload
+    header = struct.pack("<3sBII", MAM_SIGNATURE, COMPRESSION_FORMAT_XPRESS_HUFF | 0x80, len(scca), 0)
+    return header[:8] + struct.pack("<I", zlib.crc32(header + payload)) + payload
+
+
+def add_prefetch_files(folder, count, seed=0):
+    """Write count .pf files under folder, cycling through the versions; version 30 files are MAM-compressed.
+
+    Returns {path: spec}.
+    """
+    rng = random.Random(seed)
+    versions = sorted(PREFETCH_METRICS_OFFSETS)
+    os.makedirs(folder, exist_ok=True)
+    specs = {}
+    for i in range(count):
+        spec = prefetch_spec(rng, i)
+        version = versions[i % len(versions)]
+        data = prefetch_scca(version, spec)
+        if version >= 30:
+            data = mam_compress(data, crc=i % 2 == 1)
+        path = os.path.join(folder, f"{spec['executable']}-{spec['hash']:08X}.pf")
+        with open(path, "wb") as f:
+            f.write(data)
+        specs[path] = spec
+    return specs
+
+
+# -- jump lists ----------------------------------------------------------------
+
+CFB_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+CFB_SECTOR_SIZE = 512
+CFB_MINI_SECTOR_SIZE = 64
+# Streams below this size live in the mini stream
+CFB_MINI_CUTOFF = 4096
+CFB_FREE, CFB_END_OF_CHAIN, CFB_FAT_SECTOR = 0xFFFFFFFF, 0xFFFFFFFE, 0xFFFFFFFD
+CFB_NO_STREAM = 0xFFFFFFFF
+CFB_STREAM, CFB_ROOT = 2, 5
+LNK_CLSID = uuid.UUID("00021401-0000-0000-c000-000000000046")
+LNK_FLAGS = 0x01 | 0x02 | 0x04 | 0x80  # IDList, LinkInfo, Name, Unicode
+TRACKER_BLOCK_SIGNATURE = 0xA0000003
+CUSTOM_DESTINATIONS_FOOTER = 0xBABFFBAB
+# 100 ns intervals from 1582-10-15, where version 1 UUID time starts, to the FILETIME epoch
+UUID_FILETIME_OFFSET = 0x146BF33E42C000
+
+
+def _chain(fat, first, count):
+    """Link count sectors from first in fat; returns first (or the end-of-chain mark when count is 0)"""
+    for sector in range(first, first + count):
+        fat[sector] = sector + 1 if sector + 1 < first + count else CFB_END_OF_CHAIN
+    return first if count else CFB_END_OF_CHAIN
+
+
+def _sectors(size, sector_size):
+    return -(-size // sector_size)
+
+
+def _directory_entry(name, entry_type, start, size, right=CFB_NO_STREAM, child=CFB_NO_STREAM):
+    encoded = _utf16z(name) if name else b""
+    return struct.pack("<64sHBBIII16sIQQIQ", encoded, len(encoded), entry_type, 1, CFB_NO_STREAM, right, child,
+                       bytes(16), 0, 0, 0, start, size)
+
+
+def compound_file(streams):
+    """A version 3 OLE compound file (512-byte sectors) holding streams, {name: bytes}, in its root storage.
+
+    Streams below CFB_MINI_CUTOFF bytes go to the mini stream, as Windows stores them.
+    """
+    # Siblings must be ordered by name length, then upper-cased name; a right-leaning chain is a valid tree
+    names = sorted(streams, key=lambda name: (len(name), name.upper()))
+    large = [name for name in names if len(streams[name]) >= CFB_MINI_CUTOFF]
+    ministream = bytearray()
+    minifat = []
+    starts = {}
+    for name in names:
+        if name in large:
+            continue
+        count = _sectors(len(streams[name]), CFB_MINI_SECTOR_SIZE)
+        minifat += [0] * count
+        starts[name] = _chain(minifat, len(minifat) - count, count)
+        ministream += streams[name].ljust(count * CFB_MINI_SECTOR_SIZE, b"\x00")
+
+    sectors = []
+    fat = []
+
+    def allocate(data):
+        count = _sectors(len(data), CFB_SECTOR_SIZE)
+        fat.extend([0] * count)
+        sectors.append(bytes(data).ljust(count * CFB_SECTOR_SIZE, b"\x00"))
+        return _chain(fat, len(fat) - count, count)
+
+    for name in large:
+        starts[name] = allocate(streams[name])
+    ministream_start = allocate(ministream)
+    minifat += [CFB_FREE] * (-len(minifat) % (CFB_SECTOR_SIZE // 4))
+    minifat_bytes = struct.pack(f"<{len(minifat)}I", *minifat)
+    minifat_start = allocate(minifat_bytes)
+    directory = _directory_entry("Root Entry", CFB_ROOT, ministream_start, len(ministream), child=1 if names else CFB_NO_STREAM)
+    for index, name in enumerate(names):
+        right = index + 2 if index + 1 < len(names) else CFB_NO_STREAM
+        directory += _directory_entry(name, CFB_STREAM, starts[name], len(streams[name]), right=right)
+    # Unused entries of the last directory sector
+    directory += _directory_entry("", 0, 0, 0) * (-(len(names) + 1) % (CFB_SECTOR_SIZE // 128))
+    directory_start = allocate(directory)
+
+    fat_count = _sectors(len(fat), CFB_SECTOR_SIZE // 4)
+    while _sectors(len(fat) + fat_count, CFB_SECTOR_SIZE // 4) > fat_count:
+        fat_count += 1
+    if fat_count > 109:
+        raise ValueError("compound file too large for a header-only DIFAT")
+    fat_start = len(fat)
+    fat += [CFB_FAT_SECTOR] * fat_count
+    fat += [CFB_FREE] * (fat_count * CFB_SECTOR_SIZE // 4 - len(fat))
+    difat = list(range(fat_start, fat_start + fat_count)) + [CFB_FREE] * (109 - fat_count)
+
+    header = struct.pack("<8s16sHHHHH6sIIIIIIIII109I", CFB_SIGNATURE, bytes(16), 0x3E, 3, 0xFFFE, 9, 6, bytes(6),
+                         0, fat_count, directory_start, 0, CFB_MINI_CUTOFF, minifat_start,
+                         _sectors(len(minifat_bytes), CFB_SECTOR_SIZE), CFB_END_OF_CHAIN, 0, *difat)
+    return header + b"".join(sectors) + struct.pack(f"<{len(fat)}I", *fat)
+
+
+def _droid(timestamp, node, clock_sequence):
+    """A version 1 UUID (file droid) of a 100 ns timestamp since 1582-10-15 and a MAC address"""
+    return uuid.UUID(fields=(timestamp & 0xFFFFFFFF, timestamp >> 32 & 0xFFFF, timestamp >> 48 & 0x0FFF | 0x1000,
+                             0x80 | clock_sequence >> 8 & 0x3F, clock_sequence & 0xFF, node))
+
+
+def jump_list_entries(rng, count):
+    """Entries of a synthetic jump list: what the DestList and each LNK stream say about one target"""
+    entries = []
+    for number in range(1, count + 1):
+        name = f"Document {rng.randrange(10000)}.docx"
+        entries.append({
+            'entry_number': number,
+            'path': f"C:\\Users\\synthetic\\Documents\\{name}",
+            'name': name,
+            'hostname': f"synthetic-pc{rng.randrange(10)}",
+            'modified': _filetime(rng),
+            'pinned': rng.randrange(4) == 0,
+            'interaction_count': rng.randrange(1, 50),
+            'droid_time': _filetime(rng) + UUID_FILETIME_OFFSET,
+            'mac': rng.randrange(2 ** 48),
+            'created': _filetime(rng), 'accessed': _filetime(rng), 'written': _filetime(rng),
+            'size': rng.randrange(2 ** 24),
+            'serial': rng.randrange(2 ** 32),
+            'label': "OS",
+        })
+    return entries
+
+
+def lnk(entry):
+    """A Shell Link of entry with an empty IDList (just its terminator), a local-path LinkInfo, a Name and a tracker block"""
+    label, path = entry['label'].encode("cp1252") + b"\x00", entry['path'].encode("cp1252") + b"\x00"
+    volume = struct.pack("<4I", 16 + len(label), 3, entry['serial'], 16) + label
+    link_info = struct.pack("<7I", 28 + len(volume) + len(path) + 1, 28, 1, 28, 28 + len(volume), 0,
+                            28 + len(volume) + len(path)) + volume + path + b"\x00"
+    name = entry['name'].encode("utf-16-le")
+    tracker = struct.pack("<IIII16s", 0x60, TRACKER_BLOCK_SIGNATURE, 0x58, 0, entry['hostname'].encode("ascii")[:15])
+    tracker += _droid(entry['droid_time'], entry['mac'], 1).bytes_le * 2 + bytes(32)
+    return (struct.pack("<I16sIIQQQIIIH10s", 0x4C, LNK_CLSID.bytes_le, LNK_FLAGS, 0x20, entry['created'],
+                        entry['accessed'], entry['written'], entry['size'], 0, 1, 0, bytes(10))
+            + struct.pack("<H", 2) + bytes(2) + link_info + struct.pack("<H", len(entry['name'])) + name
+            + tracker + struct.pack("<I", 0))
+
+
+def destlist(entries, version):
+    """A DestList stream: the Windows 7 layout for version 1, the Windows 10 one for versions 3 and 4"""
+    data = bytearray(struct.pack("<IIIfQQ", version, len(entries), sum(e['pinned'] for e in entries), 0,
+                                 entries[-1]['entry_number'] if entries else 0, len(entries)))
+    for entry in entries:
+        droid = _droid(entry['droid_time'], entry['mac'], 1).bytes_le
+        data += struct.pack("<Q16s16s16s16s16sIIfQi", 0, droid, droid, droid, droid,
+                            entry['hostname'].encode("ascii")[:15], entry['entry_number'], 0, 1.0,
+                            entry['modified'], 0 if entry['pinned'] else -1)
+        path = entry['path'].encode("utf-16-le")
+        if version == 1:
+            data += struct.pack("<H", len(entry['path'])) + path
+        else:
+            data += (struct.pack("<II8sH", 0, entry['interaction_count'], bytes(8), len(entry['path']))
+                     + path + bytes(4))
+    return bytes(data)
+
+
+def automatic_destinations(entries, version):
+    """An AutomaticDestinations-ms file: the DestList plus one LNK stream per entry, named by its number in hex"""
+    streams = {f"{entry['entry_number']:x}": lnk(entry) for entry in entries}
+    streams['DestList'] = destlist(entries, version)
+    return compound_file(streams)
+
+
+def custom_destinations(entries):
+    """A CustomDestinations-ms file with one custom category holding entries"""
+    category = "Tasks".encode("utf-16-le")
+    data = struct.pack("<III", 2, 1, 0) + struct.pack("<IH", 0, len("Tasks")) + category
+    data += struct.pack("<I", len(entries))
+    for entry in entries:
+        data += LNK_CLSID.bytes_le + lnk(entry)
+    return data + struct.pack("<I", CUSTOM_DESTINATIONS_FOOTER)
+
+
+def add_jump_lists(folder, count, seed=0, entries=12):
+    """Write count AutomaticDestinations files (DestList versions 1, 3 and 4 in turn) and count
+    CustomDestinations files under folder. Returns {path: entries}.
+    """
+    rng = random.Random(seed)
+    versions = (1, 3, 4)
+    os.makedirs(folder, exist_ok=True)
+    written = {}
+    for i in range(count):
+        app_id = f"{rng.randrange(16 ** 16):016x}"
+        files = {f"{app_id}.automaticDestinations-ms": (jump_list_entries(rng, entries), versions[i % len(versions)]),
+                 f"{app_id}.customDestinations-ms": (jump_list_entries(rng, entries), None)}
+        for name, (items, version) in files.items():
+            path = os.path.join(folder, name)
+            with open(path, "wb") as f:
+                f.write(custom_destinations(items) if version is None else automatic_destinations(items, version))
+            written[path] = items
+    return written
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog="regparser_synth", description="Write synthetic registry hives")
+    parser.add_argument("folder", help="folder to write the hives into")
+    parser.add_argument("--scale", choices=list(SCALES),
+                        help="write a whole case (SYSTEM, SOFTWARE, NTUSER.DAT, filler files) of a named scale")
+    parser.add_argument("--name", default="SYSTEM", help="file name of a single custom hive (default: SYSTEM)")
+    parser.add_argument("--keys", type=int, default=DEFAULT_SHAPE['keys'])
+    parser.add_argument("--depth", type=int, default=DEFAULT_SHAPE['depth'])
+    parser.add_argument("--fanout", type=int, default=DEFAULT_SHAPE['fanout'])
+    parser.add_argument("--values-per-key", type=int, default=DEFAULT_SHAPE['values_per_key'])
+    parser.add_argument("--large-every", type=int, default=DEFAULT_SHAPE['large_value_every'],
+                        help="every Nth value is a large REG_BINARY (0: none)")
+    parser.add_argument("--large-size", type=int, default=DEFAULT_SHAPE['large_value_size'])
+    parser.add_argument("--usb", type=int, default=0,
+                        help="USB storage devices to add, as the traces a hive of --name holds")
+    parser.add_argument("--bluetooth", type=int, default=0, help="paired Bluetooth devices to add")
+    parser.add_argument("--networks", type=int, default=0, help="NetworkList profiles to add")
+    parser.add_argument("--shellbags", type=int, default=0, help="BagMRU folders to add, as an NTUSER.DAT holds them")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="prefetch files (versions 17, 23, 26 and compressed 30) to write under <folder>/Prefetch")
+    parser.add_argument("--jumplists", type=int, default=0,
+                        help="AutomaticDestinations and CustomDestinations files each to write under <folder>/JumpLists")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if args.prefetch:
+        folder = os.path.join(args.folder, "Prefetch")
+        add_prefetch_files(folder, args.prefetch, args.seed)
+        print(f"{folder}: {args.prefetch:,} prefetch files")
+    if args.jumplists:
+        folder = os.path.join(args.folder, "JumpLists")
+        add_jump_lists(folder, args.jumplists, args.seed)
+        print(f"{folder}: {args.jumplists:,} automatic and custom jump lists each")
+    if args.scale:
+        for name, path in generate_case(args.folder, args.scale, args.seed).items():
+            print(f"{path}: {os.path.getsize(path):,} bytes")
+        return 0
+    os.makedirs(args.folder, exist_ok=True)
+    shape = {'keys': args.keys, 'depth': args.depth, 'fanout': args.fanout, 'values_per_key': args.values_per_key,
+             'large_value_every': args.large_every, 'large_value_size': args.large_size}
+    path = os.path.join(args.folder, args.name)
+    usb_hive = args.name.upper() if args.name.upper() in USB_TRACES else 'SYSTEM'
+    size = generate_hive(path, shape, args.seed, args.usb, args.bluetooth, args.networks, usb_hive=usb_hive,
+                         shellbags=args.shellbags)
+    print(f"{path}: {size:,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
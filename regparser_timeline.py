@@ -0,0 +1,362 @@
+"""Super-timeline of every artifact output, built with an external merge sort.
+
+Each parser output named in the run manifest is streamed once. Its
+timestamps are normalized to UTC and turned into events, which are sorted in
+runs of at most ``run_rows`` events and spilled to disk. The runs are then
+combined with a k-way heap merge (in passes of MAX_FAN_IN runs) straight into
+the CSV, SQLite or Parquet timeline, so memory stays bounded by the run size
+however many events the case holds.
+"""
+import os
+import re
+import csv
+import heapq
+import shutil
+import sqlite3
+import datetime
+import tempfile
+
+from regparser_core import JobCancelled, incomplete_on_cancel, CANCEL_CHECK_EVERY
+from regparser_manifest import load_manifest, latest_entries, COMPLETE
+
+
+TIMELINE_COLUMNS = ['Timestamp (UTC)', 'Source', 'Event', 'Description', 'Detail', 'Source File']
+TIMELINE_SOURCES = ['Registry', 'USB', 'Bluetooth', 'Network', 'Prefetch', 'JumpLists', 'Shellbags']
+TIMELINE_FORMATS = {'csv': '.csv', 'sqlite': '.sqlite', 'parquet': '.parquet'}
+
+DEFAULT_RUN_ROWS = 250000
+MAX_FAN_IN = 64
+WRITE_BATCH = 10000
+
+# Every parser writes 'YYYY-MM-DD HH:MM:SS[.fff][ UTC]'; other offsets are converted
+TIMESTAMP_RE = re.compile(r'(\d{4}-\d\d-\d\d)[ T](\d\d:\d\d:\d\d)(\.\d+)?\s*(UTC|Z|[+-]\d\d:?\d\d)?$')
+UTC_ZONES = (None, 'UTC', 'Z', '+00:00', '+0000', '-00:00', '-0000')
+
+
+def normalize_timestamp(text):
+    """'YYYY-MM-DD HH:MM:SS[.fraction]' in UTC, or None if text is not a timestamp.
+
+    The result sorts chronologically as a plain string, which is what lets
+    runs be merged without parsing anything again.
+    """
+    match = TIMESTAMP_RE.match(text.strip()) if text else None
+    if not match:
+        return None
+    date, time, fraction, zone = match.groups()
+    if zone in UTC_ZONES:
+        return f"{date} {time}{fraction or ''}"
+    if ':' not in zone:
+        zone = f"{zone[:3]}:{zone[3:]}"
+    try:
+        moment = datetime.datetime.fromisoformat(f"{date}T{time}{fraction or ''}{zone}")
+    except ValueError:
+        return None
+    utc = moment.astimezone(datetime.timezone.utc)
+    return utc.strftime('%Y-%m-%d %H:%M:%S') + (f".{utc.microsecond:06d}" if fraction else "")
+
+
+def window_bound(text, end=False):
+    """Normalize a --from/--to bound; a bare date covers the whole day"""
+    if not text:
+        return None
+    text = text.strip()
+    if re.fullmatch(r'\d{4}-\d\d-\d\d', text):
+        text += ' 23:59:59.999999' if end else ' 00:00:00'
+    bound = normalize_timestamp(text)
+    if bound is None:
+        raise ValueError(f"Not a timestamp: {text!r} (expected YYYY-MM-DD[ HH:MM:SS])")
+    return bound
+
+
+# Event extractors: row dict -> [(timestamp text, event, description, detail)]
+
+def registry_events(path):
+    detail = os.path.splitext(os.path.basename(path))[0]
+    last_key = None
+
+    def extract(row):
+        nonlocal last_key
+        # The dump has one row per value; the key's last write is one event
+        key_path = row.get('Key Path')
+        if key_path == last_key:
+            return ()
+        last_key = key_path
+        return [(row.get('Last Modified'), "Key last write", key_path, detail)]
+    return extract
+
+
+def usb_events(path):
+    def extract(row):
+        name = row.get('Friendly Name') or row.get('Device Description') or row.get('Device ID')
+        return [(row.get('Key Last Modified'), f"{row.get('Type')} device key last write", name,
+                 f"Serial {row.get('Serial Number')}")]
+    return extract
+
+
+def usb_correlation_events(path):
+    def extract(row):
+        name = row.get('Friendly Name') or f"{row.get('Vendor')} {row.get('Product')}"
+        detail = f"Serial {row.get('Serial Number')} on {row.get('Computer')}"
+        volume = ", ".join(v for v in (row.get('Drive Letter'), row.get('Volume Name')) if v)
+        if volume:
+            detail += f" ({volume})"
+        return [(row.get('First Install'), "USB device first installed", name, detail),
+                (row.get('Last Arrival'), "USB device last connected", name, detail),
+                (row.get('Last Removal'), "USB device last removed", name, detail)]
+    return extract
+
+
+def bluetooth_events(path):
+    def extract(row):
+        name, mac = row.get('Name'), row.get('MAC Address')
+        return [(row.get('LastSeen'), "Device last seen", name, mac),
+                (row.get('LastConnected'), "Device last connected", name, mac)]
+    return extract
+
+
+def network_events(path):
+    def extract(row):
+        name, description = row.get('ProfileName'), row.get('Description')
+        return [(row.get('DateCreated'), "Profile created", name, description),
+                (row.get('DateLastConnected'), "Profile last connected", name, description)]
+    return extract
+
+
+def prefetch_events(path):
+    def extract(row):
+        return [(row.get('RunTime'), "Program executed", row.get('ExecutableName'), "")]
+    return extract
+
+
+def jump_list_events(path):
+    def extract(row):
+        target = row.get('LocalPath') or row.get('NetworkPath') or row.get('Path') or row.get('Name')
+        app = f"AppId {row.get('AppId')}"
+        return [(row.get('LastModified'), "Jump list entry last used", target, app),
+                (row.get('TargetCreated'), "Jump list target created", target, app),
+                (row.get('TargetModified'), "Jump list target modified", target, app),
+                (row.get('TargetAccessed'), "Jump list target accessed", target, app)]
+    return extract
+
+
+def shellbag_events(path):
+    def extract(row):
+        folder, hive = row.get('Absolute Path'), row.get('Hive')
+        return [(row.get('Key Last Write'), "Folder opened (BagMRU key write)", folder, hive),
+                (row.get('Created'), "Folder created", folder, hive),
+                (row.get('Modified'), "Folder modified", folder, hive),
+                (row.get('Accessed'), "Folder accessed", folder, hive)]
+    return extract
+
+
+def extractor_for(artifact, path):
+    """(source, extractor factory) for a parser output, or None if it carries no events"""
+    name = os.path.basename(path)
+    if artifact == 'Registry':
+        return 'Registry', registry_events
+    if artifact == 'USB_Devices':
+        return 'USB', usb_correlation_events if name == 'USB_Correlation.csv' else usb_events
+    if artifact == 'Bluetooth_Devices':
+        return 'Bluetooth', bluetooth_events
+    if artifact == 'Network_Connections':
+        return 'Network', network_events
+    if artifact == 'Prefetch' and name.endswith('_Timeline.csv'):
+        return 'Prefetch', prefetch_events
+    if artifact == 'JumpLists':
+        return 'JumpLists', jump_list_events
+    if artifact == 'Shellbags':
+        return 'Shellbags', shellbag_events
+    return None
+
+
+def timeline_inputs(output_folder, sources=None):
+    """[(source, csv path, extractor factory)] for the completed outputs in the run manifest"""
+    manifest = load_manifest(output_folder)
+    if not manifest:
+        return []
+    inputs = []
+    for entry in latest_entries(manifest['entries']):
+        if entry['status'] != COMPLETE:
+            continue
+        for output in entry['outputs']:
+            match = extractor_for(entry['artifact'], output['path'])
+            if not match or output['incomplete'] or not output['path'].endswith('.csv'):
+                continue
+            if sources and match[0] not in sources:
+                continue
+            if os.path.exists(output['path']):
+                inputs.append((match[0], output['path'], match[1]))
+    return inputs
+
+
+def _write_run(events, run_dir, index):
+    events.sort()
+    path = os.path.join(run_dir, f"run_{index:05d}.csv")
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(events)
+    return path
+
+
+def _read_run(path):
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        yield from csv.reader(f)
+
+
+def spill_sorted_runs(inputs, run_dir, start=None, end=None, run_rows=DEFAULT_RUN_ROWS,
+                      progress=None, cancel=None):
+    """Stream every input into sorted run files of at most run_rows events. Returns the run paths."""
+    runs = []
+    events = []
+    rows_seen = 0
+    for source, path, factory in inputs:
+        extract = factory(path)
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                rows_seen += 1
+                if cancel is not None and rows_seen % CANCEL_CHECK_EVERY == 0:
+                    cancel.check()
+                for timestamp, event, description, detail in extract(row):
+                    timestamp = normalize_timestamp(timestamp)
+                    if timestamp is None or (start and timestamp < start) or (end and timestamp > end):
+                        continue
+                    events.append((timestamp, source, event, description or "", detail or "", path))
+                if len(events) >= run_rows:
+                    runs.append(_write_run(events, run_dir, len(runs)))
+                    events = []
+        if progress is not None:
+            progress.add(items=1, nbytes=os.path.getsize(path))
+    if events:
+        runs.append(_write_run(events, run_dir, len(runs)))
+    return runs
+
+
+def merge_runs(runs, run_dir, cancel=None):
+    """Reduce runs to at most MAX_FAN_IN by merging groups of them into new runs"""
+    generation = 0
+    while len(runs) > MAX_FAN_IN:
+        merged = []
+        for index in range(0, len(runs), MAX_FAN_IN):
+            if cancel is not None:
+                cancel.check()
+            group = runs[index:index + MAX_FAN_IN]
+            path = os.path.join(run_dir, f"merge_{generation}_{len(merged):05d}.csv")
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(heapq.merge(*(_read_run(run) for run in group)))
+            for run in group:
+                os.remove(run)
+            merged.append(path)
+        runs = merged
+        generation += 1
+    return runs
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(TIMELINE_COLUMNS)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class SqliteSink:
+    """One ``timeline`` table, indexed on timestamp and source once loaded"""
+
+    def __init__(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=OFF")
+        self.connection.execute("PRAGMA synchronous=OFF")
+        self.connection.execute(
+            "CREATE TABLE timeline (timestamp TEXT, source TEXT, event TEXT, "
+            "description TEXT, detail TEXT, source_file TEXT)")
+
+    def write(self, rows):
+        self.connection.executemany("INSERT INTO timeline VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        self.connection.execute("CREATE INDEX timeline_timestamp ON timeline (timestamp)")
+        self.connection.execute("CREATE INDEX timeline_source ON timeline (source, timestamp)")
+        self.connection.commit()
+        self.connection.close()
+
+
+class ParquetSink:
+    """String columns written one row group per batch; needs pyarrow"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+        self.pyarrow = pyarrow
+        self.names = ['timestamp', 'source', 'event', 'description', 'detail', 'source_file']
+        self.schema = pyarrow.schema([(name, pyarrow.string()) for name in self.names])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        columns = [list(column) for column in zip(*rows)]
+        self.writer.write_table(self.pyarrow.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+SINKS = {'csv': CsvSink, 'sqlite': SqliteSink, 'parquet': ParquetSink}
+
+
+def build_timeline(output_folder, out_path, fmt='csv', start=None, end=None, sources=None,
+                   run_rows=DEFAULT_RUN_ROWS, progress=None, cancel=None, log=print):
+    """Merge every completed artifact output of output_folder into one timeline. Returns the event count.
+
+    start/end are inclusive UTC bounds ('YYYY-MM-DD[ HH:MM:SS]'), sources a
+    subset of TIMELINE_SOURCES. On cancel the partial timeline is renamed
+    *.incomplete and JobCancelled is raised.
+    """
+    if fmt not in SINKS:
+        raise ValueError(f"Unknown timeline format {fmt!r}; choose from {', '.join(SINKS)}")
+    start, end = window_bound(start), window_bound(end, end=True)
+    inputs = timeline_inputs(output_folder, sources)
+    if not inputs:
+        log("⚠️ No completed artifact outputs in the run manifest; nothing to put on the timeline.")
+    if progress is not None:
+        progress.total_items = len(inputs)
+        progress.total_bytes = sum(os.path.getsize(path) for _, path, _ in inputs)
+
+    run_dir = tempfile.mkdtemp(prefix=".timeline_runs_", dir=os.path.dirname(os.path.abspath(out_path)))
+    count = 0
+    try:
+        with incomplete_on_cancel(out_path):
+            # Opened first so a missing optional dependency fails before any sorting
+            sink = SINKS[fmt](out_path)
+            try:
+                runs = spill_sorted_runs(inputs, run_dir, start, end, run_rows, progress, cancel)
+                log(f"🧩 Timeline: {len(inputs)} sources sorted into {len(runs)} runs; merging...")
+                runs = merge_runs(runs, run_dir, cancel)
+                batch = []
+                for row in heapq.merge(*(_read_run(run) for run in runs)):
+                    batch.append(row)
+                    if len(batch) >= WRITE_BATCH:
+                        if cancel is not None and cancel.cancelled:
+                            raise JobCancelled()
+                        sink.write(batch)
+                        count += len(batch)
+                        if progress is not None:
+                            progress.add(rows=len(batch))
+                        batch = []
+                if batch:
+                    sink.write(batch)
+                    count += len(batch)
+                    if progress is not None:
+                        progress.add(rows=len(batch))
+            finally:
+                sink.close()
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return count
@@ -0,0 +1,201 @@
+"""Decoding of Windows timestamps, one value at a time or whole columns at once.
+
+Every parser formats times the same way, 'YYYY-MM-DD HH:MM:SS UTC', and
+treats zero or out-of-range values as blank. The batch functions take a
+sequence of values (ints or raw bytes) or one packed little-endian buffer
+and, when NumPy is installed, decode the whole column with array arithmetic
+instead of a datetime object and strftime() call per value. Without NumPy
+they fall back to the per-value functions and return the same strings.
+
+NumPy is imported on the first call that is large enough to use it, not
+with this module: every parser imports it, and most runs of the CLI (and
+every child process) would otherwise pay NumPy's import time for nothing.
+"""
+import struct
+import datetime
+
+
+# Set by _load_numpy() on the first batch of VECTOR_MIN_VALUES or more
+numpy = None
+_numpy_tried = False
+
+
+TICKS_PER_SECOND = 10_000_000
+# 100 ns ticks from 1601-01-01 (FILETIME epoch) to 1970-01-01 (Unix epoch)
+FILETIME_UNIX_OFFSET = 116444736000000000
+# Last tick of 9999-12-31; anything larger is not a date datetime can represent
+MAX_FILETIME = 2650467743999999999
+FILETIME_EPOCH = datetime.datetime(1601, 1, 1)
+UNIX_EPOCH = datetime.datetime(1970, 1, 1)
+UTC_SUFFIX = " UTC"
+# Below this many values NumPy's setup costs more than it saves
+VECTOR_MIN_VALUES = 64
+
+SYSTEMTIME_SIZE = 16
+_SYSTEMTIME = struct.Struct('<8H')
+
+
+def _as_ticks(value):
+    """FILETIME ticks of an int or 8 raw bytes; 0 for anything that is not a valid FILETIME"""
+    if isinstance(value, (bytes, bytearray)):
+        value = int.from_bytes(value, 'little') if len(value) == 8 else 0
+    elif not isinstance(value, int):
+        return 0
+    return value if 0 < value <= MAX_FILETIME else 0
+
+
+def filetime_to_str(ft, suffix=UTC_SUFFIX):
+    """Format a FILETIME (int ticks since 1601 or 8 raw bytes) as UTC text; 0 or invalid gives ''"""
+    ticks = _as_ticks(ft)
+    if not ticks:
+        return ""
+    return (FILETIME_EPOCH + datetime.timedelta(seconds=ticks // TICKS_PER_SECOND)).isoformat(' ') + suffix
+
+
+def filetime_to_epoch(ft):
+    """Unix seconds of a FILETIME, or None when it is 0 or invalid"""
+    ticks = _as_ticks(ft)
+    return (ticks - FILETIME_UNIX_OFFSET) // TICKS_PER_SECOND if ticks else None
+
+
+def unix_to_str(seconds, suffix=UTC_SUFFIX):
+    """Format a Unix timestamp (e.g. an os.stat time) the same way"""
+    return (UNIX_EPOCH + datetime.timedelta(seconds=int(seconds))).isoformat(' ') + suffix
+
+
+def systemtime_to_str(raw, suffix=UTC_SUFFIX, milliseconds=True):
+    """Format a 16-byte SYSTEMTIME as UTC text; short or invalid structures give ''"""
+    if not isinstance(raw, (bytes, bytearray)) or len(raw) < SYSTEMTIME_SIZE:
+        return ""
+    year, month, _, day, hour, minute, second, millisecond = _SYSTEMTIME.unpack_from(raw)
+    try:
+        dt = datetime.datetime(year, month, day, hour, minute, second, millisecond * 1000)
+    except ValueError:
+        return ""
+    return dt.isoformat(' ', 'milliseconds' if milliseconds else 'seconds') + suffix
+
+
+def fat_datetime(raw, suffix=UTC_SUFFIX):
+    """FAT date (low word) and time (high word) packed in 4 bytes, as UTC-labelled text"""
+    date, time = struct.unpack('<HH', raw)
+    if not date:
+        return ""
+    try:
+        dt = datetime.datetime(1980 + (date >> 9), (date >> 5) & 0x0F, date & 0x1F,
+                               time >> 11, (time >> 5) & 0x3F, (time & 0x1F) * 2)
+    except ValueError:
+        return ""
+    return dt.isoformat(' ') + suffix
+
+
+# -- batch decoding ------------------------------------------------------------
+
+def _format_fields(valid, year, month, day, hour, minute, second, millisecond, suffix):
+    """Assemble 'YYYY-MM-DD HH:MM:SS[.mmm]<suffix>' for every row at once; rows not valid become ''"""
+    fraction = ".000" if millisecond is not None else ""
+    template = ("0000-00-00 00:00:00" + fraction + suffix).encode('ascii')
+    width = len(template)
+    text = numpy.empty((len(valid), width), dtype=numpy.uint8)
+    text[:] = numpy.frombuffer(template, dtype=numpy.uint8)
+    for column, scale in enumerate((1000, 100, 10, 1)):
+        text[:, column] = year // scale % 10 + 48
+    for column, field in ((5, month), (8, day), (11, hour), (14, minute), (17, second)):
+        text[:, column] = field // 10 + 48
+        text[:, column + 1] = field % 10 + 48
+    if millisecond is not None:
+        for column, scale in ((20, 100), (21, 10), (22, 1)):
+            text[:, column] = millisecond // scale % 10 + 48
+    text[~valid] = 0
+    # Zero bytes are padding to NumPy, so invalid rows come back as empty strings
+    return text.view(f'S{width}').ravel().astype(f'U{width}').tolist()
+
+
+def _civil_from_days(days):
+    """Year, month, day arrays of days since 1970-01-01 (proleptic Gregorian)"""
+    z = days + 719468
+    era = z // 146097
+    day_of_era = z - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    shifted_month = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * shifted_month + 2) // 5 + 1
+    month = numpy.where(shifted_month < 10, shifted_month + 3, shifted_month - 9)
+    year = year_of_era + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def _filetime_array(values):
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        ticks = numpy.frombuffer(values, dtype='<u8')
+    else:
+        ticks = numpy.fromiter((_as_ticks(value) for value in values), dtype=numpy.uint64, count=len(values))
+    valid = (ticks > 0) & (ticks <= MAX_FILETIME)
+    return numpy.where(valid, ticks, 0), valid
+
+
+def _load_numpy():
+    """Import NumPy once; None if it is not installed"""
+    global numpy, _numpy_tried
+    if not _numpy_tried:
+        _numpy_tried = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+    return numpy
+
+
+def _use_numpy(values):
+    count = len(values) // 8 if isinstance(values, (bytes, bytearray, memoryview)) else len(values)
+    return count >= VECTOR_MIN_VALUES and _load_numpy() is not None
+
+
+def _unpack_filetimes(values):
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        return [ticks for (ticks,) in struct.iter_unpack('<Q', values)]
+    return values
+
+
+def filetimes_to_str(values, suffix=UTC_SUFFIX):
+    """filetime_to_str() of every value: a sequence of ints / 8-byte strings, or a packed <Q buffer"""
+    if not _use_numpy(values):
+        return [filetime_to_str(value, suffix) for value in _unpack_filetimes(values)]
+    ticks, valid = _filetime_array(values)
+    seconds = (ticks // TICKS_PER_SECOND).astype(numpy.int64) - FILETIME_UNIX_OFFSET // TICKS_PER_SECOND
+    days, second_of_day = numpy.divmod(seconds, 86400)
+    year, month, day = _civil_from_days(days)
+    hour, rest = numpy.divmod(second_of_day, 3600)
+    minute, second = numpy.divmod(rest, 60)
+    return _format_fields(valid, year, month, day, hour, minute, second, None, suffix)
+
+
+def filetimes_to_epoch(values):
+    """filetime_to_epoch() of every value; invalid values give None"""
+    if not _use_numpy(values):
+        return [filetime_to_epoch(value) for value in _unpack_filetimes(values)]
+    ticks, valid = _filetime_array(values)
+    seconds = (ticks // TICKS_PER_SECOND).astype(numpy.int64) - FILETIME_UNIX_OFFSET // TICKS_PER_SECOND
+    return [int(value) if ok else None for value, ok in zip(seconds.tolist(), valid.tolist())]
+
+
+def systemtimes_to_str(values, suffix=UTC_SUFFIX, milliseconds=True):
+    """systemtime_to_str() of every value: a sequence of 16-byte strings, or a packed buffer of them"""
+    packed = isinstance(values, (bytes, bytearray, memoryview))
+    count = len(values) // SYSTEMTIME_SIZE if packed else len(values)
+    if count < VECTOR_MIN_VALUES or _load_numpy() is None:
+        if packed:
+            values = [bytes(values[i:i + SYSTEMTIME_SIZE]) for i in range(0, count * SYSTEMTIME_SIZE, SYSTEMTIME_SIZE)]
+        return [systemtime_to_str(value, suffix, milliseconds) for value in values]
+    if not packed:
+        # Short or non-bytes entries become all-zero structures, which fail validation below
+        values = b"".join(bytes(value[:SYSTEMTIME_SIZE]) if isinstance(value, (bytes, bytearray))
+                          and len(value) >= SYSTEMTIME_SIZE else bytes(SYSTEMTIME_SIZE) for value in values)
+    fields = numpy.frombuffer(values, dtype='<u2', count=count * 8).reshape(count, 8).astype(numpy.int64)
+    year, month, _, day, hour, minute, second, millisecond = fields.T
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = numpy.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])[numpy.clip(month, 0, 12)]
+    month_days = month_days + (leap & (month == 2))
+    valid = ((year >= 1) & (year <= 9999) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+             & (hour < 24) & (minute < 60) & (second < 60) & (millisecond < 1000))
+    return _format_fields(valid, year, month, day, hour, minute, second,
+                          millisecond if milliseconds else None, suffix)
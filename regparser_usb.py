@@ -0,0 +1,391 @@
+"""USB storage device correlation across SYSTEM, SOFTWARE and NTUSER.DAT hives.
+
+Every hive is read once into hash indexes keyed by the identifiers the
+artifacts share: USBSTOR serial number, ParentIdPrefix, volume GUID and
+drive letter. The other artifacts then join through those indexes, so a
+device costs a few dictionary lookups however many artifacts mention it,
+and the whole stage grows linearly with the number of devices.
+
+    SYSTEM    Enum\\USBSTOR, Enum\\USB, MountedDevices, DeviceClasses, device Properties
+    SOFTWARE  Windows Portable Devices, EMDMgmt
+    NTUSER    Explorer\\MountPoints2
+
+A case may hold several machines: SOFTWARE and NTUSER.DAT hives belong to
+the SYSTEM hive they share the longest path with, and every machine gets
+its own rows.
+"""
+import os
+import csv
+import struct
+from Registry import Registry
+
+from regparser_core import JobCancelled, incomplete_on_cancel, open_hive, key_filetime
+from regparser_times import filetime_to_str
+
+
+# Disk device interface; DeviceClasses subkeys under it are written on every arrival
+DISK_INTERFACE = "{53f56307-b6bf-11d0-94f2-00a0c91efb8b}"
+# Device property set holding the install, arrival and removal times (Windows 7+)
+DEVICE_TIMES_PROPERTIES = "{83da6326-97a6-4088-9453-a1923f573b29}"
+FIRST_INSTALL, INSTALL, LAST_ARRIVAL, LAST_REMOVAL = "0064", "0065", "0066", "0067"
+
+# Hives the correlation reads; everything else passed in is ignored
+USB_HIVE_NAMES = ('SYSTEM', 'SOFTWARE', 'NTUSER.DAT')
+
+PORTABLE_DEVICES_PATH = "Microsoft\\Windows Portable Devices\\Devices"
+EMDMGMT_PATH = "Microsoft\\Windows NT\\CurrentVersion\\EMDMgmt"
+MOUNTPOINTS2_PATH = "Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\MountPoints2"
+
+USB_CORRELATION_COLUMNS = [
+    'Computer', 'Vendor', 'Product', 'Revision', 'Serial Number', 'Unique Serial', 'Friendly Name',
+    'VID', 'PID', 'Parent ID Prefix', 'Drive Letter', 'Volume GUID', 'Volume Name', 'Volume Serial',
+    'Users', 'First Connected', 'Last Connected', 'First Install', 'Last Arrival', 'Last Removal',
+    'SYSTEM Hive',
+]
+
+
+def storage_device(text):
+    """('DEVICE\\INSTANCE' or None, ParentIdPrefix or None) named by a '#'-separated storage path.
+
+    Covers MountedDevices data, DeviceClasses key names and the Windows
+    Portable Devices / EMDMgmt key names, which all embed one of
+    USBSTOR#<device>#<instance># or STORAGE#RemovableMedia#<prefix>&RM#.
+    """
+    parts = text.upper().split('#')
+    for i, part in enumerate(parts):
+        if part.endswith('USBSTOR') and i + 2 < len(parts):
+            return f"{parts[i + 1]}\\{parts[i + 2]}", None
+        if part == 'REMOVABLEMEDIA' and i + 1 < len(parts):
+            prefix = parts[i + 1]
+            return None, prefix[:-3] if prefix.endswith('&RM') else prefix
+    return None, None
+
+
+def split_device_id(device_id):
+    """(vendor, product, revision) of a USBSTOR device ID such as Disk&Ven_X&Prod_Y&Rev_1.00"""
+    fields = {}
+    for part in device_id.split('&')[1:]:
+        name, _, value = part.partition('_')
+        fields[name.upper()] = value
+    return fields.get('VEN', ''), fields.get('PROD', ''), fields.get('REV', '')
+
+
+def instance_serial(instance_id):
+    """(serial number, whether the device reports a unique one) of a USBSTOR instance ID.
+
+    Windows appends &<n> to a real serial; devices without one get an
+    instance ID generated by the bus, whose second character is '&'.
+    """
+    if len(instance_id) > 1 and instance_id[1] == '&':
+        return instance_id, False
+    serial, sep, suffix = instance_id.rpartition('&')
+    return (serial, True) if sep and suffix.isdigit() else (instance_id, True)
+
+
+def decode_volume_serial(text):
+    """EMDMgmt stores the volume serial as a decimal; show it as XXXX-XXXX"""
+    try:
+        value = int(text) & 0xFFFFFFFF
+    except ValueError:
+        return text
+    return f"{value >> 16:04X}-{value & 0xFFFF:04X}"
+
+
+def _raw_filetime(key, name=""):
+    # Device properties are DEVPROP_TYPE_FILETIME, which python-registry does not decode
+    try:
+        raw = key.value(name).raw_data()
+    except Registry.RegistryValueNotFoundException:
+        return 0
+    return struct.unpack_from('<Q', raw)[0] if len(raw) >= 8 else 0
+
+
+def _string_value(key, name):
+    try:
+        value = key.value(name).value()
+    except Registry.RegistryValueNotFoundException:
+        return ""
+    return value if isinstance(value, str) else ""
+
+
+def _subkey(key, *names):
+    try:
+        for name in names:
+            key = key.subkey(name)
+        return key
+    except Registry.RegistryKeyNotFoundException:
+        return None
+
+
+class MachineIndex:
+    """USB storage devices of one SYSTEM hive and the indexes other artifacts join through.
+
+    Every index maps its key (upper case) to the device's 'DEVICE\\INSTANCE'
+    key in devices; times are kept as raw FILETIMEs until the row is written.
+    """
+
+    def __init__(self, hive_path):
+        self.hive_path = hive_path
+        self.computer = ""
+        self.devices = {}
+        self.by_serial = {}
+        self.by_prefix = {}
+        self.by_volume = {}
+        self.by_letter = {}
+
+    def resolve(self, text):
+        """Device key named by a storage path, through the instance or the ParentIdPrefix"""
+        device, prefix = storage_device(text)
+        if device in self.devices:
+            return device
+        return self.by_prefix.get(prefix) if prefix else None
+
+    def device_for_serial_path(self, text):
+        """Device key of a WPD/EMDMgmt key name, falling back to the serial when the instance differs"""
+        device = self.resolve(text)
+        if device is None:
+            found, _ = storage_device(text)
+            if found:
+                device = self.by_serial.get(instance_serial(found.partition('\\')[2])[0])
+        return device
+
+
+def _current_control_set(reg):
+    try:
+        current = reg.open("Select").value("Current").value()
+        return reg.open(f"ControlSet{current:03d}")
+    except (Registry.RegistryKeyNotFoundException, Registry.RegistryValueNotFoundException, TypeError):
+        pass
+    for name in ("ControlSet001", "ControlSet002"):
+        try:
+            return reg.open(name)
+        except Registry.RegistryKeyNotFoundException:
+            continue
+    return None
+
+
+def index_system_hive(hive_path, progress=None, cancel=None):
+    """MachineIndex of hive_path from one pass over its USB-related keys"""
+    index = MachineIndex(hive_path)
+    reg = open_hive(hive_path)
+    control_set = _current_control_set(reg)
+    if control_set is None:
+        return index
+    computer_name = _subkey(control_set, "Control", "ComputerName", "ComputerName")
+    if computer_name is not None:
+        index.computer = _string_value(computer_name, "ComputerName")
+
+    usbstor = _subkey(control_set, "Enum", "USBSTOR")
+    for device_key in usbstor.subkeys() if usbstor else ():
+        if cancel is not None:
+            cancel.check()
+        device_id = device_key.name()
+        vendor, product, revision = split_device_id(device_id)
+        for instance_key in device_key.subkeys():
+            instance_id = instance_key.name()
+            key = f"{device_id}\\{instance_id}".upper()
+            serial, unique = instance_serial(instance_id)
+            prefix = _string_value(instance_key, "ParentIdPrefix")
+            times = _subkey(instance_key, "Properties", DEVICE_TIMES_PROPERTIES)
+            device = {
+                'vendor': vendor, 'product': product, 'revision': revision,
+                'serial': serial, 'unique': unique, 'prefix': prefix,
+                'friendly_name': _string_value(instance_key, "FriendlyName"),
+                'vid': '', 'pid': '', 'letters': [], 'volumes': [], 'volume_names': [], 'volume_serials': [],
+                'users': {}, 'key_written': key_filetime(instance_key),
+                'first_install': 0, 'last_arrival': 0, 'last_removal': 0, 'interface_written': 0,
+            }
+            if times is not None:
+                device['first_install'] = _device_time(times, FIRST_INSTALL) or _device_time(times, INSTALL)
+                device['last_arrival'] = _device_time(times, LAST_ARRIVAL)
+                device['last_removal'] = _device_time(times, LAST_REMOVAL)
+            index.devices[key] = device
+            index.by_serial.setdefault(serial.upper(), key)
+            if prefix:
+                index.by_prefix[prefix.upper()] = key
+            if progress is not None:
+                progress.add(keys=1)
+
+    usb = _subkey(control_set, "Enum", "USB")
+    for device_key in usb.subkeys() if usb else ():
+        if cancel is not None:
+            cancel.check()
+        # VID_xxxx&PID_yyyy; the instance below it is the bare serial number
+        ids = {}
+        for part in device_key.name().upper().split('&'):
+            name, _, value = part.partition('_')
+            ids[name] = value
+        for instance_key in device_key.subkeys():
+            key = index.by_serial.get(instance_key.name().upper())
+            if key is not None:
+                device = index.devices[key]
+                device['vid'], device['pid'] = ids.get('VID', ''), ids.get('PID', '')
+
+    interfaces = _subkey(control_set, "Control", "DeviceClasses", DISK_INTERFACE)
+    for interface_key in interfaces.subkeys() if interfaces else ():
+        key = index.resolve(interface_key.name())
+        if key is not None:
+            device = index.devices[key]
+            device['interface_written'] = max(device['interface_written'], key_filetime(interface_key))
+
+    try:
+        mounted = reg.open("MountedDevices")
+    except Registry.RegistryKeyNotFoundException:
+        mounted = None
+    for value in mounted.values() if mounted else ():
+        data = value.raw_data()
+        # Fixed disks store a disk signature and offset; removable volumes a UTF-16 device path
+        if len(data) <= 24 or data[1:2] != b"\x00":
+            continue
+        key = index.resolve(data.decode('utf-16-le', errors='replace'))
+        if key is None:
+            continue
+        name = value.name()
+        if name.upper().startswith("\\DOSDEVICES\\"):
+            letter = name[12:].upper()
+            index.by_letter[letter] = key
+            index.devices[key]['letters'].append(letter)
+        elif name.startswith("\\??\\Volume"):
+            guid = name[10:].lower()
+            index.by_volume[guid.upper()] = key
+            index.devices[key]['volumes'].append(guid)
+    return index
+
+
+def _device_time(times_key, property_id):
+    key = _subkey(times_key, property_id)
+    if key is None:
+        return 0
+    # Windows 7 keeps the value one level down, in 00000000\Data
+    legacy = _subkey(key, "00000000")
+    return _raw_filetime(legacy, "Data") if legacy is not None else _raw_filetime(key)
+
+
+def join_software_hive(index, hive_path, cancel=None):
+    """Add volume names and serials from a SOFTWARE hive of index's machine"""
+    reg = open_hive(hive_path)
+    try:
+        portable = reg.open(PORTABLE_DEVICES_PATH)
+    except Registry.RegistryKeyNotFoundException:
+        portable = None
+    for device_key in portable.subkeys() if portable else ():
+        if cancel is not None:
+            cancel.check()
+        key = index.device_for_serial_path(device_key.name())
+        name = _string_value(device_key, "FriendlyName")
+        if key is not None and name:
+            _add_unique(index.devices[key]['volume_names'], name)
+
+    try:
+        emdmgmt = reg.open(EMDMGMT_PATH)
+    except Registry.RegistryKeyNotFoundException:
+        emdmgmt = None
+    for volume_key in emdmgmt.subkeys() if emdmgmt else ():
+        if cancel is not None:
+            cancel.check()
+        name = volume_key.name()
+        key = index.device_for_serial_path(name)
+        if key is None:
+            continue
+        # ..._??_USBSTOR#...#{interface}<label>_<decimal volume serial>
+        label, _, serial = name.rpartition('}')[2].rpartition('_')
+        device = index.devices[key]
+        if label:
+            _add_unique(device['volume_names'], label)
+        if serial:
+            _add_unique(device['volume_serials'], decode_volume_serial(serial))
+
+
+def join_user_hive(index, hive_path, cancel=None):
+    """Record which devices' volumes the owner of an NTUSER.DAT mounted, and when it last did"""
+    user = os.path.basename(os.path.dirname(os.path.abspath(hive_path))) or hive_path
+    reg = open_hive(hive_path)
+    try:
+        mount_points = reg.open(MOUNTPOINTS2_PATH)
+    except Registry.RegistryKeyNotFoundException:
+        return
+    for mount_key in mount_points.subkeys():
+        if cancel is not None:
+            cancel.check()
+        key = index.by_volume.get(mount_key.name().upper())
+        if key is not None:
+            users = index.devices[key]['users']
+            users[user] = max(users.get(user, 0), key_filetime(mount_key))
+
+
+def _add_unique(items, item):
+    if item not in items:
+        items.append(item)
+
+
+def assign_machines(hive_paths):
+    """{SYSTEM hive: [SOFTWARE and NTUSER.DAT hives of that machine]}, by longest shared path"""
+    systems = [p for p in hive_paths if os.path.basename(p).upper() == "SYSTEM"]
+    machines = {p: [] for p in systems}
+    for path in hive_paths:
+        if os.path.basename(path).upper() not in USB_HIVE_NAMES[1:] or not systems:
+            continue
+
+        def shared(system):
+            try:
+                return len(os.path.commonpath([os.path.abspath(system), os.path.abspath(path)]))
+            except ValueError:
+                return -1
+        machines[max(systems, key=shared)].append(path)
+    return machines
+
+
+def device_row(index, device):
+    connected = [t for t in (device['first_install'], device['last_arrival'], device['key_written'],
+                             device['interface_written'], *device['users'].values()) if t]
+    first = device['first_install'] or (min(connected) if connected else 0)
+    return [
+        index.computer, device['vendor'], device['product'], device['revision'], device['serial'],
+        "Yes" if device['unique'] else "No", device['friendly_name'], device['vid'], device['pid'],
+        device['prefix'], "; ".join(device['letters']), "; ".join(device['volumes']),
+        "; ".join(device['volume_names']), "; ".join(device['volume_serials']),
+        "; ".join(sorted(device['users'])),
+        filetime_to_str(first), filetime_to_str(max(connected) if connected else 0),
+        filetime_to_str(device['first_install']), filetime_to_str(device['last_arrival']),
+        filetime_to_str(device['last_removal']), index.hive_path,
+    ]
+
+
+def correlate_usb_devices(hive_paths, output_csv, log=print, progress=None, cancel=None):
+    """Write one row per USB storage device and machine found in hive_paths. Returns the row count."""
+    machines = assign_machines(hive_paths)
+    if progress is not None:
+        progress.total_items += len(machines) + sum(len(others) for others in machines.values())
+    row_count = 0
+    with incomplete_on_cancel(output_csv), open(output_csv, 'w', newline='', encoding='utf-8-sig') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(USB_CORRELATION_COLUMNS)
+        for system_path, others in machines.items():
+            try:
+                index = index_system_hive(system_path, progress, cancel)
+                if progress is not None:
+                    progress.add(items=1)
+                for path in others:
+                    try:
+                        if os.path.basename(path).upper() == "SOFTWARE":
+                            join_software_hive(index, path, cancel)
+                        else:
+                            join_user_hive(index, path, cancel)
+                    except JobCancelled:
+                        raise
+                    except Exception as e:
+                        log(f"⚠️ USB correlation skipped {path}: {e}")
+                    if progress is not None:
+                        progress.add(items=1)
+                for device in index.devices.values():
+                    writer.writerow(device_row(index, device))
+                row_count += len(index.devices)
+                if progress is not None:
+                    progress.add(rows=len(index.devices))
+                log(f"✅ Correlated {len(index.devices)} USB devices of {index.computer or system_path} "
+                    f"across {len(others) + 1} hives")
+            except JobCancelled:
+                raise
+            except Exception as e:
+                log(f"❌ USB correlation failed for {system_path}: {e}")
+    return row_count
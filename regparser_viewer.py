@@ -0,0 +1,454 @@
+"""Paged access to output tables of any size for the GUI results viewer.
+
+A CSV is memory-mapped and a sparse index of record offsets (one per
+SPARSE_EVERY records) is built in the background, so any row can be reached
+by seeking to the nearest checkpoint and skipping at most SPARSE_EVERY - 1
+records. Only the rows on screen are ever decoded. Sorting and filtering
+produce views: on-disk arrays of record offsets (sorted with the same
+spill-and-merge approach as the timeline), so memory stays flat however
+many rows the table has. SQLite outputs (e.g. the timeline) work the same
+way with rowids: indexing, sorting and filtering stream the matching rowids,
+in order, from a background query into an on-disk array, and a page is
+fetched by looking up its rowids, so scrolling never runs ORDER BY or OFFSET.
+"""
+import os
+import csv
+import mmap
+import heapq
+import array
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+from regparser_core import JobCancelled, CANCEL_CHECK_EVERY
+
+
+SPARSE_EVERY = 256
+SORT_RUN_ROWS = 200000
+PICKLE_CHUNK = 10000
+OFFSET_WRITE_BATCH = 65536
+# SQLite virtual machine steps between cancel checks of a background query
+SQLITE_CANCEL_STEPS = 100000
+
+
+def _sort_key(value):
+    """Numbers sort numerically and before text; text sorts case-insensitively"""
+    try:
+        return (0, float(value), '')
+    except ValueError:
+        return (1, 0.0, value.lower())
+
+
+def _write_run(items, run_dir, index, descending):
+    items.sort(reverse=descending)
+    path = os.path.join(run_dir, f"run_{index:05d}.pickle")
+    with open(path, 'wb') as f:
+        for start in range(0, len(items), PICKLE_CHUNK):
+            pickle.dump(items[start:start + PICKLE_CHUNK], f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield from pickle.load(f)
+            except EOFError:
+                return
+
+
+class _Lines:
+    """Decoded lines of a mapped file from a byte offset, tracking the next line's offset for csv.reader"""
+
+    def __init__(self, buffer, offset):
+        self.buffer = buffer
+        self.offset = offset
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.offset >= len(self.buffer):
+            raise StopIteration
+        end = self.buffer.find(b'\n', self.offset)
+        end = len(self.buffer) if end < 0 else end + 1
+        line = self.buffer[self.offset:end]
+        self.offset = end
+        return line.decode('utf-8', errors='replace')
+
+
+class OffsetView:
+    """Rows of a CsvTable in the order of an on-disk array of record offsets"""
+
+    def __init__(self, table, path):
+        self.table = table
+        self.path = path
+        self.length = os.path.getsize(path) // 8
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.length else None
+
+    def count(self):
+        return self.length
+
+    def offsets(self, start, count):
+        if not self.map:
+            return []
+        offsets = array.array('Q')
+        offsets.frombytes(self.map[start * 8:min(start + count, self.length) * 8])
+        return offsets
+
+    def rows(self, start, count):
+        return [self.table.record_at(offset) for offset in self.offsets(start, count)]
+
+    def iter_records(self, cancel=None):
+        for start in range(0, self.length, OFFSET_WRITE_BATCH):
+            if cancel is not None:
+                cancel.check()
+            for offset in self.offsets(start, OFFSET_WRITE_BATCH):
+                yield offset, self.table.record_at(offset)
+
+    def close(self):
+        if self.map:
+            self.map.close()
+        self.file.close()
+
+
+class NaturalView:
+    """Rows of a CsvTable in file order; grows while the table is being indexed"""
+
+    def __init__(self, table):
+        self.table = table
+
+    def count(self):
+        return self.table.row_count
+
+    def rows(self, start, count):
+        return self.table.rows(start, count)
+
+    def iter_records(self, cancel=None):
+        return self.table.iter_records(cancel)
+
+    def close(self):
+        pass
+
+
+class CsvTable:
+    """A memory-mapped RegParser CSV output"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.size = os.path.getsize(path)
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        start = 3 if self.map[:3] == b'\xef\xbb\xbf' else 0
+        lines = _Lines(self.map, start)
+        self.columns = next(csv.reader(lines), [])
+        self.data_start = lines.offset
+        self.checkpoints = array.array('Q', [self.data_start])
+        self.row_count = 0
+        self.indexed = False
+        self.temp_dir = tempfile.mkdtemp(prefix="regparser_view_")
+        self.views = []
+
+    def _record_ends(self, offset):
+        """Yield the end offset of each record from offset on.
+
+        A record ends at a newline outside quotes; CSV escapes quotes by
+        doubling them, so an odd quote count on a line flips the state.
+        """
+        buffer = self.map
+        inside = False
+        size = len(buffer)
+        while offset < size:
+            end = buffer.find(b'\n', offset)
+            end = size if end < 0 else end + 1
+            if buffer.find(b'"', offset, end) >= 0 and buffer[offset:end].count(b'"') & 1:
+                inside = not inside
+            offset = end
+            if not inside:
+                yield offset
+
+    def build_index(self, progress=None, cancel=None):
+        """Record every SPARSE_EVERY-th record offset; rows become reachable as this advances"""
+        if progress is not None:
+            progress.total_bytes = self.size
+        last = self.data_start
+        for count, end in enumerate(self._record_ends(self.data_start), 1):
+            self.row_count = count
+            if count % SPARSE_EVERY == 0:
+                self.checkpoints.append(end)
+                if cancel is not None and count % (SPARSE_EVERY * CANCEL_CHECK_EVERY) == 0:
+                    cancel.check()
+                if progress is not None:
+                    progress.add(rows=SPARSE_EVERY, nbytes=end - last)
+                    last = end
+        if progress is not None:
+            progress.add(rows=self.row_count % SPARSE_EVERY, nbytes=self.size - last)
+        self.indexed = True
+        return self.row_count
+
+    def offset_of_row(self, row):
+        checkpoint = min(row // SPARSE_EVERY, len(self.checkpoints) - 1)
+        offset = self.checkpoints[checkpoint]
+        skip = row - checkpoint * SPARSE_EVERY
+        if skip:
+            for skipped, end in enumerate(self._record_ends(offset), 1):
+                if skipped == skip:
+                    return end
+        return offset
+
+    def record_at(self, offset):
+        return next(csv.reader(_Lines(self.map, offset)), [])
+
+    def rows(self, start, count):
+        count = max(0, min(count, self.row_count - start))
+        if not count:
+            return []
+        lines = _Lines(self.map, self.offset_of_row(start))
+        reader = csv.reader(lines)
+        return [record for _, record in zip(range(count), reader)]
+
+    def iter_records(self, cancel=None):
+        """(offset, record) of every row in file order"""
+        lines = _Lines(self.map, self.data_start)
+        reader = csv.reader(lines)
+        seen = 0
+        while True:
+            offset = lines.offset
+            record = next(reader, None)
+            if record is None:
+                return
+            seen += 1
+            if cancel is not None and seen % CANCEL_CHECK_EVERY == 0:
+                cancel.check()
+            yield offset, record
+
+    def natural_view(self):
+        return NaturalView(self)
+
+    def _new_view_path(self, name):
+        return os.path.join(self.temp_dir, f"{name}_{len(self.views):04d}.offsets")
+
+    def _finish_view(self, path):
+        view = OffsetView(self, path)
+        self.views.append(view)
+        return view
+
+    def sorted(self, view, column, descending=False, progress=None, cancel=None):
+        """A view of view's rows ordered by column, built by external sort on (key, offset)"""
+        run_dir = tempfile.mkdtemp(dir=self.temp_dir)
+        try:
+            runs, items = [], []
+            for offset, record in view.iter_records(cancel):
+                items.append((_sort_key(record[column] if column < len(record) else ''), offset))
+                if len(items) >= SORT_RUN_ROWS:
+                    runs.append(_write_run(items, run_dir, len(runs), descending))
+                    items = []
+                    if progress is not None:
+                        progress.add(rows=SORT_RUN_ROWS)
+            if items:
+                runs.append(_write_run(items, run_dir, len(runs), descending))
+            path = self._new_view_path("sorted")
+            with open(path, 'wb') as f:
+                batch = array.array('Q')
+                for merged, (_, offset) in enumerate(heapq.merge(*(_read_run(run) for run in runs),
+                                                                 reverse=descending), 1):
+                    batch.append(offset)
+                    if len(batch) >= OFFSET_WRITE_BATCH:
+                        if cancel is not None and cancel.cancelled:
+                            raise JobCancelled()
+                        batch.tofile(f)
+                        batch = array.array('Q')
+                batch.tofile(f)
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+        return self._finish_view(path)
+
+    def filtered(self, view, text, column=None, progress=None, cancel=None):
+        """A view of view's rows containing text (case-insensitive), in one column or any"""
+        needle = text.lower()
+        path = self._new_view_path("filtered")
+        with open(path, 'wb') as f:
+            batch = array.array('Q')
+            for offset, record in view.iter_records(cancel):
+                values = record[column:column + 1] if column is not None else record
+                if any(needle in value.lower() for value in values):
+                    batch.append(offset)
+                    if len(batch) >= OFFSET_WRITE_BATCH:
+                        batch.tofile(f)
+                        batch = array.array('Q')
+                        if progress is not None:
+                            progress.add(rows=OFFSET_WRITE_BATCH)
+            batch.tofile(f)
+        return self._finish_view(path)
+
+    def close(self):
+        for view in self.views:
+            view.close()
+        if self.size:
+            self.map.close()
+        self.file.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class RowidView:
+    """Rows of a SqliteTable in the order of an on-disk array of rowids.
+
+    where/params and order_by/descending are the query that produced it, so
+    a filter or sort of this view can refine it. length None means the array
+    is still growing and the table's row_count says how much of it is written.
+    """
+
+    def __init__(self, table, path, where=None, params=(), order_by=None, descending=False, length=None):
+        self.table = table
+        self.path = path
+        self.where = where
+        self.params = tuple(params)
+        self.order_by = order_by
+        self.descending = descending
+        self.length = length
+        self.file = open(path, 'rb')
+        self.lock = threading.Lock()
+
+    def count(self):
+        return self.table.row_count if self.length is None else self.length
+
+    def rowids(self, start, count):
+        count = max(0, min(count, self.count() - start))
+        rowids = array.array('q')
+        if count:
+            with self.lock:
+                self.file.seek(start * 8)
+                rowids.frombytes(self.file.read(count * 8))
+        return rowids
+
+    def rows(self, start, count):
+        return self.table.rows_by_rowid(self.rowids(start, count))
+
+    def close(self):
+        self.file.close()
+
+
+class SqliteTable:
+    """A RegParser SQLite output with one table (e.g. the timeline)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = self._connect()
+        self.lock = threading.Lock()
+        self.name = self.query("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY rowid LIMIT 1")[0][0]
+        self.columns = [row[1] for row in self.query(f"PRAGMA table_info({self.name})")]
+        self.row_count = 0
+        self.indexed = False
+        self.temp_dir = tempfile.mkdtemp(prefix="regparser_view_")
+        self.views = []
+        natural_path = self._new_view_path("natural")
+        open(natural_path, 'wb').close()
+        self.natural = self._finish_view(RowidView(self, natural_path))
+
+    def _connect(self):
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def rows_by_rowid(self, rowids):
+        """Rows for rowids, in that order; one indexed lookup per page"""
+        if not rowids:
+            return []
+        select = ", ".join(f'"{column}"' for column in self.columns)
+        found = {row[0]: row[1:] for row in self.query(
+            f"SELECT rowid, {select} FROM {self.name} WHERE rowid IN ({', '.join('?' * len(rowids))})", tuple(rowids))}
+        return [["" if value is None else str(value) for value in found.get(rowid, ())] for rowid in rowids]
+
+    def _rowid_query(self, where, order_by, descending):
+        sql = f"SELECT rowid FROM {self.name}"
+        if where:
+            sql += f" WHERE {where}"
+        if order_by is not None:
+            sql += f' ORDER BY "{order_by}"' + (" DESC" if descending else "") + ", rowid"
+        else:
+            sql += " ORDER BY rowid"
+        return sql
+
+    def _write_rowids(self, sql, params, path, progress=None, cancel=None, grow=False):
+        """Stream the rowids sql selects into path on a connection of this job's own; returns the count.
+
+        With grow, row_count follows each written batch so the view can page
+        while the query is still running.
+        """
+        connection = self._connect()
+        if cancel is not None:
+            connection.set_progress_handler(lambda: cancel.cancelled, SQLITE_CANCEL_STEPS)
+        written = 0
+        try:
+            cursor = connection.execute(sql, params)
+            with open(path, 'wb') as f:
+                while True:
+                    batch = cursor.fetchmany(OFFSET_WRITE_BATCH)
+                    if not batch:
+                        break
+                    array.array('q', (row[0] for row in batch)).tofile(f)
+                    written += len(batch)
+                    if grow:
+                        f.flush()
+                        self.row_count = written
+                    if progress is not None:
+                        progress.add(rows=len(batch))
+        except sqlite3.OperationalError:
+            # The progress handler aborts the query with "interrupted"
+            if cancel is not None and cancel.cancelled:
+                raise JobCancelled()
+            raise
+        finally:
+            connection.close()
+        return written
+
+    def _new_view_path(self, name):
+        return os.path.join(self.temp_dir, f"{name}_{len(self.views):04d}.rowids")
+
+    def _finish_view(self, view):
+        self.views.append(view)
+        return view
+
+    def build_index(self, progress=None, cancel=None):
+        """Write every rowid in table order; rows become reachable as this advances"""
+        self._write_rowids(self._rowid_query(None, None, False), (), self.natural.path, progress, cancel, grow=True)
+        self.indexed = True
+        return self.row_count
+
+    def natural_view(self):
+        return self.natural
+
+    def _query_view(self, name, where, params, order_by, descending, progress, cancel):
+        path = self._new_view_path(name)
+        length = self._write_rowids(self._rowid_query(where, order_by, descending), params, path, progress, cancel)
+        return self._finish_view(RowidView(self, path, where, params, order_by, descending, length))
+
+    def sorted(self, view, column, descending=False, progress=None, cancel=None):
+        """A view of view's rows ordered by column, sorted once by SQLite in the background"""
+        return self._query_view("sorted", view.where, view.params, self.columns[column], descending, progress, cancel)
+
+    def filtered(self, view, text, column=None, progress=None, cancel=None):
+        """A view of view's rows containing text (case-insensitive), in one column or any"""
+        columns = [self.columns[column]] if column is not None else self.columns
+        condition = "(" + " OR ".join(f'"{name}" LIKE ?' for name in columns) + ")"
+        params = view.params + (f"%{text}%",) * len(columns)
+        where = f"{view.where} AND {condition}" if view.where else condition
+        return self._query_view("filtered", where, params, view.order_by, view.descending, progress, cancel)
+
+    def close(self):
+        for view in self.views:
+            view.close()
+        self.connection.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def open_table(path):
+    """CsvTable or SqliteTable for an output file"""
+    if path.lower().endswith(('.sqlite', '.db')):
+        return SqliteTable(path)
+    return CsvTable(path)
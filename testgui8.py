@@ -1,26 +1,230 @@
 import tkinter as tk
 from tkinter import filedialog, scrolledtext, ttk, messagebox
 import os
-import csv
-import sys
-import zipfile
+import time
 import shutil
-import subprocess
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from threading import Thread
-from Registry import Registry
 import datetime
-import struct
 import json
+import multiprocessing
+
+from regparser_core import (
+    JobCancelled, find_hives, extract_zip,
+    hive_data_size, parse_registry_hive, parse_usb_devices_from_system_hive,
+    parse_bluetooth_from_system_hives, parse_network_profiles_from_software_hives,
+)
+from regparser_events import EventBus, ProgressTracker, format_duration
+from regparser_jobs import Job, JobManager
+from regparser_governor import ResourceGovernor
+from regparser_pipeline import ALL_TASKS, REPORT_FORMATS, build_triage_pipeline, report_export_jobs, step_hives
+from regparser_manifest import open_manifest
+from regparser_timeline import build_timeline, window_bound, TIMELINE_FORMATS, TIMELINE_SOURCES
+from regparser_search import update_search_index, search_case
+from regparser_viewer import open_table
+from regparser_profiling import Profiler
+from regparser_shellbags import parse_shellbags_from_user_hives, USER_HIVE_NAMES
+from regparser_prefetch import parse_prefetch_folder
+from regparser_jumplists import parse_jump_lists_folder
+import regparser_reports
+
+
+# Console refresh cadence and limits for the queued log sink
+EVENT_POLL_MS = 100
+EVENT_BATCH_LIMIT = 2000
+MAX_CONSOLE_LINES = 5000
+# Running stages shown in the throughput line before it collapses to "+N more"
+MAX_TRACKERS_SHOWN = 3
+SEARCH_RESULT_LIMIT = 500
+# Results viewer: rows rendered at once, and refresh cadence while a table is still being indexed
+VIEWER_PAGE_ROWS = 40
+VIEWER_REFRESH_MS = 500
+
+
+class ResultsTab:
+    """One output table in the results viewer; only the visible page of rows is ever in the Treeview.
+
+    Indexing, sorting and filtering run as io jobs and hand their views back
+    through the event bus, so the window stays responsive on huge tables.
+    """
+
+    def __init__(self, app, notebook, path):
+        self.app = app
+        self.notebook = notebook
+        self.table = open_table(path)
+        self.view = self.table.natural_view()
+        self.first = 0
+        self.sort_column = None
+        self.descending = False
+        self.pending = []
+
+        self.frame = tk.Frame(notebook)
+        notebook.add(self.frame, text=os.path.basename(path))
+
+        toolbar = tk.Frame(self.frame)
+        toolbar.pack(fill='x', padx=5, pady=5)
+        self.jump_var = tk.StringVar()
+        tk.Label(toolbar, text="Row:").pack(side='left')
+        jump_entry = tk.Entry(toolbar, textvariable=self.jump_var, width=12)
+        jump_entry.pack(side='left', padx=(2, 2))
+        jump_entry.bind('<Return>', lambda event: self.jump())
+        tk.Button(toolbar, text="Go", command=self.jump).pack(side='left', padx=(0, 15))
+        self.filter_var = tk.StringVar()
+        self.filter_column_var = tk.StringVar(value="All columns")
+        tk.Label(toolbar, text="Filter:").pack(side='left')
+        filter_entry = tk.Entry(toolbar, textvariable=self.filter_var, width=30)
+        filter_entry.pack(side='left', padx=2)
+        filter_entry.bind('<Return>', lambda event: self.apply_filter())
+        ttk.Combobox(toolbar, textvariable=self.filter_column_var, state='readonly', width=18,
+                     values=["All columns"] + list(self.table.columns)).pack(side='left', padx=2)
+        tk.Button(toolbar, text="Apply", command=self.apply_filter).pack(side='left', padx=2)
+        tk.Button(toolbar, text="Reset", command=self.reset_view).pack(side='left', padx=2)
+        tk.Button(toolbar, text="Close Tab", command=self.close, bg="#d32f2f", fg="white").pack(side='right')
+
+        body = tk.Frame(self.frame)
+        body.pack(fill='both', expand=True, padx=5)
+        columns = [str(index) for index in range(len(self.table.columns))]
+        self.tree = ttk.Treeview(body, columns=columns, show='headings', height=VIEWER_PAGE_ROWS, selectmode='browse')
+        for column, title in zip(columns, self.table.columns):
+            self.tree.heading(column, text=title, command=lambda index=int(column): self.sort_by(index))
+            self.tree.column(column, width=160, stretch=True)
+        # The scrollbar spans the whole view, not the Treeview's handful of items
+        self.scrollbar = tk.Scrollbar(body, orient='vertical', command=self.on_scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+        for sequence, step in (('<Button-4>', -3), ('<Button-5>', 3), ('<Up>', -1), ('<Down>', 1),
+                               ('<Prior>', -VIEWER_PAGE_ROWS), ('<Next>', VIEWER_PAGE_ROWS)):
+            self.tree.bind(sequence, lambda event, step=step: self.scroll_to(self.first + step) or 'break')
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll_to(self.first - event.delta // 40) or 'break')
+        self.tree.bind('<Home>', lambda event: self.scroll_to(0) or 'break')
+        self.tree.bind('<End>', lambda event: self.scroll_to(self.view.count()) or 'break')
+
+        self.status_var = tk.StringVar()
+        tk.Label(self.frame, textvariable=self.status_var, anchor='w', relief=tk.SUNKEN).pack(fill='x', padx=5, pady=5)
+
+        notebook.select(self.frame)
+        self.run(f"Index {os.path.basename(path)}", self.thread_index)
+        self.render()
+        self.refresh_while_indexing()
+
+    def run(self, name, target):
+        self.pending = [job for job in self.pending if not job.finished]
+        self.pending.append(self.app.start_job(name, target, kind='io'))
+
+    def thread_index(self, cancel):
+        try:
+            rows = self.table.build_index(cancel=cancel)
+            self.app.log(f"✅ Indexed {rows:,} rows of {self.table.path}")
+        except JobCancelled:
+            pass
+        except Exception as e:
+            self.app.log(f"❌ Indexing {self.table.path} failed: {e}")
+
+    def refresh_while_indexing(self):
+        if not self.frame.winfo_exists():
+            return
+        self.render()
+        if not self.table.indexed:
+            self.frame.after(VIEWER_REFRESH_MS, self.refresh_while_indexing)
+
+    def render(self):
+        count = self.view.count()
+        self.first = max(0, min(self.first, count - VIEWER_PAGE_ROWS))
+        rows = self.view.rows(self.first, VIEWER_PAGE_ROWS)
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert('', 'end', values=row)
+        if count:
+            self.scrollbar.set(self.first / count, (self.first + len(rows)) / count)
+        else:
+            self.scrollbar.set(0, 1)
+        shown = f"Rows {self.first + 1:,}–{self.first + len(rows):,} of {count:,}" if rows else "No rows"
+        if not self.table.indexed:
+            shown += " (indexing...)"
+        if self.sort_column is not None:
+            shown += f" · sorted by {self.table.columns[self.sort_column]}" + (" ↓" if self.descending else " ↑")
+        self.status_var.set(shown)
+
+    def scroll_to(self, first):
+        self.first = first
+        self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.view.count()))
+        elif action == 'scroll':
+            step = VIEWER_PAGE_ROWS if unit == 'pages' else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def jump(self):
+        try:
+            row = int(self.jump_var.get().replace(',', ''))
+        except ValueError:
+            messagebox.showwarning("Results Viewer", "Enter a row number.")
+            return
+        self.scroll_to(row - 1)
+
+    def sort_by(self, column):
+        descending = not self.descending if column == self.sort_column else False
+        view = self.view
+        self.status_var.set(f"Sorting by {self.table.columns[column]}...")
+
+        def target(cancel):
+            try:
+                sorted_view = self.table.sorted(view, column, descending, cancel=cancel)
+                self.app.events.call(self.set_view, sorted_view, column, descending)
+            except JobCancelled:
+                pass
+            except Exception as e:
+                self.app.log(f"❌ Sorting {self.table.path} failed: {e}")
+
+        self.run(f"Sort {os.path.basename(self.table.path)}", target)
+
+    def apply_filter(self):
+        text = self.filter_var.get().strip()
+        if not text:
+            self.reset_view()
+            return
+        name = self.filter_column_var.get()
+        column = self.table.columns.index(name) if name in self.table.columns else None
+        view = self.view
+        self.status_var.set(f"Filtering on {text!r}...")
+
+        def target(cancel):
+            try:
+                filtered_view = self.table.filtered(view, text, column, cancel=cancel)
+                self.app.events.call(self.set_view, filtered_view, self.sort_column, self.descending)
+            except JobCancelled:
+                pass
+            except Exception as e:
+                self.app.log(f"❌ Filtering {self.table.path} failed: {e}")
+
+        self.run(f"Filter {os.path.basename(self.table.path)}", target)
+
+    def reset_view(self):
+        self.filter_var.set("")
+        self.set_view(self.table.natural_view(), None, False)
 
+    def set_view(self, view, sort_column, descending):
+        if not self.frame.winfo_exists():
+            return
+        self.view = view
+        self.sort_column = sort_column
+        self.descending = descending
+        self.first = 0
+        self.render()
+
+    def close(self):
+        self.frame.destroy()
+        for job in self.pending:
+            self.app.jobs.cancel(job)
+        self.close_when_idle()
+
+    def close_when_idle(self):
+        """Unmap the table only once no job still reads it"""
+        if any(not job.finished for job in self.pending):
+            self.app.root.after(VIEWER_REFRESH_MS, self.close_when_idle)
+        else:
+            self.table.close()
 
-BASE_DIR = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
-TOOLS_DIR = os.path.join(BASE_DIR, "tools")
-JLECMD_PATH = os.path.join(TOOLS_DIR, "JLECmd", "JLECmd.exe")
-SBECMD_PATH = os.path.join(TOOLS_DIR, "SBECmd", "SBECmd.exe")
-PECMD_PATH = os.path.join(TOOLS_DIR, "PECmd", "PECmd.exe")
 
 class ForensicParserApp:
     def __init__(self, root):
@@ -33,9 +237,16 @@ class ForensicParserApp:
         self.jump_folder_var = tk.StringVar()
         self.prefetch_folder_var = tk.StringVar()
         self.output_folder_var = tk.StringVar()
-        self.cancel_flag = False
+        self.search_var = tk.StringVar()
+        self.jobs = JobManager()
+        self.profile_var = tk.BooleanVar(value=False)
+        self.jobs_window = None
+        self.viewer_window = None
         self.logo_path_var = tk.StringVar()
         self.temp_zip_dir = None
+        self.events = EventBus()
+        # Sizes the job pools from the CPUs and RAM and holds back new jobs near the memory ceiling
+        self.governor = ResourceGovernor(log=self.log).start(self.jobs)
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
 
@@ -54,6 +265,7 @@ class ForensicParserApp:
         self.create_frames()
         self.create_console()
         self.load_config()
+        self.pump_events()
     
     def browse_logo(self):
         """Browse for organization logo file"""
@@ -85,8 +297,12 @@ class ForensicParserApp:
         
         tools_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Tools", menu=tools_menu)
-        tools_menu.add_command(label="Verify Tool Paths", command=self.verify_tools)
         tools_menu.add_command(label="View Output Folder", command=self.open_output_folder)
+        tools_menu.add_command(label="Build Timeline...", command=self.build_timeline_dialog)
+        tools_menu.add_command(label="Results Viewer...", command=self.open_results_viewer)
+        tools_menu.add_command(label="Jobs Panel", command=self.show_jobs_panel)
+        tools_menu.add_separator()
+        tools_menu.add_checkbutton(label="Profile Jobs", variable=self.profile_var, command=self.toggle_profiling)
 
     def create_case_info_frame(self):
         case_frame = tk.LabelFrame(self.root, text="Case Information", bg="#f0f0f0", fg="red", font=("Arial", 12, "bold"))
@@ -163,6 +379,7 @@ class ForensicParserApp:
         
         tk.Button(reg_analysis_frame2, text="Parse Bluetooth", command=self.start_parse_bluetooth, bg="#00796B", fg="white").pack(side='left', padx=2)
         tk.Button(reg_analysis_frame2, text="Parse Network", command=self.start_parse_network, bg="#33691E", fg="white").pack(side='left', padx=2)
+        tk.Button(reg_analysis_frame2, text="Run Full Triage", command=self.start_full_triage, bg="#B71C1C", fg="white").pack(side='left', padx=2)
 
 
         # Jump Lists frame
@@ -189,6 +406,14 @@ class ForensicParserApp:
         tk.Button(control_buttons, text="Clear Log", bg="#9E9E9E", fg="white", command=self.clear_log).pack(side='left', padx=5)
         tk.Button(control_buttons, text="Exit", bg="black", fg="white", command=self.on_close).pack(side='left', padx=5)
 
+        search_row = tk.Frame(control_frame, bg="#f0f0f0")
+        search_row.pack(fill='x', padx=5, pady=5)
+        tk.Label(search_row, text="Search outputs:", bg="#f0f0f0", width=20, anchor="w").pack(side="left")
+        search_entry = tk.Entry(search_row, textvariable=self.search_var, width=40)
+        search_entry.pack(side="left", fill='x', expand=True)
+        search_entry.bind("<Return>", lambda event: self.start_search())
+        tk.Button(search_row, text="Search", command=self.start_search, bg="#3F51B5", fg="white").pack(side="left", padx=5)
+
 
         self.root.grid_columnconfigure((0,1), weight=1)
         self.root.grid_rowconfigure((1,2), weight=1)
@@ -220,21 +445,102 @@ class ForensicParserApp:
         self.progress_label = tk.Label(progress_frame, text="0%", bg="#f0f0f0", width=5)
         self.progress_label.pack(side='right', padx=5)
         
+        # Live throughput / ETA of running stages
+        self.throughput_var = tk.StringVar(value="")
+        tk.Label(console_frame, textvariable=self.throughput_var, anchor='w', bg="#f0f0f0",
+                 font=("Courier", 9)).pack(fill='x', padx=5)
+        self.stage_trackers = {}
+        self.spinning = False
+
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
         status_bar = tk.Label(console_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor='w', bg="#e0e0e0")
         status_bar.pack(fill='x')
 
     def log(self, message):
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}"
-        
-        self.output_console.config(state='normal')
-        self.output_console.insert(tk.END, formatted_message + "\n")
-        self.output_console.see(tk.END)
-        self.output_console.config(state='disabled')
-        self.status_var.set(message)
-        self.root.update_idletasks()
+        """Safe to call from any thread; the console is updated by pump_events"""
+        self.events.log(message)
+
+    def pump_events(self):
+        """Apply queued log/progress events on the Tk thread in one batch"""
+        self.pump_after_id = self.root.after(EVENT_POLL_MS, self.pump_events)
+        if self.jobs.profiler is not None:
+            with self.jobs.profiler.section("Tk event pump"):
+                self.apply_events()
+        else:
+            self.apply_events()
+
+    def apply_events(self):
+        lines = []
+        status = None
+        progress = None
+        for event in self.events.drain(EVENT_BATCH_LIMIT):
+            kind = event[0]
+            if kind == 'log':
+                lines.append(event[1])
+                status = event[2]
+            elif kind == 'status':
+                status = event[1]
+            elif kind == 'progress':
+                progress = event[1:]
+            elif kind == 'stage':
+                tracker = event[1]
+                if tracker.stage not in self.stage_trackers:
+                    # A new stage replaces stages that have already finished
+                    for stage, old in list(self.stage_trackers.items()):
+                        if old.finished:
+                            del self.stage_trackers[stage]
+                self.stage_trackers[tracker.stage] = tracker
+            elif kind == 'call':
+                event[1](*event[2])
+
+        if lines:
+            self.output_console.config(state='normal')
+            self.output_console.insert(tk.END, "\n".join(lines) + "\n")
+            # Keep the console bounded so long verbose runs don't slow down Tk
+            line_count = int(self.output_console.index('end-1c').split('.')[0])
+            if line_count > MAX_CONSOLE_LINES:
+                self.output_console.delete('1.0', f"{line_count - MAX_CONSOLE_LINES}.0")
+            self.output_console.see(tk.END)
+            self.output_console.config(state='disabled')
+        if status is not None:
+            self.status_var.set(status)
+        if progress is not None:
+            current, total = progress
+            if total > 0:
+                percentage = int((current / total) * 100)
+                self.progress["value"] = percentage
+                self.progress_label.config(text=f"{percentage}%")
+        self.render_trackers()
+        self.refresh_jobs_panel()
+
+    def render_trackers(self):
+        """Show live throughput/ETA for running stages; called on every pump tick"""
+        if not self.stage_trackers:
+            return
+        trackers = list(self.stage_trackers.values())
+        active = [t for t in trackers if not t.finished]
+        shown = active[:MAX_TRACKERS_SHOWN] or trackers[-1:]
+        text = " | ".join(t.describe() for t in shown)
+        if len(active) > len(shown):
+            text += f" | (+{len(active) - len(shown)} more)"
+        self.throughput_var.set(text)
+
+        measured = [t for t in active if t.fraction() is not None]
+        if measured or not active:
+            if self.spinning:
+                self.progress.stop()
+                self.progress.config(mode='determinate')
+                self.spinning = False
+            fraction = measured[0].fraction() if measured else 1.0
+            percentage = int(fraction * 100)
+            self.progress["value"] = percentage
+            self.progress_label.config(text=f"{percentage}%")
+        elif not self.spinning:
+            # External tools give no counters; fall back to the spinner
+            self.progress.config(mode='indeterminate')
+            self.progress.start()
+            self.spinning = True
 
     def clear_log(self):
         self.output_console.config(state='normal')
@@ -248,14 +554,43 @@ class ForensicParserApp:
         self.hives_listbox.selection_clear(0, tk.END)
 
     def update_progress(self, current, total):
-        if total > 0:
-            percentage = int((current / total) * 100)
-            self.progress["value"] = percentage
-            self.progress_label.config(text=f"{percentage}%")
-            self.root.update_idletasks()
+        self.events.progress(current, total)
+
+    def start_tracker(self, stage, **totals):
+        """Create a ProgressTracker for a worker stage and show it in the GUI"""
+        tracker = ProgressTracker(stage, self.events.stage, **totals)
+        self.events.stage(tracker)
+        return tracker
+
+    def finish_tracker(self, tracker):
+        tracker.finish()
+        self.log(f"⏱ {tracker.describe()}")
+        profiler = self.jobs.profiler
+        if profiler is not None:
+            profiler.record_stage(tracker)
+
+    def toggle_profiling(self):
+        """Profile every job queued while the toggle is on; turning it off writes the run summary"""
+        if self.profile_var.get():
+            output = self.output_folder_var.get()
+            if not output:
+                messagebox.showwarning("Profile Jobs", "Please set the output folder first; profiles are written there.")
+                self.profile_var.set(False)
+                return
+            os.makedirs(output, exist_ok=True)
+            self.jobs.profiler = Profiler(output, log=self.log)
+            self.log(f"📊 Profiling on. Jobs queued from now on are profiled into {self.jobs.profiler.folder}")
+        else:
+            self.stop_profiling()
 
-    def save_config(self):
-        config = {
+    def stop_profiling(self):
+        profiler, self.jobs.profiler = self.jobs.profiler, None
+        if profiler is not None:
+            profiler.finish()
+
+    def get_config(self):
+        """Current folders and case information in the save_config/job file format"""
+        return {
             'reg_folder': self.reg_folder_var.get(),
             'jump_folder': self.jump_folder_var.get(),
             'prefetch_folder': self.prefetch_folder_var.get(),
@@ -265,6 +600,15 @@ class ForensicParserApp:
             'organization': self.case_info['organization'].get(),
             'logo_path': self.case_info['logo_path'].get()
         }
+
+    def get_case(self):
+        """Case dict consumed by the report generators"""
+        case = self.get_config()
+        case['date'] = self.case_info['date'].get()
+        return case
+
+    def save_config(self):
+        config = self.get_config()
     
         filename = filedialog.asksaveasfilename(
             defaultextension=".json",
@@ -301,74 +645,10 @@ class ForensicParserApp:
                 self.log(f"✅ Configuration loaded from {filename}")
             except Exception as e:
                 self.log(f"❌ Failed to load configuration: {e}")
-    def copy_app_logo_to_output(self, output_dir):
-        src_path = os.path.join(BASE_DIR, "app_logo.png")
-        if os.path.exists(src_path):
-            try:
-                import shutil
-                dest_path = os.path.join(output_dir, "app_logo.png")
-                shutil.copy2(src_path, dest_path)
-                return "app_logo.png"  # Relative path
-            except Exception as e:
-                print(f"⚠️ Failed to copy app logo: {e}")
-        return None
-
-    def copy_logo_to_output(self, logo_path, output_dir):
-        """Copy logo file to output directory and return relative path"""
-        if not logo_path or not os.path.exists(logo_path):
-            return None
-    
-        try:
-            logo_filename = os.path.basename(logo_path)
-            logo_dest = os.path.join(output_dir, logo_filename)
-        
-            # Copy logo file to output directory
-            import shutil
-            shutil.copy2(logo_path, logo_dest)
-        
-            return logo_filename  # Return relative path
-        except Exception as e:
-            self.log(f"⚠️ Failed to copy logo: {e}")
-            return None
     def get_analysis_summary(self):
         """Generate analysis summary for the report"""
-        summary = {
-            'registry_files': self.hives_listbox.size(),
-            'output_folders': []
-        }
-    
-        output_base = self.output_folder_var.get()
-        if output_base:
-            # Check which output folders exist
-            potential_folders = ['Registry', 'JumpLists', 'Prefetch', 'Shellbags', 'USB_Devices', 'Bluetooth_Devices', 'Network_Connections']
-            for folder in potential_folders:
-                folder_path = os.path.join(output_base, folder)
-                if os.path.exists(folder_path):
-                    file_count = len([f for f in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, f))])
-                    summary['output_folders'].append({'name': folder, 'file_count': file_count})
+        return regparser_reports.cached_analysis_summary(self.output_folder_var.get(), self.hives_listbox.size())
     
-        return summary
-    
-    def verify_tools(self):
-        tools = {
-            "JLECmd": JLECMD_PATH,
-            "SBECmd": SBECMD_PATH,
-            "PECmd": PECMD_PATH
-        }
-        
-        missing_tools = []
-        for tool_name, tool_path in tools.items():
-            if not os.path.exists(tool_path):
-                missing_tools.append(f"{tool_name}: {tool_path}")
-        
-        if missing_tools:
-            message = "Missing tools:\n" + "\n".join(missing_tools)
-            messagebox.showwarning("Missing Tools", message)
-            self.log("⚠️ Some tools are missing. Check paths in TOOLS_DIR.")
-        else:
-            messagebox.showinfo("Tool Verification", "All tools found successfully!")
-            self.log("✅ All forensic tools verified.")
-
     def open_output_folder(self):
         output_folder = self.output_folder_var.get()
         if output_folder and os.path.exists(output_folder):
@@ -395,313 +675,53 @@ class ForensicParserApp:
         tk.Checkbutton(export_window, text="Export as PDF", variable=pdf_var).pack(anchor='w', padx=20)
 
         def perform_export():
-            base_path = os.path.join(self.output_folder_var.get(), "forensic_analysis_report")
-            try:
-                if html_var.get():
-                    self.generate_html_report(base_path + ".html")
-                if pdf_var.get():
-                    self.generate_pdf_report(base_path + ".pdf")
-
-                formats = []
-                if html_var.get(): formats.append("HTML")
-                if pdf_var.get(): formats.append("PDF")
-                if formats:
-                    self.log(f"✅ Report exported as: {', '.join(formats)}")
-                    messagebox.showinfo("Export Success", f"Exported report as: {', '.join(formats)}")
-                else:
-                    self.log("⚠️ No format selected for export.")
-                    messagebox.showwarning("No Format", "No format selected.")
-
-            except Exception as e:
-                self.log(f"❌ Failed to export report: {e}")
-                messagebox.showerror("Export Error", f"Failed to export report:\n{e}")
-            export_window.destroy()
+            formats = [fmt for fmt, var in (('html', html_var), ('pdf', pdf_var)) if var.get()]
+            if not formats:
+                self.log("⚠️ No format selected for export.")
+                messagebox.showwarning("No Format", "No format selected.")
+                return
+            # Snapshot the form on the Tk thread; the summary and the renderers run as jobs
+            case, registry_files = self.get_case(), self.hives_listbox.size()
+            parent = self.start_job("Report", lambda cancel: report_export_jobs(case, registry_files, formats, self),
+                                    kind='io')
+            self.log(f"🚀 Report export started: {', '.join(fmt.upper() for fmt in formats)}")
+            self.show_export_progress(export_window, parent, formats, time.monotonic())
 
         tk.Button(export_window, text="Export", command=perform_export, bg="#4CAF50", fg="white").pack(pady=10)
 
-    
-    def generate_html_report(self, output_path):
-        output_dir = os.path.dirname(output_path)
-        logo_filename = self.copy_logo_to_output(self.case_info['logo_path'].get(), output_dir)
-        app_logo_filename = self.copy_app_logo_to_output(output_dir)
-        analysis_summary = self.get_analysis_summary()
-    
-        # Generate logo HTML
-        logo_html = ""
-        if logo_filename:
-            logo_html = f'<img src="{logo_filename}" alt="Organization Logo" style="max-height: 120px; float: right;">'
-        
-        app_logo_html = f'<img src="{app_logo_filename}" alt="App Logo" style="max-height: 100px;">' if app_logo_filename else ""
-
-    
-        # Generate analysis summary HTML
-        summary_html = ""
-        if analysis_summary['output_folders']:
-            summary_html = "<ul>"
-            for folder in analysis_summary['output_folders']:
-                summary_html += f"<li>{folder['name']}: {folder['file_count']} files generated</li>"
-            summary_html += "</ul>"
-        else:
-            summary_html = "<p>No output files generated yet.</p>"
-
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Forensic Analysis Report</title>
-            <meta charset="UTF-8">
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
-                .header {{ background-color: #f8f9fa; padding: 20px; border-radius: 5px; border-left: 5px solid #007bff; margin-bottom: 20px; }}
-                .organization-info {{ overflow: hidden; margin-bottom: 15px; }}
-                .case-details {{ display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin-top: 15px; }}
-                .section {{ margin: 20px 0; }}
-                .section h2 {{ color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px; }}
-                .artifact {{ background-color: #f9f9f9; padding: 15px; margin: 10px 0; border-left: 4px solid #2196F3; border-radius: 4px; }}
-                .artifact h3 {{ margin-top: 0; color: #34495e; }}
-                table {{ border-collapse: collapse; width: 100%; margin: 15px 0; }}
-                th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-                th {{ background-color: #f2f2f2; font-weight: bold; }}
-                tr:nth-child(even) {{ background-color: #f9f9f9; }}
-                .path-cell {{ font-family: 'Courier New', monospace; font-size: 0.9em; word-break: break-all; }}
-                .status-complete {{ color: #27ae60; font-weight: bold; }}
-                .status-pending {{ color: #f39c12; font-weight: bold; }}
-                .status-missing {{ color: #e74c3c; font-weight: bold; }}
-                .footer {{ margin-top: 40px; padding: 20px; background-color: #ecf0f1; border-radius: 5px; text-align: center; font-size: 0.9em; color: #7f8c8d; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <div class="organization-info">
-                    {logo_html}
-                    <h1>Forensic Analysis Report</h1>
-                    {f'<h2 style="color: #2980b9; margin: 5px 0;">{self.case_info["organization"].get()}</h2>' if self.case_info["organization"].get() else ''}
-                </div>
-                <div class="case-details">
-                    <div>
-                        <p><strong>Case Name:</strong> {self.case_info['case_name'].get() or 'Not specified'}</p>
-                        <p><strong>Examiner:</strong> {self.case_info['examiner'].get() or 'Not specified'}</p>
-                    </div>
-                    <div>
-                        <p><strong>Analysis Date:</strong> {self.case_info['date'].get()}</p>
-                        <p><strong>Report Generated:</strong> {datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-                    </div>
-                </div>
-            </div>
-        
-            <div class="section">
-                <h2>Executive Summary</h2>
-                <div class="artifact">
-                    <h3>Analysis Overview</h3>
-                    <p>This report contains the results of digital forensic analysis performed on various system artifacts including registry hives, jump lists, prefetch files, and other system artifacts.</p>
-                    <p>All steps have been taken to maintain integrity of evidence.</p>
-                    <h4>Processed Artifacts Summary:</h4>
-                    {summary_html}
-                </div>
-            </div>
-        
-            <div class="section">
-            <p> </p> 
-                <h2>Evidence Sources</h2>
-                <table>
-                    <tr>
-                        <th>Artifact Type</th>
-                        <th>Source Path</th>
-                        <th>Status</th>
-                        <th>Output Location</th>
-                    </tr>
-                    <tr>
-                        <td>Registry Hives</td>
-                        <td class="path-cell">{self.reg_folder_var.get() or 'Not specified'}</td>
-                        <td class="{'status-complete' if self.reg_folder_var.get() else 'status-missing'}">{f'{analysis_summary["registry_files"]} files detected' if self.reg_folder_var.get() else 'Not configured'}</td>
-                        <td class="path-cell">{os.path.join(self.output_folder_var.get(), 'Registry') if self.output_folder_var.get() else 'Not set'}</td>
-                    </tr>
-                    <tr>
-                        <td>Jump Lists</td>
-                        <td class="path-cell">{self.jump_folder_var.get() or 'Not specified'}</td>
-                        <td class="{'status-complete' if self.jump_folder_var.get() else 'status-missing'}">{'Parsed successfully' if self.jump_folder_var.get() else 'Not configured'}</td>
-                        <td class="path-cell">{os.path.join(self.output_folder_var.get(), 'JumpLists') if self.output_folder_var.get() else 'Not set'}</td>
-                    </tr>
-                    <tr>
-                        <td>Prefetch Files</td>
-                        <td class="path-cell">{self.prefetch_folder_var.get() or 'Not specified'}</td>
-                        <td class="{'status-complete' if self.prefetch_folder_var.get() else 'status-missing'}">{'Parsed successfully' if self.prefetch_folder_var.get() else 'Not configured'}</td>
-                        <td class="path-cell">{os.path.join(self.output_folder_var.get(), 'Prefetch') if self.output_folder_var.get() else 'Not set'}</td>
-                    </tr>
-                    <tr>
-                        <td>Shellbags</td>
-                        <td class="path-cell">{self.reg_folder_var.get() or 'Not specified'}</td>
-                        <td class="{'status-complete' if self.reg_folder_var.get() else 'status-missing'}">{'Available from Registry' if self.reg_folder_var.get() else 'Requires Registry'}</td>
-                        <td class="path-cell">{os.path.join(self.output_folder_var.get(), 'Shellbags') if self.output_folder_var.get() else 'Not set'}</td>
-                    </tr>
-                    <tr>
-                        <td>USB Devices</td>
-                        <td class="path-cell">{self.reg_folder_var.get() or 'Not specified'}</td>
-                        <td class="{'status-complete' if self.reg_folder_var.get() else 'status-missing'}">{'Available from SYSTEM hive' if self.reg_folder_var.get() else 'Requires SYSTEM hive'}</td>
-                        <td class="path-cell">{os.path.join(self.output_folder_var.get(), 'USB_Devices') if self.output_folder_var.get() else 'Not set'}</td>
-                    </tr>
-                    <tr>
-                        <td>Bluetooth Devices</td>
-                        <td class="path-cell">{self.reg_folder_var.get() or 'Not specified'}</td>
-                        <td class="{'status-complete' if self.reg_folder_var.get() else 'status-missing'}">{'Available from SYSTEM hive' if self.reg_folder_var.get() else 'Requires SYSTEM hive'}</td>
-                        <td class="path-cell">{os.path.join(self.output_folder_var.get(), 'Bluetooth_Devices') if self.output_folder_var.get() else 'Not set'}</td>
-                    </tr>
-                    <tr>
-                        <td>Network Profiles</td>
-                        <td class="path-cell">{self.reg_folder_var.get() or 'Not specified'}</td>
-                        <td class="{'status-complete' if self.reg_folder_var.get() else 'status-missing'}">{'Available from SOFTWARE hive' if self.reg_folder_var.get() else 'Requires SOFTWARE hive'}</td>
-                        <td class="path-cell">{os.path.join(self.output_folder_var.get(), 'Network_Connections') if self.output_folder_var.get() else 'Not set'}</td>
-                    </tr>
-                </table>
-            </div>
-        
-            <div class="section">
-                <h2>Tool Information</h2>
-                <div class="artifact">
-                    <h3>Forensic Tools Used</h3>
-                    <ul>
-                        <li><strong>Registry Analysis:</strong> Custom Python parser using python-registry library</li>
-                        <li><strong>Jump Lists:</strong> JLECmd.exe 1.5.1 (Eric Zimmerman Tools)</li>
-                        <li><strong>Shellbags:</strong> SBECmd.exe 2.1.0 (Eric Zimmerman Tools)</li>
-                        <li><strong>Prefetch:</strong> PECmd.exe 1.5.1 (Eric Zimmerman Tools)</li>
-                        <li><strong>Report Generation:</strong> RegParser v2.2</li>
-                    </ul>
-                </div>
-            </div>
-        
-            <div class="footer">
-                {app_logo_html}
-                <p>This report was generated by RegParser v2.2 developed by Soukarya Sur. Follow me on linkedin.com/in/soukarya-sur-096589256</p>
-                <p>For questions about this analysis, please contact: {self.case_info['examiner'].get() or 'the assigned examiner'}</p>
-                <p>RegParser v2.2 will not be responsible for any data loss.</p>
-            </div>
-        </body>
-        </html>
-        """
-    
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
-    def generate_pdf_report(self, output_path):
-        output_dir = os.path.dirname(output_path)
-        summary = self.get_analysis_summary()
-        logo_filename = self.copy_logo_to_output(self.case_info['logo_path'].get(), output_dir)
-        app_logo_filename = self.copy_app_logo_to_output(output_dir)
-
-        pdf = canvas.Canvas(output_path, pagesize=A4)
-        width, height = A4
-        y = height - 40
-
-        pdf.setFont("Helvetica-Bold", 16)
-        pdf.drawString(40, y, "Forensic Analysis Report")
-        y -= 25
-
-        pdf.setFont("Helvetica", 10)
-        pdf.drawString(40, y, f"Organization: {self.case_info['organization'].get()}")
-        y -= 15
-        pdf.drawString(40, y, f"Case Name: {self.case_info['case_name'].get()}")
-        y -= 15
-        pdf.drawString(40, y, f"Examiner: {self.case_info['examiner'].get()}")
-        y -= 15
-        pdf.drawString(40, y, f"Date: {self.case_info['date'].get()}")
-        y -= 30
-
-        if logo_filename:
-            try:
-                logo_path = os.path.join(output_dir, logo_filename)
-                # Draw org logo at top-right corner
-                pdf.drawImage(logo_path, width - 100, 400, width=70, preserveAspectRatio=True, mask='auto')
-            except Exception as e:
-                self.log(f"⚠️ Failed to draw organization logo: {e}")
-
-        # Executive Summary
-        pdf.setFont("Helvetica-Bold", 12)
-        pdf.drawString(40, y, "Executive Summary")
-        y -= 18
-        pdf.setFont("Helvetica", 10)
-        pdf.drawString(40, y, "This report contains the results of forensic analysis on various artifacts.")
-        y -= 30
-
-        # Summary
-        pdf.setFont("Helvetica-Bold", 11)
-        pdf.drawString(40, y, "Processed Artifacts:")
-        y -= 18
-        pdf.setFont("Helvetica", 10)
-
-        for folder in summary['output_folders']:
-            if y < 60:
-                pdf.showPage()
-                y = height - 40
-                pdf.setFont("Helvetica", 10)
-            pdf.drawString(50, y, f"- {folder['name']}: {folder['file_count']} files")
-            y -= 15
-
-        y -= 10
-        pdf.setFont("Helvetica-Bold", 11)
-        pdf.drawString(40, y, "Evidence Sources:")
-        y -= 20
-        pdf.setFont("Helvetica", 10)
-
-        def draw_source(label, input_path, output_folder):
-            nonlocal y
-            if y < 60:
-                pdf.showPage()
-                y = height - 40
-                pdf.setFont("Helvetica", 10)
-
-            # Check if the tool has run (folder created and has files)
-            if os.path.exists(output_folder) and os.listdir(output_folder):
-                pdf.drawString(50, y, f"{label}:")
-                y -= 15
-                pdf.drawString(70, y, f"Input Path: {input_path or 'Not set'}")
-                y -= 15
-                pdf.drawString(70, y, f"Output Folder: {output_folder}")
-                y -= 20
-            else:
-                pdf.drawString(50, y, f"{label}: Not parsed")
-                y -= 20
-
-        draw_source("Registry Hives", self.reg_folder_var.get(), os.path.join(self.output_folder_var.get(), 'Registry'))
-        draw_source("Jump Lists", self.jump_folder_var.get(), os.path.join(self.output_folder_var.get(), 'JumpLists'))
-        draw_source("Prefetch", self.prefetch_folder_var.get(), os.path.join(self.output_folder_var.get(), 'Prefetch'))
-        draw_source("USB Devices", self.reg_folder_var.get(), os.path.join(self.output_folder_var.get(), 'USB_Devices'))
-        draw_source("Shellbags", self.reg_folder_var.get(), os.path.join(self.output_folder_var.get(), 'Shellbags'))
-        draw_source("Bluetooth Devices", self.reg_folder_var.get(), os.path.join(self.output_folder_var.get(), 'Bluetooth_Devices'))
-        draw_source("Network Profiles", self.reg_folder_var.get(), os.path.join(self.output_folder_var.get(), 'Network_Connections'))
-
-        y -= 10
-        pdf.setFont("Helvetica-Bold", 11)
-        pdf.drawString(40, y, "Tool Info:")
-        y -= 15
-        pdf.setFont("Helvetica", 10)
-        tools = [
-            "Registry Analysis: Internal Python Parser",
-            "Jump Lists: JLECmd.exe",
-            "Shellbags: SBECmd.exe",
-            "Prefetch: PECmd.exe",
-            "Report Generation: RegParser v2.2"
-        ]
-        for tool in tools:
-            pdf.drawString(50, y, f"- {tool}")
-            y -= 15
-
-        y -= 10
-        pdf.setFont("Helvetica-Oblique", 8)
-        pdf.drawString(40, y, "Generated by RegParser v2.2 developed by Soukarya Sur")
-        y -= 10
-        pdf.drawString(40, y, f"LinkedIn: linkedin.com/in/soukarya-sur-096589256")
-        y -= 10
-        pdf.drawString(40, y, f"For queries contact: {self.case_info['examiner'].get() or 'N/A'}")
-
-        if app_logo_filename:
-            try:
-                app_logo_path = os.path.join(output_dir, app_logo_filename)
-                # Draw app logo at bottom-right corner (leave margin)
-                pdf.drawImage(app_logo_path, width - 100, 20, width=70, preserveAspectRatio=True, mask='auto')
-            except Exception as e:
-                self.log(f"⚠️ Failed to draw app logo: {e}")
+    def show_export_progress(self, window, parent, formats, started):
+        """Turn the export dialog into per-format progress bars with a Cancel button"""
+        for child in window.winfo_children():
+            child.destroy()
+        window.title("Exporting Report")
+        window.geometry(f"460x{70 + 50 * len(formats)}")
+        rows = {}
+        for fmt in formats:
+            text_var = tk.StringVar(value=f"{fmt.upper()} report: waiting...")
+            tk.Label(window, textvariable=text_var, anchor='w').pack(fill='x', padx=10, pady=(8, 0))
+            bar = ttk.Progressbar(window, orient=tk.HORIZONTAL, mode='determinate')
+            bar.pack(fill='x', padx=10)
+            rows[fmt] = (text_var, bar)
+        button = tk.Button(window, text="Cancel", command=lambda: self.jobs.cancel(parent), bg="#d32f2f", fg="white")
+        button.pack(pady=10)
+
+        def poll():
+            if not window.winfo_exists():
+                return
+            for fmt, (text_var, bar) in rows.items():
+                tracker = self.stage_trackers.get(f"{fmt.upper()} report")
+                if tracker is not None and tracker.started >= started:
+                    bar['value'] = int((tracker.fraction() or 0) * 100)
+                    text_var.set(tracker.describe())
+            if parent.finished:
+                states = {child.name: child.state for child in parent.children}
+                for fmt, (text_var, bar) in rows.items():
+                    text_var.set(f"{fmt.upper()} report: {states.get(f'{fmt.upper()} report', parent.state)}")
+                button.config(text="Close", command=window.destroy, bg="#4CAF50")
+                return
+            window.after(250, poll)
 
-        pdf.save()
+        poll()
 
     def browse_reg_folder(self): self.reg_folder_var.set(filedialog.askdirectory() or "")
     def browse_jump_folder(self):
@@ -731,59 +751,278 @@ class ForensicParserApp:
     def browse_output_folder(self): self.output_folder_var.set(filedialog.askdirectory() or "")
 
     def cancel_parsing(self):
-        self.cancel_flag = True
-        self.log("🛑 Cancel requested. Waiting for threads to stop...")
-
-    def start_parse_hives(self): self.start_thread(self.thread_parse_hives)
-    def start_parse_jump_lists(self): self.start_thread(self.thread_parse_jump_lists)
-    def start_parse_shellbags(self): self.start_thread(self.thread_parse_shellbags)
-    def start_parse_prefetch(self): self.start_thread(self.thread_parse_prefetch)
-    def start_parse_usb_devices(self): self.start_thread(self.thread_parse_usb_devices)
-    def start_parse_bluetooth(self): self.start_thread(self.thread_parse_bluetooth)
-    def start_parse_network(self): self.start_thread(self.thread_parse_network)
-
-    def start_thread(self, target_func):
-        self.cancel_flag = False
-        thread = Thread(target=target_func)
-        thread.daemon = True
-        thread.start()
-
-    def thread_parse_hives(self):
-        output = self.output_folder_var.get()
-        indices = self.hives_listbox.curselection()
-        if not (output and indices):
+        count = self.jobs.cancel_all()
+        if count:
+            self.log(f"🛑 Cancel requested for {count} job(s). Waiting for them to stop...")
+        else:
+            self.log("🛑 Cancel requested, but no jobs are running.")
+
+    def selected_hives(self):
+        return [self.hives_listbox.get(i) for i in self.hives_listbox.curselection()]
+
+    # The form is read here on the Tk thread; the worker only gets plain values
+    def start_parse_hives(self):
+        output, hives = self.output_folder_var.get(), self.selected_hives()
+        self.start_job("Parse hives", lambda cancel: self.thread_parse_hives(cancel, output, hives))
+
+    def start_parse_jump_lists(self):
+        folder, output = self.jump_folder_var.get(), self.output_folder_var.get()
+        self.start_job("Jump Lists", lambda cancel: self.thread_parse_jump_lists(cancel, folder, output))
+
+    def start_parse_shellbags(self):
+        output, hives = self.output_folder_var.get(), self.selected_hives()
+        self.start_job("Shellbags", lambda cancel: self.thread_parse_shellbags(cancel, output, hives))
+
+    def start_parse_prefetch(self):
+        folder, output = self.prefetch_folder_var.get(), self.output_folder_var.get()
+        self.start_job("Prefetch", lambda cancel: self.thread_parse_prefetch(cancel, folder, output))
+
+    def start_parse_usb_devices(self):
+        output, hives = self.output_folder_var.get(), self.selected_hives()
+        self.start_job("USB devices", lambda cancel: self.thread_parse_usb_devices(cancel, output, hives))
+
+    def start_parse_bluetooth(self):
+        output, hives = self.output_folder_var.get(), self.selected_hives()
+        self.start_job("Bluetooth", lambda cancel: self.thread_parse_bluetooth(cancel, output, hives))
+
+    def start_parse_network(self):
+        output, hives = self.output_folder_var.get(), self.selected_hives()
+        self.start_job("Network profiles", lambda cancel: self.thread_parse_network(cancel, output, hives))
+
+    def build_timeline_dialog(self):
+        """Choose format, time window and sources, then merge all parsed outputs into one timeline"""
+        if not self.output_folder_var.get():
+            messagebox.showwarning("Build Timeline", "Please set an output folder first.")
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Build Timeline")
+        dialog.resizable(False, False)
+
+        format_var = tk.StringVar(value='csv')
+        from_var, to_var = tk.StringVar(), tk.StringVar()
+        source_vars = {source: tk.BooleanVar(value=True) for source in TIMELINE_SOURCES}
+
+        tk.Label(dialog, text="Output format:").grid(row=0, column=0, sticky='w', padx=10, pady=5)
+        for column, fmt in enumerate(TIMELINE_FORMATS, 1):
+            tk.Radiobutton(dialog, text=fmt.upper(), variable=format_var, value=fmt).grid(row=0, column=column, sticky='w')
+        tk.Label(dialog, text="From (UTC):").grid(row=1, column=0, sticky='w', padx=10)
+        tk.Entry(dialog, textvariable=from_var, width=22).grid(row=1, column=1, columnspan=3, sticky='w')
+        tk.Label(dialog, text="To (UTC):").grid(row=2, column=0, sticky='w', padx=10)
+        tk.Entry(dialog, textvariable=to_var, width=22).grid(row=2, column=1, columnspan=3, sticky='w')
+        tk.Label(dialog, text="Sources:").grid(row=3, column=0, sticky='nw', padx=10, pady=5)
+        for index, (source, var) in enumerate(source_vars.items()):
+            tk.Checkbutton(dialog, text=source, variable=var).grid(row=3 + index // 3, column=1 + index % 3, sticky='w')
+
+        def start():
+            try:
+                start_bound = window_bound(from_var.get())
+                end_bound = window_bound(to_var.get(), end=True)
+            except ValueError as e:
+                messagebox.showerror("Build Timeline", str(e))
+                return
+            sources = [source for source, var in source_vars.items() if var.get()]
+            fmt, output = format_var.get(), self.output_folder_var.get()
+            dialog.destroy()
+            self.start_job("Timeline", lambda cancel: self.thread_build_timeline(
+                cancel, output, fmt, start_bound, end_bound, sources))
+
+        tk.Button(dialog, text="Build", command=start, bg="#4CAF50", fg="white").grid(
+            row=6, column=0, columnspan=4, pady=10)
+
+    def start_search(self):
+        output, query = self.output_folder_var.get(), self.search_var.get().strip()
+        if not (output and query):
+            messagebox.showwarning("Search", "Set an output folder and type something to search for.")
+            return
+        self.start_job("Search", lambda cancel: self.thread_search(cancel, output, query), kind='io')
+
+    def thread_search(self, cancel, output, query):
+        """Bring the index up to date (only new outputs are read), then query it"""
+        try:
+            indexed = update_search_index(output, cancel=cancel, log=self.log)
+            if indexed:
+                self.log(f"✅ Indexed {indexed} new or changed outputs for search.")
+            started = time.perf_counter()
+            hits = search_case(output, query, SEARCH_RESULT_LIMIT)
+            elapsed = (time.perf_counter() - started) * 1000
+            self.log(f"🔎 {len(hits)} match(es) for {query!r} in {elapsed:.1f} ms")
+            self.events.call(self.show_search_results, query, hits)
+        except JobCancelled:
+            self.log("🛑 Search canceled.")
+            raise
+        except Exception as e:
+            self.log(f"❌ Search failed: {e}")
+
+    def show_search_results(self, query, hits):
+        window = tk.Toplevel(self.root)
+        window.title(f"Search: {query}")
+        window.geometry("900x400")
+        columns = ("source", "row")
+        tree = ttk.Treeview(window, columns=columns, height=16)
+        tree.heading("#0", text="File")
+        tree.column("#0", width=260)
+        tree.heading("source", text="Artifact")
+        tree.column("source", width=110, anchor='center')
+        tree.heading("row", text="Row")
+        tree.column("row", width=500)
+        for hit in hits:
+            values = " | ".join(f"{column}={value}" for column, value in hit['row'].items() if value)
+            tree.insert('', 'end', text=os.path.basename(hit['file']), values=(hit['artifact'], values))
+        scrollbar = ttk.Scrollbar(window, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side='right', fill='y')
+        tree.pack(fill='both', expand=True, padx=5, pady=5)
+        if len(hits) >= SEARCH_RESULT_LIMIT:
+            tk.Label(window, text=f"Showing the first {SEARCH_RESULT_LIMIT} matches; refine the query to narrow them down.").pack(pady=(0, 5))
+
+    def open_results_viewer(self):
+        """Open an output table (CSV or SQLite) in a new tab of the results viewer"""
+        path = filedialog.askopenfilename(
+            title="Open Output Table",
+            initialdir=self.output_folder_var.get() or None,
+            filetypes=[("Output tables", "*.csv *.sqlite"), ("CSV files", "*.csv"), ("SQLite files", "*.sqlite")])
+        if not path:
+            return
+        if self.viewer_window is None or not self.viewer_window.winfo_exists():
+            self.viewer_window = tk.Toplevel(self.root)
+            self.viewer_window.title("Results Viewer")
+            self.viewer_window.geometry("1100x700")
+            self.viewer_notebook = ttk.Notebook(self.viewer_window)
+            self.viewer_notebook.pack(fill='both', expand=True)
+            self.viewer_tabs = []
+            self.viewer_window.protocol("WM_DELETE_WINDOW", self.close_results_viewer)
+        try:
+            self.viewer_tabs.append(ResultsTab(self, self.viewer_notebook, path))
+        except Exception as e:
+            messagebox.showerror("Results Viewer", f"Cannot open {path}: {e}")
+            return
+        self.viewer_window.lift()
+
+    def close_results_viewer(self):
+        for tab in self.viewer_tabs:
+            if tab.frame.winfo_exists():
+                tab.close()
+        self.viewer_window.destroy()
+
+    def start_job(self, name, target_func, kind='cpu'):
+        """Queue target_func(cancel) on the job manager; it runs when a slot is free"""
+        return self.jobs.submit(Job(name, target_func, kind=kind))
+
+    def start_full_triage(self):
+        """Scan, dedup and parse everything, then export HTML and PDF reports, as one job graph"""
+        if not self.output_folder_var.get() or not self.reg_folder_var.get():
+            messagebox.showwarning("Full Triage", "Please set the registry folder and the output folder first.")
+            return
+        # Snapshot the form on the Tk thread; the jobs never touch Tk variables
+        job = self.get_case()
+        job.update(tasks=list(ALL_TASKS), hives=[], report=list(REPORT_FORMATS))
+        self.jobs.submit_all(build_triage_pipeline(job, self))
+        self.log("🚀 Full triage queued. Tools > Jobs Panel shows progress per job.")
+        self.show_jobs_panel()
+
+    def show_jobs_panel(self):
+        if self.jobs_window is not None and self.jobs_window.winfo_exists():
+            self.jobs_window.lift()
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Jobs")
+        window.geometry("620x320")
+        columns = ("state", "kind", "wait", "run")
+        tree = ttk.Treeview(window, columns=columns, height=12)
+        tree.heading("#0", text="Job")
+        tree.column("#0", width=240)
+        for column, title, width in zip(columns, ("State", "Kind", "Waited", "Run time"), (90, 60, 90, 90)):
+            tree.heading(column, text=title)
+            tree.column(column, width=width, anchor='center')
+        tree.pack(fill='both', expand=True, padx=5, pady=5)
+
+        buttons = tk.Frame(window)
+        buttons.pack(fill='x', padx=5, pady=(0, 5))
+
+        def cancel_selected():
+            by_id = {str(id(job)): job for job in self.jobs.snapshot()}
+            for item in tree.selection():
+                if item in by_id:
+                    self.jobs.cancel(by_id[item])
+
+        tk.Button(buttons, text="Cancel Selected", command=cancel_selected, bg="#d32f2f", fg="white").pack(side='left', padx=2)
+        tk.Button(buttons, text="Clear Finished", command=self.jobs.clear_finished).pack(side='left', padx=2)
+        self.jobs_window = window
+        self.jobs_tree = tree
+        self.refresh_jobs_panel()
+
+    def refresh_jobs_panel(self):
+        """Sync the jobs tree with the manager; called from the pump tick"""
+        if self.jobs_window is None or not self.jobs_window.winfo_exists():
+            return
+        tree = self.jobs_tree
+        jobs = self.jobs.snapshot()
+        wanted = set()
+        for job in jobs:
+            item = str(id(job))
+            wanted.add(item)
+            parent = str(id(job.parent)) if job.parent is not None else ''
+            values = (job.state, job.kind, format_duration(job.wait_time()), format_duration(job.run_time()))
+            if tree.exists(item):
+                tree.item(item, values=values)
+            else:
+                tree.insert(parent if tree.exists(parent) else '', 'end', iid=item, text=job.name, values=values, open=True)
+        for item in tree.get_children(''):
+            for child in tree.get_children(item):
+                if child not in wanted:
+                    tree.delete(child)
+            if item not in wanted:
+                tree.delete(item)
+
+    def thread_parse_hives(self, cancel, output, hive_paths):
+        if not (output and hive_paths):
             self.log("⚠️ Missing output folder or hive selection.")
             return
         
         out_dir = os.path.join(output, "Registry")
         os.makedirs(out_dir, exist_ok=True)
         
-        total_hives = len(indices)
-        self.progress["maximum"] = 100
-        
-        for idx, i in enumerate(indices, 1):
-            if self.cancel_flag:
-                self.log("🛑 Hive parsing canceled.")
-                break
-                
-            hive_path = self.hives_listbox.get(i)
-            hive_name = os.path.basename(hive_path)
-            out_file = os.path.join(out_dir, f"{hive_name}.csv")
-            
+        hive_sizes = {}
+        for hive_path in hive_paths:
             try:
-                self.log(f"🔍 Parsing {hive_name} ({idx}/{total_hives})")
-                parse_registry_hive(hive_path, out_file)
-                self.log(f"✅ Saved to {out_file}")
-            except Exception as e:
-                self.log(f"❌ Failed parsing {hive_name}: {e}")
-            
-            self.update_progress(idx, total_hives)
+                hive_sizes[hive_path] = hive_data_size(hive_path)
+            except OSError:
+                hive_sizes[hive_path] = 0
+        tracker = self.start_tracker("Registry", total_bytes=sum(hive_sizes.values()))
+        done_bytes = 0
+
+        total_hives = len(hive_paths)
+        try:
+            for idx, hive_path in enumerate(hive_paths, 1):
+                if cancel.cancelled:
+                    self.log("🛑 Hive parsing canceled.")
+                    raise JobCancelled()
+                
+                hive_name = os.path.basename(hive_path)
+                out_file = os.path.join(out_dir, f"{hive_name}.csv")
             
-        self.log(f"✅ Registry parsing complete. Processed {len(indices)} hives.")
-        self.status_var.set("Registry parsing complete.")
+                try:
+                    self.log(f"🔍 Parsing {hive_name} ({idx}/{total_hives})")
+                    with open_manifest(output).stage("Registry", f"Registry {hive_name}", tracker,
+                                                     inputs=[hive_path], outputs=[out_file]):
+                        parse_registry_hive(hive_path, out_file, tracker, cancel)
+                    self.log(f"✅ Saved to {out_file}")
+                except JobCancelled:
+                    self.log(f"🛑 Hive parsing canceled. Partial output kept as {out_file}.incomplete")
+                    raise
+                except Exception as e:
+                    self.log(f"❌ Failed parsing {hive_name}: {e}")
 
-    def thread_parse_jump_lists(self):
-        folder, output = self.jump_folder_var.get(), self.output_folder_var.get()
+                # Replace the cell-size estimate with the real hbin bytes of this hive
+                done_bytes += hive_sizes[hive_path]
+                tracker.sync_bytes(done_bytes)
+        finally:
+            self.finish_tracker(tracker)
+        self.log(f"✅ Registry parsing complete. Processed {total_hives} hives.")
+        self.events.status("Registry parsing complete.")
+
+    def thread_parse_jump_lists(self, cancel, folder, output):
         if not (folder and output):
             self.log("⚠️ Missing jump lists folder or output folder.")
             return
@@ -791,55 +1030,52 @@ class ForensicParserApp:
         out_dir = os.path.join(output, "JumpLists")
         os.makedirs(out_dir, exist_ok=True)
         
+        tracker = self.start_tracker("Jump Lists")
         try:
             self.log("🔍 Parsing Jump Lists...")
-            self.progress.config(mode='indeterminate')
-            self.progress.start()
             
-            result = subprocess.run([JLECMD_PATH, "-d", folder, "--csv", out_dir], 
-                                  check=True, capture_output=True, text=True)
+            with open_manifest(output).stage("JumpLists", "Jump Lists", tracker, inputs=[folder], outputs=[out_dir]) as entry:
+                rows, failed = parse_jump_lists_folder(folder, out_dir, progress=tracker, cancel=cancel, log=self.log)
+                entry['failed_items'] = failed
+            self.log(f"✅ Jump Lists parsed: {rows} entries ({failed} files failed). Output: {out_dir}")
             
-            self.progress.stop()
-            self.progress.config(mode='determinate')
-            self.log(f"✅ Jump Lists parsed successfully. Output: {out_dir}")
-            
-        except subprocess.CalledProcessError as e:
-            self.log(f"❌ JLECmd failed: {e}")
+        except JobCancelled:
+            self.log("🛑 Jump Lists parsing canceled. Partial outputs marked .incomplete")
+            raise
         except Exception as e:
-            self.log(f"❌ Unexpected error: {e}")
+            self.log(f"❌ Jump Lists parsing failed: {e}")
         finally:
-            self.progress.stop()
-            self.progress.config(mode='determinate')
+            self.finish_tracker(tracker)
             
-        self.status_var.set("Jump Lists parsing complete.")
+        self.events.status("Jump Lists parsing complete.")
 
-    def thread_parse_shellbags(self):
-        folder, output = self.reg_folder_var.get(), self.output_folder_var.get()
-        if not (folder and output):
-            self.log("⚠️ Missing registry folder or output folder.")
+    def thread_parse_shellbags(self, cancel, output, hive_paths):
+        user_hives = [h for h in hive_paths if os.path.basename(h).upper() in USER_HIVE_NAMES]
+        if not (output and user_hives):
+            self.log("⚠️ Missing output folder or NTUSER.DAT/UsrClass.dat selection.")
             return
-            
+
         out_dir = os.path.join(output, "Shellbags")
         os.makedirs(out_dir, exist_ok=True)
-        
+        out_file = os.path.join(out_dir, "Shellbags.csv")
+
+        tracker = self.start_tracker("Shellbags")
         try:
             self.log("🔍 Parsing Shellbags...")
-            self.progress.config(mode='indeterminate')
-            self.progress.start()
-            
-            subprocess.run([SBECMD_PATH, "-d", folder, "--csv", out_dir], check=True)
-            self.log(f"✅ Shellbags parsed successfully. Output: {out_dir}")
-            
+            with open_manifest(output).stage("Shellbags", "Shellbags", tracker, inputs=user_hives, outputs=[out_file]):
+                row_count = parse_shellbags_from_user_hives(user_hives, out_file, self.log, tracker, cancel)
+            self.log(f"✅ Found {row_count} shellbag entries. Output: {out_file}")
+        except JobCancelled:
+            self.log("🛑 Shellbags parsing canceled. Partial output marked .incomplete")
+            raise
         except Exception as e:
             self.log(f"❌ Shellbags parsing failed: {e}")
         finally:
-            self.progress.stop()
-            self.progress.config(mode='determinate')
-            
-        self.status_var.set("Shellbags parsing complete.")
+            self.finish_tracker(tracker)
 
-    def thread_parse_prefetch(self):
-        folder, output = self.prefetch_folder_var.get(), self.output_folder_var.get()
+        self.events.status("Shellbags parsing complete.")
+
+    def thread_parse_prefetch(self, cancel, folder, output):
         if not (folder and output):
             self.log("⚠️ Missing prefetch folder or output folder.")
             return
@@ -847,32 +1083,32 @@ class ForensicParserApp:
         out_dir = os.path.join(output, "Prefetch")
         os.makedirs(out_dir, exist_ok=True)
         
+        tracker = self.start_tracker("Prefetch")
         try:
             self.log("🔍 Parsing Prefetch files...")
-            self.progress.config(mode='indeterminate')
-            self.progress.start()
             
-            subprocess.run([PECMD_PATH, "-d", folder, "--csv", out_dir], check=True)
-            self.log(f"✅ Prefetch files parsed successfully. Output: {out_dir}")
+            with open_manifest(output).stage("Prefetch", "Prefetch", tracker, inputs=[folder], outputs=[out_dir]) as entry:
+                parsed, failed = parse_prefetch_folder(folder, out_dir, progress=tracker, cancel=cancel, log=self.log)
+                entry['failed_items'] = failed
+            self.log(f"✅ Parsed {parsed} prefetch files ({failed} failed). Output: {out_dir}")
             
+        except JobCancelled:
+            self.log("🛑 Prefetch parsing canceled. Partial outputs marked .incomplete")
+            raise
         except Exception as e:
             self.log(f"❌ Prefetch parsing failed: {e}")
         finally:
-            self.progress.stop()
-            self.progress.config(mode='determinate')
+            self.finish_tracker(tracker)
             
-        self.status_var.set("Prefetch parsing complete.")
+        self.events.status("Prefetch parsing complete.")
 
-    def thread_parse_usb_devices(self):
-        output = self.output_folder_var.get()
-        indices = self.hives_listbox.curselection()
-        if not (output and indices):
+    def thread_parse_usb_devices(self, cancel, output, hive_paths):
+        if not (output and hive_paths):
             self.log("⚠️ Missing output folder or hive selection.")
             return
             
         system_hive_path = None
-        for i in indices:
-            path = self.hives_listbox.get(i)
+        for path in hive_paths:
             if os.path.basename(path).upper() == "SYSTEM":
                 system_hive_path = path
                 break
@@ -885,254 +1121,101 @@ class ForensicParserApp:
         os.makedirs(out_dir, exist_ok=True)
         out_file = os.path.join(out_dir, "USB_Devices.csv")
         
+        tracker = self.start_tracker("USB Devices")
         try:
             self.log(f"🔍 Parsing USB devices from {os.path.basename(system_hive_path)}")
-            self.progress.config(mode='indeterminate')
-            self.progress.start()
             
-            parse_usb_devices_from_system_hive(system_hive_path, out_file)
+            with open_manifest(output).stage("USB_Devices", "USB Devices", tracker,
+                                             inputs=[system_hive_path], outputs=[out_file]):
+                parse_usb_devices_from_system_hive(system_hive_path, out_file, tracker, cancel)
             self.log(f"✅ USB device information saved to {out_file}")
             
+        except JobCancelled:
+            self.log("🛑 USB device parsing canceled. Partial output marked .incomplete")
+            raise
         except Exception as e:
             self.log(f"❌ Failed parsing USB devices: {e}")
         finally:
-            self.progress.stop()
-            self.progress.config(mode='determinate')
+            self.finish_tracker(tracker)
             
-        self.status_var.set("USB device parsing complete.")
+        self.events.status("USB device parsing complete.")
         
-    def thread_parse_bluetooth(self):
-
-        output = self.output_folder_var.get()
-        indices = self.hives_listbox.curselection()
-        if not (output and indices):
+    def thread_parse_bluetooth(self, cancel, output, hive_paths):
+        if not (output and hive_paths):
             self.log("⚠️ Select output folder and SYSTEM hive.")
             return
+        system_hives = step_hives('bluetooth', hive_paths)
 
         out_bt_dir = os.path.join(output, "Bluetooth_Devices")
         os.makedirs(out_bt_dir, exist_ok=True)
         bt_file = os.path.join(out_bt_dir, "Bluetooth_SYSTEM.csv")
 
-        def filetime_to_dt(ft):
-            try:
-                if isinstance(ft, bytes) and len(ft) == 8:
-                    ts = struct.unpack("<Q", ft)[0]
-                elif isinstance(ft, int):
-                    ts = ft
-                else:
-                    return ""
-                timestamp = (ts - 116444736000000000) / 10000000
-                dt = datetime.datetime.utcfromtimestamp(timestamp)
-                return dt.strftime('%Y-%m-%d %H:%M:%S UTC')
-            except:
-                return ""
-
-        def decode_device_name(raw_bytes):
-            if not raw_bytes:
-                return ""
-
-            # Try UTF-16 first (some devices use it)
-            try:
-                name = raw_bytes.decode('utf-16-le').strip('\x00')
-                if name and all(32 <= ord(c) < 127 or c.isspace() for c in name):  # basic ASCII printable
-                    return name
-            except:
-                pass
-
-            # Try UTF-8 next
-            try:
-                return raw_bytes.decode('utf-8', errors='replace').strip('\x00')
-            except:
-                pass
-
-            
-
-            return raw_bytes.hex()  # Raw hex fallback
-
-        def parse_cod(cod):
-            major_device_classes = {
-                0x00: 'Miscellaneous',
-                0x01: 'Computer',
-                0x02: 'Phone',
-                0x03: 'LAN/Network Access Point',
-                0x04: 'Audio/Video',
-                0x05: 'Peripheral',
-                0x06: 'Imaging',
-                0x07: 'Wearable',
-                0x08: 'Toy',
-                0x09: 'Health',
-            }
-            try:
-                major = (cod >> 8) & 0x1F
-                return major_device_classes.get(major, 'Unknown')
-            except:
-                return ""
-
+        tracker = self.start_tracker("Bluetooth")
         try:
             self.log("🔍 Parsing Bluetooth devices...")
-            self.progress.config(mode='indeterminate')
-            self.progress.start()
-
-            with open(bt_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['Hive', 'MAC Address', 'Name', 'ClassOfDevice', 'Device Type', 'LastSeen', 'LastConnected'])
-
-                device_count = 0
-                for i in indices:
-                    hive_path = self.hives_listbox.get(i)
-                    if os.path.basename(hive_path).upper() != "SYSTEM":
-                        continue
-                    try:
-                        reg = Registry.Registry(hive_path)
-                        try:
-                            root = reg.open("ControlSet001\\Services\\BTHPORT\\Parameters\\Devices")
-                        except:
-                            self.log(f"⚠️ Devices key not found in {os.path.basename(hive_path)}")
-                            continue
-
-                        for dev in root.subkeys():
-                            mac = dev.name()
-
-                            def get_value(name):
-                                try:
-                                    return dev.value(name).value()
-                                except:
-                                    return None
-
-                            name_bin = get_value("Name")
-                            name = decode_device_name(name_bin) if name_bin else ""
-                            class_of_device = get_value("COD")
-                            device_type = parse_cod(class_of_device) if class_of_device else ""
-                            last_seen = filetime_to_dt(get_value("LastSeen"))
-                            last_conn = filetime_to_dt(get_value("LastConnected"))
-
-                            writer.writerow([
-                                os.path.basename(hive_path),
-                                mac,
-                                name,
-                                class_of_device if class_of_device else "",
-                                device_type,
-                                last_seen,
-                                last_conn
-                            ])
-                            device_count += 1
-
-                        self.log(f"✅ Bluetooth devices parsed from {os.path.basename(hive_path)}")
-                    except Exception as e:
-                        self.log(f"❌ Bluetooth parse failed for {os.path.basename(hive_path)}: {e}")
+            with open_manifest(output).stage("Bluetooth_Devices", "Bluetooth", tracker, inputs=system_hives, outputs=[bt_file]):
+                device_count = parse_bluetooth_from_system_hives(system_hives, bt_file, self.log, tracker, cancel)
 
             self.log(f"✅ Found {device_count} Bluetooth devices. Output: {bt_file}")
+        except JobCancelled:
+            self.log("🛑 Bluetooth parsing canceled. Partial output marked .incomplete")
+            raise
         except Exception as e:
             self.log(f"❌ Bluetooth parsing failed: {e}")
         finally:
-            self.progress.stop()
-            self.progress.config(mode='determinate')
+            self.finish_tracker(tracker)
 
-        self.status_var.set("Bluetooth parsing complete.")
+        self.events.status("Bluetooth parsing complete.")
 
-    def thread_parse_network(self):
-        output = self.output_folder_var.get()
-        indices = self.hives_listbox.curselection()
-        if not (output and indices):
+    def thread_parse_network(self, cancel, output, hive_paths):
+        if not (output and hive_paths):
             self.log("⚠️ Select output folder and SOFTWARE hive.")
             return
+        software_hives = step_hives('network', hive_paths)
 
         out_net_dir = os.path.join(output, "Network_Connections")
         os.makedirs(out_net_dir, exist_ok=True)
         net_file = os.path.join(out_net_dir, "NetworkProfiles_SOFTWARE.csv")
 
-        def systemtime_to_dt(data):
-            try:
-                if isinstance(data, bytes) and len(data) >= 16:
-                    year = int.from_bytes(data[0:2], 'little')
-                    month = int.from_bytes(data[2:4], 'little')
-                    day = int.from_bytes(data[6:8], 'little')
-                    hour = int.from_bytes(data[8:10], 'little')
-                    minute = int.from_bytes(data[10:12], 'little')
-                    second = int.from_bytes(data[12:14], 'little')
-                    millisecond = int.from_bytes(data[14:16], 'little')
-
-                    dt = datetime.datetime(year, month, day, hour, minute, second, millisecond * 1000)
-                    return dt.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] + " UTC"
-                else:
-                    return "Invalid SYSTEMTIME"
-            except Exception as e:
-                return f"Error: {e}"
-
-        def filetime_to_dt(ft):
-            try:
-                if isinstance(ft, bytes) and len(ft) == 8:
-                    ts = struct.unpack("<Q", ft)[0]
-                elif isinstance(ft, int):
-                    ts = ft
-                else:
-                    return "Invalid time format"
-
-                timestamp = (ts - 116444736000000000) / 10000000
-                dt = datetime.datetime.utcfromtimestamp(timestamp)
-                return dt.strftime('%Y-%m-%d %H:%M:%S UTC')
-
-            except Exception as e:
-                return f"Error: {e}"
-
-        def parse_timestamp(value):
-            if isinstance(value, bytes):
-                if len(value) == 8:
-                    return filetime_to_dt(value)
-                elif len(value) >= 16:
-                    return systemtime_to_dt(value)
-                else:
-                    return "Invalid binary time"
-            elif isinstance(value, int):
-                return filetime_to_dt(value)
-            else:
-                return "N/A"
-
+        tracker = self.start_tracker("Network Profiles")
         try:
             self.log("🔍 Parsing network profiles...")
-            self.progress.config(mode='indeterminate')
-            self.progress.start()
-
-            with open(net_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['Hive', 'ProfileName', 'Description', 'DateCreated', 'Managed', 'DateLastConnected'])
-
-                profile_count = 0
-                for i in indices:
-                    hive_path = self.hives_listbox.get(i)
-                    if os.path.basename(hive_path).upper() != "SOFTWARE":
-                        continue
-                    try:
-                        reg = Registry.Registry(hive_path)
-                        profiles = reg.open("Microsoft\\Windows NT\\CurrentVersion\\NetworkList\\Profiles")
-                        for profile in profiles.subkeys():
-                            def get_val(name):
-                                try:
-                                    return profile.value(name).value()
-                                except:
-                                    return None
-
-                            name = get_val("ProfileName")
-                            desc = get_val("Description")
-                            date_created = parse_timestamp(get_val("DateCreated"))
-                            managed = get_val("Managed")
-                            date_last_connected = parse_timestamp(get_val("DateLastConnected"))
-
-                            writer.writerow([os.path.basename(hive_path), name, desc, date_created, managed, date_last_connected])
-                            profile_count += 1
-
-                        self.log(f"✅ Network profiles parsed from {os.path.basename(hive_path)}")
-                    except Exception as e:
-                        self.log(f"❌ Network parse failed for {os.path.basename(hive_path)}: {e}")
+            with open_manifest(output).stage("Network_Connections", "Network Profiles", tracker,
+                                             inputs=software_hives, outputs=[net_file]):
+                profile_count = parse_network_profiles_from_software_hives(software_hives, net_file, self.log, tracker, cancel)
 
             self.log(f"✅ Found {profile_count} network profiles. Output: {net_file}")
+        except JobCancelled:
+            self.log("🛑 Network parsing canceled. Partial output marked .incomplete")
+            raise
         except Exception as e:
             self.log(f"❌ Network parsing failed: {e}")
         finally:
-            self.progress.stop()
-            self.progress.config(mode='determinate')
+            self.finish_tracker(tracker)
+
+        self.events.status("Network profile parsing complete.")
+
+    def thread_build_timeline(self, cancel, output, fmt, start, end, sources):
+        out_dir = os.path.join(output, "Timeline")
+        os.makedirs(out_dir, exist_ok=True)
+        out_file = os.path.join(out_dir, "Timeline" + TIMELINE_FORMATS[fmt])
+
+        tracker = self.start_tracker("Timeline")
+        try:
+            self.log("🔍 Building super-timeline...")
+            with open_manifest(output).stage("Timeline", "Timeline", tracker, outputs=[out_file]):
+                count = build_timeline(output, out_file, fmt, start, end, sources,
+                                       progress=tracker, cancel=cancel, log=self.log)
+            self.log(f"✅ Timeline holds {count} events. Output: {out_file}")
+        except JobCancelled:
+            self.log("🛑 Timeline build canceled. Partial output marked .incomplete")
+            raise
+        except Exception as e:
+            self.log(f"❌ Timeline build failed: {e}")
+        finally:
+            self.finish_tracker(tracker)
 
-        self.status_var.set("Network profile parsing complete.")
+        self.events.status("Timeline build complete.")
 
     def load_zip_and_scan(self):
         zip_path = filedialog.askopenfilename(
@@ -1176,27 +1259,33 @@ class ForensicParserApp:
             dialog.destroy()
             subfolder_name = f"zip_extract_{timestamp}"
             self.temp_zip_dir = os.path.join(base_path, subfolder_name)
+            self.log(f"📦 Extracting ZIP file: {zip_path}")
+            self.start_job("Extract ZIP", lambda cancel: self.thread_extract_zip(cancel, zip_path, self.temp_zip_dir),
+                           kind='io')
 
-            try:
-                os.makedirs(self.temp_zip_dir, exist_ok=True)
-                self.log(f"📦 Extracting ZIP file: {zip_path}")
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(self.temp_zip_dir)
-
-                self.log("📂 ZIP extracted successfully.")
-                self.log(f"📁 Extraction path: {self.temp_zip_dir}")
-                self.log("📡 Now scanning hives from extracted content...")
-
-                self.reg_folder_var.set(self.temp_zip_dir)
-                self.scan_hives()
+        tk.Button(dialog, text="Extract", command=confirm_path, bg="#4CAF50", fg="white").pack(pady=10)
 
-            except Exception as e:
-                self.log(f"❌ Failed to extract ZIP: {e}")
 
-        tk.Button(dialog, text="Extract", command=confirm_path, bg="#4CAF50", fg="white").pack(pady=10)
 
 
+    def thread_extract_zip(self, cancel, zip_path, dest_dir):
+        """Extract the ZIP off the Tk thread, then scan the extracted folder back on it"""
+        try:
+            extract_zip(zip_path, dest_dir, cancel)
+        except JobCancelled:
+            self.log("🛑 ZIP extraction canceled. The extracted part is left in place")
+            raise
+        except Exception as e:
+            self.log(f"❌ Failed to extract ZIP: {e}")
+            return
+        self.log("📂 ZIP extracted successfully.")
+        self.log(f"📁 Extraction path: {dest_dir}")
+        self.log("📡 Now scanning hives from extracted content...")
+        self.events.call(self.scan_extracted_folder, dest_dir)
 
+    def scan_extracted_folder(self, folder):
+        self.reg_folder_var.set(folder)
+        self.scan_hives()
 
     def cleanup_temp_zip(self):
         if self.temp_zip_dir and os.path.exists(self.temp_zip_dir):
@@ -1216,6 +1305,10 @@ class ForensicParserApp:
                 self.cleanup_temp_zip()
             else:
                 self.log(f"📁 Extracted folder kept: {self.temp_zip_dir}")
+        self.jobs.cancel_all()
+        self.governor.stop()
+        self.stop_profiling()
+        self.root.after_cancel(self.pump_after_id)
         self.root.destroy()
 
             
@@ -1231,31 +1324,10 @@ class ForensicParserApp:
 
         self.log(f"🔎 Scanning for registry hives in {folder}")
 
-        # Enhanced hive detection with more file types
-        known_hive_names = [
-            'SYSTEM', 'SOFTWARE', 'SAM', 'SECURITY', 'NTUSER.DAT', 'USRCLASS.DAT', 
-            'AMCACHE.HVE', 'DRIVERS', 'usrClass.dat', 'BBI', 'BCD', 'COMPONENTS',
-            'DEFAULT', 'ELAM', 'SCHEMA.DAT'
-        ]
-
-        hive_count = 0
-        for root_dir, dirs, files in os.walk(folder):
-            for file in files:
-                # Check for known hive names (case-insensitive)
-                if any(file.upper() == hive.upper() for hive in known_hive_names):
-                    full_path = os.path.join(root_dir, file)
-                    self.hives_listbox.insert(tk.END, full_path)
-                    hive_count += 1
-                # Also check for files without extensions that might be hives
-                elif '.' not in file and len(file) > 2:
-                    full_path = os.path.join(root_dir, file)
-                    # Basic heuristic: check file size (registry hives are typically > 10KB)
-                    try:
-                        if os.path.getsize(full_path) > 10240:  # 10KB
-                            self.hives_listbox.insert(tk.END, full_path)
-                            hive_count += 1
-                    except:
-                        pass
+        hives = find_hives(folder)
+        for full_path in hives:
+            self.hives_listbox.insert(tk.END, full_path)
+        hive_count = len(hives)
 
         self.log(f"✅ Found {hive_count} potential registry hives.")
         if hive_count > 0:
@@ -1263,166 +1335,8 @@ class ForensicParserApp:
         self.log(f"🧾 Total hive entries: {self.hives_listbox.size()}")
 
 
-def parse_registry_hive(hive_path, output_csv):
-    """Enhanced registry hive parser with better error handling"""
-    reg = Registry.Registry(hive_path)
-    
-    with open(output_csv, 'w', newline='', encoding='utf-8-sig') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(['Key Path', 'Value Name', 'Value Type', 'Value Data', 'Last Modified'])
-        
-        def get_value_type(value):
-            """Convert registry value type to readable string"""
-            type_map = {
-                Registry.RegSZ: "REG_SZ",
-                Registry.RegExpandSZ: "REG_EXPAND_SZ", 
-                Registry.RegBin: "REG_BINARY",
-                Registry.RegDWord: "REG_DWORD",
-                Registry.RegMultiSZ: "REG_MULTI_SZ",
-                Registry.RegQWord: "REG_QWORD"
-            }
-            return type_map.get(value.value_type(), f"Unknown({value.value_type()})")
-        
-        def recursive_parse(key, path=""):
-            current_path = path + "\\" + key.name() if path else key.name()
-            
-            # Parse values in current key
-            for value in key.values():
-                try:
-                    val_name = value.name() or "(Default)"
-                    val_type = get_value_type(value)
-                    
-                    # Handle different data types
-                    try:
-                        val_data = str(value.value())
-                        # Truncate very long binary data
-                        if val_type == "REG_BINARY" and len(val_data) > 100:
-                            val_data = val_data[:100] + "... (truncated)"
-                    except:
-                        val_data = "[Error reading value]"
-                    
-                    last_modified = key.timestamp().strftime("%Y-%m-%d %H:%M:%S")
-                    
-                    writer.writerow([current_path, val_name, val_type, val_data, last_modified])
-                except Exception as e:
-                    # Log error but continue processing
-                    writer.writerow([current_path, "[Error]", "ERROR", f"Failed to read: {e}", ""])
-            
-            # Recursively process subkeys
-            for subkey in key.subkeys():
-                try:
-                    recursive_parse(subkey, current_path)
-                except Exception as e:
-                    # Log error but continue with other subkeys
-                    writer.writerow([current_path + "\\" + subkey.name(), "[Error]", "ERROR", 
-                                   f"Failed to access subkey: {e}", ""])
-        
-        recursive_parse(reg.root())
-
-def parse_usb_devices_from_system_hive(hive_path, output_csv):
-    """Enhanced USB device parser with more comprehensive data extraction"""
-    reg = Registry.Registry(hive_path)
-    
-    # Try multiple ControlSets for comprehensive coverage
-    control_sets = ["ControlSet001", "ControlSet002", "CurrentControlSet"]
-    usbstor_key = None
-    usb_key = None
-
-    for cs in control_sets:
-        if usbstor_key is None:
-            try:
-                usbstor_key = reg.open(f"{cs}\\Enum\\USBSTOR")
-            except Registry.RegistryKeyNotFoundException:
-                pass
-        if usb_key is None:
-            try:
-                usb_key = reg.open(f"{cs}\\Enum\\USB")
-            except Registry.RegistryKeyNotFoundException:
-                pass
-        if usbstor_key and usb_key:
-            break
-
-    with open(output_csv, 'w', newline='', encoding='utf-8-sig') as csvfile:
-        writer = csv.writer(csvfile)
-        # Enhanced column set with additional forensically relevant fields
-        writer.writerow([
-            'Type', 'Device ID', 'Instance ID', 'Key Last Modified', 'Device Description', 
-            'Friendly Name', 'Service', 'Class GUID', 'Parent ID Prefix', 'Serial Number',
-            'Hardware IDs', 'Compatible IDs', 'Driver', 'Manufacturer', 'Location Information'
-        ])
-
-        def parse_usb_keys(key, key_type):
-            if not key:
-                return
-            
-            device_count = 0
-            for device_id_key in key.subkeys():
-                device_id = device_id_key.name()
-                for instance_key in device_id_key.subkeys():
-                    instance_id = instance_key.name()
-
-                    # Enhanced timestamp handling
-                    try:
-                        last_modified = instance_key.timestamp().strftime("%Y-%m-%d %H:%M:%S UTC")
-                    except Exception:
-                        last_modified = "N/A"
-
-                    # Comprehensive value extraction with error handling
-                    def get_value_safe(key, val_name):
-                        try:
-                            value = key.value(val_name).value()
-                            if isinstance(value, list):
-                                return "; ".join(str(v) for v in value)
-                            return str(value)
-                        except Registry.RegistryValueNotFoundException:
-                            return ""
-                        except Exception:
-                            return "[Error reading value]"
-
-                    device_desc = get_value_safe(instance_key, "DeviceDesc")
-                    friendly_name = get_value_safe(instance_key, "FriendlyName")
-                    service = get_value_safe(instance_key, "Service")
-                    class_guid = get_value_safe(instance_key, "ClassGUID")
-                    parent_id_prefix = get_value_safe(instance_key, "ParentIdPrefix")
-                    hardware_ids = get_value_safe(instance_key, "HardwareID")
-                    compatible_ids = get_value_safe(instance_key, "CompatibleIDs")
-                    driver = get_value_safe(instance_key, "Driver")
-                    manufacturer = get_value_safe(instance_key, "Mfg")
-                    location_info = get_value_safe(instance_key, "LocationInformation")
-
-                    # Enhanced serial number extraction
-                    serial_number = instance_id  # Default to instance ID
-                    serial_number_val = get_value_safe(instance_key, "SerialNumber")
-                    if serial_number_val:
-                        serial_number = serial_number_val
-
-                    writer.writerow([
-                        key_type, device_id, instance_id, last_modified, device_desc,
-                        friendly_name, service, class_guid, parent_id_prefix, serial_number,
-                        hardware_ids, compatible_ids, driver, manufacturer, location_info
-                    ])
-                    device_count += 1
-            
-            return device_count
-
-        usbstor_count = 0
-        usb_count = 0
-        
-        if usbstor_key:
-            usbstor_count = parse_usb_keys(usbstor_key, "USBSTOR") or 0
-        else:
-            writer.writerow(["USBSTOR", "No devices found or key missing", "", "", "", "", "", "", "", "", "", "", "", "", ""])
-
-        if usb_key:
-            usb_count = parse_usb_keys(usb_key, "USB") or 0
-        else:
-            writer.writerow(["USB", "No devices found or key missing", "", "", "", "", "", "", "", "", "", "", "", "", ""])
-
-    return usbstor_count + usb_count
-
-
-
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = ForensicParserApp(root)
     root.mainloop()
\ No newline at end of file
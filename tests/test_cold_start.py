@@ -0,0 +1,7 @@
+from regparser_bench import measure_cold_start, COLD_START_MODULE, IMPORT_BUDGET_SECONDS
+
+
+def test_cli_import_stays_lean():
+    seconds, loaded = measure_cold_start()
+    assert loaded == [], f"importing {COLD_START_MODULE} loaded {loaded}"
+    assert seconds <= IMPORT_BUDGET_SECONDS
@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from regparser_jumplists import (CompoundFile, JumpListError, parse_automatic_destinations,
+                                 parse_custom_destinations)
+from regparser_synth import (UUID_FILETIME_OFFSET, automatic_destinations, compound_file, custom_destinations,
+                             destlist, jump_list_entries, lnk)
+from regparser_times import filetime_to_str
+
+
+def lnk_fields(entry):
+    return {
+        'TargetCreated': filetime_to_str(entry['created']),
+        'TargetModified': filetime_to_str(entry['written']),
+        'TargetAccessed': filetime_to_str(entry['accessed']),
+        'FileSize': entry['size'],
+        'LocalPath': entry['path'],
+        'DriveType': 'Fixed',
+        'VolumeSerialNumber': f"{entry['serial']:08X}",
+        'VolumeLabel': entry['label'],
+        'Name': entry['name'],
+        'MachineID': entry['hostname'],
+    }
+
+
+def destlist_fields(entry, version):
+    return {
+        'DestListVersion': version,
+        'EntryNumber': entry['entry_number'],
+        'Path': entry['path'],
+        'Hostname': entry['hostname'],
+        'LastModified': filetime_to_str(entry['modified']),
+        'CreationTime': filetime_to_str(entry['droid_time'] - UUID_FILETIME_OFFSET),
+        'MacAddress': ':'.join(f"{entry['mac'] >> shift & 0xFF:02x}" for shift in range(40, -8, -8)),
+        'Pinned': entry['pinned'],
+        'InteractionCount': '' if version == 1 else entry['interaction_count'],
+    }
+
+
+def picked(row, expected):
+    return {name: row.get(name) for name in expected}
+
+
+def test_compound_file_streams():
+    rng = random.Random(1)
+    streams = {'empty': b"", 'small': rng.randbytes(100), 'cutoff': rng.randbytes(4096),
+               'large': rng.randbytes(5000), 'DestList': rng.randbytes(4095)}
+    cfb = CompoundFile(compound_file(streams))
+    assert sorted(cfb.stream_names()) == sorted(streams)
+    for name, data in streams.items():
+        assert cfb.read_stream(name) == data
+    # Streams below the cutoff are read from the mini stream
+    assert streams['small'] in bytes(cfb.ministream)
+    assert streams['large'] not in bytes(cfb.ministream)
+
+
+@pytest.mark.parametrize("version", [1, 3, 4])
+def test_destlist_versions(version):
+    entries = jump_list_entries(random.Random(version), 5)
+    rows = parse_automatic_destinations(memoryview(automatic_destinations(entries, version)))
+    assert len(rows) == len(entries)
+    for row, entry in zip(rows, entries):
+        expected = dict(destlist_fields(entry, version), **lnk_fields(entry))
+        assert picked(row, expected) == expected
+        assert 'ParsingError' not in row
+
+
+def test_destlist_outside_mini_stream():
+    entries = jump_list_entries(random.Random(2), 60)
+    data = automatic_destinations(entries, 4)
+    assert len(CompoundFile(data).read_stream('DestList')) >= 4096
+    rows = parse_automatic_destinations(memoryview(data))
+    assert [row['Path'] for row in rows] == [entry['path'] for entry in entries]
+
+
+def test_damaged_destlist():
+    entries = jump_list_entries(random.Random(3), 4)
+    streams = {f"{entry['entry_number']:x}": lnk(entry) for entry in entries}
+    # Cut the DestList in the middle of its third entry
+    full, two = destlist(entries, 3), destlist(entries[:2], 3)
+    streams['DestList'] = full[:len(two) + 40]
+    rows = parse_automatic_destinations(memoryview(compound_file(streams)))
+    assert [row['EntryNumber'] for row in rows] == [1, 2, 3, 4]
+    for row, entry in zip(rows[:2], entries):
+        assert picked(row, destlist_fields(entry, 3)) == destlist_fields(entry, 3)
+    # The LNK streams of the lost entries are still reported, without DestList fields
+    for row, entry in zip(rows[2:], entries[2:]):
+        assert 'Path' not in row
+        assert picked(row, lnk_fields(entry)) == lnk_fields(entry)
+
+
+def test_damaged_lnk_stream():
+    entries = jump_list_entries(random.Random(4), 2)
+    streams = {'1': lnk(entries[0]), '2': b"not a link", 'DestList': destlist(entries, 4)}
+    rows = parse_automatic_destinations(memoryview(compound_file(streams)))
+    assert 'ParsingError' not in rows[0]
+    assert rows[1]['ParsingError'].startswith("LNK 2:")
+    assert rows[1]['Path'] == entries[1]['path']
+
+
+def test_custom_destinations():
+    entries = jump_list_entries(random.Random(5), 3)
+    rows = parse_custom_destinations(custom_destinations(entries))
+    assert [row['EntryNumber'] for row in rows] == [0, 1, 2]
+    for row, entry in zip(rows, entries):
+        assert picked(row, lnk_fields(entry)) == lnk_fields(entry)
+
+
+def test_not_a_compound_file():
+    with pytest.raises(JumpListError):
+        CompoundFile(b"\x00" * 1024)
+
+
+def test_truncated_compound_file():
+    data = automatic_destinations(jump_list_entries(random.Random(6), 60), 1)
+    with pytest.raises(JumpListError):
+        CompoundFile(data[:len(data) // 2])
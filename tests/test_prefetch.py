@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from regparser_prefetch import PrefetchError, decompress_mam, parse_prefetch_bytes, xpress_huffman_decompress
+from regparser_synth import mam_compress, prefetch_scca, prefetch_spec, xpress_huffman_compress
+from regparser_times import filetime_to_str
+
+
+# Hand-assembled stream: every symbol has a 9-bit code (so codes are the symbols),
+# literals "abc" then match symbol 275 (offset bits 1, length 6) with offset bit 1
+HAND_STREAM = bytes([0x99]) * 256 + bytes.fromhex("9830718c00380000")
+
+
+def expected_fields(version, spec):
+    volume = spec['volumes'][0]
+    return {
+        'executable': spec['executable'],
+        'hash': f"{spec['hash']:08X}",
+        'version': version,
+        'run_count': spec['run_count'],
+        'run_times': [filetime_to_str(t) for t in spec['run_times'][:1 if version < 26 else 8]],
+        'volumes': [{'name': volume['name'], 'serial': f"{volume['serial']:08X}",
+                     'created': filetime_to_str(volume['created'])}],
+        'directories': volume['directories'],
+        'files_loaded': spec['files_loaded'],
+    }
+
+
+def parsed_fields(data):
+    record = parse_prefetch_bytes(data)
+    del record['size']
+    return record
+
+
+def test_hand_assembled_stream():
+    assert xpress_huffman_decompress(HAND_STREAM, 9) == b"abcabcabc"
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"a",
+    bytes(range(256)) * 3,
+    # Long matches need the one- and three-byte length extensions
+    b"x" * 300 + b"y" * 70000,
+    # More than one 64 KiB block, each with its own table
+    random.Random(1).randbytes(150000),
+    b"".join(random.Random(2).choice([b"SCCA", b"\\WINDOWS\\SYSTEM32\\", b"\x00" * 40]) for _ in range(20000)),
+], ids=["empty", "one byte", "literals", "long matches", "random blocks", "mixed blocks"])
+def test_xpress_round_trip(data):
+    compressed = xpress_huffman_compress(data)
+    assert xpress_huffman_decompress(compressed, len(data)) == data
+
+
+def test_xpress_uses_matches():
+    data = b"\\VOLUME{01d2}\\WINDOWS\\SYSTEM32\\NTDLL.DLL\x00" * 2000
+    assert len(xpress_huffman_compress(data)) < len(data) // 20
+
+
+def test_xpress_truncated_stream():
+    compressed = xpress_huffman_compress(random.Random(3).randbytes(100000))
+    with pytest.raises(PrefetchError):
+        xpress_huffman_decompress(compressed[:40000], 100000)
+
+
+@pytest.mark.parametrize("version", [17, 23, 26, 30])
+def test_layouts(version):
+    spec = prefetch_spec(random.Random(version), version)
+    assert parsed_fields(prefetch_scca(version, spec)) == expected_fields(version, spec)
+
+
+def test_windows10_short_file_information():
+    spec = prefetch_spec(random.Random(4))
+    assert parsed_fields(prefetch_scca(30, spec, metrics_offset=0x128)) == expected_fields(30, spec)
+
+
+@pytest.mark.parametrize("crc", [False, True], ids=["plain", "crc"])
+def test_mam_unwrap(crc):
+    spec = prefetch_spec(random.Random(5))
+    # Enough loaded files to take the SCCA data past one block
+    spec['files_loaded'] += [f"\\VOLUME{{01d2}}\\APP\\LIB{i}.DLL" for i in range(3000)]
+    scca = prefetch_scca(30, spec)
+    assert len(scca) > 65536
+    compressed = mam_compress(scca, crc)
+    assert decompress_mam(compressed) == scca
+    assert parsed_fields(compressed) == expected_fields(30, spec)
+
+
+def test_mam_unsupported_format():
+    compressed = bytearray(mam_compress(prefetch_scca(30, prefetch_spec(random.Random(6)))))
+    compressed[3] = 0x03
+    with pytest.raises(PrefetchError):
+        decompress_mam(bytes(compressed))